@@ -0,0 +1,225 @@
+# admission.py
+"""Admission control for BigQuery jobs and Gemini calls.
+
+Each backend has a global concurrency limit and a per-user limit. Calls
+over the limit wait in per-user queues, and free slots go to users
+round-robin. A user who fires twenty queries therefore delays everyone else
+by at most one slot per turn. A call that waits longer than
+ADMISSION_TIMEOUT_SECONDS fails with AdmissionTimeout.
+
+A limit of 0 disables that limit.
+
+Background runners (batch.py, pre-warming) run every item under one user
+name and bound their own concurrency, so `exempt_from_per_user_limit`
+lifts the per-user limit for them. Their calls still count against the
+global limit and take their turn round-robin.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+ADMISSION_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_TIMEOUT_SECONDS", "60"))
+BQ_MAX_CONCURRENT = int(os.getenv("BQ_MAX_CONCURRENT", "20"))
+BQ_MAX_PER_USER = int(os.getenv("BQ_MAX_PER_USER", "3"))
+GEMINI_MAX_CONCURRENT = int(os.getenv("GEMINI_MAX_CONCURRENT", "16"))
+GEMINI_MAX_PER_USER = int(os.getenv("GEMINI_MAX_PER_USER", "2"))
+
+ANONYMOUS = "anonymous"
+
+
+class AdmissionTimeout(TimeoutError):
+    """Raised when a call waited longer than the queue timeout for a slot."""
+
+
+class _Ticket:
+    __slots__ = ("user", "granted")
+
+    def __init__(self, user):
+        self.user = user
+        self.granted = False
+
+
+class FairLimiter:
+    """Concurrency limiter with per-user FIFO queues served round-robin."""
+
+    def __init__(self, name: str, limit: int, per_user_limit: int = 0, timeout_s: float = ADMISSION_TIMEOUT_SECONDS):
+        self.name = name
+        self.limit = limit
+        self.per_user_limit = per_user_limit
+        self.timeout_s = timeout_s
+        self.exempt_users = set()  # not held to per_user_limit
+        self._cond = threading.Condition()
+        self._active = 0
+        self._active_by_user = {}
+        self._queues = OrderedDict()  # user -> deque of tickets; order is the round-robin order
+        self._admitted = 0
+        self._queued = 0
+        self._timed_out = 0
+        self._max_wait_ms = 0.0
+
+    def _has_room(self, user) -> bool:
+        if self.limit and self._active >= self.limit:
+            return False
+        if not self.per_user_limit or user in self.exempt_users:
+            return True
+        return self._active_by_user.get(user, 0) < self.per_user_limit
+
+    def _admit(self, user):
+        self._active += 1
+        self._active_by_user[user] = self._active_by_user.get(user, 0) + 1
+        self._admitted += 1
+
+    def _grant_waiting(self):
+        """Hands free slots to queued users, one ticket per user per turn."""
+        granted = False
+        while self._queues:
+            for user in list(self._queues):
+                if self._has_room(user):
+                    queue = self._queues.pop(user)
+                    ticket = queue.popleft()
+                    if queue:
+                        self._queues[user] = queue  # back of the round-robin order
+                    ticket.granted = True
+                    self._admit(user)
+                    granted = True
+                    break
+            else:
+                break
+        if granted:
+            self._cond.notify_all()
+
+    def position(self, ticket: _Ticket) -> int:
+        """1-based place in line under round-robin order."""
+        queue = self._queues.get(ticket.user)
+        if ticket.granted or not queue or ticket not in queue:
+            return 0
+        rank = queue.index(ticket)
+        users = list(self._queues)
+        mine = users.index(ticket.user)
+        ahead = sum(
+            min(len(self._queues[user]), rank + 1 if i < mine else rank)
+            for i, user in enumerate(users) if i != mine
+        )
+        return ahead + rank + 1
+
+    @contextmanager
+    def slot(self, user: str = None, tracer=None, on_queue=None):
+        """Holds one slot for the duration of the block.
+
+        `on_queue(position)` is called while waiting, whenever the caller's
+        place in line changes. The wait is recorded on `tracer` as a
+        queue.<name> span.
+        """
+        user = user or ANONYMOUS
+        if not self.limit and not self.per_user_limit:
+            yield
+            return
+        started = time.perf_counter()
+        started_ns = time.time_ns()
+        position = 0
+        with self._cond:
+            if self._has_room(user) and not self._queues:
+                self._admit(user)
+                ticket = None
+            else:
+                ticket = _Ticket(user)
+                self._queues.setdefault(user, deque()).append(ticket)
+                self._grant_waiting()
+                position = self.position(ticket)
+                if not ticket.granted:
+                    self._queued += 1
+        if ticket is not None:
+            try:
+                self._wait(ticket, started, on_queue)
+            except BaseException:
+                # Timed out, or interrupted (e.g. Streamlit stopping the script from on_queue):
+                # leave the queue, or give back the slot if it was granted meanwhile.
+                with self._cond:
+                    if ticket.granted:
+                        self._release(user)
+                    else:
+                        self._withdraw(ticket)
+                raise
+        try:
+            wait_ms = (time.perf_counter() - started) * 1000
+            with self._cond:
+                self._max_wait_ms = max(self._max_wait_ms, wait_ms)
+            if tracer is not None:
+                tracer.record_span(f"queue.{self.name}", started_ns, time.time_ns(), position=position,
+                                   wait_ms=round(wait_ms, 1))
+            yield
+        finally:
+            with self._cond:
+                self._release(user)
+
+    def _release(self, user):
+        self._active -= 1
+        self._active_by_user[user] -= 1
+        if not self._active_by_user[user]:
+            del self._active_by_user[user]
+        self._grant_waiting()
+
+    def _wait(self, ticket: _Ticket, started: float, on_queue):
+        reported = None
+        while True:
+            with self._cond:
+                position = self.position(ticket)
+                if position == reported and not ticket.granted:
+                    remaining = self.timeout_s - (time.perf_counter() - started)
+                    if remaining > 0:
+                        self._cond.wait(timeout=remaining)
+                        position = self.position(ticket)
+                if ticket.granted:
+                    return
+                if self.timeout_s - (time.perf_counter() - started) <= 0:
+                    self._abandon(ticket)
+                    raise AdmissionTimeout(
+                        f"{self.name} is busy: waited {self.timeout_s:g}s for a slot. Please try again shortly."
+                    )
+            # Outside the lock: the callback may be slow (e.g. a UI update).
+            if on_queue is not None and position != reported:
+                on_queue(position)
+            reported = position
+
+    def _abandon(self, ticket: _Ticket):
+        self._withdraw(ticket)
+        self._timed_out += 1
+
+    def _withdraw(self, ticket: _Ticket):
+        queue = self._queues.get(ticket.user)
+        if queue is not None and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[ticket.user]
+        self._cond.notify_all()  # positions behind it moved up
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "per_user_limit": self.per_user_limit,
+                "active": self._active,
+                "waiting": sum(len(q) for q in self._queues.values()),
+                "waiting_users": len(self._queues),
+                "admitted": self._admitted,
+                "queued": self._queued,
+                "timed_out": self._timed_out,
+                "max_wait_ms": round(self._max_wait_ms, 1),
+            }
+
+
+bigquery_limiter = FairLimiter("bigquery", BQ_MAX_CONCURRENT, BQ_MAX_PER_USER)
+gemini_limiter = FairLimiter("gemini", GEMINI_MAX_CONCURRENT, GEMINI_MAX_PER_USER)
+
+
+def exempt_from_per_user_limit(user: str):
+    """Lifts the per-user limits for a background runner's user name."""
+    bigquery_limiter.exempt_users.add(user)
+    gemini_limiter.exempt_users.add(user)
+
+
+def admission_stats() -> dict:
+    return {"bigquery": bigquery_limiter.stats(), "gemini": gemini_limiter.stats()}
@@ -0,0 +1,387 @@
+# answer_cache.py
+# pylint: disable=broad-exception-caught
+"""SQLite-backed cache of finished answers.
+
+Answers are keyed on (hash of the template's parameterized SQL, canonical
+final parameters, sampling mode, data freshness), so editing a template's
+SQL retires its old answers. Freshness is "settled" once a date range ends more
+than ANSWER_CACHE_SETTLED_DAYS ago, since GA4 can still rewrite a daily
+shard for about three days. For ranges that are not yet settled, freshness
+is the last-modified time of the range's newest daily shard. If that cannot
+be read (the intraday table, or a client without get_table), it falls back
+to a time bucket of ANSWER_CACHE_TTL_SECONDS.
+
+An optional question key in front of routing maps a normalized question,
+asked on the same UTC day against the same dataset, to a stored answer. A
+repeat question then skips both Gemini calls and the BigQuery job.
+
+Eviction is shard-aware. `evict_shard(date)` drops every answer whose range
+covers a rewritten daily shard. `put()` does this on its own when it sees a
+shard's last-modified time change, and when a daily shard shows up for the
+first time it drops the answers that were cached on a time bucket before it
+landed. `prune()` drops unsettled answers whose freshness bucket has passed,
+then trims least-recently-hit entries down to ANSWER_CACHE_MAX_MB. `put()`
+runs it every ANSWER_CACHE_PRUNE_EVERY writes or ANSWER_CACHE_PRUNE_SECONDS,
+whichever comes first.
+
+    python answer_cache.py --stats
+    python answer_cache.py --evict-shard 20240301 --prune
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", "/tmp/ga4_chat_answers.sqlite3")
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+ANSWER_CACHE_SETTLED_DAYS = int(os.getenv("ANSWER_CACHE_SETTLED_DAYS", "3"))
+ANSWER_CACHE_MAX_MB = float(os.getenv("ANSWER_CACHE_MAX_MB", "256"))
+# put() prunes after this many writes or this long since the last prune, whichever comes first.
+ANSWER_CACHE_PRUNE_EVERY = int(os.getenv("ANSWER_CACHE_PRUNE_EVERY", "100"))
+ANSWER_CACHE_PRUNE_SECONDS = float(os.getenv("ANSWER_CACHE_PRUNE_SECONDS", "600"))
+# Look up normalized questions before routing (skips both Gemini calls on a hit).
+ANSWER_CACHE_QUESTION_KEY = os.getenv("ANSWER_CACHE_QUESTION_KEY", "true").lower() in ("1", "true", "yes")
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    last_hit_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    template_name TEXT NOT NULL,
+    params TEXT NOT NULL,
+    sampling_mode TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    freshness TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    details TEXT,
+    rows TEXT,
+    size_bytes INTEGER NOT NULL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_answers_dates ON answers (start_date, end_date);
+CREATE TABLE IF NOT EXISTS question_keys (
+    question_key TEXT PRIMARY KEY,
+    answer_key TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shard_versions (
+    dataset TEXT NOT NULL,
+    shard_date TEXT NOT NULL,
+    modified TEXT NOT NULL,
+    PRIMARY KEY (dataset, shard_date)
+);
+"""
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s-]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Case, punctuation and whitespace-insensitive form of a question."""
+    text = _PUNCTUATION_RE.sub(" ", question.lower())
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def canonical_params(final_params: dict) -> str:
+    return json.dumps({k: str(v) for k, v in final_params.items() if v is not None}, sort_keys=True)
+
+
+def _today():
+    return datetime.now(timezone.utc).date()
+
+
+def is_settled(end_date: str, settled_days: int = ANSWER_CACHE_SETTLED_DAYS) -> bool:
+    try:
+        end = datetime.strptime(end_date, "%Y%m%d").date()
+    except (TypeError, ValueError):
+        return False
+    return end <= _today() - timedelta(days=settled_days)
+
+
+def newest_shard(end_date: str) -> str:
+    """The newest daily shard a range ending on `end_date` reads; the one GA4 is still updating."""
+    return min(end_date, (_today() - timedelta(days=1)).strftime("%Y%m%d"))
+
+
+def freshness_token(final_params: dict, bq_client=None) -> str:
+    """Changes whenever the data behind the parameters may have changed."""
+    end_date = final_params.get("end_date")
+    if is_settled(end_date):
+        return "settled"
+    if bq_client is not None and hasattr(bq_client, "get_table"):
+        newest = newest_shard(end_date)
+        table_id = f"{final_params['project_id']}.{final_params['dataset_id']}.events_{newest}"
+        try:
+            modified = bq_client.get_table(table_id).modified
+            if modified is not None:
+                return f"modified:{int(modified.timestamp())}"
+        except Exception as e:
+            logger.debug("No modified time for %s: %s", table_id, e)
+    return f"ttl:{int(time.time() // ANSWER_CACHE_TTL_SECONDS)}"
+
+
+def answer_key(sql: str, final_params: dict, sampling_mode: str, freshness: str) -> str:
+    sql_hash = hashlib.sha256(sql.encode("utf-8")).hexdigest()
+    payload = json.dumps([sql_hash, canonical_params(final_params), sampling_mode, freshness])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def question_key(question: str, project_id: str, dataset_id: str, sampling_mode: str) -> str:
+    # Relative dates ("yesterday") resolve differently each day, so the day is part of the key.
+    payload = json.dumps([normalize_question(question), project_id, dataset_id, sampling_mode,
+                          _today().isoformat()])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """Safe to share across Streamlit sessions; each call opens its own connection."""
+
+    def __init__(self, path: str = ANSWER_CACHE_PATH, max_mb: float = ANSWER_CACHE_MAX_MB):
+        self.path = path
+        self.max_bytes = int(max_mb * 1_000_000)
+        self._prune_lock = threading.Lock()
+        self._writes_since_prune = 0
+        self._last_prune = time.monotonic()
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(answers)")}
+            if "source" not in columns:  # caches created before pre-warming existed
+                conn.execute("ALTER TABLE answers ADD COLUMN source TEXT")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _hit(self, conn, key):
+        row = conn.execute(
+            "SELECT created_at, answer, details, rows, freshness, template_name, params FROM answers WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE answers SET hits = hits + 1, last_hit_at = ? WHERE key = ?", (time.time(), key))
+        return {
+            "key": key,
+            "age_s": round(time.time() - row[0], 1),
+            "answer": row[1],
+            "details": json.loads(row[2]) if row[2] else {},
+            "rows": json.loads(row[3]) if row[3] else [],
+            "freshness": row[4],
+            "template_name": row[5],
+            "final_params": json.loads(row[6]),
+        }
+
+    def get(self, sql, final_params, sampling_mode, bq_client=None, freshness=None):
+        """Returns the cached answer for a template's parameterized SQL and resolved parameters, or None."""
+        freshness = freshness or freshness_token(final_params, bq_client)
+        key = answer_key(sql, final_params, sampling_mode, freshness)
+        with closing(self._connect()) as conn, conn:
+            return self._hit(conn, key)
+
+    def get_by_question(self, question, project_id, dataset_id, sampling_mode, bq_client=None):
+        """Looks a normalized question up before routing; re-checks freshness of the answer it maps to."""
+        qkey = question_key(question, project_id, dataset_id, sampling_mode)
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                """
+                SELECT a.key, a.freshness, a.params FROM question_keys q
+                JOIN answers a ON a.key = q.answer_key
+                WHERE q.question_key = ?
+                """,
+                (qkey,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] != "settled" and freshness_token(json.loads(row[2]), bq_client) != row[1]:
+                return None
+            return self._hit(conn, row[0])
+
+    def put(self, template_name, sql, final_params, sampling_mode, answer, details, rows,
+            question=None, bq_client=None, freshness=None, source="chat") -> str:
+        freshness = freshness or freshness_token(final_params, bq_client)
+        key = answer_key(sql, final_params, sampling_mode, freshness)
+        details_json = json.dumps(details, default=str)
+        rows_json = json.dumps(rows, default=str)
+        size = len(answer) + len(details_json) + len(rows_json)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            if freshness.startswith("modified:"):
+                self._note_shard(conn, final_params.get("dataset_id"),
+                                 newest_shard(final_params.get("end_date")), freshness)
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO answers (
+                    key, created_at, last_hit_at, hits, template_name, params, sampling_mode,
+                    start_date, end_date, freshness, answer, details, rows, size_bytes, source
+                ) VALUES (?, ?, ?, 0, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, now, now, template_name, canonical_params(final_params), sampling_mode,
+                 final_params.get("start_date"), final_params.get("end_date"), freshness,
+                 answer, details_json, rows_json, size, source),
+            )
+            if question:
+                self._link(conn, question, final_params, sampling_mode, key)
+        if self._prune_due():
+            try:
+                self.prune()
+            except sqlite3.Error as e:
+                logger.warning("Answer cache prune failed: %s", e)
+        return key
+
+    def _prune_due(self) -> bool:
+        with self._prune_lock:
+            self._writes_since_prune += 1
+            if (self._writes_since_prune < ANSWER_CACHE_PRUNE_EVERY
+                    and time.monotonic() - self._last_prune < ANSWER_CACHE_PRUNE_SECONDS):
+                return False
+            self._writes_since_prune = 0
+            self._last_prune = time.monotonic()
+            return True
+
+    def _note_shard(self, conn, dataset_id, shard_date, modified):
+        """Records a shard's last-modified token and evicts answers made before it changed."""
+        row = conn.execute(
+            "SELECT modified FROM shard_versions WHERE dataset = ? AND shard_date = ?", (dataset_id, shard_date)
+        ).fetchone()
+        if row is not None and row[0] == modified:
+            return
+        conn.execute(
+            "INSERT OR REPLACE INTO shard_versions (dataset, shard_date, modified) VALUES (?, ?, ?)",
+            (dataset_id, shard_date, modified),
+        )
+        if row is None:
+            # First sight of the shard (e.g. the daily export just landed): answers cached before it
+            # existed were keyed on a time bucket.
+            evicted = self._evict_shard(conn, shard_date, "AND freshness LIKE 'ttl:%'")
+        else:
+            evicted = self._evict_shard(conn, shard_date)
+        if evicted:
+            logger.info("Shard %s of %s changed; evicted %d cached answers", shard_date, dataset_id, evicted)
+
+    def link_question(self, question, final_params, sampling_mode, key):
+        """Points a question at an existing answer, e.g. after a parameter-level hit."""
+        with closing(self._connect()) as conn, conn:
+            self._link(conn, question, final_params, sampling_mode, key)
+
+    @staticmethod
+    def _link(conn, question, final_params, sampling_mode, key):
+        qkey = question_key(question, final_params.get("project_id"), final_params.get("dataset_id"), sampling_mode)
+        conn.execute(
+            "INSERT OR REPLACE INTO question_keys (question_key, answer_key, created_at) VALUES (?, ?, ?)",
+            (qkey, key, time.time()),
+        )
+
+    def evict_shard(self, shard_date: str) -> int:
+        """Drops answers whose date range includes the given YYYYMMDD shard."""
+        with closing(self._connect()) as conn, conn:
+            return self._evict_shard(conn, shard_date)
+
+    def _evict_shard(self, conn, shard_date, where=""):
+        cursor = conn.execute(
+            f"DELETE FROM answers WHERE start_date <= ? AND end_date >= ? {where}", (shard_date, shard_date)
+        )
+        self._drop_orphan_questions(conn)
+        return cursor.rowcount
+
+    def prune(self) -> dict:
+        """Drops unsettled answers past their freshness window, then LRU-trims to the size cap."""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            expired = conn.execute(
+                "DELETE FROM answers WHERE freshness != 'settled' AND created_at < ?",
+                (now - max(ANSWER_CACHE_TTL_SECONDS, ANSWER_CACHE_SETTLED_DAYS * 86_400),),
+            ).rowcount
+            expired += conn.execute(
+                "DELETE FROM answers WHERE freshness LIKE 'ttl:%' AND created_at < ?",
+                (now - ANSWER_CACHE_TTL_SECONDS,),
+            ).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM answers").fetchone()[0]
+            trimmed = 0
+            if total > self.max_bytes:
+                for key, size in conn.execute(
+                    "SELECT key, size_bytes FROM answers ORDER BY last_hit_at ASC"
+                ).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+                    total -= size
+                    trimmed += 1
+            conn.execute("DELETE FROM question_keys WHERE created_at < ?", (now - 86_400,))
+            self._drop_orphan_questions(conn)
+            # Shards that have settled will not change again.
+            settled_before = (_today() - timedelta(days=ANSWER_CACHE_SETTLED_DAYS + 1)).strftime("%Y%m%d")
+            conn.execute("DELETE FROM shard_versions WHERE shard_date < ?", (settled_before,))
+        return {"expired": expired, "trimmed": trimmed, "bytes": total}
+
+    @staticmethod
+    def _drop_orphan_questions(conn):
+        conn.execute("DELETE FROM question_keys WHERE answer_key NOT IN (SELECT key FROM answers)")
+
+    def source_stats(self, source: str, since: float) -> dict:
+        """Entries stored by `source` (e.g. "prewarm") since a unix time, and how often they were hit."""
+        with closing(self._connect()) as conn:
+            entries, hit_entries, hits, warmed_at = conn.execute(
+                """
+                SELECT COUNT(*), COALESCE(SUM(hits > 0), 0), COALESCE(SUM(hits), 0), MIN(created_at)
+                FROM answers WHERE source = ? AND created_at >= ?
+                """,
+                (source, since),
+            ).fetchone()
+            templates = conn.execute(
+                """
+                SELECT template_name, SUM(hits) FROM answers
+                WHERE source = ? AND created_at >= ?
+                GROUP BY template_name ORDER BY SUM(hits) DESC
+                """,
+                (source, since),
+            ).fetchall()
+        return {"entries": entries, "entries_hit": hit_entries, "hits": hits, "stored_at": warmed_at,
+                "hits_by_template": dict(templates)}
+
+    def stats(self) -> dict:
+        with closing(self._connect()) as conn:
+            entries, size, hits, settled = conn.execute(
+                """
+                SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(hits), 0),
+                       COALESCE(SUM(freshness = 'settled'), 0)
+                FROM answers
+                """
+            ).fetchone()
+            questions = conn.execute("SELECT COUNT(*) FROM question_keys").fetchone()[0]
+        return {"entries": entries, "settled": settled, "question_keys": questions,
+                "hits": hits, "mb": round(size / 1_000_000, 3)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=ANSWER_CACHE_PATH)
+    parser.add_argument("--evict-shard", action="append", default=[], metavar="YYYYMMDD",
+                        help="Drop answers covering this daily shard (repeatable).")
+    parser.add_argument("--prune", action="store_true", help="Expire stale entries and trim to the size cap.")
+    parser.add_argument("--stats", action="store_true")
+    args = parser.parse_args(argv)
+
+    cache = AnswerCache(args.path)
+    for shard in args.evict_shard:
+        print(f"evicted {cache.evict_shard(shard)} answers covering {shard}")
+    if args.prune:
+        print(f"pruned: {cache.prune()}")
+    if args.stats or not (args.evict_shard or args.prune):
+        print(json.dumps(cache.stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
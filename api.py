@@ -0,0 +1,372 @@
+# api.py
+# pylint: disable=broad-exception-caught
+"""JSON HTTP API over the chat pipeline, for internal tools and bots.
+
+    GET  /templates            -> {"templates": [{name, **metadata}]} (see validate_templates.py)
+    POST /ask                  {"question", "session_id"?, "sampling_mode"?, "use_cache"?}
+    POST /execute-template     {"template", "parameters"?, "question"?, "summarize"?, "sampling_mode"?, "use_cache"?}
+    POST /results              {"template", "parameters"?, "page_size"?} -> first page of the full result
+    GET  /results/<id>?page=N  -> page N (0-based) of that result
+    GET  /results/<id>/export?format=csv|parquet -> the full result, streamed as a download
+    GET  /metrics              -> BigQuery query coalescing and admission queue counters
+    GET  /healthz
+
+/ask and /execute-template return {"answer", "rows", "details"}, the same
+payload the chat UI shows. /results runs a template without its top_n
+LIMIT and returns {"result_id", "page", "pages", "page_size", "total_rows",
+"rows"}. The remaining pages are read from BigQuery's destination table on
+request, and only by the same user. /export streams the whole result one
+BigQuery page at a time (see exports.py), so it never holds it all. The server is a single asyncio/Tornado process:
+the blocking BigQuery and Gemini calls run on a thread pool of
+API_MAX_WORKERS, so the event loop keeps accepting requests while they wait.
+
+Auth follows the Streamlit app. When SIMPLE_AUTH_USERNAME and
+SIMPLE_AUTH_PASSWORD_HASH are set, requests need HTTP Basic credentials for
+that user. Behind IAP the caller is the email in IAP's verified assertion
+(identity.py); otherwise each client address counts as its own user.
+
+    python api.py                 # listens on $PORT (default 8081)
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import tornado.web
+
+from admission import AdmissionTimeout, admission_stats
+from answer_cache import AnswerCache
+from engine import SUMMARY_MODEL_ID, answer_question, answer_template, coalescing_stats, run_paged
+from exports import EXPORT_FORMATS, EXPORT_MIME_TYPES, iter_export
+from gemini_calls import GeminiTimeout, latencies as gemini_latencies
+from identity import client_address, iap_email
+from perf_store import PerfStore
+from prewarm import start_background_warmup
+from query_template_library import TEMPLATE_INDEX
+from result_pages import RESULT_PAGE_SIZE, ResultExpired, ResultPages
+from sampling import SAMPLING_MODE, SAMPLING_MODES
+from token_usage import remaining_budget
+from tracing import Tracer, export_trace
+
+# ------------------------------------------------------------------------------
+# Config (env-driven; safe defaults)
+# ------------------------------------------------------------------------------
+VERTEX_LOCATION = os.getenv("VERTEX_LOCATION", "us-central1")
+GA4_DATASET = os.getenv("GA4_BIGQUERY_DATASET", "")
+# Cloud Run sets PORT; 8081 keeps it clear of the Streamlit app locally.
+API_PORT = int(os.getenv("PORT", "8081"))
+# Pipelines running at once; further requests wait for a free worker.
+API_MAX_WORKERS = int(os.getenv("API_MAX_WORKERS", "32"))
+# Largest page a client may ask /results for.
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "1000"))
+
+SIMPLE_AUTH_USERNAME = os.getenv("SIMPLE_AUTH_USERNAME")
+SIMPLE_AUTH_PASSWORD_HASH = os.getenv("SIMPLE_AUTH_PASSWORD_HASH")
+
+
+def list_templates() -> list:
+    return [{"name": name, **meta} for name, meta in TEMPLATE_INDEX.items()]
+
+
+class RequestError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ------------------------------------------------------------------------------
+# Handlers
+# ------------------------------------------------------------------------------
+class BaseHandler(tornado.web.RequestHandler):
+    def initialize(self, ctx: dict):
+        self.ctx = ctx  # pylint: disable=attribute-defined-outside-init
+
+    def set_default_headers(self):
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+
+    def prepare(self):
+        if SIMPLE_AUTH_USERNAME and SIMPLE_AUTH_PASSWORD_HASH and not self._basic_auth_ok():
+            self.set_header("WWW-Authenticate", 'Basic realm="ga4-chat"')
+            self.write_json(401, {"error": "authentication required"})
+
+    def _basic_auth_ok(self) -> bool:
+        header = self.request.headers.get("Authorization", "")
+        if not header.startswith("Basic "):
+            return False
+        try:
+            username, _, password = base64.b64decode(header[6:]).decode().partition(":")
+        except Exception:
+            return False
+        password_hash = hashlib.sha256(password.encode()).hexdigest()
+        return (hmac.compare_digest(username, SIMPLE_AUTH_USERNAME)
+                and hmac.compare_digest(password_hash, SIMPLE_AUTH_PASSWORD_HASH))
+
+    def current_user_name(self) -> str:
+        """The verified IAP email, else the client address (see identity.py).
+
+        The basic-auth username is shared by every caller, so it does not
+        identify one; keying on it would put the whole instance under one
+        user's admission limit.
+        """
+        email = iap_email(self.request.headers)
+        if email:
+            return email
+        return f"client:{client_address(self.request.headers.get('X-Forwarded-For'), self.request.remote_ip)}"
+
+    def write_json(self, status: int, payload: dict):
+        self.set_status(status)
+        self.finish(json.dumps(payload, ensure_ascii=False, default=str))
+
+    def json_body(self) -> dict:
+        try:
+            body = json.loads(self.request.body or b"{}")
+        except ValueError as e:
+            raise RequestError(400, f"invalid JSON body: {e}") from e
+        if not isinstance(body, dict):
+            raise RequestError(400, "JSON body must be an object")
+        return body
+
+    def pipeline_options(self, body: dict) -> dict:
+        sampling_mode = body.get("sampling_mode", SAMPLING_MODE)
+        if sampling_mode not in SAMPLING_MODES:
+            raise RequestError(400, f"sampling_mode must be one of {SAMPLING_MODES}")
+        session = str(body.get("session_id") or uuid.uuid4().hex)
+        user = self.current_user_name()
+        perf_store = self.ctx["perf_store"]
+        return {
+            "model_id": SUMMARY_MODEL_ID,
+            "sampling_mode": sampling_mode,
+            "perf_store": perf_store,
+            "session_id": session,
+            "user": user,
+            "token_budget": remaining_budget(perf_store, session, user),
+            "answer_cache": self.ctx["answer_cache"] if body.get("use_cache", True) else None,
+        }
+
+    async def run_pipeline(self, pipeline, *args, **kwargs):
+        """Runs a blocking pipeline call on the worker pool and writes its result."""
+        tracer = Tracer("api.answer", route=self.request.path)
+        ctx = self.ctx
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                ctx["executor"],
+                lambda: pipeline(*args, ctx["bq_client"], ctx["genai_client"], ctx["project_id"],
+                                 ctx["dataset_id"], tracer=tracer, **kwargs),
+            )
+        except ValueError as e:
+            self.write_json(400, {"error": str(e)})
+            return
+        except AdmissionTimeout as e:
+            self.set_header("Retry-After", "30")
+            self.write_json(503, {"error": str(e)})
+            return
+        except GeminiTimeout as e:
+            self.write_json(504, {"error": str(e)})
+            return
+        except Exception as e:
+            self.write_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        finally:
+            tracer.finish()
+            export_trace(tracer)
+        details = result["details"]
+        details["trace"] = {"trace_id": tracer.trace_id, "spans": tracer.summary()}
+        self.write_json(200, {"answer": result["answer"], "rows": result["rows"], "details": details})
+
+
+class AskHandler(BaseHandler):
+    async def post(self):
+        try:
+            body = self.json_body()
+            question = body.get("question")
+            if not isinstance(question, str) or not question.strip():
+                raise RequestError(400, "'question' is required")
+            options = self.pipeline_options(body)
+        except RequestError as e:
+            self.write_json(e.status, {"error": str(e)})
+            return
+        await self.run_pipeline(answer_question, question.strip(), **options)
+
+
+class ExecuteTemplateHandler(BaseHandler):
+    async def post(self):
+        try:
+            body = self.json_body()
+            template_name = body.get("template")
+            if template_name not in TEMPLATE_INDEX:
+                raise RequestError(404, f"unknown template: {template_name!r}")
+            params = body.get("parameters") or {}
+            if not isinstance(params, dict):
+                raise RequestError(400, "'parameters' must be an object")
+            options = self.pipeline_options(body)
+        except RequestError as e:
+            self.write_json(e.status, {"error": str(e)})
+            return
+        await self.run_pipeline(answer_template, template_name, params, question=body.get("question"),
+                                summarize=bool(body.get("summarize", True)), cache_source="api", **options)
+
+
+class ResultsHandler(BaseHandler):
+    async def post(self):
+        try:
+            body = self.json_body()
+            template_name = body.get("template")
+            if template_name not in TEMPLATE_INDEX:
+                raise RequestError(404, f"unknown template: {template_name!r}")
+            params = body.get("parameters") or {}
+            if not isinstance(params, dict):
+                raise RequestError(400, "'parameters' must be an object")
+            page_size = body.get("page_size", RESULT_PAGE_SIZE)
+            if not isinstance(page_size, int) or not 1 <= page_size <= API_MAX_PAGE_SIZE:
+                raise RequestError(400, f"'page_size' must be an integer from 1 to {API_MAX_PAGE_SIZE}")
+        except RequestError as e:
+            self.write_json(e.status, {"error": str(e)})
+            return
+        ctx, user = self.ctx, self.current_user_name()
+        tracer = Tracer("api.results", route=self.request.path)
+        try:
+            first = await asyncio.get_running_loop().run_in_executor(
+                ctx["executor"],
+                lambda: run_paged(template_name, params, ctx["bq_client"], ctx["project_id"], ctx["dataset_id"],
+                                  page_size=page_size, tracer=tracer, user=user),
+            )
+        except ValueError as e:
+            self.write_json(400, {"error": str(e)})
+            return
+        except AdmissionTimeout as e:
+            self.set_header("Retry-After", "30")
+            self.write_json(503, {"error": str(e)})
+            return
+        except Exception as e:
+            self.write_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        finally:
+            tracer.finish()
+            export_trace(tracer)
+        pages = ctx["result_pages"]
+        result_id = pages.register(user, first["destination"], first["total_rows"], page_size)
+        self.write_json(200, {**pages.info(result_id, user), "page": 0, "rows": first["rows"]})
+
+    async def get(self, result_id):
+        try:
+            page = int(self.get_query_argument("page", "0"))
+        except ValueError:
+            self.write_json(400, {"error": "'page' must be an integer"})
+            return
+        ctx, user = self.ctx, self.current_user_name()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                ctx["executor"], lambda: ctx["result_pages"].page(ctx["bq_client"], result_id, page, user))
+        except ResultExpired as e:
+            self.write_json(404, {"error": str(e)})
+            return
+        except ValueError as e:
+            self.write_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self.write_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self.write_json(200, result)
+
+
+class ExportHandler(BaseHandler):
+    async def get(self, result_id):
+        fmt = self.get_query_argument("format", "csv")
+        if fmt not in EXPORT_FORMATS:
+            self.write_json(400, {"error": f"format must be one of {EXPORT_FORMATS}"})
+            return
+        ctx, user = self.ctx, self.current_user_name()
+        try:
+            table = ctx["result_pages"].destination(result_id, user)
+        except ResultExpired as e:
+            self.write_json(404, {"error": str(e)})
+            return
+        chunks = iter_export(ctx["bq_client"], table, fmt)
+        loop = asyncio.get_running_loop()
+        try:
+            chunk = await loop.run_in_executor(ctx["executor"], next, chunks, None)
+        except ResultExpired as e:
+            self.write_json(404, {"error": str(e)})
+            return
+        except Exception as e:
+            self.write_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self.set_header("Content-Type", EXPORT_MIME_TYPES[fmt])
+        self.set_header("Content-Disposition", f'attachment; filename="ga4-results-{result_id[:8]}.{fmt}"')
+        # Once the first bytes are sent a failure can only cut the download short; Tornado closes the connection.
+        while chunk is not None:
+            self.write(chunk)
+            await self.flush()
+            chunk = await loop.run_in_executor(ctx["executor"], next, chunks, None)
+        self.finish()
+
+
+class TemplatesHandler(BaseHandler):
+    def get(self):
+        self.write_json(200, {"templates": self.ctx["templates"]})
+
+
+class MetricsHandler(BaseHandler):
+    def get(self):
+        self.write_json(200, {"bigquery_coalescing": coalescing_stats(), "admission": admission_stats(),
+                              "gemini_latency": gemini_latencies.stats()})
+
+
+class HealthHandler(BaseHandler):
+    def prepare(self):
+        pass  # health checks are unauthenticated
+
+    def get(self):
+        self.write_json(200, {"status": "ok"})
+
+
+def make_app(bq_client, genai_client, project_id: str, dataset_id: str, perf_store: PerfStore = None,
+             answer_cache: AnswerCache = None, max_workers: int = API_MAX_WORKERS) -> tornado.web.Application:
+    ctx = {
+        "bq_client": bq_client,
+        "genai_client": genai_client,
+        "project_id": project_id,
+        "dataset_id": dataset_id,
+        "perf_store": perf_store or PerfStore(),
+        "answer_cache": answer_cache or AnswerCache(),
+        "executor": ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api"),
+        "templates": list_templates(),
+        "result_pages": ResultPages(),
+    }
+    return tornado.web.Application([
+        (r"/ask", AskHandler, {"ctx": ctx}),
+        (r"/execute-template", ExecuteTemplateHandler, {"ctx": ctx}),
+        (r"/results", ResultsHandler, {"ctx": ctx}),
+        (r"/results/([0-9a-f]+)", ResultsHandler, {"ctx": ctx}),
+        (r"/results/([0-9a-f]+)/export", ExportHandler, {"ctx": ctx}),
+        (r"/templates", TemplatesHandler, {"ctx": ctx}),
+        (r"/metrics", MetricsHandler, {"ctx": ctx}),
+        (r"/healthz", HealthHandler, {"ctx": ctx}),
+    ])
+
+
+async def main():
+    from google import genai  # pylint: disable=import-outside-toplevel
+    from google.cloud import bigquery  # pylint: disable=import-outside-toplevel
+
+    if not GA4_DATASET:
+        raise SystemExit("Missing env var GA4_BIGQUERY_DATASET (e.g., analytics_123456789).")
+    bq_client = bigquery.Client()
+    genai_client = genai.Client(vertexai=True, location=VERTEX_LOCATION, project=bq_client.project)
+    perf_store, answer_cache = PerfStore(), AnswerCache()
+    app = make_app(bq_client, genai_client, bq_client.project, GA4_DATASET, perf_store, answer_cache)
+    start_background_warmup(bq_client, genai_client, bq_client.project, GA4_DATASET, answer_cache, perf_store)
+    # No xheaders: it would let a client-set X-Real-Ip become remote_ip. identity.client_address reads
+    # the X-Forwarded-For entry Cloud Run appended instead.
+    app.listen(API_PORT)
+    print(f"Listening on :{API_PORT}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,23 +2,35 @@
 # pylint: disable=broad-exception-caught
 
 import os
-import json
 import hashlib
-from datetime import datetime, timedelta, timezone
+import uuid
 
 import streamlit as st
 from google import genai
+from google.api_core.exceptions import GoogleAPIError
 from google.cloud import bigquery
-from google.genai.types import FunctionDeclaration, GenerateContentConfig, Part, Tool
 
-from query_template_library import QUERY_TEMPLATE_LIBRARY
+from admission import AdmissionTimeout, admission_stats
+from answer_cache import AnswerCache
+from details_store import DetailsStore
+from engine import SUMMARY_MODEL_ID, answer_question, coalescing_stats, run_paged
+from exports import EXPORT_FORMATS, EXPORT_MIME_TYPES, export_to_file, result_destination
+from gemini_calls import latencies as gemini_latencies
+from identity import iap_email
+from perf_store import PerfStore
+from prewarm import PREWARM_INTERVAL_SECONDS, start_background_warmup
+from query_template_library import TEMPLATE_INDEX
+from result_pages import ResultExpired, ResultPages
+from results_view import plottable_metrics, time_axis, time_series, to_arrow
+from sampling import SAMPLING_MODE, SAMPLING_MODES
+from token_usage import remaining_budget, start_of_day_utc
+from tracing import Tracer, export_trace
 
 st.set_page_config(page_title="Speak with GA4 v1", layout="wide")
 
 # ------------------------------------------------------------------------------
 # Config (env-driven; safe defaults)
 # ------------------------------------------------------------------------------
-MODEL_ID = os.getenv("MODEL_ID", "gemini-2.5-pro")
 VERTEX_LOCATION = os.getenv("VERTEX_LOCATION", "us-central1")
 GA4_DATASET = os.getenv("GA4_BIGQUERY_DATASET", "")
 
@@ -26,6 +38,15 @@ GA4_DATASET = os.getenv("GA4_BIGQUERY_DATASET", "")
 SIMPLE_AUTH_USERNAME = os.getenv("SIMPLE_AUTH_USERNAME")
 SIMPLE_AUTH_PASSWORD_HASH = os.getenv("SIMPLE_AUTH_PASSWORD_HASH")
 
+# Admin view (per-template performance history); off by default
+ENABLE_ADMIN_VIEW = os.getenv("ENABLE_ADMIN_VIEW", "").lower() in ("1", "true", "yes")
+
+# Chat messages rendered per page; older ones sit behind "Show earlier messages".
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "20"))
+
+# Exports larger than this are not offered as browser downloads; the API streams them instead.
+EXPORT_UI_MAX_MB = float(os.getenv("EXPORT_UI_MAX_MB", "200"))
+
 # Fail fast on missing critical configuration
 if not GA4_DATASET:
     st.error("Missing env var GA4_BIGQUERY_DATASET (e.g., analytics_123456789). Set it in Cloud Run.")
@@ -58,6 +79,7 @@ def check_password():
             
             if username == SIMPLE_AUTH_USERNAME and password_hash == SIMPLE_AUTH_PASSWORD_HASH:
                 st.session_state["password_correct"] = True
+                st.session_state["username"] = username
                 st.rerun()  # Rerun the app to show the main content
             else:
                 st.error("The username or password you have entered is invalid.")
@@ -65,109 +87,195 @@ def check_password():
 
 
 # ------------------------------------------------------------------------------
-# Tools (Function Calling) — GA4-aware params
+# Helpers
 # ------------------------------------------------------------------------------
-execute_template_query_func = FunctionDeclaration(
-    name="execute_template_query",
-    description=(
-        "Executes a GA4 BigQuery template. Use this to answer user questions about GA4 data."
-    ),
-    parameters={
-        "type": "object",
-        "properties": {
-            "template_name": {
-                "type": "string",
-                "description": "One of the available GA4 query template names.",
-            },
-            "parameters": {
-                "type": "object",
-                "description": (
-                    "Template parameters. Common: start_date/end_date (YYYYMMDD), top_n, "
-                    "and other specific filters like event_name, property_key, or country_name."
-                ),
-                "properties": {
-                    "start_date": {
-                        "type": "string",
-                        "description": "YYYYMMDD. Defaults to 7 days ago.",
-                    },
-                    "end_date": {
-                        "type": "string",
-                        "description": "YYYYMMDD. Defaults to yesterday.",
-                    },
-                    "property_key": {
-                        "type": "string",
-                        "description": "The key of the user property to analyze (e.g., 'user_tier'). Used by templates like 'extract_specific_user_property'.",
-                    },
-                    "event_name": {
-                        "type": "string",
-                        "description": "The name of the event to analyze (e.g., 'purchase', 'page_view'). Used by templates like 'calculate_events_per_user' or 'analyze_specific_event_details'.",
-                    },
-                    "country_name": {
-                        "type": "string",
-                        "description": "The full name of a country for analysis (e.g., 'United States'). Used by 'analyze_specific_country'.",
-                    },
-                    "campaign_name": {
-                        "type": "string",
-                        "description": "The name of a marketing campaign for analysis. Used by 'analyze_specific_campaign'.",
-                    },
-                },
-            },
-        },
-        "required": ["template_name", "parameters"],
-    },
-)
-
-query_tool = Tool(function_declarations=[execute_template_query_func])
+@st.cache_resource
+def get_perf_store() -> PerfStore:
+    return PerfStore()
+
+
+@st.cache_resource
+def get_answer_cache() -> AnswerCache:
+    return AnswerCache()
+
+
+@st.cache_resource
+def start_prewarming():
+    """One background warmer per process, when PREWARM_INTERVAL_SECONDS is set."""
+    if PREWARM_INTERVAL_SECONDS <= 0:
+        return None
+    client = bigquery.Client()
+    warm_genai_client = genai.Client(vertexai=True, location=VERTEX_LOCATION, project=client.project)
+    return start_background_warmup(client, warm_genai_client, client.project, GA4_DATASET,
+                                   get_answer_cache(), get_perf_store())
+
+
+@st.cache_resource
+def get_details_store() -> DetailsStore:
+    return DetailsStore()
+
+
+@st.cache_resource
+def get_result_pages() -> ResultPages:
+    return ResultPages()
+
+
+def current_user() -> str:
+    """The verified IAP email (see identity.py), else this browser session.
+
+    The simple-auth username is shared by everyone who knows the password,
+    so it does not identify a person. Keying on it would put the whole
+    instance under one user's admission limit and token budget.
+    """
+    email = iap_email(st.context.headers)
+    if email:
+        return email
+    return f"session:{session_id()}"
+
+
+def session_id() -> str:
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+
+def render_details(details_id: str):
+    """Loads a message's execution details from the details store only once the user opens them."""
+    if not st.toggle("Execution details", key=f"details_{details_id}"):
+        return
+    entry = get_details_store().get(session_id(), details_id)
+    if entry is None:
+        st.caption("These details are no longer available.")
+        return
+    if entry["trace_waterfall"]:
+        st.code(entry["trace_waterfall"], language=None)
+    # The rows themselves are shown by the results panel.
+    st.json({k: v for k, v in entry["details"].items() if k != "query_results_preview"}, expanded=False)
+
+
+def render_results(details_id: str):
+    """Results panel: the full result as an Arrow-backed table, plus a line chart for time-series templates."""
+    if not st.toggle("Results", key=f"results_{details_id}"):
+        return
+    entry = get_details_store().get(session_id(), details_id)
+    if entry is None:
+        st.caption("These results are no longer available.")
+        return
+    table = to_arrow(entry["rows"])
+    template = entry["details"].get("chosen_template")
+    axis = [column for column in time_axis(template) if column in table.column_names]
+    metrics = plottable_metrics(template, table)
+    if axis and metrics and table.num_rows > 1:
+        plotted = st.multiselect("Plot", metrics, default=metrics[:1], key=f"plot_{details_id}")
+        if plotted:
+            series, x = time_series(table, axis, plotted)
+            if series.num_rows < table.num_rows:
+                st.caption(f"Showing {series.num_rows} of {table.num_rows} points (downsampled).")
+            st.line_chart(series, x=x, y=plotted)
+    st.dataframe(table, use_container_width=True)
+
+
+def render_export(key: str, table_for, rerun_table=None):
+    """CSV / Parquet export buttons. `table_for()` returns the BigQuery table holding the full result.
+
+    The file is written from BigQuery one page at a time into a temp file,
+    then offered as a download. If that table has expired, `rerun_table()`
+    (when given) runs the query again for a fresh one.
+    """
+    columns = st.columns([1] * len(EXPORT_FORMATS) + [4])
+    for column, fmt in zip(columns, EXPORT_FORMATS):
+        if not column.button(f"Export {fmt.upper()}", key=f"export_{fmt}_{key}"):
+            continue
+        try:
+            with st.spinner(f"Writing {fmt.upper()} from BigQuery..."):
+                try:
+                    path = export_to_file(bq_client, table_for(), fmt)
+                except ResultExpired:
+                    if rerun_table is None:
+                        raise
+                    path = export_to_file(bq_client, rerun_table(), fmt)
+        except (ValueError, ResultExpired, AdmissionTimeout) as e:
+            st.caption(str(e))
+            return
+        except GoogleAPIError as e:
+            st.caption(f"The export failed: {e}")
+            return
+        try:
+            size_mb = os.path.getsize(path) / 1e6
+            if size_mb > EXPORT_UI_MAX_MB:
+                st.caption(f"The {fmt.upper()} file is {size_mb:.0f} MB, over the {EXPORT_UI_MAX_MB:g} MB download "
+                           "limit here. Use the API's /results/<id>/export to stream it.")
+            else:
+                with open(path, "rb") as f:
+                    st.download_button(f"Download {fmt.upper()} ({size_mb:.1f} MB)", f.read(),
+                                       file_name=f"ga4-results-{key[:8]}.{fmt}", mime=EXPORT_MIME_TYPES[fmt],
+                                       key=f"download_{fmt}_{key}")
+        finally:
+            os.remove(path)
+
+
+def answer_table(details_id: str, fresh: bool = False) -> str:
+    """The BigQuery table holding an answer's full result, for render_export."""
+    entry = get_details_store().get(session_id(), details_id)
+    if entry is None:
+        raise ValueError("These details are no longer available.")
+    return result_destination(bq_client, entry["details"], user=current_user(), fresh=fresh)
+
+
+def render_full_results(details_id: str):
+    """'Show all rows' reruns a ranking template without its top_n LIMIT and pages through the result.
+
+    The result stays in BigQuery's destination table. Only the page on
+    screen is kept in session state, and each page turn fetches the next one
+    with list_rows.
+    """
+    key = f"pages_{details_id}"
+    state = st.session_state.get(key)
+    if state is None:
+        if not st.button("Show all rows", key=f"all_{details_id}"):
+            return
+        entry = get_details_store().get(session_id(), details_id)
+        if entry is None:
+            st.caption("These details are no longer available.")
+            return
+        details = entry["details"]
+        try:
+            with st.spinner("Querying BigQuery for the full result..."):
+                first = run_paged(details["chosen_template"], details["final_parameters"], bq_client,
+                                  PROJECT_ID, GA4_DATASET, user=current_user())
+        except (ValueError, AdmissionTimeout) as e:
+            st.caption(str(e))
+            return
+        except GoogleAPIError as e:
+            st.caption(f"The full result could not be fetched: {e}")
+            return
+        result_id = get_result_pages().register(session_id(), first["destination"], first["total_rows"],
+                                                first["page_size"])
+        state = st.session_state[key] = {"result_id": result_id, "page": 0, "rows": first["rows"]}
 
+    try:
+        info = get_result_pages().info(state["result_id"], session_id())
+        prev_col, label_col, next_col = st.columns([1, 4, 1])
+        turn = 0
+        if prev_col.button("◀ Previous", key=f"prev_{details_id}", disabled=state["page"] == 0):
+            turn = -1
+        if next_col.button("Next ▶", key=f"next_{details_id}", disabled=state["page"] >= info["pages"] - 1):
+            turn = 1
+        if turn:
+            page = get_result_pages().page(bq_client, state["result_id"], state["page"] + turn, session_id())
+            state["page"], state["rows"] = page["page"], page["rows"]
+    except ResultExpired as e:
+        st.session_state.pop(key, None)
+        st.caption(str(e))
+        return
+    except GoogleAPIError as e:
+        st.caption(f"This page could not be fetched: {e}")
+        return
+    first_row = state["page"] * info["page_size"]
+    label_col.caption(f"Rows {first_row + 1}–{first_row + len(state['rows'])} of {info['total_rows']}")
+    st.dataframe(to_arrow(state["rows"]), use_container_width=True)
+    render_export(state["result_id"], lambda: get_result_pages().destination(state["result_id"], session_id()))
 
-# ------------------------------------------------------------------------------
-# Helpers
-# ------------------------------------------------------------------------------
-def get_template_descriptions() -> str:
-    lines = []
-    for name, details in QUERY_TEMPLATE_LIBRARY.items():
-        desc = details.get("description", "").strip()
-        lines.append(f"- `{name}`: {desc}")
-    return "\n".join(lines)
-
-
-def execute_bq_query(sql: str, bq_client: bigquery.Client):
-    job_config = bigquery.QueryJobConfig(maximum_bytes_billed=10_000_000_000) # 10 GB
-    query_job = bq_client.query(sql, job_config=job_config)
-    rows = query_job.result()
-    return [dict(row.items()) for row in rows]
-
-
-def default_dates():
-    today = datetime.now(timezone.utc).date()
-    end_date = today - timedelta(days=1)
-    start_date = today - timedelta(days=8)
-    return start_date.strftime("%Y%m%d"), end_date.strftime("%Y%m%d")
-
-
-def build_system_prompt(project_id: str, ga4_dataset: str) -> str:
-    today_iso = datetime.now(timezone.utc).date().isoformat()
-    return f"""
-You are a Google Analytics 4 BigQuery expert assistant. Your goal is to answer user questions by selecting the correct GA4 query template and parameters.
-
-Plan:
-1) Analyze the user's question (intent, metrics, dimensions, filters, time range).
-2) Choose the best template from the list.
-3) Extract parameters:
-   - Dates in YYYYMMDD (handle phrases like "yesterday", "last 7 days", "this month").
-   - If missing, default to the last 8 days (inclusive).
-4) Call execute_template_query with template_name and parameters.
-5) After receiving results, produce a concise answer grounded ONLY in the returned data.
-
-Available templates:
-{get_template_descriptions()}
-
-Rules:
-- Today's date (UTC): {today_iso}
-- Project: {project_id}
-- GA4 dataset: {ga4_dataset}
-- Use only provided data when summarizing (no fabrication).
-""".strip()
 
 # ------------------------------------------------------------------------------
 # Main App Logic
@@ -184,6 +292,7 @@ if is_authenticated:
     except Exception as e:
         st.error(f"Failed to initialize Google Cloud clients: {e}")
         st.stop()
+    start_prewarming()
 
     st.title("Speak with GA4 v1")
 
@@ -203,16 +312,77 @@ if is_authenticated:
         """)
         st.success(f"**Project ID:** `{PROJECT_ID}`")
         st.success(f"**GA4 Dataset:** `{GA4_DATASET}`")
+        sampling_mode = st.selectbox(
+            "Sampling",
+            SAMPLING_MODES,
+            index=SAMPLING_MODES.index(SAMPLING_MODE) if SAMPLING_MODE in SAMPLING_MODES else 0,
+            help="'auto' runs large queries on a deterministic sample of users and scales counts back up.",
+        )
+        use_answer_cache = st.toggle(
+            "Reuse cached answers",
+            value=True,
+            help="Repeated questions over data that hasn't changed are answered from the cache instantly.",
+        )
+
+    if ENABLE_ADMIN_VIEW:
+        with st.expander("📊 Template performance (admin)", expanded=False):
+            summaries = get_perf_store().template_summaries()
+            if summaries:
+                st.dataframe(summaries, use_container_width=True)
+                plan_template = st.selectbox("Latest query plan for", [s["template"] for s in summaries])
+                st.json(get_perf_store().recent_query_plan(plan_template), expanded=False)
+            else:
+                st.caption("No executions recorded yet.")
+            st.markdown("**BigQuery query coalescing (this instance)**")
+            coalescing = coalescing_stats()
+            cols = st.columns(4)
+            cols[0].metric("Jobs run", coalescing["executions"])
+            cols[1].metric("Joined in-flight job", coalescing["coalesced"])
+            cols[2].metric("Coalesce rate", f"{(coalescing['coalesce_rate'] or 0):.0%}")
+            cols[3].metric("In flight", coalescing["in_flight"])
+            st.markdown("**Admission queues (this instance)**")
+            st.dataframe([{"backend": name, **stats} for name, stats in admission_stats().items()],
+                         use_container_width=True)
+            st.markdown("**Gemini call latency (this instance)**")
+            st.dataframe([{"call": name, **stats} for name, stats in gemini_latencies.stats().items()],
+                         use_container_width=True)
+            st.markdown("**Execution details memory (this instance)**")
+            details_stats = get_details_store().process_stats()
+            cols = st.columns(4)
+            cols[0].metric("Sessions", details_stats["sessions"])
+            cols[1].metric("In memory", f"{details_stats['in_memory_mb']} / {details_stats['process_cap_mb']} MB")
+            cols[2].metric("Spilled (gzip)", f"{details_stats['spilled_mb_gzip']} MB")
+            cols[3].metric("Spills / reloads", f"{details_stats['spills']} / {details_stats['reloads']}")
+            st.dataframe(get_details_store().session_stats(), use_container_width=True)
+            st.markdown("**Gemini tokens today**")
+            token_group = st.radio("Group by", ["user", "template_name", "session_id", "model"], horizontal=True)
+            st.dataframe(get_perf_store().token_totals(token_group, since=start_of_day_utc()),
+                         use_container_width=True)
 
     if "messages" not in st.session_state:
         st.session_state.messages = []
 
-    for m in st.session_state.messages:
+    # Only the latest page of history is rendered, so reruns stay flat as the conversation grows.
+    messages = st.session_state.messages
+    history_shown = st.session_state.get("history_shown", HISTORY_PAGE_SIZE)
+    if len(messages) > history_shown:
+        if st.button(f"Show earlier messages ({len(messages) - history_shown} hidden)"):
+            st.session_state.history_shown = history_shown + HISTORY_PAGE_SIZE
+            st.rerun()
+    for m in messages[-history_shown:]:
         with st.chat_message(m["role"]):
+            if m.get("cached"):
+                st.badge("Cached", icon="⚡", color="green")
             st.markdown(m["content"])
-            if "details" in m and m["details"]:
-                with st.expander("Execution Details"):
-                    st.json(m["details"])
+            if m.get("details_id"):
+                if m.get("has_results"):
+                    render_results(m["details_id"])
+                render_details(m["details_id"])
+                if m.get("exportable"):
+                    render_export(m["details_id"], lambda: answer_table(m["details_id"]),
+                                  lambda: answer_table(m["details_id"], fresh=True))
+                if m.get("pageable"):
+                    render_full_results(m["details_id"])
 
     if user_prompt := st.chat_input("Ask about your GA4 data..."):
         st.session_state.messages.append({"role": "user", "content": user_prompt})
@@ -220,81 +390,62 @@ if is_authenticated:
             st.markdown(user_prompt)
 
         with st.chat_message("assistant"):
+            tracer = Tracer("chat.answer")
             try:
                 with st.spinner("Thinking..."):
-                    system_prompt = build_system_prompt(PROJECT_ID, GA4_DATASET)
-                    full_prompt = f"{system_prompt}\nUser question: {user_prompt}"
-
-                    chat = genai_client.chats.create(
-                        model=MODEL_ID,
-                        config=GenerateContentConfig(temperature=0, tools=[query_tool]),
+                    progress = st.empty()
+                    result = answer_question(
+                        user_prompt, bq_client, genai_client, PROJECT_ID, GA4_DATASET,
+                        model_id=SUMMARY_MODEL_ID,
+                        sampling_mode=sampling_mode,
+                        perf_store=get_perf_store(),
+                        tracer=tracer,
+                        on_status=progress.caption,
+                        session_id=session_id(),
+                        user=current_user(),
+                        token_budget=remaining_budget(get_perf_store(), session_id(), current_user()),
+                        answer_cache=get_answer_cache() if use_answer_cache else None,
                     )
-
-                    response = chat.send_message(full_prompt)
-                    part = response.candidates[0].content.parts[0]
-
-                    backend_details = {}
-                    final_answer = ""
-
-                    if part.function_call and part.function_call.name == "execute_template_query":
-                        fc_args = dict(part.function_call.args.items())
-                        template_name = fc_args.get("template_name")
-                        params = fc_args.get("parameters", {}) or {}
-
-                        if not template_name or template_name not in QUERY_TEMPLATE_LIBRARY:
-                            raise ValueError(f"Invalid template selected by model: {template_name}")
-
-                        sql_template = QUERY_TEMPLATE_LIBRARY[template_name]["template"]
-                        start_def, end_def = default_dates()
-                        final_params = {
-                            "project_id": PROJECT_ID,
-                            "dataset_id": GA4_DATASET,
-                            "start_date": (params.get("start_date") or start_def),
-                            "end_date": (params.get("end_date") or end_def),
-                        }
-                        
-                        # Add any other params from the template library
-                        template_specific = ["event_name", "country_name", "property_key", "campaign_name"]
-                        for param in template_specific:
-                            if param in params:
-                                final_params[param] = params[param]
-
-                        try:
-                            final_sql = sql_template.format(**final_params)
-                        except KeyError as ke:
-                            raise ValueError(f"Template missing parameter: {ke}") from ke
-
-                        backend_details = {
-                            "chosen_template": template_name,
-                            "extracted_parameters": params,
-                            "final_parameters": final_params,
-                            "generated_sql": final_sql,
-                        }
-
-                        with st.spinner(f"Querying BigQuery with '{template_name}'..."):
-                            rows = execute_bq_query(final_sql, bq_client)
-                            backend_details["query_results_preview"] = rows[:5]
-                            api_response_json = json.dumps(rows, ensure_ascii=False, default=str)
-
-                        response2 = chat.send_message(
-                            Part.from_function_response(
-                                name="execute_template_query",
-                                response={"content": api_response_json},
-                            )
-                        )
-                        final_answer = response2.candidates[0].content.parts[0].text
-                    else:
-                        final_answer = getattr(part, "text", "I couldn't map this to a template. Try rephrasing with a time range.")
-
-                st.markdown(final_answer)
-                with st.expander("Execution Details"):
-                    st.json(backend_details)
+                    progress.empty()
+                final_answer = result["answer"]
+                backend_details = result["details"]
+                cached = backend_details.get("cache", {}).get("hit", False)
+
+                with tracer.span("render.answer"):
+                    if cached:
+                        st.badge("Cached", icon="⚡", color="green")
+                    st.markdown(final_answer)
+                    if backend_details.get("sampling"):
+                        st.caption(backend_details["sampling"]["note"])
+                    if backend_details.get("token_usage", {}).get("summary_mode") == "compact":
+                        st.caption("Token budget is running low, so only the top rows were summarized.")
+                tracer.finish()
+                export_trace(tracer)
+                backend_details["trace"] = {"trace_id": tracer.trace_id, "spans": tracer.summary()}
+                details_id = get_details_store().put(session_id(), backend_details, tracer.waterfall(),
+                                                     rows=result["rows"])
+                exportable = bool(backend_details.get("generated_sql")) and not backend_details.get("sampling")
+                has_results = bool(result["rows"])
+                if has_results:
+                    render_results(details_id)
+                render_details(details_id)
+                if exportable:
+                    render_export(details_id, lambda: answer_table(details_id),
+                                  lambda: answer_table(details_id, fresh=True))
+                # Ranking templates stop at top_n rows; these offer the full list, paged.
+                template = backend_details.get("chosen_template")
+                pageable = template in TEMPLATE_INDEX and "top_n" in TEMPLATE_INDEX[template]["parameters"]
+                if pageable:
+                    render_full_results(details_id)
 
                 st.session_state.messages.append(
-                    {"role": "assistant", "content": final_answer, "details": backend_details}
+                    {"role": "assistant", "content": final_answer, "details_id": details_id, "cached": cached,
+                     "has_results": has_results, "exportable": exportable, "pageable": pageable}
                 )
 
             except Exception as e:
+                tracer.finish()
+                export_trace(tracer)
                 msg = f"An error occurred: {e}"
                 st.error(msg)
                 st.session_state.messages.append({"role": "assistant", "content": msg})
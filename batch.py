@@ -0,0 +1,207 @@
+# batch.py
+# pylint: disable=broad-exception-caught
+"""Headless batch runner: answers a list of questions or template runs in parallel.
+
+Input is JSONL, one item per line, either a question routed by Gemini
+or a template run that skips routing:
+
+    {"question": "How many users did we have last week?"}
+    {"template": "classify_session_channels", "parameters": {"start_date": "20240301", "end_date": "20240331"}}
+
+A plain .txt file is read as one question per line. Answers, rows and a
+per-item timing breakdown (admission queues, routing, BigQuery
+queue/execute/fetch, summary)
+are written to --output as JSONL; --parquet-dir also writes each item's rows
+as <index>_<template>.parquet.
+
+    python batch.py reports.jsonl --output answers.jsonl --parquet-dir rows/ --concurrency 8
+    python batch.py reports.jsonl --output answers.jsonl --no-summary --batch-priority
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from admission import exempt_from_per_user_limit
+from engine import ROUTE_ESCALATION_MODEL_ID, ROUTE_MODEL_ID, SUMMARY_MODEL_ID, answer_question, answer_template
+from percentiles import percentile
+from tracing import Tracer
+
+# Spans reported per item, in pipeline order.
+TIMING_SPANS = [
+    "cache.question_lookup", "queue.gemini", "gemini.route", "cache.lookup", "bigquery.dry_run", "queue.bigquery",
+    "bigquery.queue", "bigquery.execute", "bigquery.fetch", "bigquery.coalesced", "gemini.summarize",
+]
+
+
+def load_items(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".txt"):
+            return [{"question": line.strip()} for line in f if line.strip()]
+        items = [json.loads(line) for line in f if line.strip()]
+    for number, item in enumerate(items, 1):
+        if not item.get("question") and not item.get("template"):
+            raise ValueError(f"{path}:{number}: each item needs a 'question' or a 'template'")
+    return items
+
+
+def timing_breakdown(tracer: Tracer) -> dict:
+    totals = defaultdict(float)
+    for span in tracer.spans:
+        if span.name in TIMING_SPANS:
+            totals[span.name] += span.duration_ms
+    timings = {name: round(totals[name], 1) for name in TIMING_SPANS if name in totals}
+    timings["total"] = round(tracer.root.duration_ms, 1)
+    return timings
+
+
+def run_item(index: int, item: dict, bq_client, genai_client, project_id: str, dataset_id: str,
+             summarize=True, **options) -> dict:
+    tracer = Tracer("batch.item", index=index)
+    outcome = {"index": index, **{k: item[k] for k in ("question", "template", "parameters") if k in item}}
+    try:
+        if item.get("template"):
+            options.pop("route_model", None)
+            options.pop("escalation_model", None)
+            result = answer_template(item["template"], item.get("parameters") or {}, bq_client, genai_client,
+                                     project_id, dataset_id, question=item.get("question"),
+                                     summarize=summarize, tracer=tracer, **options)
+        else:
+            options.pop("priority", None)
+            result = answer_question(item["question"], bq_client, genai_client, project_id, dataset_id,
+                                     tracer=tracer, **options)
+        details = result["details"]
+        outcome.update(
+            template=details.get("chosen_template", item.get("template")),
+            route_tier=(details.get("routing") or {}).get("tier"),
+            final_parameters=details.get("final_parameters"),
+            answer=result["answer"],
+            row_count=len(result["rows"]),
+            rows=result["rows"],
+            cached=details.get("cache", {}).get("hit", False),
+            job_stats={k: v for k, v in (details.get("job_stats") or {}).items() if k != "query_plan"},
+            tokens=(details.get("token_usage") or {}).get("totals"),
+        )
+    except Exception as e:
+        outcome["error"] = f"{type(e).__name__}: {e}"
+    tracer.finish()
+    outcome["timings_ms"] = timing_breakdown(tracer)
+    return outcome
+
+
+def write_parquet(outcome: dict, directory: str):
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    if not outcome.get("rows"):
+        return None
+    path = os.path.join(directory, f"{outcome['index']:04d}_{outcome.get('template') or 'unrouted'}.parquet")
+    pq.write_table(pa.Table.from_pylist(outcome["rows"]), path)
+    return path
+
+
+def run_batch(items, bq_client, genai_client, project_id, dataset_id, concurrency=4, output=None,
+              parquet_dir=None, summarize=True, log=print, **options) -> list:
+    """Runs every item with at most `concurrency` in flight; writes results in input order."""
+    if parquet_dir:
+        os.makedirs(parquet_dir, exist_ok=True)
+    out = open(output, "w", encoding="utf-8") if output else None
+    outcomes = []
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            futures = [
+                pool.submit(run_item, index, item, bq_client, genai_client, project_id, dataset_id,
+                            summarize=summarize, **options)
+                for index, item in enumerate(items)
+            ]
+            for future in futures:
+                outcome = future.result()
+                if parquet_dir:
+                    outcome["parquet"] = write_parquet(outcome, parquet_dir)
+                if out is not None:
+                    out.write(json.dumps(outcome, ensure_ascii=False, default=str) + "\n")
+                    out.flush()
+                outcomes.append(outcome)
+                label = outcome.get("question") or outcome.get("template")
+                status = outcome.get("error") or f"{outcome['row_count']} rows" + (" (cached)" if outcome["cached"] else "")
+                log(f"[{outcome['index'] + 1}/{len(items)}] {outcome['timings_ms']['total']:>9.1f} ms  {label[:60]}  {status}")
+    finally:
+        if out is not None:
+            out.close()
+    return outcomes
+
+
+def print_timing_report(outcomes: list, wall_s: float):
+    errors = sum(1 for o in outcomes if "error" in o)
+    print(f"\n{len(outcomes)} items, {errors} errors, {wall_s:.1f}s wall "
+          f"({len(outcomes) / wall_s if wall_s else 0:.2f} items/s)")
+    print(f"{'stage':<24}{'items':>7}{'p50 ms':>11}{'p95 ms':>11}{'sum s':>10}")
+    for stage in TIMING_SPANS + ["total"]:
+        values = [o["timings_ms"][stage] for o in outcomes if stage in o["timings_ms"]]
+        if values:
+            print(f"{stage:<24}{len(values):>7}{percentile(values, 50):>11.1f}{percentile(values, 95):>11.1f}"
+                  f"{sum(values) / 1000:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL of questions/template runs, or .txt with one question per line.")
+    parser.add_argument("--output", required=True, help="JSONL file for answers, rows and timings.")
+    parser.add_argument("--parquet-dir", help="Also write each item's rows as Parquet here.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Items in flight at once.")
+    parser.add_argument("--model", default=SUMMARY_MODEL_ID, help="Model that writes the summaries.")
+    parser.add_argument("--route-model", default=ROUTE_MODEL_ID, help="Fast model that picks the template.")
+    parser.add_argument("--escalation-model", default=ROUTE_ESCALATION_MODEL_ID,
+                        help="Re-routes questions whose fast routing fails validation; empty disables.")
+    parser.add_argument("--sampling", choices=("off", "auto"), default="off")
+    parser.add_argument("--no-summary", action="store_true",
+                        help="Template items skip the Gemini summary; the answer is a table of the rows.")
+    parser.add_argument("--batch-priority", action="store_true", help="Run template items at BATCH priority.")
+    parser.add_argument("--use-cache", action="store_true", help="Read and fill the answer cache.")
+    parser.add_argument("--user", default="batch", help="User name token usage is recorded under.")
+    parser.add_argument("--offline", action="store_true", help="Use the fake clients from fakes.py (no cloud).")
+    args = parser.parse_args(argv)
+
+    items = load_items(args.input)
+    # --concurrency bounds this run; the per-user limits would cut it to 2-3 slots.
+    exempt_from_per_user_limit(args.user)
+    if args.offline:
+        from fakes import FakeBigQueryClient, FakeGenaiClient  # pylint: disable=import-outside-toplevel
+
+        bq_client = FakeBigQueryClient(latency_ms=50, queue_ms=5)
+        genai_client = FakeGenaiClient(route_latency_ms=50, summary_latency_ms=50)
+        dataset_id = os.getenv("GA4_BIGQUERY_DATASET", "analytics_offline")
+    else:
+        from google import genai  # pylint: disable=import-outside-toplevel
+        from google.cloud import bigquery  # pylint: disable=import-outside-toplevel
+
+        dataset_id = os.getenv("GA4_BIGQUERY_DATASET", "")
+        if not dataset_id:
+            parser.error("GA4_BIGQUERY_DATASET is not set")
+        bq_client = bigquery.Client()
+        genai_client = genai.Client(vertexai=True, location=os.getenv("VERTEX_LOCATION", "us-central1"),
+                                    project=bq_client.project)
+
+    from answer_cache import AnswerCache  # pylint: disable=import-outside-toplevel
+    from perf_store import PerfStore  # pylint: disable=import-outside-toplevel
+
+    started = time.perf_counter()
+    outcomes = run_batch(
+        items, bq_client, genai_client, bq_client.project, dataset_id,
+        concurrency=args.concurrency, output=args.output, parquet_dir=args.parquet_dir,
+        summarize=not args.no_summary,
+        model_id=args.model, route_model=args.route_model, escalation_model=args.escalation_model,
+        sampling_mode=args.sampling, perf_store=PerfStore(),
+        answer_cache=AnswerCache() if args.use_cache else None,
+        priority="BATCH" if args.batch_priority else None, user=args.user,
+    )
+    print_timing_report(outcomes, time.perf_counter() - started)
+    return 1 if any("error" in o for o in outcomes) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+# benchmark.py
+"""Offline end-to-end benchmark of the chat pipeline.
+
+Replays a question corpus through engine.answer_question with the fake
+BigQuery and Gemini clients from fakes.py, then reports p50/p95 latency and
+peak traced memory per stage, plus throughput. Each run is saved as JSON
+under benchmarks/results/ (named by timestamp and git commit) so runs can be
+compared across commits with --compare.
+
+    python benchmark.py --iterations 3 --concurrency 8
+    python benchmark.py --compare benchmarks/results/<previous>.json
+    python benchmark.py --cold-start     # import time/memory of a fresh instance
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from engine import ROUTE_MODEL_ID, answer_question
+from fakes import FakeBigQueryClient, FakeGenaiClient
+from percentiles import percentile
+from tracing import Tracer
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "questions.jsonl")
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "results")
+
+
+def load_corpus(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_one(item, bq_client, genai_client, project_id, dataset_id):
+    tracer = Tracer("chat.answer")
+    error = None
+    try:
+        with tracer.span("pipeline"):
+            answer_question(item["question"], bq_client, genai_client, project_id, dataset_id, tracer=tracer)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        error = f"{type(e).__name__}: {e}"
+    tracer.finish()
+    return tracer, error
+
+
+def summarize_traces(traces) -> dict:
+    durations = defaultdict(list)
+    memory = defaultdict(list)
+    for tracer in traces:
+        for span in tracer.spans:
+            # Routing spans are also reported per tier, e.g. gemini.route[escalated].
+            names = [span.name] + ([f"{span.name}[{span.attributes['tier']}]"] if "tier" in span.attributes else [])
+            for name in names:
+                durations[name].append(span.duration_ms)
+                if "mem.peak_kb" in span.attributes:
+                    memory[name].append(span.attributes["mem.peak_kb"])
+    stages = {}
+    for name, values in durations.items():
+        stages[name] = {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "mem_peak_kb_p95": percentile(memory.get(name, []), 95),
+        }
+    return stages
+
+
+def run_benchmark(corpus, iterations=1, concurrency=1, bq_options=None, genai_options=None,
+                  trace_memory=True) -> dict:
+    routes = {item["question"]: (item["template"], item.get("parameters")) for item in corpus}
+    bq_client = FakeBigQueryClient(**(bq_options or {}))
+    genai_client = FakeGenaiClient(routes=routes, **(genai_options or {}))
+    items = [item for _ in range(iterations) for item in corpus]
+
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(
+            lambda item: run_one(item, bq_client, genai_client, bq_client.project, "analytics_benchmark"),
+            items,
+        ))
+    wall_s = time.perf_counter() - started
+    if trace_memory:
+        tracemalloc.stop()
+
+    traces = [tracer for tracer, _ in outcomes]
+    errors = [error for _, error in outcomes if error]
+    return {
+        "git_commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "iterations": iterations,
+            "concurrency": concurrency,
+            "bigquery": bq_options or {},
+            "gemini": genai_options or {},
+            "trace_memory": trace_memory,
+        },
+        "questions": len(items),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "wall_s": round(wall_s, 3),
+        "throughput_qps": round(len(items) / wall_s, 3) if wall_s else None,
+        "stages": summarize_traces(traces),
+        "routing": summarize_routing(traces),
+    }
+
+
+def summarize_routing(traces) -> dict:
+    tiers = [tracer.root.attributes["route_tier"] for tracer in traces if "route_tier" in tracer.root.attributes]
+    escalated = tiers.count("escalated")
+    return {"routed": len(tiers), "escalated": escalated,
+            "escalation_rate": round(escalated / len(tiers), 3) if tiers else None}
+
+
+def print_report(result: dict, baseline: dict = None):
+    print(f"commit {result['git_commit']}  questions={result['questions']}  errors={result['errors']}  "
+          f"wall={result['wall_s']}s  throughput={result['throughput_qps']} q/s")
+    routing = result.get("routing") or {}
+    if routing.get("routed"):
+        print(f"routing: {routing['escalated']}/{routing['routed']} escalated to the stronger model "
+              f"({routing['escalation_rate']:.1%})")
+    header = f"{'stage':<26}{'n':>6}{'p50 ms':>11}{'p95 ms':>11}{'mem p95 KB':>13}"
+    if baseline:
+        header += f"{'Δp50':>10}{'Δp95':>10}"
+    print(header)
+    base_stages = (baseline or {}).get("stages", {})
+    for name, stats in sorted(result["stages"].items(), key=lambda kv: -kv[1]["p50_ms"]):
+        mem = stats["mem_peak_kb_p95"]
+        line = (f"{name:<26}{stats['count']:>6}{stats['p50_ms']:>11.1f}{stats['p95_ms']:>11.1f}"
+                f"{(f'{mem:.1f}' if mem is not None else '-'):>13}")
+        if baseline:
+            base = base_stages.get(name)
+            if base:
+                line += f"{stats['p50_ms'] - base['p50_ms']:>+10.1f}{stats['p95_ms'] - base['p95_ms']:>+10.1f}"
+            else:
+                line += f"{'new':>10}{'':>10}"
+        print(line)
+
+
+# Runs in a fresh interpreter: imports MODULE, then reads what the first
+# question on a new instance needs from the template library (all
+# descriptions for the routing prompt, one template's SQL).
+_COLD_START_SNIPPET = """
+import json, sys, time, tracemalloc
+tracemalloc.start()
+started = time.perf_counter()
+__import__(sys.argv[1])
+import_ms = (time.perf_counter() - started) * 1000
+import_kb = tracemalloc.get_traced_memory()[0] / 1024
+started = time.perf_counter()
+import query_template_library as lib
+index = getattr(lib, "TEMPLATE_INDEX", None) or lib.QUERY_TEMPLATE_LIBRARY
+descriptions = [meta["description"] for meta in index.values()]
+sql = lib.QUERY_TEMPLATE_LIBRARY["calculate_total_users"]["template"]
+first_use_ms = (time.perf_counter() - started) * 1000
+current, peak = tracemalloc.get_traced_memory()
+print(json.dumps({"import_ms": import_ms, "import_kb": import_kb, "first_use_ms": first_use_ms,
+                  "retained_kb": current / 1024, "peak_kb": peak / 1024}))
+"""
+
+
+def measure_cold_start(modules=("query_template_library", "engine"), runs: int = 5) -> dict:
+    """Median import time and traced memory per module, each run in a fresh
+    interpreter. The repo's modules are copied to an empty directory and run
+    with -B, so they are compiled from source as on a new container;
+    installed packages keep their bytecode as they do in the image."""
+    import shutil  # pylint: disable=import-outside-toplevel
+    import statistics  # pylint: disable=import-outside-toplevel
+    import tempfile  # pylint: disable=import-outside-toplevel
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        shutil.copytree(here, workdir, dirs_exist_ok=True,
+                        ignore=shutil.ignore_patterns("__pycache__", ".git", "benchmarks"))
+        for module in modules:
+            samples = []
+            for _ in range(runs):
+                out = subprocess.run([sys.executable, "-B", "-c", _COLD_START_SNIPPET, module], cwd=workdir,
+                                     capture_output=True, text=True, check=True).stdout
+                samples.append(json.loads(out.strip().splitlines()[-1]))
+            results[module] = {k: round(statistics.median(s[k] for s in samples), 1) for k in samples[0]}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL of {question, template, parameters}.")
+    parser.add_argument("--iterations", type=int, default=1, help="Times to replay the corpus.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Questions in flight at once.")
+    parser.add_argument("--bq-latency-ms", type=float, default=800)
+    parser.add_argument("--bq-queue-ms", type=float, default=50)
+    parser.add_argument("--bq-rows", type=int, default=50, help="Rows returned per query.")
+    parser.add_argument("--route-latency-ms", type=float, default=1200)
+    parser.add_argument("--summary-latency-ms", type=float, default=1500)
+    parser.add_argument("--fast-route-scale", type=float, default=1.0,
+                        help="Latency multiplier for the fast routing model (ROUTE_MODEL_ID).")
+    parser.add_argument("--fast-misroute-rate", type=float, default=0.0,
+                        help="Share of questions the fast routing model sends to a nonexistent template.")
+    parser.add_argument("--gemini-tail-rate", type=float, default=0.0,
+                        help="Share of Gemini calls that take --gemini-tail-ms longer.")
+    parser.add_argument("--gemini-tail-ms", type=float, default=0)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0,
+                        help="Share of Gemini calls that fail with a retryable 503.")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Relative latency jitter (0.2 = ±20%%).")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc (it slows Python code).")
+    parser.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR)
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--compare", help="Previous result JSON to diff against.")
+    parser.add_argument("--cold-start", action="store_true",
+                        help="Only measure import time and memory of a fresh process, then exit.")
+    args = parser.parse_args(argv)
+
+    if args.cold_start:
+        for module, stats in measure_cold_start().items():
+            print(f"{module:<24}" + "  ".join(f"{k}={v}" for k, v in stats.items()))
+        return 0
+
+    result = run_benchmark(
+        load_corpus(args.corpus),
+        iterations=args.iterations,
+        concurrency=args.concurrency,
+        bq_options={
+            "latency_ms": args.bq_latency_ms, "queue_ms": args.bq_queue_ms,
+            "rows": args.bq_rows, "jitter": args.jitter, "seed": args.seed,
+        },
+        genai_options={
+            "route_latency_ms": args.route_latency_ms, "summary_latency_ms": args.summary_latency_ms,
+            "jitter": args.jitter, "seed": args.seed, "tail_rate": args.gemini_tail_rate,
+            "tail_latency_ms": args.gemini_tail_ms, "error_rate": args.gemini_error_rate,
+            "model_latency_scale": {ROUTE_MODEL_ID: args.fast_route_scale},
+            "misroute_rate": {ROUTE_MODEL_ID: args.fast_misroute_rate},
+        },
+        trace_memory=not args.no_memory,
+    )
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    if not args.no_save:
+        os.makedirs(args.results_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = os.path.join(args.results_dir, f"{stamp}-{result['git_commit']}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"saved {path}")
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
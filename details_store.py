@@ -0,0 +1,190 @@
+# details_store.py
+# pylint: disable=broad-exception-caught
+"""Per-session storage for execution details, kept out of st.session_state.
+
+Chat messages keep only a `details_id`; the details dict (generated SQL,
+result previews, job stats, trace), trace waterfall and result rows are
+fetched from here when the user opens them, so a rerun does not copy or
+render them.
+
+Memory is accounted per entry as its JSON size. When a session exceeds
+DETAILS_SESSION_MAX_MB, or the process exceeds DETAILS_PROCESS_MAX_MB, the
+least recently used entries are spilled to gzip files under
+DETAILS_SPILL_DIR. Entries over DETAILS_SPILL_ENTRY_KB go straight to disk.
+`get()` reloads spilled entries transparently.
+"""
+
+import gzip
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# Sessions idle longer than this are dropped.
+DETAILS_SESSION_TTL_SECONDS = int(os.getenv("DETAILS_SESSION_TTL_SECONDS", str(6 * 3600)))
+DETAILS_SESSION_MAX_MB = float(os.getenv("DETAILS_SESSION_MAX_MB", "8"))
+DETAILS_PROCESS_MAX_MB = float(os.getenv("DETAILS_PROCESS_MAX_MB", "256"))
+DETAILS_SPILL_ENTRY_KB = float(os.getenv("DETAILS_SPILL_ENTRY_KB", "512"))
+DETAILS_SPILL_DIR = os.getenv("DETAILS_SPILL_DIR", os.path.join(tempfile.gettempdir(), "ga4-chat-details"))
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("value", "bytes", "path", "spilled_bytes")
+
+    def __init__(self, value, size):
+        self.value = value          # {"details", "trace_waterfall", "rows"} while in memory, else None
+        self.bytes = size           # JSON size, whether in memory or spilled
+        self.path = None            # gzip file once spilled
+        self.spilled_bytes = 0      # compressed size on disk
+
+
+class _Session:
+    __slots__ = ("touched", "entries", "memory_bytes")
+
+    def __init__(self, now):
+        self.touched = now
+        self.entries = OrderedDict()  # details_id -> _Entry, least recently used first
+        self.memory_bytes = 0
+
+
+class DetailsStore:
+    def __init__(self, session_ttl_s: int = DETAILS_SESSION_TTL_SECONDS,
+                 session_max_bytes: int = int(DETAILS_SESSION_MAX_MB * 1024 * 1024),
+                 process_max_bytes: int = int(DETAILS_PROCESS_MAX_MB * 1024 * 1024),
+                 spill_entry_bytes: int = int(DETAILS_SPILL_ENTRY_KB * 1024),
+                 spill_dir: str = DETAILS_SPILL_DIR):
+        self.session_ttl_s = session_ttl_s
+        self.session_max_bytes = session_max_bytes
+        self.process_max_bytes = process_max_bytes
+        self.spill_entry_bytes = spill_entry_bytes
+        self.spill_dir = os.path.join(spill_dir, uuid.uuid4().hex[:8])  # one directory per store/process
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._lru = OrderedDict()  # (session_id, details_id) of in-memory entries, process-wide
+        self._memory_bytes = 0
+        self._spills = 0
+        self._reloads = 0
+
+    def put(self, session_id: str, details: dict, trace_waterfall: str = None, rows: list = None) -> str:
+        details_id = uuid.uuid4().hex
+        value = {"details": details, "trace_waterfall": trace_waterfall, "rows": rows or []}
+        entry = _Entry(value, len(json.dumps(value, ensure_ascii=False, default=str).encode()))
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.setdefault(session_id, _Session(now))
+            session.touched = now
+            session.entries[details_id] = entry
+            self._admit(session_id, session, details_id, entry)
+        return details_id
+
+    def get(self, session_id: str, details_id: str):
+        """Returns {"details", "trace_waterfall", "rows"}, or None if it expired."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            entry = session.entries.get(details_id) if session else None
+            if entry is None:
+                return None
+            session.touched = time.time()
+            session.entries.move_to_end(details_id)
+            if entry.value is not None:
+                self._lru.move_to_end((session_id, details_id))
+                return entry.value
+            try:
+                with gzip.open(entry.path, "rt", encoding="utf-8") as f:
+                    value = json.load(f)
+            except Exception as e:
+                logger.warning("Could not reload spilled details %s: %s", entry.path, e)
+                return None
+            self._reloads += 1
+            os.remove(entry.path)
+            entry.path, entry.spilled_bytes, entry.value = None, 0, value
+            self._admit(session_id, session, details_id, entry)
+            return value
+
+    def drop(self, session_id: str):
+        with self._lock:
+            self._drop(session_id)
+
+    # ---- memory accounting -------------------------------------------------
+    def _admit(self, session_id, session, details_id, entry):
+        """Counts an in-memory entry, then spills until the session and process are under their caps."""
+        if entry.bytes > self.spill_entry_bytes:
+            self._spill(session_id, session, details_id, entry)
+            return
+        session.memory_bytes += entry.bytes
+        self._memory_bytes += entry.bytes
+        self._lru[(session_id, details_id)] = None
+        # The entry just added is the most recently used, so it is the last one spilled.
+        for other_id, other in list(session.entries.items()):
+            if session.memory_bytes <= self.session_max_bytes:
+                break
+            if other.value is not None and other_id != details_id:
+                self._spill(session_id, session, other_id, other)
+        while self._memory_bytes > self.process_max_bytes and len(self._lru) > 1:
+            victim_session_id, victim_id = next(iter(self._lru))
+            victim_session = self._sessions[victim_session_id]
+            self._spill(victim_session_id, victim_session, victim_id, victim_session.entries[victim_id])
+
+    def _spill(self, session_id, session, details_id, entry):
+        directory = os.path.join(self.spill_dir, session_id)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{details_id}.json.gz")
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(entry.value, f, ensure_ascii=False, default=str)
+        if self._lru.pop((session_id, details_id), False) is None:
+            session.memory_bytes -= entry.bytes
+            self._memory_bytes -= entry.bytes
+        entry.value, entry.path, entry.spilled_bytes = None, path, os.path.getsize(path)
+        self._spills += 1
+
+    def _drop(self, session_id):
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return
+        for details_id in session.entries:
+            self._lru.pop((session_id, details_id), None)
+        self._memory_bytes -= session.memory_bytes
+        shutil.rmtree(os.path.join(self.spill_dir, session_id), ignore_errors=True)
+
+    def _expire(self, now: float):
+        for session_id in [s for s, v in self._sessions.items() if now - v.touched > self.session_ttl_s]:
+            self._drop(session_id)
+
+    # ---- reporting ---------------------------------------------------------
+    def session_stats(self) -> list:
+        """Per-session memory and spill usage, largest in-memory first."""
+        with self._lock:
+            stats = [
+                {
+                    "session_id": session_id,
+                    "entries": len(session.entries),
+                    "in_memory_kb": round(session.memory_bytes / 1024, 1),
+                    "spilled_entries": sum(1 for e in session.entries.values() if e.path),
+                    "spilled_kb_gzip": round(sum(e.spilled_bytes for e in session.entries.values()) / 1024, 1),
+                    "idle_s": round(time.time() - session.touched),
+                }
+                for session_id, session in self._sessions.items()
+            ]
+        return sorted(stats, key=lambda s: s["in_memory_kb"], reverse=True)
+
+    def process_stats(self) -> dict:
+        with self._lock:
+            spilled = [e.spilled_bytes for s in self._sessions.values() for e in s.entries.values() if e.path]
+            return {
+                "sessions": len(self._sessions),
+                "in_memory_mb": round(self._memory_bytes / 1024 / 1024, 2),
+                "process_cap_mb": round(self.process_max_bytes / 1024 / 1024, 1),
+                "session_cap_mb": round(self.session_max_bytes / 1024 / 1024, 1),
+                "spilled_entries": len(spilled),
+                "spilled_mb_gzip": round(sum(spilled) / 1024 / 1024, 2),
+                "spills": self._spills,
+                "reloads": self._reloads,
+            }
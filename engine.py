@@ -0,0 +1,691 @@
+# engine.py
+"""The question -> template -> SQL -> rows -> answer pipeline, free of Streamlit.
+
+app.py drives it from the chat UI; the benchmark harness drives it with the
+fake clients in fakes.py. Clients are passed in, never created here.
+"""
+
+import os
+import json
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+
+from google.cloud import bigquery
+from google.genai.types import Content, FunctionCall, FunctionDeclaration, GenerateContentConfig, Part, Tool
+
+from admission import bigquery_limiter, gemini_limiter
+from answer_cache import ANSWER_CACHE_QUESTION_KEY, freshness_token
+from gemini_calls import GEMINI_HEDGE_MODEL, http_options, send_message
+from perf_store import extract_job_stats
+from result_pages import RESULT_PAGE_SIZE
+from query_template_library import TEMPLATE_INDEX, bind_parameters, template_sql
+from sampling import apply_user_sampling, choose_sample_rate, scale_sampled_rows
+from singleflight import SingleFlight
+from token_usage import CHARS_PER_TOKEN, UsageMeter, choose_summary_mode, compact_rows, rows_to_markdown
+from tracing import Tracer
+
+# ------------------------------------------------------------------------------
+# Config (env-driven; safe defaults)
+# ------------------------------------------------------------------------------
+MODEL_ID = os.getenv("MODEL_ID", "gemini-2.5-pro")
+# Picking a template rarely needs the large model; its choice is checked by route_problems.
+ROUTE_MODEL_ID = os.getenv("ROUTE_MODEL_ID", "gemini-2.5-flash")
+# Re-routes with this model when the fast model's choice fails the check; empty disables escalation.
+ROUTE_ESCALATION_MODEL_ID = os.getenv("ROUTE_ESCALATION_MODEL_ID", MODEL_ID)
+SUMMARY_MODEL_ID = os.getenv("SUMMARY_MODEL_ID", MODEL_ID)
+NO_TEMPLATE_ANSWER = "I couldn't map this to a template. Try rephrasing with a time range."
+# Rows returned by ranking templates (those declaring top_n) when the question names no number.
+TOP_N_DEFAULT = int(os.getenv("TOP_N_DEFAULT", "25"))
+TOP_N_MAX = int(os.getenv("TOP_N_MAX", "1000"))
+# top_n used by run_paged, which asks for the full result.
+PAGED_MAX_ROWS = int(os.getenv("PAGED_MAX_ROWS", "100000"))
+
+# Identical queries issued while one is already running wait for it instead of starting a new job.
+BQ_COALESCE = os.getenv("BQ_COALESCE", "1").lower() in ("1", "true", "yes")
+_bq_flights = SingleFlight()
+
+
+# ------------------------------------------------------------------------------
+# Tools (Function Calling) — GA4-aware params
+# ------------------------------------------------------------------------------
+execute_template_query_func = FunctionDeclaration(
+    name="execute_template_query",
+    description=(
+        "Executes a GA4 BigQuery template. Use this to answer user questions about GA4 data."
+    ),
+    parameters={
+        "type": "object",
+        "properties": {
+            "template_name": {
+                "type": "string",
+                "description": "One of the available GA4 query template names.",
+            },
+            "parameters": {
+                "type": "object",
+                "description": (
+                    "Template parameters. Common: start_date/end_date (YYYYMMDD), top_n, "
+                    "and other specific filters like event_name, property_key, or country_name."
+                ),
+                "properties": {
+                    "start_date": {
+                        "type": "string",
+                        "description": "YYYYMMDD. Defaults to 7 days ago.",
+                    },
+                    "end_date": {
+                        "type": "string",
+                        "description": "YYYYMMDD. Defaults to yesterday.",
+                    },
+                    "top_n": {
+                        "type": "integer",
+                        "description": (
+                            "How many top-ranked rows to return, for questions like 'top 10 pages'. "
+                            f"Defaults to {TOP_N_DEFAULT} unless the template sets its own default."
+                        ),
+                    },
+                    "property_key": {
+                        "type": "string",
+                        "description": "The key of the user property to analyze (e.g., 'user_tier'). Used by templates like 'extract_specific_user_property'.",
+                    },
+                    "event_name": {
+                        "type": "string",
+                        "description": "The name of the event to analyze (e.g., 'purchase', 'page_view'). Used by templates like 'calculate_events_per_user' or 'analyze_specific_event_details'.",
+                    },
+                    "country_name": {
+                        "type": "string",
+                        "description": "The full name of a country for analysis (e.g., 'United States'). Used by 'analyze_specific_country'.",
+                    },
+                    "campaign_name": {
+                        "type": "string",
+                        "description": "The name of a marketing campaign for analysis. Used by 'analyze_specific_campaign'.",
+                    },
+                },
+            },
+        },
+        "required": ["template_name", "parameters"],
+    },
+)
+
+query_tool = Tool(function_declarations=[execute_template_query_func])
+
+
+def chat_config() -> GenerateContentConfig:
+    return GenerateContentConfig(temperature=0, tools=[query_tool], http_options=http_options())
+
+
+# ------------------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------------------
+def get_template_descriptions() -> str:
+    lines = []
+    for name, details in TEMPLATE_INDEX.items():
+        desc = details.get("description", "").strip()
+        lines.append(f"- `{name}`: {desc}")
+    return "\n".join(lines)
+
+
+def query_fingerprint(sql: str, query_params: dict = None) -> str:
+    """Identifies a query by its SQL text and parameter values."""
+    payload = json.dumps([sql, {k: str(v) for k, v in (query_params or {}).items()}], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def bq_query_parameters(query_params: dict) -> list:
+    """{name: value} -> BigQuery named parameters: INT64 for ints (top_n), STRING for everything else."""
+    return [
+        bigquery.ScalarQueryParameter(name, "INT64", value) if isinstance(value, int) and not isinstance(value, bool)
+        else bigquery.ScalarQueryParameter(name, "STRING", str(value))
+        for name, value in (query_params or {}).items()
+    ]
+
+
+def execute_bq_query(sql: str, bq_client: bigquery.Client, tracer: Tracer = None, priority: str = None,
+                     user: str = None, on_queue=None, query_params: dict = None, page_size: int = None):
+    """Runs the query and returns (rows, job_stats). `priority` is "INTERACTIVE" (default) or "BATCH".
+
+    `query_params` are the values for the SQL's @name parameters. With
+    `page_size`, only the first page of rows is fetched; job_stats then
+    carries "total_rows" and the "destination" table holding the rest.
+
+    The job waits for a slot from the BigQuery admission limiter, queued
+    fairly against other users' jobs; `on_queue(position)` reports its place
+    in line while it waits.
+
+    Concurrent calls with the same SQL and parameters share one job (see BQ_COALESCE); the
+    callers that joined get copies of its rows, job_stats["coalesced"] set,
+    and a bigquery.coalesced span covering their wait.
+    """
+    tracer = tracer or Tracer("execute_bq_query")
+    if not BQ_COALESCE:
+        return _run_bq_query(sql, bq_client, tracer, priority, user, on_queue, query_params, page_size)
+    key = (getattr(bq_client, "project", None), query_fingerprint(sql, query_params), page_size)
+    started_ns = time.time_ns()
+    (rows, job_stats), shared = _bq_flights.do(
+        key, lambda: _run_bq_query(sql, bq_client, tracer, priority, user, on_queue, query_params, page_size))
+    if not shared:
+        return rows, job_stats
+    tracer.record_span("bigquery.coalesced", started_ns, time.time_ns(), job_id=job_stats.get("job_id"))
+    # The job was paid for once, by the caller that started it.
+    job_stats = {**job_stats, "coalesced": True, "total_bytes_billed": 0, "slot_millis": 0}
+    return [dict(row) for row in rows], job_stats
+
+
+def coalescing_stats() -> dict:
+    """Process-wide counts of BigQuery queries run vs. served by joining an identical in-flight query."""
+    return _bq_flights.stats()
+
+
+def _run_bq_query(sql: str, bq_client: bigquery.Client, tracer: Tracer, priority: str = None,
+                  user: str = None, on_queue=None, query_params: dict = None, page_size: int = None):
+    with bigquery_limiter.slot(user, tracer, on_queue):
+        return _submit_bq_query(sql, bq_client, tracer, priority, query_params, page_size)
+
+
+def _submit_bq_query(sql: str, bq_client: bigquery.Client, tracer: Tracer, priority: str = None,
+                     query_params: dict = None, page_size: int = None):
+    job_config = bigquery.QueryJobConfig(maximum_bytes_billed=10_000_000_000, # 10 GB
+                                         query_parameters=bq_query_parameters(query_params))
+    if priority:
+        job_config.priority = priority
+    with tracer.span("bigquery.submit"):
+        query_job = bq_client.query(sql, job_config=job_config)
+    with tracer.span("bigquery.wait") as wait_span:
+        rows = query_job.result(max_results=page_size) if page_size else query_job.result()
+    # Split the wait using BigQuery's own timeline: queued until `started`,
+    # executing until `ended`.
+    if query_job.created and query_job.started and query_job.ended:
+        created_ns = int(query_job.created.timestamp() * 1e9)
+        started_ns = int(query_job.started.timestamp() * 1e9)
+        ended_ns = int(query_job.ended.timestamp() * 1e9)
+        tracer.record_span("bigquery.queue", created_ns, started_ns, parent_id=wait_span.span_id)
+        tracer.record_span("bigquery.execute", started_ns, ended_ns, parent_id=wait_span.span_id)
+    with tracer.span("bigquery.fetch") as fetch_span:
+        page = rows
+        rows = [dict(row.items()) for row in page]
+        fetch_span.attributes["rows"] = len(rows)
+    job_stats = extract_job_stats(query_job)
+    if page_size:
+        destination = query_job.destination
+        job_stats["total_rows"] = page.total_rows
+        job_stats["destination"] = f"{destination.project}.{destination.dataset_id}.{destination.table_id}"
+    return rows, job_stats
+
+
+def estimate_query_bytes(sql: str, bq_client: bigquery.Client, query_params: dict = None) -> int:
+    """Dry-runs the query and returns the bytes BigQuery would process."""
+    job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False,
+                                         query_parameters=bq_query_parameters(query_params))
+    query_job = bq_client.query(sql, job_config=job_config)
+    return query_job.total_bytes_processed or 0
+
+
+def default_dates():
+    today = datetime.now(timezone.utc).date()
+    end_date = today - timedelta(days=1)
+    start_date = today - timedelta(days=8)
+    return start_date.strftime("%Y%m%d"), end_date.strftime("%Y%m%d")
+
+
+def build_system_prompt(project_id: str, ga4_dataset: str, today=None) -> str:
+    today_iso = (today or datetime.now(timezone.utc).date()).isoformat()
+    return f"""
+You are a Google Analytics 4 BigQuery expert assistant. Your goal is to answer user questions by selecting the correct GA4 query template and parameters.
+
+Plan:
+1) Analyze the user's question (intent, metrics, dimensions, filters, time range).
+2) Choose the best template from the list.
+3) Extract parameters:
+   - Dates in YYYYMMDD (handle phrases like "yesterday", "last 7 days", "this month").
+   - If missing, default to the last 8 days (inclusive).
+4) Call execute_template_query with template_name and parameters.
+5) After receiving results, produce a concise answer grounded ONLY in the returned data.
+   If the results carry a sampling_note, say the figures are sample-based estimates.
+   If they carry a truncation_note, say the summary covers only the top rows.
+   If they carry a limit_note, the query stopped at its top_n rows: present them as the top N,
+   and do not count or total the rows as if they were every value.
+
+Available templates:
+{get_template_descriptions()}
+
+Rules:
+- Today's date (UTC): {today_iso}
+- Project: {project_id}
+- GA4 dataset: {ga4_dataset}
+- Use only provided data when summarizing (no fabrication).
+""".strip()
+
+
+# ------------------------------------------------------------------------------
+# Pipeline
+# ------------------------------------------------------------------------------
+def route_question(question: str, genai_client, project_id: str, dataset_id: str,
+                   model_id: str = ROUTE_MODEL_ID, tracer: Tracer = None, today=None, user: str = None, on_queue=None,
+                   hedge_model: str = GEMINI_HEDGE_MODEL, tier: str = None):
+    """Sends the routing turn. Returns (chat, response, model); the chat carries on to the summary turn.
+
+    The call waits for a Gemini admission slot first (see execute_bq_query),
+    then runs with the deadline, retries and hedging of gemini_calls;
+    `model` is the one that answered. `tier` is recorded on the span.
+    """
+    tracer = tracer or Tracer("route_question")
+    with tracer.span("prompt.build"):
+        system_prompt = build_system_prompt(project_id, dataset_id, today=today)
+        full_prompt = f"{system_prompt}\nUser question: {question}"
+
+    def new_chat(model):
+        return genai_client.chats.create(model=model, config=chat_config())
+
+    with gemini_limiter.slot(user, tracer, on_queue):
+        return send_message(new_chat, full_prompt, model_id, tracer, "route", hedge_model=hedge_model,
+                            **({"tier": tier} if tier else {}))
+
+
+def route_tiered(question: str, genai_client, project_id: str, dataset_id: str,
+                 route_model: str = ROUTE_MODEL_ID, escalation_model: str = ROUTE_ESCALATION_MODEL_ID,
+                 tracer: Tracer = None, today=None, user: str = None, on_queue=None, on_status=None,
+                 meter: UsageMeter = None, hedge_model: str = GEMINI_HEDGE_MODEL):
+    """Routes with `route_model`, and again with `escalation_model` if route_problems finds fault.
+
+    Returns (chat, response, routing) for the routing that is used, where
+    routing is {"tier": "fast" | "escalated", "model", "latency_ms": {tier:
+    ms}, "escalation_reasons"}. Token usage of every call goes into `meter`.
+    """
+    tiers = [("fast", route_model)]
+    if escalation_model and escalation_model != route_model:
+        tiers.append(("escalated", escalation_model))
+    routing = {"latency_ms": {}}
+    for tier, model in tiers:
+        if tier == "escalated" and on_status is not None:
+            on_status("Double-checking the question with a stronger model...")
+        started = time.perf_counter()
+        chat, response, answered_by = route_question(question, genai_client, project_id, dataset_id, model, tracer,
+                                                     today=today, user=user, on_queue=on_queue,
+                                                     hedge_model=hedge_model, tier=tier)
+        routing["latency_ms"][tier] = round((time.perf_counter() - started) * 1000, 1)
+        routing.update(tier=tier, model=answered_by)
+        if meter is not None:
+            meter.add("route", answered_by, response)
+        problems = route_problems(*parse_route(response))
+        if not problems:
+            break
+        if tier == "fast":
+            routing["escalation_reasons"] = problems
+    return chat, response, routing
+
+
+def parse_route(response):
+    """Returns (template_name, parameters) from the routing response, or (None, None)."""
+    part = response.candidates[0].content.parts[0]
+    if not (part.function_call and part.function_call.name == "execute_template_query"):
+        return None, None
+    fc_args = dict(part.function_call.args.items())
+    return fc_args.get("template_name"), fc_args.get("parameters", {}) or {}
+
+
+def route_problems(template_name, params) -> list:
+    """Reasons a routing choice looks wrong; empty when it can run as chosen.
+
+    Parameters the chosen template does not use are not a problem:
+    resolve_parameters drops them, and the details list them under
+    `ignored_parameters`.
+    """
+    if template_name is None:
+        return ["no template chosen"]
+    if template_name not in TEMPLATE_INDEX:
+        return [f"unknown template {template_name!r}"]
+    declared = TEMPLATE_INDEX[template_name]["parameters"]
+    problems, dates = [], {}
+    for name in ("start_date", "end_date"):
+        if params.get(name):
+            try:
+                dates[name] = datetime.strptime(str(params[name]), "%Y%m%d")
+            except ValueError:
+                problems.append(f"{name} is not a YYYYMMDD date: {params[name]!r}")
+    if len(dates) == 2 and dates["start_date"] > dates["end_date"]:
+        problems.append("start_date is after end_date")
+    problems += [f"missing {name}" for name in declared
+                 if name not in ("start_date", "end_date", "top_n") and params.get(name) in (None, "")]
+    return problems
+
+
+def resolve_parameters(template_name: str, params: dict, project_id: str, dataset_id: str) -> dict:
+    """Fills in the project, dataset and default dates, and keeps only the parameters the template declares."""
+    start_def, end_def = default_dates()
+    final_params = {
+        "project_id": project_id,
+        "dataset_id": dataset_id,
+        "start_date": (params.get("start_date") or start_def),
+        "end_date": (params.get("end_date") or end_def),
+    }
+
+    declared = TEMPLATE_INDEX[template_name]["parameters"]
+    for param in declared:
+        if param not in final_params and param in params:
+            final_params[param] = params[param]
+    if "top_n" in declared:
+        final_params["top_n"] = resolve_top_n(params.get("top_n"), declared["top_n"].get("default", TOP_N_DEFAULT))
+    return final_params
+
+
+def resolve_top_n(value, default: int = TOP_N_DEFAULT) -> int:
+    """The model may send 10, 10.0 or "10"; anything unusable falls back to `default`."""
+    try:
+        top_n = int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return default
+    return min(top_n, TOP_N_MAX) if top_n > 0 else default
+
+
+def render_sql(template_name: str, final_params: dict, sample_rate: float = 1.0):
+    """Returns (sql, query_params); values are bound as @name parameters, not formatted into the SQL."""
+    sql_template = template_sql(template_name)
+    if sample_rate < 1.0:
+        sql_template = apply_user_sampling(sql_template, sample_rate)
+    try:
+        return bind_parameters(sql_template, final_params)
+    except KeyError as ke:
+        raise ValueError(f"Template missing parameter: {ke}") from ke
+
+
+class _Run:
+    """Clients and options shared by the stages of one pipeline run."""
+
+    def __init__(self, bq_client, genai_client, project_id, dataset_id, model_id, sampling_mode,
+                 perf_store, tracer, on_status, token_budget, answer_cache, priority=None, cache_source="chat",
+                 summarize=True, user=None):
+        self.bq_client = bq_client
+        self.genai_client = genai_client
+        self.project_id = project_id
+        self.dataset_id = dataset_id
+        self.model_id = model_id
+        self.sampling_mode = sampling_mode
+        self.perf_store = perf_store
+        self.tracer = tracer or Tracer("chat.answer")
+        self.on_status = on_status or (lambda message: None)
+        self.token_budget = token_budget
+        self.answer_cache = answer_cache
+        self.priority = priority
+        self.cache_source = cache_source
+        self.summarize = summarize
+        self.user = user
+        self.meter = UsageMeter()
+        self.routing = None
+
+    def on_queue(self, backend: str):
+        """Queue-position callback for the admission limiters, reported through on_status."""
+        return lambda position: self.on_status(f"Waiting for {backend} capacity: #{position} in line...")
+
+    def record_token_usage(self, session_id, user):
+        if self.perf_store is not None and self.meter.calls:
+            self.perf_store.record_token_usage(self.meter.calls, session_id=session_id, user=user,
+                                               template_name=self.tracer.root.attributes.get("template"))
+
+
+def answer_question(question: str, bq_client, genai_client, project_id: str, dataset_id: str,
+                    model_id: str = SUMMARY_MODEL_ID, sampling_mode: str = "off", perf_store=None,
+                    tracer: Tracer = None, on_status=None, session_id: str = None, user: str = None,
+                    token_budget: int = None, answer_cache=None, route_model: str = ROUTE_MODEL_ID,
+                    escalation_model: str = ROUTE_ESCALATION_MODEL_ID) -> dict:
+    """Answers one question end to end.
+
+    Returns {"answer", "details", "rows", "tracer"}; `details` is the
+    backend_details dict shown in the UI. `on_status(message)` is called
+    before long-running stages so callers can show progress.
+
+    Routing runs on `route_model`, escalating to `escalation_model` when
+    needed (see route_tiered); `model_id` writes the summary.
+
+    `token_budget` is the number of Gemini tokens this question may still
+    spend (None = unlimited); near the limit the summary is compacted or
+    skipped. Token usage is stored in `perf_store` under `session_id`/`user`.
+
+    With an `answer_cache`, a repeated question (before routing) or repeated
+    template + parameters (after routing) returns the stored answer, with
+    details["cache"]["hit"] set.
+    """
+    run = _Run(bq_client, genai_client, project_id, dataset_id, model_id, sampling_mode,
+               perf_store, tracer, on_status, token_budget, answer_cache, user=user)
+
+    if answer_cache is not None and ANSWER_CACHE_QUESTION_KEY:
+        with run.tracer.span("cache.question_lookup"):
+            cached = answer_cache.get_by_question(question, project_id, dataset_id, sampling_mode, bq_client)
+        if cached is not None:
+            return _cached_result(cached, "question", run.tracer)
+    try:
+        chat, response, run.routing = route_tiered(question, genai_client, project_id, dataset_id, route_model,
+                                                   escalation_model, run.tracer, user=user,
+                                                   on_queue=run.on_queue("Gemini"), on_status=run.on_status,
+                                                   meter=run.meter)
+        run.tracer.root.attributes["route_tier"] = run.routing["tier"]
+        template_name, params = parse_route(response)
+
+        if params is None:
+            part = response.candidates[0].content.parts[0]
+            answer = getattr(part, "text", None) or NO_TEMPLATE_ANSWER
+            details = {"routing": run.routing,
+                       "token_usage": {"calls": run.meter.calls, "totals": run.meter.totals()}}
+            return {"answer": answer, "details": details, "rows": [], "tracer": run.tracer}
+
+        return _run_template(run, chat.get_history(), question, template_name, params,
+                             run.meter.calls[-1]["prompt_tokens"])
+    finally:
+        run.record_token_usage(session_id, user)
+
+
+def answer_template(template_name: str, params: dict, bq_client, genai_client, project_id: str,
+                    dataset_id: str, question: str = None, summarize: bool = True,
+                    model_id: str = SUMMARY_MODEL_ID, sampling_mode: str = "off", perf_store=None,
+                    tracer: Tracer = None, on_status=None, session_id: str = None, user: str = None,
+                    token_budget: int = None, answer_cache=None, priority: str = None,
+                    cache_source: str = "chat") -> dict:
+    """Runs a known template without the routing turn; same return shape as answer_question.
+
+    The summary turn sees the same conversation a routed question produces.
+    `summarize=False` skips Gemini entirely and answers with a table of the
+    rows. `priority` is a BigQuery job priority ("BATCH" for background work).
+    """
+    run = _Run(bq_client, genai_client, project_id, dataset_id, model_id, sampling_mode,
+               perf_store, tracer, on_status, token_budget, answer_cache,
+               priority=priority, cache_source=cache_source, summarize=summarize, user=user)
+    with run.tracer.span("prompt.build"):
+        full_prompt = f"{build_system_prompt(project_id, dataset_id)}\nUser question: " + (
+            question or f"Summarize the results of the {template_name} template.")
+        history = [
+            Content(role="user", parts=[Part(text=full_prompt)]),
+            Content(role="model", parts=[Part(function_call=FunctionCall(
+                name="execute_template_query",
+                args={"template_name": template_name, "parameters": dict(params or {})},
+            ))]),
+        ]
+    try:
+        return _run_template(run, history, question, template_name, dict(params or {}),
+                             len(full_prompt) // CHARS_PER_TOKEN)
+    finally:
+        run.record_token_usage(session_id, user)
+
+
+def run_paged(template_name: str, params: dict, bq_client, project_id: str, dataset_id: str,
+              page_size: int = RESULT_PAGE_SIZE, tracer: Tracer = None, user: str = None, on_queue=None) -> dict:
+    """Runs a template for its full result and fetches only the first page.
+
+    A top_n LIMIT is raised to PAGED_MAX_ROWS. The rest of the rows stay in
+    the job's destination table; register it with ResultPages to page
+    through them. Returns {"template", "final_parameters", "generated_sql",
+    "query_parameters", "destination", "total_rows", "page_size", "rows",
+    "job_stats"}.
+    """
+    tracer = tracer or Tracer("run_paged")
+    if template_name not in TEMPLATE_INDEX:
+        raise ValueError(f"Unknown template: {template_name}")
+    tracer.root.attributes["template"] = template_name
+    with tracer.span("params.resolve"):
+        final_params = resolve_parameters(template_name, params, project_id, dataset_id)
+        if "top_n" in final_params:
+            final_params["top_n"] = PAGED_MAX_ROWS
+    with tracer.span("sql.render"):
+        final_sql, query_params = render_sql(template_name, final_params)
+    with tracer.span("bigquery", template=template_name, page_size=page_size):
+        rows, job_stats = execute_bq_query(final_sql, bq_client, tracer, user=user, on_queue=on_queue,
+                                           query_params=query_params, page_size=page_size)
+    return {
+        "template": template_name,
+        "final_parameters": final_params,
+        "generated_sql": final_sql,
+        "query_parameters": query_params,
+        "destination": job_stats["destination"],
+        "total_rows": job_stats["total_rows"],
+        "page_size": page_size,
+        "rows": rows,
+        "job_stats": job_stats,
+    }
+
+
+def _cached_result(cached: dict, level: str, tracer: Tracer, token_usage: dict = None, routing: dict = None) -> dict:
+    tracer.root.attributes["template"] = cached["template_name"]
+    tracer.root.attributes["cache"] = level
+    details = dict(cached["details"])
+    details.pop("routing", None)
+    if routing is not None:
+        details["routing"] = routing
+    details["cache"] = {"hit": True, "level": level, "age_s": cached["age_s"], "freshness": cached["freshness"]}
+    if token_usage is not None:
+        details["token_usage"] = token_usage
+    else:
+        details.pop("token_usage", None)
+    return {"answer": cached["answer"], "details": details, "rows": cached["rows"], "tracer": tracer}
+
+
+def _run_template(run: _Run, history, question, template_name, params, history_prompt_tokens) -> dict:
+    """Resolve -> render -> (cache) -> query -> summarize, for a chosen template.
+
+    `history` is the routing conversation the summary turn continues.
+    """
+    tracer, meter, bq_client = run.tracer, run.meter, run.bq_client
+
+    with tracer.span("params.resolve"):
+        if not template_name or template_name not in TEMPLATE_INDEX:
+            raise ValueError(f"Invalid template selected by model: {template_name}")
+
+        final_params = resolve_parameters(template_name, params, run.project_id, run.dataset_id)
+        ignored = sorted(name for name in params if name not in TEMPLATE_INDEX[template_name]["parameters"])
+    tracer.root.attributes["template"] = template_name
+
+    with tracer.span("sql.render"):
+        final_sql, query_params = render_sql(template_name, final_params)
+
+    backend_details = {
+        "chosen_template": template_name,
+        "extracted_parameters": params,
+        "final_parameters": final_params,
+        "generated_sql": final_sql,
+        "query_parameters": query_params,
+    }
+    if ignored:
+        backend_details["ignored_parameters"] = ignored
+    if run.routing is not None:
+        backend_details["routing"] = run.routing
+
+    # Answers are cached under the unsampled SQL; the sampling mode is part of the key.
+    cache_sql = final_sql
+    if run.answer_cache is not None:
+        with tracer.span("cache.lookup"):
+            freshness = freshness_token(final_params, bq_client)
+            cached = run.answer_cache.get(cache_sql, final_params, run.sampling_mode, freshness=freshness)
+        if cached is not None:
+            if question:
+                run.answer_cache.link_question(question, final_params, run.sampling_mode, cached["key"])
+            return _cached_result(cached, "parameters", tracer,
+                                  token_usage={"calls": meter.calls, "totals": meter.totals()}, routing=run.routing)
+
+    sample_rate = 1.0
+    if run.sampling_mode != "off":
+        with tracer.span("bigquery.dry_run"):
+            estimated_bytes = estimate_query_bytes(final_sql, bq_client, query_params)
+        sample_rate = choose_sample_rate(estimated_bytes, mode=run.sampling_mode)
+        backend_details["estimated_bytes"] = estimated_bytes
+        if sample_rate < 1.0:
+            with tracer.span("sql.render", sample_rate=sample_rate):
+                final_sql, query_params = render_sql(template_name, final_params, sample_rate)
+            backend_details["generated_sql"] = final_sql
+
+    run.on_status(f"Querying BigQuery with '{template_name}'...")
+    query_started = time.perf_counter()
+    with tracer.span("bigquery", template=template_name):
+        rows, job_stats = execute_bq_query(final_sql, bq_client, tracer, priority=run.priority,
+                                           user=run.user, on_queue=run.on_queue("BigQuery"),
+                                           query_params=query_params)
+    duration_ms = round((time.perf_counter() - query_started) * 1000, 1)
+    backend_details["job_stats"] = {"duration_ms": duration_ms, **job_stats}
+    if run.perf_store is not None:
+        run.perf_store.record_execution(
+            template_name, job_stats, duration_ms, len(rows),
+            question=question,
+            start_date=final_params["start_date"],
+            end_date=final_params["end_date"],
+        )
+        backend_details["template_performance"] = run.perf_store.template_percentiles(template_name)
+
+    rows, sampling_info = scale_sampled_rows(rows, sample_rate)
+    if sampling_info:
+        backend_details["sampling"] = sampling_info
+    backend_details["query_results_preview"] = rows[:5]
+    limit_note = None
+    if "top_n" in final_params and len(rows) >= final_params["top_n"]:
+        limit_note = (f"The query returns only the top {final_params['top_n']} rows (top_n), "
+                      "so there may be more values than listed.")
+        backend_details["limit_note"] = limit_note
+    with tracer.span("results.serialize") as serialize_span:
+        content = json.dumps(rows, ensure_ascii=False, default=str)
+        summary_rows, truncation_note = compact_rows(rows)
+        compact_content = (json.dumps(summary_rows, ensure_ascii=False, default=str)
+                           if truncation_note else content)
+        serialize_span.attributes["bytes"] = len(content)
+
+    token_budget = run.token_budget
+    remaining = None if token_budget is None else token_budget - meter.totals()["total_tokens"]
+    summary_mode = (choose_summary_mode(remaining, history_prompt_tokens, len(content), len(compact_content))
+                    if run.summarize else "skip")
+    tracer.root.attributes["summary_mode"] = summary_mode
+
+    if summary_mode == "skip":
+        answer = f"Results from `{template_name}`:\n\n{rows_to_markdown(rows)}"
+        if run.summarize:
+            answer = f"The token budget is nearly used up, so this answer skips the written summary. {answer}"
+    else:
+        api_response = {"content": content}
+        if summary_mode == "compact":
+            api_response = {"content": compact_content, "truncation_note": truncation_note}
+        if limit_note:
+            api_response["limit_note"] = limit_note
+        if sampling_info:
+            api_response["sampling_note"] = sampling_info["note"]
+
+        def new_chat(model):
+            return run.genai_client.chats.create(model=model, config=chat_config(), history=history)
+
+        run.on_status("Summarizing results...")
+        with gemini_limiter.slot(run.user, tracer, run.on_queue("Gemini")):
+            _, response2, summary_model = send_message(
+                new_chat,
+                Part.from_function_response(
+                    name="execute_template_query",
+                    response=api_response,
+                ),
+                run.model_id, tracer, "summarize", mode=summary_mode,
+            )
+        meter.add("summarize", summary_model, response2)
+        answer = response2.candidates[0].content.parts[0].text
+
+    backend_details["token_usage"] = {
+        "calls": meter.calls,
+        "totals": meter.totals(),
+        "summary_mode": summary_mode,
+        "budget_remaining": None if token_budget is None else token_budget - meter.totals()["total_tokens"],
+    }
+    if run.answer_cache is not None and summary_mode != "skip":
+        with tracer.span("cache.store"):
+            run.answer_cache.put(template_name, cache_sql, final_params, run.sampling_mode, answer,
+                                 backend_details, rows, question=question, freshness=freshness,
+                                 source=run.cache_source)
+        backend_details["cache"] = {"hit": False, "freshness": freshness}
+    return {"answer": answer, "details": backend_details, "rows": rows, "tracer": tracer}
@@ -0,0 +1,151 @@
+# exports.py
+"""Streaming CSV / Parquet export of full query results.
+
+Every BigQuery query writes its full result to a destination table that
+BigQuery keeps for about a day. An export reads that table with
+`list_rows` one page (EXPORT_PAGE_ROWS rows) at a time, converts each page
+to an Arrow record batch and encodes it straight away. Memory stays at
+about one page whatever the result size. The API streams the bytes to the
+client as they are produced. The chat UI writes them to a temp file.
+
+An export comes from cached results when it can. First choice is the
+destination table of the job that produced the answer (or of a paged
+result). Failing that, the answer's parameterized SQL is re-run, which
+BigQuery normally answers from its own result cache. A destination table
+that has expired by the time it is read raises ResultExpired; answers can
+then be exported again with `result_destination(..., fresh=True)`.
+"""
+
+import os
+import tempfile
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from google.api_core.exceptions import NotFound
+
+from engine import execute_bq_query
+from result_pages import ResultExpired
+from tracing import Tracer
+
+EXPORT_FORMATS = ("csv", "parquet")
+EXPORT_PAGE_ROWS = int(os.getenv("EXPORT_PAGE_ROWS", "10000"))
+EXPORT_MIME_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+
+def result_destination(bq_client, details: dict, tracer: Tracer = None, user: str = None, fresh: bool = False) -> str:
+    """The table holding the full result of the run described by `details` (an answer's execution details).
+
+    `fresh=True` skips the tables of earlier runs and re-runs the SQL, for
+    when those have expired.
+    """
+    tracer = tracer or Tracer("export.destination")
+    if details.get("sampling"):
+        raise ValueError("This answer was computed on a sample and scaled up in the app; it cannot be exported.")
+    job_stats = {} if fresh else details.get("job_stats") or {}
+    if job_stats.get("destination"):
+        return job_stats["destination"]
+    if job_stats.get("job_id"):
+        with tracer.span("bigquery.get_job"):
+            try:
+                job = bq_client.get_job(job_stats["job_id"], location=job_stats.get("location"))
+                destination = job.destination
+            except NotFound:
+                destination = None
+        if destination is not None:
+            return f"{destination.project}.{destination.dataset_id}.{destination.table_id}"
+    if not details.get("generated_sql"):
+        raise ValueError("These results cannot be exported.")
+    # Same SQL and parameters as the answer, so BigQuery's result cache usually serves it.
+    _, job_stats = execute_bq_query(details["generated_sql"], bq_client, tracer, user=user,
+                                    query_params=details.get("query_parameters"), page_size=1)
+    return job_stats["destination"]
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back through drain().
+
+    tell() keeps counting across drains, which the Parquet writer needs for
+    the offsets in its footer.
+    """
+
+    def __init__(self):
+        self.closed = False
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _writer(fmt: str, sink, schema):
+    if fmt == "csv":
+        return pa_csv.CSVWriter(sink, schema)
+    return pq.ParquetWriter(sink, schema, compression="zstd")
+
+
+def iter_export(bq_client, table: str, fmt: str, page_rows: int = EXPORT_PAGE_ROWS, tracer: Tracer = None):
+    """Yields the encoded bytes of `table` as CSV or Parquet, one BigQuery page at a time.
+
+    Raises ResultExpired if the table no longer exists.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {EXPORT_FORMATS}")
+    tracer = tracer or Tracer("export")
+    sink = _ChunkSink()
+    writer = None
+    exported = 0
+    with tracer.span("export.write", format=fmt) as span:
+        try:
+            rows = bq_client.list_rows(table, page_size=page_rows)
+            for batch in rows.to_arrow_iterable():
+                if writer is None:
+                    writer = _writer(fmt, sink, batch.schema)
+                writer.write_batch(batch)
+                exported += batch.num_rows
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        except NotFound as e:
+            raise ResultExpired("These results have expired; run the query again.") from e
+        if writer is None:  # no pages at all: header / empty file from the table schema
+            writer = _writer(fmt, sink, pa.schema([(field.name, pa.string()) for field in rows.schema or []]))
+        writer.close()
+        span.attributes["rows"] = exported
+    yield sink.drain()
+
+
+def export_to_file(bq_client, table: str, fmt: str, directory: str = None, tracer: Tracer = None) -> str:
+    """Writes the export to a temp file and returns its path; the caller deletes it.
+
+    If the export fails, the temp file is deleted here.
+    """
+    fd, path = tempfile.mkstemp(suffix=f".{fmt}", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in iter_export(bq_client, table, fmt, tracer=tracer):
+                f.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
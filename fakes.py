@@ -0,0 +1,283 @@
+# fakes.py
+"""In-process stand-ins for `bigquery.Client` and `genai.Client`.
+
+They implement just the surface engine.py uses, with configurable latency and
+result sizes, so the full pipeline can be benchmarked offline. Gemini
+responses are built from the real `google.genai.types` so the engine parses
+them exactly as it parses live responses.
+"""
+
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pyarrow as pa
+
+from google.api_core.exceptions import NotFound
+from google.cloud.bigquery import TableReference
+from google.genai import errors as genai_errors
+from google.genai import types as genai_types
+
+_QUESTION_RE = re.compile(r"User question:\s*(.*)\s*$", re.DOTALL)
+
+
+def _sleep_ms(latency_ms: float, jitter: float, rng: random.Random):
+    if latency_ms <= 0:
+        return
+    factor = 1 + rng.uniform(-jitter, jitter) if jitter else 1
+    time.sleep(max(0.0, latency_ms * factor) / 1000)
+
+
+class FakeRow(dict):
+    """Mimics `bigquery.Row.items()`."""
+
+
+class FakeRowIterator:
+    """Mimics `RowIterator`: iterates at most `max_results` rows but reports the full `total_rows`."""
+
+    def __init__(self, rows, max_results=None, page_size=None):
+        self.total_rows = len(rows)
+        self._rows = rows[:max_results] if max_results else rows
+        self._page_size = page_size or len(self._rows) or 1
+        self.schema = None
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def to_arrow_iterable(self, **kwargs):
+        for start in range(0, len(self._rows), self._page_size):
+            yield pa.RecordBatch.from_pylist([dict(row) for row in self._rows[start:start + self._page_size]])
+
+
+class FakeQueryJob:
+    _counter = 0
+    _counter_lock = threading.Lock()
+
+    def __init__(self, client, sql, job_config):
+        with FakeQueryJob._counter_lock:
+            FakeQueryJob._counter += 1
+            self.job_id = f"fake_job_{FakeQueryJob._counter}"
+        self._client = client
+        self.query = sql
+        self.job_config = job_config
+        self.created = datetime.now(timezone.utc)
+        self.started = None
+        self.ended = None
+        self.total_bytes_processed = client.bytes_processed
+        self.total_bytes_billed = 0 if getattr(job_config, "dry_run", False) else client.bytes_processed
+        self.slot_millis = None
+        self.cache_hit = False
+        self.query_plan = []
+        self.destination = TableReference.from_string(f"{client.project}._fake_results.anon_{self.job_id}")
+        self.location = "US"
+        self._rows = None
+
+    def result(self, *args, max_results=None, **kwargs):
+        if self._rows is None:
+            client = self._client
+            _sleep_ms(client.queue_ms, client.jitter, client.rng)
+            self.started = datetime.now(timezone.utc)
+            _sleep_ms(client.latency_ms, client.jitter, client.rng)
+            self.ended = datetime.now(timezone.utc)
+            self.slot_millis = int((self.ended - self.started) / timedelta(milliseconds=1)) * 10
+            rows = client.make_rows(self.query)
+            # Honour a `LIMIT @top_n` the way BigQuery would, so row counts shrink with top_n.
+            for param in getattr(self.job_config, "query_parameters", None) or []:
+                if param.name == "top_n":
+                    rows = rows[:param.value]
+            self._rows = [FakeRow(row) for row in rows]
+            self._client.tables[str(self.destination)] = self._rows
+        return FakeRowIterator(self._rows, max_results)
+
+
+class FakeBigQueryClient:
+    """`bigquery.Client` look-alike returning `rows` synthetic rows per query."""
+
+    def __init__(self, project="fake-project", latency_ms=800, queue_ms=50, jitter=0.2,
+                 rows=50, bytes_processed=1_000_000_000, seed=None):
+        self.project = project
+        self.latency_ms = latency_ms
+        self.queue_ms = queue_ms
+        self.jitter = jitter
+        self.rows = rows
+        self.bytes_processed = bytes_processed
+        self.rng = random.Random(seed)
+        self.queries = []
+        self.tables = {}  # destination table id -> rows, for list_rows
+        self.jobs = {}
+
+    def query(self, sql, job_config=None, **kwargs):
+        self.queries.append(sql)
+        job = FakeQueryJob(self, sql, job_config)
+        self.jobs[job.job_id] = job
+        if getattr(job_config, "dry_run", False):
+            job.started = job.ended = job.created
+            job._rows = []
+        return job
+
+    def get_job(self, job_id, location=None, **kwargs):
+        if job_id not in self.jobs:
+            raise NotFound(f"Not found: Job {job_id}")
+        return self.jobs[job_id]
+
+    def list_rows(self, table, start_index=0, max_results=None, page_size=None, **kwargs):
+        rows = self.tables.get(str(table))
+        if rows is None:
+            raise NotFound(f"Not found: Table {table}")
+        _sleep_ms(self.queue_ms, self.jitter, self.rng)
+        end = None if max_results is None else start_index + max_results
+        return FakeRowIterator(rows[start_index:end], page_size=page_size)
+
+    def make_rows(self, sql):
+        if callable(self.rows):
+            return self.rows(sql)
+        return [
+            {
+                "dimension": f"value_{i}",
+                "user_count": 1000 - i,
+                "session_count": 1500 - i,
+                "event_count": 9000 - 3 * i,
+                "engagement_rate": round(0.5 + (i % 10) / 100, 2),
+            }
+            for i in range(self.rows)
+        ]
+
+
+def _usage(prompt_text: str, output_text: str):
+    prompt_tokens = max(1, len(prompt_text) // 4)
+    output_tokens = max(1, len(output_text) // 4)
+    return genai_types.GenerateContentResponseUsageMetadata(
+        prompt_token_count=prompt_tokens,
+        candidates_token_count=output_tokens,
+        total_token_count=prompt_tokens + output_tokens,
+    )
+
+
+def _response(part, usage):
+    return genai_types.GenerateContentResponse(
+        candidates=[genai_types.Candidate(content=genai_types.Content(role="model", parts=[part]))],
+        usage_metadata=usage,
+    )
+
+
+class FakeChat:
+    def __init__(self, client, model, history=None):
+        self._client = client
+        self.model = model
+        self._history = list(history or [])
+
+    def get_history(self, curated=False):
+        return list(self._history)
+
+    def send_message(self, message, **kwargs):
+        client = self._client
+        client.misbehave()
+        scale = client.model_latency_scale.get(self.model, 1.0)
+        if isinstance(message, str):
+            _sleep_ms(client.route_latency_ms * scale, client.jitter, client.rng)
+            match = _QUESTION_RE.search(message)
+            question = match.group(1).strip() if match else message
+            template_name, parameters = client.route(question, self.model)
+            if template_name is None:
+                text = "I couldn't map this to a template."
+                return _response(genai_types.Part(text=text), _usage(message, text))
+            call = genai_types.FunctionCall(
+                name="execute_template_query",
+                args={"template_name": template_name, "parameters": parameters},
+            )
+            return _response(genai_types.Part(function_call=call), _usage(message, str(call.args)))
+
+        _sleep_ms(client.summary_latency_ms * scale, client.jitter, client.rng)
+        content = ""
+        if getattr(message, "function_response", None) is not None:
+            content = str((message.function_response.response or {}).get("content", ""))
+        text = f"Summary of {len(content)} bytes of results."
+        return _response(genai_types.Part(text=text), _usage(content, text))
+
+
+class _FakeChats:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, model=None, config=None, history=None, **kwargs):
+        return FakeChat(self._client, model, history)
+
+
+class FakeGenaiClient:
+    """`genai.Client` look-alike.
+
+    `routes` maps question text to (template_name, parameters); unknown
+    questions route to `default_template` with no parameters. A `tail_rate`
+    share of calls take `tail_latency_ms` longer, and an `error_rate` share
+    fail with a 503, to exercise timeouts, retries and hedging.
+
+    `model_latency_scale` maps a model name to a latency multiplier, and
+    `misroute_rate` maps a model name to the share of questions it routes
+    to a template that does not exist, to exercise tiered routing.
+    """
+
+    def __init__(self, routes=None, route_latency_ms=1200, summary_latency_ms=1500, jitter=0.2,
+                 default_template="calculate_total_users", seed=None, tail_rate=0.0, tail_latency_ms=0,
+                 error_rate=0.0, model_latency_scale=None, misroute_rate=None):
+        self.routes = dict(routes or {})
+        self.route_latency_ms = route_latency_ms
+        self.summary_latency_ms = summary_latency_ms
+        self.jitter = jitter
+        self.default_template = default_template
+        self.tail_rate = tail_rate
+        self.tail_latency_ms = tail_latency_ms
+        self.error_rate = error_rate
+        self.model_latency_scale = dict(model_latency_scale or {})
+        self.misroute_rate = dict(misroute_rate or {})
+        self.rng = random.Random(seed)
+        self.chats = _FakeChats(self)
+
+    def misbehave(self):
+        if self.error_rate and self.rng.random() < self.error_rate:
+            raise genai_errors.ServerError(503, {"error": {"code": 503, "message": "fake overload",
+                                                          "status": "UNAVAILABLE"}})
+        if self.tail_rate and self.rng.random() < self.tail_rate:
+            _sleep_ms(self.tail_latency_ms, 0, self.rng)
+
+    def route(self, question, model=None):
+        if self.rng.random() < self.misroute_rate.get(model, 0.0):
+            return "no_such_template", {}
+        if question in self.routes:
+            template_name, parameters = self.routes[question]
+            return template_name, dict(parameters or {})
+        return self.default_template, {}
+
+
+class _RecordedChat:
+    def __init__(self, client):
+        self._client = client
+
+    def send_message(self, message, **kwargs):
+        match = _QUESTION_RE.search(message) if isinstance(message, str) else None
+        question = match.group(1).strip() if match else str(message)
+        record = self._client.recordings.get(question)
+        if record is None:
+            raise KeyError(f"No recorded response for question: {question!r}")
+        return genai_types.GenerateContentResponse.model_validate(record["response"])
+
+
+class _RecordedChats:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, model=None, config=None, **kwargs):
+        return _RecordedChat(self._client)
+
+
+class RecordedGenaiClient:
+    """`genai.Client` look-alike that replays routing responses recorded by routing_eval.py.
+
+    `recordings` maps question text to the recorded line
+    ({"question", "prompt_sha", "model", "latency_ms", "response"}).
+    """
+
+    def __init__(self, recordings):
+        self.recordings = dict(recordings)
+        self.chats = _RecordedChats(self)
@@ -0,0 +1,697 @@
+# ga4_datagen.py
+"""Synthetic GA4 BigQuery export generator.
+
+Writes one `events_YYYYMMDD.parquet` shard per day with the GA4 export
+schema from local_engine.GA4_EVENTS_SCHEMA: sessions with page-view paths,
+traffic sources, device/geo, an ecommerce funnel with purchase items and
+refunds, plus the event_params keys the templates read (ga_session_id,
+ga_session_number, session_engaged, entrances, page_location, ...).
+
+Everything is generated with vectorized numpy/Arrow operations in chunks and
+streamed to Parquet row groups, so memory stays bounded and large fixtures
+(hundreds of millions of events) build in minutes.
+
+    python ga4_datagen.py --events 2_000_000 --days 28 --output fixtures/ga4
+    python local_engine.py --data fixtures/ga4
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from local_engine import GA4_EVENTS_SCHEMA
+
+# ------------------------------------------------------------------------------
+# Distributions
+# ------------------------------------------------------------------------------
+# (source, medium, campaign, weight)
+TRAFFIC_SOURCES = [
+    ("google", "organic", "(organic)", 0.34),
+    ("(direct)", "(none)", "(direct)", 0.22),
+    ("google", "cpc", "brand_search", 0.09),
+    ("google", "cpc", "spring_sale", 0.05),
+    ("bing", "organic", "(organic)", 0.04),
+    ("facebook", "paid_social", "retargeting", 0.05),
+    ("instagram", "social", "(not set)", 0.03),
+    ("facebook.com", "referral", "(referral)", 0.03),
+    ("newsletter", "email", "weekly_digest", 0.07),
+    ("partner.example", "affiliate", "partner_program", 0.03),
+    ("youtube.com", "video", "product_launch", 0.02),
+    ("duckduckgo", "organic", "(organic)", 0.03),
+]
+# (category, operating_system, os_version, browser, mobile_brand, weight)
+DEVICES = [
+    ("desktop", "Windows", "Windows 11", "Chrome", None, 0.27),
+    ("desktop", "Macintosh", "Macintosh 14.4", "Safari", None, 0.10),
+    ("desktop", "Windows", "Windows 10", "Edge", None, 0.06),
+    ("desktop", "Linux", "Linux", "Firefox", None, 0.02),
+    ("mobile", "iOS", "iOS 17.4", "Safari", "Apple", 0.25),
+    ("mobile", "Android", "Android 14", "Chrome", "Samsung", 0.16),
+    ("mobile", "Android", "Android 13", "Chrome", "Google", 0.07),
+    ("tablet", "iOS", "iOS 17.4", "Safari", "Apple", 0.05),
+    ("tablet", "Android", "Android 13", "Chrome", "Samsung", 0.02),
+]
+# (country, continent, sub_continent, region, city, metro, language, utc_offset_hours, weight)
+GEOS = [
+    ("United States", "Americas", "Northern America", "California", "Los Angeles", "Los Angeles CA", "en-us", -8, 0.12),
+    ("United States", "Americas", "Northern America", "New York", "New York", "New York NY", "en-us", -5, 0.11),
+    ("United States", "Americas", "Northern America", "Texas", "Austin", "Austin TX", "en-us", -6, 0.07),
+    ("United States", "Americas", "Northern America", "Illinois", "Chicago", "Chicago IL", "en-us", -6, 0.05),
+    ("Canada", "Americas", "Northern America", "Ontario", "Toronto", "(not set)", "en-ca", -5, 0.05),
+    ("United Kingdom", "Europe", "Northern Europe", "England", "London", "(not set)", "en-gb", 0, 0.10),
+    ("Germany", "Europe", "Western Europe", "Berlin", "Berlin", "(not set)", "de-de", 1, 0.08),
+    ("France", "Europe", "Western Europe", "Ile-de-France", "Paris", "(not set)", "fr-fr", 1, 0.06),
+    ("Spain", "Europe", "Southern Europe", "Community of Madrid", "Madrid", "(not set)", "es-es", 1, 0.04),
+    ("India", "Asia", "Southern Asia", "Maharashtra", "Mumbai", "(not set)", "en-in", 5.5, 0.10),
+    ("Japan", "Asia", "Eastern Asia", "Tokyo", "Tokyo", "(not set)", "ja-jp", 9, 0.06),
+    ("Australia", "Oceania", "Australasia", "New South Wales", "Sydney", "(not set)", "en-au", 10, 0.05),
+    ("Brazil", "Americas", "South America", "State of Sao Paulo", "Sao Paulo", "(not set)", "pt-br", -3, 0.06),
+    ("Mexico", "Americas", "Central America", "Mexico City", "Mexico City", "(not set)", "es-mx", -6, 0.05),
+]
+CONTENT_PAGES = [
+    ("/", "Home"), ("/collections/new", "New Arrivals"), ("/collections/sale", "Sale"),
+    ("/collections/shoes", "Shoes"), ("/collections/apparel", "Apparel"), ("/collections/accessories", "Accessories"),
+    ("/search", "Search Results"), ("/cart", "Cart"), ("/checkout", "Checkout"), ("/account", "My Account"),
+    ("/blog", "Blog"), ("/blog/running-tips", "10 Running Tips"), ("/blog/size-guide", "Size Guide"),
+    ("/about", "About Us"), ("/contact", "Contact"), ("/faq", "FAQ"), ("/shipping", "Shipping & Returns"),
+]
+BRANDS = ["Acme", "Stride", "Northwind", "Fleet", "Summit", "Pulse", "Terra", "Nova"]
+CATEGORIES = [("Shoes", "Running"), ("Shoes", "Trail"), ("Shoes", "Casual"), ("Apparel", "Tops"),
+              ("Apparel", "Bottoms"), ("Apparel", "Outerwear"), ("Accessories", "Bags"), ("Accessories", "Socks")]
+ITEM_LISTS = [("home_featured", "Home Featured"), ("search_results", "Search Results"),
+              ("category_grid", "Category Grid"), ("related_products", "Related Products")]
+HOSTNAME = "shop.example.com"
+
+# Events logged per session, in the order they appear within the session.
+EVENT_TYPES = [
+    "first_visit", "session_start", "page_view", "view_search_results", "view_item", "add_to_cart",
+    "begin_checkout", "purchase", "refund", "login", "sign_up", "user_engagement",
+]
+_E = {name: index for index, name in enumerate(EVENT_TYPES)}
+
+# Session behaviour
+PAGE_VIEW_CONTINUE_P = 0.62      # geometric page-view depth, mean ~2.6
+ENGAGED_SINGLE_PAGE_P = 0.25     # single-page sessions counted engaged anyway
+SEARCH_P = 0.10
+VIEW_ITEM_P = 0.32
+ADD_TO_CART_P = 0.30             # of sessions viewing an item
+CHECKOUT_P = 0.55                # of sessions adding to cart
+PURCHASE_P = 0.55                # of sessions beginning checkout
+REFUND_P = 0.04                  # of purchasing sessions
+LOGIN_P = 0.20                   # of sessions by identified users
+SIGN_UP_P = 0.06                 # of new users' first sessions
+IDENTIFIED_USER_P = 0.30
+RETURNING_USER_SHARE = 0.55      # share of the user pool first seen before the range
+
+# Session start hour of day (UTC, before the geo offset), a two-peak weekday curve.
+HOUR_WEIGHTS = np.array([2, 1.4, 1, 0.8, 0.8, 1.2, 2.2, 3.6, 4.8, 5.4, 5.6, 5.8,
+                         6.0, 5.9, 5.6, 5.4, 5.3, 5.5, 6.0, 6.6, 6.8, 6.0, 4.6, 3.2])
+DAY_OF_WEEK_WEIGHTS = np.array([1.04, 1.06, 1.05, 1.02, 0.96, 0.90, 0.97])  # Mon..Sun
+
+
+def _weights(rows, index=-1):
+    w = np.array([row[index] for row in rows], dtype=float)
+    return w / w.sum()
+
+
+def _expected_events_per_session(new_user_share):
+    page_views = 1 / (1 - PAGE_VIEW_CONTINUE_P)
+    view_item = VIEW_ITEM_P
+    cart = view_item * ADD_TO_CART_P
+    checkout = cart * CHECKOUT_P
+    purchase = checkout * PURCHASE_P
+    engaged = (1 - (1 - PAGE_VIEW_CONTINUE_P) * (1 - ENGAGED_SINGLE_PAGE_P))
+    return (1 + new_user_share * (1 + SIGN_UP_P) + page_views + SEARCH_P + 2 * view_item + cart + checkout
+            + purchase * (1 + REFUND_P) + IDENTIFIED_USER_P * LOGIN_P + engaged)
+
+
+def _take(array: pa.Array, indices: np.ndarray, valid: np.ndarray = None) -> pa.Array:
+    """array[indices] with nulls where `valid` is False."""
+    idx = pa.array(indices, type=pa.int64(), mask=None if valid is None else ~valid)
+    return array.take(idx)
+
+
+def _field_type(name, *path):
+    field_type = GA4_EVENTS_SCHEMA.field(name).type
+    for part in path:
+        if pa.types.is_list(field_type):
+            field_type = field_type.value_type
+        field_type = field_type.field(part).type
+    return field_type
+
+
+# ------------------------------------------------------------------------------
+# Static dimension tables (small Arrow arrays indexed with take())
+# ------------------------------------------------------------------------------
+class _Dimensions:
+    def __init__(self, rng: np.random.Generator, n_items: int):
+        self.source_p = _weights(TRAFFIC_SOURCES)
+        self.device_p = _weights(DEVICES)
+        self.geo_p = _weights(GEOS)
+
+        self.traffic_source = pa.array(
+            [{"source": s, "medium": m, "name": c} for s, m, c, _ in TRAFFIC_SOURCES],
+            type=_field_type("traffic_source"),
+        )
+        self.collected_traffic_source = pa.array(
+            [{"manual_source": s, "manual_medium": m, "manual_campaign_name": c,
+              "manual_campaign_id": f"cmp_{i}" if c[0] != "(" else None,
+              "manual_term": "running shoes" if m == "cpc" else None,
+              "manual_content": "banner_a" if m in ("paid_social", "email") else None,
+              "manual_creative_format": "image" if m == "paid_social" else None,
+              "manual_marketing_tactic": "prospecting" if m in ("cpc", "paid_social") else None}
+             for i, (s, m, c, _) in enumerate(TRAFFIC_SOURCES)],
+            type=_field_type("collected_traffic_source"),
+        )
+        self.last_click = pa.array(
+            [{"manual_campaign": {"campaign_id": f"cmp_{i}" if c[0] != "(" else None, "campaign_name": c,
+                                  "source": s, "medium": m,
+                                  "term": "running shoes" if m == "cpc" else None,
+                                  "content": "banner_a" if m in ("paid_social", "email") else None,
+                                  "creative_format": "image" if m == "paid_social" else None,
+                                  "marketing_tactic": "prospecting" if m in ("cpc", "paid_social") else None},
+              "google_ads_campaign": ({"customer_id": "123-456-7890", "account_name": "Example Shop Ads",
+                                       "campaign_id": f"gads_{i}", "campaign_name": c,
+                                       "ad_group_id": f"ag_{i}", "ad_group_name": f"{c}_core"}
+                                      if m == "cpc" else None)}
+             for i, (s, m, c, _) in enumerate(TRAFFIC_SOURCES)],
+            type=_field_type("session_traffic_source_last_click"),
+        )
+        self.source_is_cpc = np.array([m == "cpc" for _, m, _, _ in TRAFFIC_SOURCES])
+
+        self.device = pa.array(
+            [{"category": cat, "operating_system": os_name, "operating_system_version": os_version,
+              "browser": browser, "browser_version": "124.0", "mobile_brand_name": brand,
+              "mobile_model_name": None if brand is None else f"{brand} phone",
+              "mobile_marketing_name": None if brand is None else f"{brand} phone",
+              "is_limited_ad_tracking": "No",
+              "web_info": {"browser": browser, "browser_version": "124.0", "hostname": HOSTNAME}}
+             for cat, os_name, os_version, browser, brand, _ in DEVICES],
+            type=_field_type("device"),
+        )
+        # Language and time zone come from geo; device struct is built per geo x device.
+        self.geo = pa.array(
+            [{"country": g[0], "continent": g[1], "sub_continent": g[2], "region": g[3], "city": g[4], "metro": g[5]}
+             for g in GEOS],
+            type=_field_type("geo"),
+        )
+        self.device_by_geo = pa.array(
+            [dict(device, language=g[6], time_zone_offset_seconds=int(g[7] * 3600))
+             for g in GEOS for device in self.device.to_pylist()],
+            type=_field_type("device"),
+        )
+
+        # Pages: content pages, then one page per product.
+        self.n_items = n_items
+        self.brand_idx = rng.integers(0, len(BRANDS), n_items)
+        self.category_idx = rng.integers(0, len(CATEGORIES), n_items)
+        self.price = np.round(np.exp(rng.normal(3.9, 0.6, n_items)), 2)  # median ~$50
+        item_ids = [f"SKU_{i:05d}" for i in range(n_items)]
+        item_names = [f"{BRANDS[b]} {CATEGORIES[c][1]} {i}" for i, (b, c) in
+                      enumerate(zip(self.brand_idx, self.category_idx))]
+        self.item_id = pa.array(item_ids)
+        self.item_name = pa.array(item_names)
+        self.item_brand = pa.array(BRANDS).take(pa.array(self.brand_idx))
+        self.item_category = pa.array([c[0] for c in CATEGORIES]).take(pa.array(self.category_idx))
+        self.item_category2 = pa.array([c[1] for c in CATEGORIES]).take(pa.array(self.category_idx))
+        self.item_popularity = _zipf_p(n_items, 1.05)
+
+        paths = [p for p, _ in CONTENT_PAGES] + [f"/products/{i.lower()}" for i in item_ids]
+        titles = [t for _, t in CONTENT_PAGES] + item_names
+        self.n_content_pages = len(CONTENT_PAGES)
+        self.page_location = pa.array([f"https://{HOSTNAME}{p}" for p in paths])
+        self.page_title = pa.array(titles)
+        self.content_page_p = _zipf_p(len(CONTENT_PAGES), 1.2)
+        self.referrers = pa.array(
+            [None if s == "(direct)" else f"https://{s if '.' in s else s + '.com'}/" for s, _, _, _ in TRAFFIC_SOURCES]
+        )
+        self.gclids = pa.array([f"Cj0KCQ{n:010d}" for n in rng.integers(0, 10**10, 5000)])
+
+
+def _zipf_p(n, s):
+    p = 1 / np.arange(1, n + 1) ** s
+    return p / p.sum()
+
+
+# ------------------------------------------------------------------------------
+# Users
+# ------------------------------------------------------------------------------
+class _UserPool:
+    """Users ordered by first-touch day, so "users seen by day d" is a prefix."""
+
+    def __init__(self, rng, n_users, start: date, days: int):
+        self.n = n_users
+        n_returning = int(n_users * RETURNING_USER_SHARE)
+        new_per_day = np.full(days, (n_users - n_returning) // days)
+        new_per_day[: (n_users - n_returning) % days] += 1
+        # cutoff[d] = number of users whose first touch is on or before day d
+        self.first_new = np.concatenate([[n_returning], n_returning + np.cumsum(new_per_day)[:-1]])
+        self.cutoff = n_returning + np.cumsum(new_per_day)
+
+        start_s = int(datetime(start.year, start.month, start.day, tzinfo=timezone.utc).timestamp())
+        first_touch_day = np.empty(n_users, dtype=np.int64)
+        first_touch_day[:n_returning] = -rng.integers(1, 365, n_returning)
+        first_touch_day[n_returning:] = np.repeat(np.arange(days), new_per_day)
+        self.first_touch_us = (start_s + first_touch_day * 86_400 + rng.integers(0, 86_400, n_users)) * 1_000_000
+
+        pseudo = pc.binary_join_element_wise(
+            pc.cast(pa.array(rng.integers(100_000_000, 2_000_000_000, n_users)), pa.string()),
+            pc.cast(pa.array(self.first_touch_us // 1_000_000), pa.string()),
+            ".",
+        )
+        self.pseudo_id = pseudo
+        self.identified = rng.random(n_users) < IDENTIFIED_USER_P
+        self.user_id = _take(pc.binary_join_element_wise("u_", pc.cast(pa.array(np.arange(n_users)), pa.string()), ""),
+                             np.arange(n_users), self.identified)
+        self.geo_idx = rng.choice(len(GEOS), n_users, p=_weights(GEOS))
+        self.device_idx = rng.choice(len(DEVICES), n_users, p=_weights(DEVICES))
+        self.first_source_idx = rng.choice(len(TRAFFIC_SOURCES), n_users, p=_weights(TRAFFIC_SOURCES))
+        self.tier_idx = rng.choice(3, n_users, p=[0.7, 0.22, 0.08])
+        self.ltv = np.round(rng.exponential(40, n_users) * (rng.random(n_users) < 0.2), 2)
+        self.active = rng.random(n_users) < 0.93
+
+    def sample_returning(self, rng, day, count):
+        """Heavy-tailed pick among users first seen before `day`: a few users are very active."""
+        pool = int(self.first_new[day])
+        return np.minimum((pool * rng.random(count) ** 2.2).astype(np.int64), pool - 1)
+
+
+# ------------------------------------------------------------------------------
+# Chunk generation
+# ------------------------------------------------------------------------------
+def _generate_chunk(rng, dims: _Dimensions, users: _UserPool, day: int, day_date: date,
+                    user_idx: np.ndarray, is_new: np.ndarray, txn_counter: list) -> pa.Table:
+    S = len(user_idx)
+    day_start_s = int(datetime(day_date.year, day_date.month, day_date.day, tzinfo=timezone.utc).timestamp())
+    hour = rng.choice(24, S, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    session_start_s = day_start_s + hour * 3600 + rng.integers(0, 3600, S)
+    session_id = session_start_s  # GA4's ga_session_id is the session start in seconds
+    session_number = np.where(is_new, 1, 2 + rng.geometric(0.25, S))
+    # New users arrive via their first-touch source; returning sessions re-sample.
+    source_idx = np.where(is_new, users.first_source_idx[user_idx],
+                          rng.choice(len(TRAFFIC_SOURCES), S, p=dims.source_p))
+
+    # Per-session event counts by type (columns follow EVENT_TYPES).
+    counts = np.zeros((S, len(EVENT_TYPES)), dtype=np.int64)
+    counts[:, _E["first_visit"]] = is_new
+    counts[:, _E["session_start"]] = 1
+    page_views = rng.geometric(1 - PAGE_VIEW_CONTINUE_P, S)
+    counts[:, _E["page_view"]] = page_views
+    counts[:, _E["view_search_results"]] = rng.random(S) < SEARCH_P
+    view_item = rng.random(S) < VIEW_ITEM_P
+    cart = view_item & (rng.random(S) < ADD_TO_CART_P)
+    checkout = cart & (rng.random(S) < CHECKOUT_P)
+    purchase = checkout & (rng.random(S) < PURCHASE_P)
+    counts[:, _E["view_item"]] = view_item * rng.integers(1, 4, S)
+    counts[:, _E["add_to_cart"]] = cart
+    counts[:, _E["begin_checkout"]] = checkout
+    counts[:, _E["purchase"]] = purchase
+    counts[:, _E["refund"]] = purchase & (rng.random(S) < REFUND_P)
+    counts[:, _E["login"]] = users.identified[user_idx] & (rng.random(S) < LOGIN_P)
+    counts[:, _E["sign_up"]] = is_new & (rng.random(S) < SIGN_UP_P)
+    engaged = (page_views > 1) | (rng.random(S) < ENGAGED_SINGLE_PAGE_P)
+    counts[:, _E["user_engagement"]] = engaged
+
+    flat = counts.ravel()
+    ev_session = np.repeat(np.repeat(np.arange(S), len(EVENT_TYPES)), flat)
+    ev_type = np.repeat(np.tile(np.arange(len(EVENT_TYPES)), S), flat)
+    E = len(ev_session)
+    session_first = np.concatenate([[0], np.cumsum(counts.sum(axis=1))[:-1]])
+    ev_pos = np.arange(E) - session_first[ev_session]
+
+    gaps_us = (rng.exponential(35, E) * 1_000_000).astype(np.int64)
+    gaps_us[ev_pos == 0] = 0
+    cum = np.cumsum(gaps_us)
+    ts = session_start_s[ev_session] * 1_000_000 + cum - cum[session_first[ev_session]]
+
+    ev_user = user_idx[ev_session]
+    is_pv = ev_type == _E["page_view"]
+    first_pv = is_pv & (ev_pos == counts[ev_session, :_E["page_view"]].sum(axis=1))
+    is_session_start = ev_type == _E["session_start"]
+
+    # Pages: product events sit on a product page, everything else on a content page.
+    is_item_event = np.isin(ev_type, [_E["view_item"], _E["add_to_cart"], _E["begin_checkout"], _E["purchase"]])
+    item_for_event = rng.choice(dims.n_items, E, p=dims.item_popularity)
+    page_idx = rng.choice(dims.n_content_pages, E, p=dims.content_page_p)
+    page_idx = np.where(is_item_event & (ev_type == _E["view_item"]), dims.n_content_pages + item_for_event, page_idx)
+    page_idx[ev_type == _E["begin_checkout"]] = 8
+    page_idx[ev_type == _E["purchase"]] = 8
+    page_idx[ev_type == _E["add_to_cart"]] = 7
+    page_idx[ev_type == _E["view_search_results"]] = 6
+
+    # ---- event_params: one entry per (event, key) present, grouped by event ----
+    str_vocab = pa.concat_arrays([
+        dims.page_location, dims.page_title, dims.referrers.cast(pa.string()),
+        pa.array(["0", "1"]),
+        pa.array([s for s, _, _, _ in TRAFFIC_SOURCES]), pa.array([m for _, m, _, _ in TRAFFIC_SOURCES]),
+        pa.array([c for _, _, c, _ in TRAFFIC_SOURCES]),
+    ])
+    n_pages = len(dims.page_location)
+    n_sources = len(TRAFFIC_SOURCES)
+    off_title = n_pages
+    off_ref = 2 * n_pages
+    off_engaged = off_ref + n_sources
+    off_src = off_engaged + 2
+    off_med = off_src + n_sources
+    off_cmp = off_med + n_sources
+    previous_page = np.concatenate([[0], page_idx[:-1]])
+    all_events = np.ones(E, dtype=bool)
+    has_source = is_session_start | first_pv
+    param_specs = [
+        # (key, event mask, int values or None, string vocab index or None)
+        ("ga_session_id", all_events, session_id[ev_session], None),
+        ("ga_session_number", all_events, session_number[ev_session], None),
+        ("page_location", all_events, None, page_idx),
+        ("page_title", all_events, None, off_title + page_idx),
+        ("session_engaged", all_events, None, off_engaged + engaged[ev_session].astype(np.int64)),
+        ("engagement_time_msec", is_pv | (ev_type == _E["user_engagement"]),
+         (rng.exponential(25_000, E) + 100).astype(np.int64), None),
+        ("entrances", first_pv, np.ones(E, dtype=np.int64), None),
+        ("page_referrer", is_pv, None,
+         np.where(first_pv, off_ref + source_idx[ev_session], previous_page)),
+        ("source", has_source, None, off_src + source_idx[ev_session]),
+        ("medium", has_source, None, off_med + source_idx[ev_session]),
+        ("campaign", has_source, None, off_cmp + source_idx[ev_session]),
+    ]
+    keys = pa.array([spec[0] for spec in param_specs])
+    p_event, p_key, p_int, p_str, p_int_set = [], [], [], [], []
+    for key_index, (_, mask, int_values, str_index) in enumerate(param_specs):
+        events_with_key = np.nonzero(mask)[0]
+        n = len(events_with_key)
+        p_event.append(events_with_key)
+        p_key.append(np.full(n, key_index))
+        p_int.append(int_values[events_with_key] if int_values is not None else np.zeros(n, dtype=np.int64))
+        p_str.append(str_index[events_with_key] if str_index is not None else np.full(n, -1))
+        p_int_set.append(np.full(n, int_values is not None))
+    p_event = np.concatenate(p_event)
+    order = np.argsort(p_event, kind="stable")
+    p_event = p_event[order]
+    p_key = np.concatenate(p_key)[order]
+    p_int = np.concatenate(p_int)[order]
+    p_str = np.concatenate(p_str)[order]
+    int_is_set = np.concatenate(p_int_set)[order]
+    param_value = pa.StructArray.from_arrays(
+        [
+            _take(str_vocab, np.maximum(p_str, 0), p_str >= 0),
+            pa.array(p_int, type=pa.int64(), mask=~int_is_set),
+            pa.nulls(len(p_key), pa.float64()),
+            pa.nulls(len(p_key), pa.float64()),
+        ],
+        fields=list(_field_type("event_params", "value")),
+    )
+    param_offsets = np.concatenate([[0], np.cumsum(np.bincount(p_event, minlength=E))]).astype(np.int32)
+    event_params = pa.ListArray.from_arrays(
+        pa.array(param_offsets),
+        pa.StructArray.from_arrays([keys.take(pa.array(p_key)), param_value],
+                                   fields=list(_field_type("event_params").value_type)),
+        type=_field_type("event_params"),
+    )
+
+    # ---- items and ecommerce ----
+    is_purchase = ev_type == _E["purchase"]
+    is_refund = ev_type == _E["refund"]
+    n_items_per_event = np.where(is_item_event, 1, 0)
+    n_items_per_event[is_purchase | (ev_type == _E["begin_checkout"])] = 1 + rng.binomial(3, 0.3, int((is_purchase | (ev_type == _E["begin_checkout"])).sum()))
+    item_offsets = np.concatenate([[0], np.cumsum(n_items_per_event)]).astype(np.int32)
+    I = int(item_offsets[-1])
+    item_event = np.repeat(np.arange(E), n_items_per_event)
+    first_item_of_event = item_offsets[:-1][item_event] == np.arange(I)
+    item_idx = np.where(first_item_of_event, item_for_event[item_event], rng.choice(dims.n_items, I, p=dims.item_popularity))
+    quantity = rng.choice([1, 1, 1, 2, 3], I)
+    price = dims.price[item_idx]
+    item_is_purchase = is_purchase[item_event]
+    revenue = np.round(price * quantity, 2)
+    list_idx = rng.integers(0, len(ITEM_LISTS), I)
+    has_list = rng.random(I) < 0.7
+    has_coupon = item_is_purchase & (rng.random(I) < 0.12)
+    has_promo = rng.random(I) < 0.08
+    item_fields = {
+        "item_id": dims.item_id.take(pa.array(item_idx)),
+        "item_name": dims.item_name.take(pa.array(item_idx)),
+        "item_brand": dims.item_brand.take(pa.array(item_idx)),
+        "item_category": dims.item_category.take(pa.array(item_idx)),
+        "item_category2": dims.item_category2.take(pa.array(item_idx)),
+        "price_in_usd": pa.array(price),
+        "price": pa.array(price),
+        "quantity": pa.array(quantity, type=pa.int64()),
+        "item_revenue_in_usd": pa.array(revenue, mask=~item_is_purchase),
+        "item_revenue": pa.array(revenue, mask=~item_is_purchase),
+        "coupon": _take(pa.array(["SAVE10", "WELCOME15", "FREESHIP"]), list_idx % 3, has_coupon),
+        "item_list_id": _take(pa.array([l[0] for l in ITEM_LISTS]), list_idx, has_list),
+        "item_list_name": _take(pa.array([l[1] for l in ITEM_LISTS]), list_idx, has_list),
+        "item_list_index": _take(pa.array([str(i) for i in range(1, 25)]), rng.integers(0, 24, I), has_list),
+        "promotion_id": _take(pa.array(["promo_summer", "promo_bundle"]), list_idx % 2, has_promo),
+        "promotion_name": _take(pa.array(["Summer Sale", "Bundle & Save"]), list_idx % 2, has_promo),
+    }
+    item_type = _field_type("items").value_type
+    items = pa.ListArray.from_arrays(
+        pa.array(item_offsets),
+        pa.StructArray.from_arrays(
+            [item_fields.get(f.name, pa.nulls(I, f.type)) for f in item_type],
+            fields=list(item_type),
+        ),
+        type=_field_type("items"),
+    )
+
+    purchase_revenue = np.zeros(E)
+    purchase_quantity = np.zeros(E, dtype=np.int64)
+    if I:
+        np.add.at(purchase_revenue, item_event, np.where(item_is_purchase, revenue, 0))
+        np.add.at(purchase_quantity, item_event, np.where(item_is_purchase, quantity, 0))
+    purchase_events = np.nonzero(is_purchase)[0]
+    txn_ids = np.full(E, -1, dtype=np.int64)
+    txn_ids[purchase_events] = txn_counter[0] + np.arange(len(purchase_events))
+    txn_counter[0] += len(purchase_events)
+    # A refund belongs to its session's purchase, which always precedes it in the session.
+    session_purchase = np.full(S, -1, dtype=np.int64)
+    session_purchase[ev_session[purchase_events]] = purchase_events
+    refund_events = np.nonzero(is_refund)[0]
+    refund_of = session_purchase[ev_session[refund_events]]
+    txn_ids[refund_events] = txn_ids[refund_of]
+    refund_value = np.zeros(E)
+    refund_value[refund_events] = purchase_revenue[refund_of]
+    has_ecommerce = is_purchase | is_refund
+    shipping = np.where(purchase_revenue >= 100, 0.0, 5.99)
+    tax = np.round(purchase_revenue * 0.08, 2)
+    txn_strings = pc.binary_join_element_wise(
+        f"T{day_date:%Y%m%d}_", pc.cast(pa.array(np.maximum(txn_ids, 0)), pa.string()), "")
+    ecommerce_fields = {
+        "transaction_id": _take(txn_strings, np.arange(E), has_ecommerce),
+        "purchase_revenue_in_usd": pa.array(purchase_revenue, mask=~is_purchase),
+        "purchase_revenue": pa.array(purchase_revenue, mask=~is_purchase),
+        "total_item_quantity": pa.array(purchase_quantity, mask=~is_purchase),
+        "unique_items": pa.array(n_items_per_event.astype(np.int64), mask=~is_purchase),
+        "shipping_value_in_usd": pa.array(shipping, mask=~is_purchase),
+        "shipping_value": pa.array(shipping, mask=~is_purchase),
+        "tax_value_in_usd": pa.array(tax, mask=~is_purchase),
+        "tax_value": pa.array(tax, mask=~is_purchase),
+        "refund_value_in_usd": pa.array(refund_value, mask=~is_refund),
+        "refund_value": pa.array(refund_value, mask=~is_refund),
+    }
+    ecommerce_type = _field_type("ecommerce")
+    ecommerce = pa.StructArray.from_arrays(
+        [ecommerce_fields.get(f.name, pa.nulls(E, f.type)) for f in ecommerce_type],
+        fields=list(ecommerce_type),
+        mask=pa.array(~has_ecommerce),
+    )
+
+    # ---- user-level columns ----
+    tier = pa.array(["standard", "silver", "gold"]).take(pa.array(users.tier_idx[ev_user]))
+    up_type = _field_type("user_properties").value_type
+    user_properties = pa.ListArray.from_arrays(
+        pa.array(np.arange(E + 1, dtype=np.int32)),
+        pa.StructArray.from_arrays(
+            [pa.array(["user_tier"]).take(pa.array(np.zeros(E, dtype=np.int64))),
+             pa.StructArray.from_arrays(
+                 [tier, pa.nulls(E, pa.int64()), pa.nulls(E, pa.float64()), pa.nulls(E, pa.float64()),
+                  pa.array(users.first_touch_us[ev_user])],
+                 fields=list(up_type.field("value").type))],
+            fields=list(up_type),
+        ),
+        type=_field_type("user_properties"),
+    )
+    ltv = users.ltv[ev_user]
+    user_ltv = pa.StructArray.from_arrays(
+        [pa.array(ltv), pa.array(["USD"]).take(pa.array(np.zeros(E, dtype=np.int64)))],
+        fields=list(_field_type("user_ltv")),
+    )
+    ev_source = source_idx[ev_session]
+    gclid_valid = dims.source_is_cpc[ev_source] & has_source
+    collected = dims.collected_traffic_source.take(pa.array(ev_source, mask=~has_source))
+    collected_fields = {f.name: collected.field(f.name) for f in collected.type}
+    collected_fields["gclid"] = _take(dims.gclids, (session_id[ev_session] % len(dims.gclids)), gclid_valid)
+    collected = pa.StructArray.from_arrays(
+        [collected_fields[f.name] for f in collected.type], fields=list(collected.type),
+        mask=pa.array(~has_source),
+    )
+    event_value = pa.array(purchase_revenue, mask=~is_purchase)
+
+    columns = {
+        "event_date": pa.array([day_date.strftime("%Y%m%d")]).take(pa.array(np.zeros(E, dtype=np.int64))),
+        "event_timestamp": pa.array(ts),
+        "event_name": pa.array(EVENT_TYPES).take(pa.array(ev_type)),
+        "event_params": event_params,
+        "event_value_in_usd": event_value,
+        "event_server_timestamp_offset": pa.array(rng.integers(50_000, 900_000, E)),
+        "user_id": users.user_id.take(pa.array(ev_user)),
+        "user_pseudo_id": users.pseudo_id.take(pa.array(ev_user)),
+        "user_properties": user_properties,
+        "user_first_touch_timestamp": pa.array(users.first_touch_us[ev_user]),
+        "user_ltv": user_ltv,
+        "device": dims.device_by_geo.take(pa.array(users.geo_idx[ev_user] * len(DEVICES) + users.device_idx[ev_user])),
+        "geo": dims.geo.take(pa.array(users.geo_idx[ev_user])),
+        "traffic_source": dims.traffic_source.take(pa.array(users.first_source_idx[ev_user])),
+        "stream_id": pa.array(["4000000001"]).take(pa.array(np.zeros(E, dtype=np.int64))),
+        "platform": pa.array(["WEB"]).take(pa.array(np.zeros(E, dtype=np.int64))),
+        "event_dimensions": pa.StructArray.from_arrays(
+            [pa.array([HOSTNAME]).take(pa.array(np.zeros(E, dtype=np.int64)))],
+            fields=list(_field_type("event_dimensions"))),
+        "ecommerce": ecommerce,
+        "items": items,
+        "collected_traffic_source": collected,
+        "is_active_user": pa.array(users.active[ev_user]),
+        "batch_event_index": pa.array(ev_pos.astype(np.int64)),
+        "session_traffic_source_last_click": dims.last_click.take(pa.array(ev_source)),
+    }
+    return pa.Table.from_arrays(
+        [columns.get(f.name, pa.nulls(E, f.type)) for f in GA4_EVENTS_SCHEMA],
+        schema=GA4_EVENTS_SCHEMA,
+    )
+
+
+class _World:
+    """State shared by every day: the user pool, dimension tables and session plan.
+
+    Built deterministically from the seed, so worker processes rebuild an
+    identical copy instead of receiving it pickled.
+    """
+
+    def __init__(self, events, days, users, start_date, seed, chunk_events):
+        rng = np.random.default_rng([seed, 0])
+        self.start_date = start_date
+        self.seed = seed
+        self.users = _UserPool(rng, users, start_date, days)
+        self.dims = _Dimensions(rng, n_items=500)
+
+        new_users = users * (1 - RETURNING_USER_SHARE)
+        sessions_total = events / _expected_events_per_session(0.0)
+        for _ in range(3):  # events/session depends on the new-user share, which depends on sessions
+            new_share = min(1.0, new_users / max(1.0, sessions_total))
+            sessions_total = events / _expected_events_per_session(new_share)
+        day_weights = np.array([DAY_OF_WEEK_WEIGHTS[(start_date + timedelta(days=d)).weekday()]
+                                for d in range(days)])
+        day_weights *= np.linspace(0.95, 1.05, days)  # gentle growth trend
+        self.sessions_per_day = np.maximum(1, np.round(sessions_total * day_weights / day_weights.sum()))
+        self.chunk_sessions = max(1, int(chunk_events / _expected_events_per_session(new_share)))
+
+    def write_day(self, output_dir, day, compression):
+        rng = np.random.default_rng([self.seed, 1, day])
+        pool = self.users
+        day_date = self.start_date + timedelta(days=day)
+        new_users = np.arange(pool.first_new[day], pool.cutoff[day])
+        n_returning = max(0, int(self.sessions_per_day[day]) - len(new_users))
+        returning = (pool.sample_returning(rng, day, n_returning) if pool.first_new[day]
+                     else rng.choice(new_users, n_returning))
+        user_idx = np.concatenate([new_users, returning])
+        is_new = np.concatenate([np.ones(len(new_users), bool), np.zeros(len(returning), bool)])
+        shuffle = rng.permutation(len(user_idx))
+        user_idx, is_new = user_idx[shuffle], is_new[shuffle]
+
+        path = os.path.join(output_dir, f"events_{day_date:%Y%m%d}.parquet")
+        rows = 0
+        txn_counter = [0]
+        with pq.ParquetWriter(path, GA4_EVENTS_SCHEMA, compression=compression) as writer:
+            for lo in range(0, len(user_idx), self.chunk_sessions):
+                hi = lo + self.chunk_sessions
+                table = _generate_chunk(rng, self.dims, pool, day, day_date, user_idx[lo:hi], is_new[lo:hi],
+                                        txn_counter)
+                writer.write_table(table)
+                rows += table.num_rows
+        return day_date, rows
+
+
+_worker_world = None
+
+
+def _init_worker(*world_args):
+    global _worker_world  # pylint: disable=global-statement
+    _worker_world = _World(*world_args)
+
+
+def _write_day_in_worker(output_dir, day, compression):
+    return _worker_world.write_day(output_dir, day, compression)
+
+
+def generate(output_dir: str, events: int, days: int, users: int = None, end_date: date = None,
+             seed: int = 42, chunk_events: int = 1_000_000, compression: str = "zstd", workers: int = 1,
+             log=print) -> dict:
+    """Generates ~`events` events over `days` daily shards into `output_dir`.
+
+    Output depends only on the arguments and seed, not on `workers`.
+    """
+    end_date = end_date or (datetime.now(timezone.utc).date() - timedelta(days=1))
+    start_date = end_date - timedelta(days=days - 1)
+    users = users or max(100, events // 25)
+    os.makedirs(output_dir, exist_ok=True)
+    world_args = (events, days, users, start_date, seed, chunk_events)
+
+    started = time.perf_counter()
+    written = 0
+
+    def report(day_date, rows):
+        nonlocal written
+        written += rows
+        elapsed = time.perf_counter() - started
+        log(f"{day_date:%Y-%m-%d}: {rows:,} events ({written:,} total, {written / elapsed:,.0f} events/s)")
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=world_args) as executor:
+            futures = [executor.submit(_write_day_in_worker, output_dir, day, compression) for day in range(days)]
+            for future in as_completed(futures):
+                report(*future.result())
+    else:
+        world = _World(*world_args)
+        for day in range(days):
+            report(*world.write_day(output_dir, day, compression))
+
+    elapsed = time.perf_counter() - started
+    return {"events": written, "days": days, "users": users, "seconds": round(elapsed, 2),
+            "events_per_second": round(written / elapsed) if elapsed else None,
+            "start_date": f"{start_date:%Y%m%d}", "end_date": f"{end_date:%Y%m%d}"}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", required=True, help="Directory for events_YYYYMMDD.parquet shards.")
+    parser.add_argument("--events", type=lambda v: int(v.replace("_", "")), default=1_000_000,
+                        help="Approximate total events (e.g. 5_000 or 300_000_000).")
+    parser.add_argument("--days", type=int, default=28)
+    parser.add_argument("--users", type=lambda v: int(v.replace("_", "")), help="User pool size (default events/25).")
+    parser.add_argument("--end-date", type=lambda v: datetime.strptime(v, "%Y%m%d").date(),
+                        help="Last shard date, YYYYMMDD (default yesterday).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-events", type=lambda v: int(v.replace("_", "")), default=1_000_000,
+                        help="Events per Parquet row group; bounds memory.")
+    parser.add_argument("--compression", default="zstd")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes writing days in parallel (Parquet encoding is the bottleneck).")
+    args = parser.parse_args(argv)
+
+    summary = generate(args.output, args.events, args.days, args.users, args.end_date, args.seed,
+                       args.chunk_events, args.compression, args.workers)
+    print(f"wrote {summary['events']:,} events, {summary['days']} shards "
+          f"({summary['start_date']}..{summary['end_date']}) in {summary['seconds']}s "
+          f"= {summary['events_per_second']:,} events/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
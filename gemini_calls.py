@@ -0,0 +1,209 @@
+# gemini_calls.py
+# pylint: disable=broad-exception-caught
+"""Deadlines, retries and hedging for Gemini calls.
+
+Every call gets a deadline of GEMINI_TIMEOUT_SECONDS. It is sent with the
+request as its HTTP timeout and also enforced here, so one stuck call cannot
+stall an answer. Timeouts, 429s and 5xx errors are retried up to
+GEMINI_MAX_RETRIES times with full-jitter exponential backoff.
+
+With GEMINI_HEDGE_MODEL set, a call that is still running once it passes the
+GEMINI_HEDGE_PERCENTILE latency of recent calls of the same kind ("route" or
+"summarize") on the same model is also sent to the hedge model. Whichever
+answers first wins. The other is left to finish in the background and its
+answer is dropped.
+
+Each attempt runs on a fresh chat from the caller's `new_chat(model)`, so an
+abandoned attempt never writes into the conversation that carries on. Each
+attempt is recorded in the trace as a `gemini.attempt` span with its model,
+outcome and duration.
+"""
+
+import os
+import queue
+import random
+import threading
+import time
+from collections import defaultdict, deque
+
+import httpx
+from google.genai import errors as genai_errors
+from google.genai.types import HttpOptions
+
+from percentiles import percentile
+from tracing import Tracer
+
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "60"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+GEMINI_BACKOFF_MS = float(os.getenv("GEMINI_BACKOFF_MS", "500"))
+GEMINI_BACKOFF_MAX_MS = float(os.getenv("GEMINI_BACKOFF_MAX_MS", "8000"))
+# Empty disables hedging.
+GEMINI_HEDGE_MODEL = os.getenv("GEMINI_HEDGE_MODEL", "")
+GEMINI_HEDGE_PERCENTILE = float(os.getenv("GEMINI_HEDGE_PERCENTILE", "95"))
+# Until this many latencies are known for a kind of call, hedge after GEMINI_HEDGE_DEFAULT_MS.
+GEMINI_HEDGE_MIN_SAMPLES = int(os.getenv("GEMINI_HEDGE_MIN_SAMPLES", "20"))
+GEMINI_HEDGE_DEFAULT_MS = float(os.getenv("GEMINI_HEDGE_DEFAULT_MS", "10000"))
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class GeminiTimeout(TimeoutError):
+    """No attempt answered within the deadline."""
+
+
+def http_options() -> HttpOptions:
+    """Per-request options for GenerateContentConfig: the deadline as the HTTP timeout."""
+    return HttpOptions(timeout=int(GEMINI_TIMEOUT_SECONDS * 1000))
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (TimeoutError, ConnectionError, httpx.TransportError)):
+        return True
+    return isinstance(error, genai_errors.APIError) and error.code in RETRYABLE_STATUS_CODES
+
+
+class LatencyWindow:
+    """The most recent successful call latencies per (kind, model)."""
+
+    def __init__(self, size: int = 200):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=size))
+
+    def add(self, kind: str, model: str, ms: float):
+        with self._lock:
+            self._samples[(kind, model)].append(ms)
+
+    def percentile(self, kind: str, model: str, pct: float):
+        """None until GEMINI_HEDGE_MIN_SAMPLES latencies are known."""
+        with self._lock:
+            values = list(self._samples.get((kind, model), ()))
+        if len(values) < GEMINI_HEDGE_MIN_SAMPLES:
+            return None
+        return percentile(values, pct)
+
+    def stats(self) -> dict:
+        with self._lock:
+            samples = {key: list(values) for key, values in self._samples.items()}
+        return {
+            f"{kind}/{model}": {"n": len(values), "p50_ms": round(percentile(values, 50), 1),
+                                "p95_ms": round(percentile(values, 95), 1)}
+            for (kind, model), values in samples.items() if values
+        }
+
+
+latencies = LatencyWindow()
+
+
+def hedge_delay_ms(kind: str, model: str) -> float:
+    observed = latencies.percentile(kind, model, GEMINI_HEDGE_PERCENTILE)
+    return GEMINI_HEDGE_DEFAULT_MS if observed is None else observed
+
+
+class _Attempt:
+    __slots__ = ("kind", "model", "number", "hedge", "start_ns", "end_ns", "chat", "response", "error", "dropped")
+
+    def __init__(self, kind, model, number, hedge):
+        self.kind = kind
+        self.model = model
+        self.number = number
+        self.hedge = hedge
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.chat = None
+        self.response = None
+        self.error = None
+        self.dropped = None  # ("timeout" | "abandoned", when) once the caller stops waiting for it
+
+    def start(self, new_chat, message, finished: queue.Queue):
+        def run():
+            try:
+                self.chat = new_chat(self.model)
+                self.response = self.chat.send_message(message)
+            except Exception as e:
+                self.error = e
+            self.end_ns = time.time_ns()
+            if self.error is None:
+                # Late finishers count too, or hedging would hide the slow tail it reacts to.
+                latencies.add(self.kind, self.model, (self.end_ns - self.start_ns) / 1_000_000)
+            finished.put(self)
+
+        threading.Thread(target=run, name=f"gemini-{self.kind}-{self.number}", daemon=True).start()
+        return self
+
+
+def _race(new_chat, message, kind, model, hedge_model, timeout_s, attempts: list):
+    """One round: the primary attempt, plus a hedge if it runs long. Returns the winning attempt or None."""
+    finished = queue.Queue()
+    running = [_Attempt(kind, model, len(attempts) + 1, False).start(new_chat, message, finished)]
+    attempts.extend(running)
+    now = time.monotonic()
+    deadline = now + timeout_s
+    hedge_at = now + hedge_delay_ms(kind, model) / 1000 if hedge_model else None
+    while running:
+        wake_at = deadline if hedge_at is None else min(deadline, hedge_at)
+        try:
+            attempt = finished.get(timeout=max(0.0, wake_at - time.monotonic()))
+        except queue.Empty:
+            if hedge_at is None or time.monotonic() >= deadline:
+                _drop(running, "timeout")
+                return None
+            hedge = _Attempt(kind, hedge_model, len(attempts) + 1, True).start(new_chat, message, finished)
+            running.append(hedge)
+            attempts.append(hedge)
+            hedge_at = None
+            continue
+        running.remove(attempt)
+        if attempt.error is None:
+            _drop(running, "abandoned")
+            return attempt
+    return None
+
+
+def _drop(attempts, outcome):
+    now_ns = time.time_ns()
+    for attempt in attempts:
+        attempt.dropped = (outcome, now_ns)
+
+
+def _record(tracer: Tracer, parent_id, attempt, winner):
+    end_ns, outcome = attempt.end_ns, {"outcome": "won" if attempt is winner else "lost"}
+    if attempt.dropped is not None:
+        outcome["outcome"], end_ns = attempt.dropped
+    elif attempt.error is not None:
+        outcome = {"outcome": "error", "error": f"{type(attempt.error).__name__}: {attempt.error}"}
+    tracer.record_span("gemini.attempt", attempt.start_ns, end_ns or time.time_ns(), parent_id=parent_id,
+                       model=attempt.model, attempt=attempt.number, hedge=attempt.hedge, **outcome)
+
+
+def send_message(new_chat, message, model: str, tracer: Tracer, kind: str, hedge_model: str = GEMINI_HEDGE_MODEL,
+                 timeout_s: float = GEMINI_TIMEOUT_SECONDS, max_retries: int = GEMINI_MAX_RETRIES, **attributes):
+    """Sends `message` on a fresh chat from `new_chat(model)`; returns (chat, response, model) of the winner.
+
+    Runs in a `gemini.<kind>` span that records the winning model, the
+    number of attempts and whether a hedge was sent.
+    """
+    hedge_model = hedge_model if hedge_model != model else ""
+    with tracer.span(f"gemini.{kind}", model=model, **attributes) as span:
+        attempts = []
+        winner = None
+        try:
+            retry = 0
+            while True:
+                round_start = len(attempts)
+                winner = _race(new_chat, message, kind, model, hedge_model, timeout_s, attempts)
+                if winner is not None:
+                    return winner.chat, winner.response, winner.model
+                errors = [a.error for a in attempts[round_start:] if a.error is not None]
+                error = errors[-1] if errors else GeminiTimeout(f"Gemini did not answer within {timeout_s:g}s")
+                if not is_retryable(error) or retry >= max_retries:
+                    raise error
+                retry += 1
+                backoff_ms = random.uniform(0, min(GEMINI_BACKOFF_MAX_MS, GEMINI_BACKOFF_MS * 2 ** (retry - 1)))
+                with tracer.span("gemini.backoff", ms=round(backoff_ms, 1)):
+                    time.sleep(backoff_ms / 1000)
+        finally:
+            for attempt in attempts:
+                _record(tracer, span.span_id, attempt, winner)
+            span.attributes.update(attempts=len(attempts), hedged=any(a.hedge for a in attempts))
+            if winner is not None:
+                span.attributes["winner"] = winner.model
@@ -0,0 +1,88 @@
+# identity.py
+# pylint: disable=broad-exception-caught
+"""Who is calling: the IAP-authenticated user and the client address.
+
+IAP adds X-Goog-Authenticated-User-Email to the requests it forwards, but
+any caller who reaches the service some other way can set that header too.
+The email is therefore only used when it can be trusted:
+  - with IAP_AUDIENCE set, the signed X-Goog-IAP-JWT-Assertion is verified
+    against IAP's public keys and the email is read from it;
+  - with TRUST_IAP_HEADER=true, the plain header is taken as is. Use this
+    only when the service cannot be reached except through IAP.
+Otherwise there is no IAP identity.
+
+The client address is read from X-Forwarded-For, counting FORWARDED_HOPS
+entries from the right. Those entries are the ones Google's front ends
+append, which a client cannot forge. It is 1 for Cloud Run and 2 behind
+an external HTTPS load balancer. X-Real-Ip is ignored.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+from google.auth import jwt
+from google.auth.transport.requests import Request
+
+IAP_AUDIENCE = os.getenv("IAP_AUDIENCE", "")
+TRUST_IAP_HEADER = os.getenv("TRUST_IAP_HEADER", "").lower() in ("1", "true", "yes")
+FORWARDED_HOPS = int(os.getenv("FORWARDED_HOPS", "1"))
+
+IAP_ISSUER = "https://cloud.google.com/iap"
+IAP_CERTS_URL = "https://www.gstatic.com/iap/verify/public_key"
+IAP_CERTS_TTL_SECONDS = 3600
+
+logger = logging.getLogger(__name__)
+
+_certs_lock = threading.Lock()
+_certs = {"keys": None, "fetched_at": 0.0}
+
+
+def _iap_certs() -> dict:
+    """IAP's ES256 public keys, refetched hourly."""
+    with _certs_lock:
+        if _certs["keys"] is None or time.monotonic() - _certs["fetched_at"] > IAP_CERTS_TTL_SECONDS:
+            response = Request()(IAP_CERTS_URL, method="GET")
+            if response.status != 200:
+                raise ValueError(f"Could not fetch IAP keys: HTTP {response.status}")
+            _certs["keys"] = json.loads(response.data)
+            _certs["fetched_at"] = time.monotonic()
+        return _certs["keys"]
+
+
+def verify_iap_assertion(assertion: str, audience: str = IAP_AUDIENCE, certs: dict = None) -> str:
+    """The email in a signed IAP assertion. Raises ValueError if it does not verify."""
+    claims = jwt.decode(assertion, certs=certs or _iap_certs(), audience=audience)
+    if claims.get("iss") != IAP_ISSUER:
+        raise ValueError(f"unexpected issuer {claims.get('iss')!r}")
+    if not claims.get("email"):
+        raise ValueError("assertion has no email")
+    return claims["email"]
+
+
+def iap_email(headers) -> str:
+    """The IAP-authenticated email from request headers, or None if it cannot be trusted."""
+    if IAP_AUDIENCE:
+        assertion = headers.get("X-Goog-IAP-JWT-Assertion")
+        if not assertion:
+            return None
+        try:
+            return verify_iap_assertion(assertion)
+        except Exception as e:
+            logger.warning("Rejected IAP assertion: %s", e)
+            return None
+    if TRUST_IAP_HEADER:
+        email = headers.get("X-Goog-Authenticated-User-Email")
+        if email:
+            return email.split(":", 1)[-1]  # "accounts.google.com:user@example.com"
+    return None
+
+
+def client_address(forwarded_for: str, peer: str, hops: int = FORWARDED_HOPS) -> str:
+    """The address `hops` entries from the right of X-Forwarded-For, else the peer address."""
+    entries = [entry.strip() for entry in (forwarded_for or "").split(",") if entry.strip()]
+    if hops <= 0 or len(entries) < hops:
+        return peer
+    return entries[-hops]
@@ -0,0 +1,442 @@
+# local_engine.py
+# pylint: disable=broad-exception-caught
+"""Embedded DuckDB stand-in for the GA4 BigQuery export.
+
+Loads GA4-export-shaped data (nested `event_params`, `user_properties` and
+`items` arrays, one shard per day) and runs templates from
+QUERY_TEMPLATE_LIBRARY after translating their BigQuery SQL to DuckDB:
+
+- `project.dataset.events_*` becomes the `events` view, whose
+  `_table_suffix` column is derived from each shard's file name;
+- `UNNEST(array) [AS alias]` in a FROM/JOIN becomes a lateral subquery that
+  expands the struct fields, so `key`, `value.int_value` and
+  `items.item_id` resolve as they do in BigQuery;
+- the remaining dialect differences (COUNTIF, SAFE_DIVIDE, PARSE_DATE,
+  TIMESTAMP_MICROS, ...) are handled by sqlglot's BigQuery -> DuckDB
+  transpiler, plus the overrides in `_FUNCTION_OVERRIDES`.
+
+Requires the optional `duckdb` and `sqlglot` packages (requirements-dev.txt).
+
+    python local_engine.py --sample                     # every template, built-in data
+    python local_engine.py --data fixtures/ga4 --repeat 5
+    python local_engine.py --data fixtures/ga4 --variants variants/
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import pyarrow as pa
+
+try:
+    import duckdb
+    import sqlglot
+    from sqlglot import exp
+except ImportError:  # pragma: no cover - optional dev dependency
+    duckdb = None
+    sqlglot = None
+    exp = None
+
+from engine import TOP_N_DEFAULT, resolve_top_n
+from query_template_library import QUERY_TEMPLATE_LIBRARY, TEMPLATE_INDEX, bind_parameters
+from sampling import apply_user_sampling
+
+# ------------------------------------------------------------------------------
+# GA4 export schema (the subset of columns the templates read)
+# ------------------------------------------------------------------------------
+_PARAM_VALUE = pa.struct([
+    ("string_value", pa.string()),
+    ("int_value", pa.int64()),
+    ("float_value", pa.float64()),
+    ("double_value", pa.float64()),
+])
+_USER_PROPERTY_VALUE = pa.struct([
+    ("string_value", pa.string()),
+    ("int_value", pa.int64()),
+    ("float_value", pa.float64()),
+    ("double_value", pa.float64()),
+    ("set_timestamp_micros", pa.int64()),
+])
+_MANUAL_CAMPAIGN = pa.struct([
+    ("campaign_id", pa.string()), ("campaign_name", pa.string()), ("source", pa.string()),
+    ("medium", pa.string()), ("term", pa.string()), ("content", pa.string()),
+    ("source_platform", pa.string()), ("creative_format", pa.string()), ("marketing_tactic", pa.string()),
+])
+_GOOGLE_ADS_CAMPAIGN = pa.struct([
+    ("customer_id", pa.string()), ("account_name", pa.string()), ("campaign_id", pa.string()),
+    ("campaign_name", pa.string()), ("ad_group_id", pa.string()), ("ad_group_name", pa.string()),
+])
+
+GA4_EVENTS_SCHEMA = pa.schema([
+    ("event_date", pa.string()),
+    ("event_timestamp", pa.int64()),
+    ("event_name", pa.string()),
+    ("event_params", pa.list_(pa.struct([("key", pa.string()), ("value", _PARAM_VALUE)]))),
+    ("event_previous_timestamp", pa.int64()),
+    ("event_value_in_usd", pa.float64()),
+    ("event_bundle_sequence_id", pa.int64()),
+    ("event_server_timestamp_offset", pa.int64()),
+    ("user_id", pa.string()),
+    ("user_pseudo_id", pa.string()),
+    ("privacy_info", pa.struct([
+        ("analytics_storage", pa.string()), ("ads_storage", pa.string()), ("uses_transient_token", pa.string()),
+    ])),
+    ("user_properties", pa.list_(pa.struct([("key", pa.string()), ("value", _USER_PROPERTY_VALUE)]))),
+    ("user_first_touch_timestamp", pa.int64()),
+    ("user_ltv", pa.struct([("revenue", pa.float64()), ("currency", pa.string())])),
+    ("device", pa.struct([
+        ("category", pa.string()), ("mobile_brand_name", pa.string()), ("mobile_model_name", pa.string()),
+        ("mobile_marketing_name", pa.string()), ("mobile_os_hardware_model", pa.string()),
+        ("operating_system", pa.string()), ("operating_system_version", pa.string()),
+        ("vendor_id", pa.string()), ("advertising_id", pa.string()), ("language", pa.string()),
+        ("is_limited_ad_tracking", pa.string()), ("time_zone_offset_seconds", pa.int64()),
+        ("browser", pa.string()), ("browser_version", pa.string()),
+        ("web_info", pa.struct([("browser", pa.string()), ("browser_version", pa.string()), ("hostname", pa.string())])),
+    ])),
+    ("geo", pa.struct([
+        ("city", pa.string()), ("country", pa.string()), ("continent", pa.string()),
+        ("region", pa.string()), ("sub_continent", pa.string()), ("metro", pa.string()),
+    ])),
+    ("app_info", pa.struct([
+        ("id", pa.string()), ("version", pa.string()), ("install_store", pa.string()),
+        ("firebase_app_id", pa.string()), ("install_source", pa.string()),
+    ])),
+    ("traffic_source", pa.struct([("name", pa.string()), ("medium", pa.string()), ("source", pa.string())])),
+    ("stream_id", pa.string()),
+    ("platform", pa.string()),
+    ("event_dimensions", pa.struct([("hostname", pa.string())])),
+    ("ecommerce", pa.struct([
+        ("total_item_quantity", pa.int64()), ("purchase_revenue_in_usd", pa.float64()),
+        ("purchase_revenue", pa.float64()), ("refund_value_in_usd", pa.float64()),
+        ("refund_value", pa.float64()), ("shipping_value_in_usd", pa.float64()),
+        ("shipping_value", pa.float64()), ("tax_value_in_usd", pa.float64()),
+        ("tax_value", pa.float64()), ("unique_items", pa.int64()), ("transaction_id", pa.string()),
+    ])),
+    ("items", pa.list_(pa.struct([
+        ("item_id", pa.string()), ("item_name", pa.string()), ("item_brand", pa.string()),
+        ("item_variant", pa.string()), ("item_category", pa.string()), ("item_category2", pa.string()),
+        ("item_category3", pa.string()), ("item_category4", pa.string()), ("item_category5", pa.string()),
+        ("price_in_usd", pa.float64()), ("price", pa.float64()), ("quantity", pa.int64()),
+        ("item_revenue_in_usd", pa.float64()), ("item_revenue", pa.float64()),
+        ("item_refund_in_usd", pa.float64()), ("item_refund", pa.float64()),
+        ("coupon", pa.string()), ("affiliation", pa.string()), ("location_id", pa.string()),
+        ("item_list_id", pa.string()), ("item_list_name", pa.string()), ("item_list_index", pa.string()),
+        ("promotion_id", pa.string()), ("promotion_name", pa.string()),
+        ("creative_name", pa.string()), ("creative_slot", pa.string()),
+    ]))),
+    ("collected_traffic_source", pa.struct([
+        ("manual_campaign_id", pa.string()), ("manual_campaign_name", pa.string()),
+        ("manual_source", pa.string()), ("manual_medium", pa.string()), ("manual_term", pa.string()),
+        ("manual_content", pa.string()), ("manual_source_platform", pa.string()),
+        ("manual_creative_format", pa.string()), ("manual_marketing_tactic", pa.string()),
+        ("gclid", pa.string()), ("dclid", pa.string()), ("srsltid", pa.string()),
+    ])),
+    ("is_active_user", pa.bool_()),
+    ("batch_event_index", pa.int64()),
+    ("batch_page_id", pa.int64()),
+    ("batch_ordering_id", pa.int64()),
+    ("session_traffic_source_last_click", pa.struct([
+        ("manual_campaign", _MANUAL_CAMPAIGN),
+        ("google_ads_campaign", _GOOGLE_ADS_CAMPAIGN),
+    ])),
+])
+
+# ------------------------------------------------------------------------------
+# BigQuery -> DuckDB translation
+# ------------------------------------------------------------------------------
+_EVENTS_TABLE_RE = re.compile(r"`[^`]+\.events_\*`")
+
+# BigQuery functions sqlglot does not map (or maps differently) for DuckDB.
+_FUNCTION_OVERRIDES = {
+    "FARM_FINGERPRINT": "HASH",
+}
+
+
+def _expand_struct_unnest(node):
+    """`UNNEST(arr) AS a` (FROM/JOIN position) -> `(SELECT UNNEST(_e) FROM (SELECT UNNEST(arr) AS _e)) AS a`.
+
+    BigQuery exposes the fields of an unnested struct directly (or via the
+    alias); DuckDB's table-function UNNEST yields one struct column instead.
+    DuckDB binds the correlated subquery laterally on its own.
+    """
+    if not isinstance(node, exp.Unnest) or not isinstance(node.parent, (exp.From, exp.Join)):
+        return node
+    array = node.expressions[0]
+    alias = node.args.get("alias")
+    alias_name = None
+    if alias is not None:
+        alias_name = alias.name or (alias.columns[0].name if alias.columns else None)
+    select = sqlglot.parse_one(
+        f"SELECT UNNEST(_e) FROM (SELECT UNNEST({array.sql(dialect='duckdb')}) AS _e)",
+        read="duckdb",
+    )
+    return select.subquery(alias_name or "_unnest")
+
+
+def _override_functions(node):
+    if isinstance(node, exp.Anonymous):
+        name = node.name.upper()
+    elif isinstance(node, exp.Func):
+        name = node.sql_name()
+    else:
+        return node
+    if name not in _FUNCTION_OVERRIDES:
+        return node
+    args = node.expressions or [node.this]
+    return exp.Anonymous(this=_FUNCTION_OVERRIDES[name], expressions=args)
+
+
+def translate_sql(bigquery_sql: str) -> str:
+    """Translates a rendered template from BigQuery SQL to DuckDB SQL."""
+    sql = _EVENTS_TABLE_RE.sub("events", bigquery_sql)
+    tree = sqlglot.parse_one(sql, read="bigquery")
+    tree = tree.transform(_expand_struct_unnest).transform(_override_functions)
+    return tree.sql(dialect="duckdb")
+
+
+# ------------------------------------------------------------------------------
+# Built-in sample data
+# ------------------------------------------------------------------------------
+def _param(key, string_value=None, int_value=None):
+    return {"key": key, "value": {"string_value": string_value, "int_value": int_value,
+                                  "float_value": None, "double_value": None}}
+
+
+def build_sample_events(days: int = 7, users: int = 50, seed: int = 1, end_date=None) -> pa.Table:
+    """A small deterministic GA4-shaped dataset for smoke-running templates.
+
+    Use ga4_datagen.py for realistic, production-scale data.
+    """
+    rng = random.Random(seed)
+    end_date = end_date or (datetime.now(timezone.utc).date() - timedelta(days=1))
+    sources = [("google", "organic", "(organic)"), ("google", "cpc", "spring_sale"),
+               ("(direct)", "(none)", "(direct)"), ("newsletter", "email", "weekly")]
+    pages = ["/", "/products", "/products/shoe", "/cart", "/checkout", "/blog/post"]
+    rows = []
+    for day in range(days):
+        date = end_date - timedelta(days=days - 1 - day)
+        day_start = int(datetime(date.year, date.month, date.day, tzinfo=timezone.utc).timestamp() * 1_000_000)
+        for user in range(users):
+            if rng.random() < 0.4:
+                continue
+            source, medium, campaign = rng.choice(sources)
+            session_id = day_start // 1_000_000 + user
+            ts = day_start + rng.randint(0, 20 * 3600) * 1_000_000
+            base = {
+                "event_date": date.strftime("%Y%m%d"),
+                "user_pseudo_id": f"{user}.{seed}",
+                "user_id": f"user_{user}" if user % 3 == 0 else None,
+                "user_first_touch_timestamp": day_start - user * 86_400_000_000 // 10,
+                "user_properties": [{"key": "user_tier", "value": {
+                    "string_value": rng.choice(["free", "pro"]), "int_value": None, "float_value": None,
+                    "double_value": None, "set_timestamp_micros": day_start}}],
+                "user_ltv": {"revenue": round(rng.random() * 100, 2), "currency": "USD"},
+                "device": {"category": rng.choice(["desktop", "mobile", "tablet"]),
+                           "operating_system": rng.choice(["Windows", "iOS", "Android", "Macintosh"]),
+                           "browser": rng.choice(["Chrome", "Safari", "Firefox"]), "language": "en-us",
+                           "web_info": {"browser": "Chrome", "browser_version": "120", "hostname": "shop.example.com"}},
+                "geo": {"country": rng.choice(["United States", "Germany", "India"]), "city": rng.choice(["Berlin", "Austin", "Pune"]),
+                        "continent": "Americas", "region": "Texas", "sub_continent": "Northern America", "metro": "(not set)"},
+                "traffic_source": {"name": campaign, "medium": medium, "source": source},
+                "collected_traffic_source": {"manual_source": source, "manual_medium": medium, "manual_campaign_name": campaign},
+                "session_traffic_source_last_click": {
+                    "manual_campaign": {"campaign_name": campaign, "source": source, "medium": medium},
+                    "google_ads_campaign": {"campaign_name": campaign if medium == "cpc" else None},
+                },
+                "stream_id": "1234", "platform": "WEB", "is_active_user": True,
+            }
+            events = ["session_start", "first_visit" if day == 0 else "user_engagement"]
+            events += ["page_view"] * rng.randint(1, 4)
+            if rng.random() < 0.3:
+                events += ["view_item", "add_to_cart", "begin_checkout"]
+                if rng.random() < 0.5:
+                    events.append("purchase")
+            for index, event_name in enumerate(events):
+                ts += rng.randint(5, 120) * 1_000_000
+                params = [
+                    _param("ga_session_id", int_value=session_id),
+                    _param("ga_session_number", int_value=day + 1),
+                    _param("page_location", string_value=f"https://shop.example.com{rng.choice(pages)}"),
+                    _param("page_title", string_value="Shop"),
+                    _param("engagement_time_msec", int_value=rng.randint(100, 60_000)),
+                    _param("session_engaged", string_value="1" if index > 1 else "0"),
+                    _param("source", string_value=source), _param("medium", string_value=medium),
+                    _param("campaign", string_value=campaign),
+                ]
+                if index == 2:
+                    params.append(_param("entrances", int_value=1))
+                row = dict(base, event_name=event_name, event_timestamp=ts, event_params=params, items=[])
+                if event_name in ("view_item", "add_to_cart", "purchase"):
+                    price = rng.choice([19.99, 49.0, 120.0])
+                    quantity = rng.randint(1, 3)
+                    row["items"] = [{"item_id": f"sku_{rng.randint(1, 9)}", "item_name": "Runner",
+                                     "item_brand": rng.choice(["Acme", "Zoom"]), "item_category": rng.choice(["Shoes", "Apparel"]),
+                                     "price_in_usd": price, "price": price, "quantity": quantity,
+                                     "item_revenue_in_usd": price * quantity, "item_revenue": price * quantity,
+                                     "item_list_name": "Home", "item_list_id": "home", "item_list_index": "1"}]
+                if event_name == "purchase":
+                    revenue = row["items"][0]["item_revenue_in_usd"]
+                    row["ecommerce"] = {"transaction_id": f"T{date:%Y%m%d}{user}", "purchase_revenue_in_usd": revenue,
+                                        "purchase_revenue": revenue, "total_item_quantity": row["items"][0]["quantity"],
+                                        "unique_items": 1, "shipping_value_in_usd": 5.0, "tax_value_in_usd": round(revenue * 0.1, 2)}
+                    row["event_value_in_usd"] = revenue
+                rows.append(row)
+    return pa.Table.from_pylist(rows, schema=GA4_EVENTS_SCHEMA)
+
+
+# ------------------------------------------------------------------------------
+# Engine
+# ------------------------------------------------------------------------------
+class LocalGA4Engine:
+    """DuckDB database exposing GA4 shards as an `events` view with `_table_suffix`."""
+
+    def __init__(self, database: str = ":memory:", threads: int = None):
+        if duckdb is None or sqlglot is None:
+            raise RuntimeError("local_engine requires the optional 'duckdb' and 'sqlglot' packages.")
+        self.con = duckdb.connect(database)
+        if threads:
+            self.con.execute(f"SET threads = {int(threads)}")
+
+    def load_parquet(self, directory: str):
+        """Uses every `events_YYYYMMDD*.parquet` file under `directory` as a daily shard."""
+        pattern = os.path.join(directory, "events_*.parquet").replace("'", "''")
+        self.con.execute(f"""
+            CREATE OR REPLACE VIEW events AS
+            SELECT * EXCLUDE (filename),
+                   regexp_extract(filename, 'events_([0-9]{{8}})', 1) AS _table_suffix
+            FROM read_parquet('{pattern}', filename = true, union_by_name = true)
+        """)
+
+    def load_arrow(self, table: pa.Table):
+        self.con.register("_events_arrow", table)
+        self.con.execute("CREATE OR REPLACE TABLE events AS SELECT *, event_date AS _table_suffix FROM _events_arrow")
+        self.con.unregister("_events_arrow")
+
+    def date_range(self):
+        return self.con.execute("SELECT MIN(_table_suffix), MAX(_table_suffix) FROM events").fetchone()
+
+    def run_sql(self, bigquery_sql: str, query_params: dict = None) -> list:
+        """Runs BigQuery SQL; `query_params` bind its @name parameters (as DuckDB $name)."""
+        cursor = self.con.execute(translate_sql(bigquery_sql), query_params or None)
+        columns = [d[0] for d in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def run_template(self, template_name: str, params: dict, sql_template: str = None,
+                     sample_rate: float = 1.0) -> list:
+        sql_template = sql_template or QUERY_TEMPLATE_LIBRARY[template_name]["template"]
+        if sample_rate < 1.0:
+            sql_template = apply_user_sampling(sql_template, sample_rate)
+        return self.run_sql(*bind_parameters(sql_template, params))
+
+    def time_template(self, template_name: str, params: dict, repeat: int = 3, **kwargs) -> dict:
+        timings = []
+        rows = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = self.run_template(template_name, params, **kwargs)
+            timings.append((time.perf_counter() - started) * 1000)
+        return {"rows": len(rows), "median_ms": round(statistics.median(timings), 2),
+                "min_ms": round(min(timings), 2)}
+
+
+# Values used for template-specific placeholders when running the whole library.
+DEFAULT_TEMPLATE_PARAMS = {
+    "project_id": "local",
+    "dataset_id": "ga4",
+    "event_name": "purchase",
+    "country_name": "United States",
+    "property_key": "user_tier",
+    "campaign_name": "spring_sale",
+}
+
+
+def template_params(name: str, params: dict) -> dict:
+    """`params` plus the top_n the BigQuery path would use for this template when none is asked for."""
+    spec = TEMPLATE_INDEX[name]["parameters"].get("top_n") if name in TEMPLATE_INDEX else None
+    if spec is None:
+        return params
+    return dict(params, top_n=resolve_top_n(None, spec.get("default", TOP_N_DEFAULT)))
+
+
+def load_variants(directory: str) -> dict:
+    """Reads `<template_name>.sql` files as alternative bodies for those templates."""
+    variants = {}
+    for filename in sorted(os.listdir(directory)):
+        name, ext = os.path.splitext(filename)
+        if ext == ".sql" and name in QUERY_TEMPLATE_LIBRARY:
+            with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                variants[name] = f.read()
+    return variants
+
+
+def run_library(engine: LocalGA4Engine, templates=None, repeat: int = 3, variants=None,
+                sample_rate: float = 1.0) -> dict:
+    """Runs templates over the loaded date range; returns per-template timings and failures."""
+    start_date, end_date = engine.date_range()
+    base_params = dict(DEFAULT_TEMPLATE_PARAMS, start_date=start_date, end_date=end_date)
+    results = {}
+    for name in templates or QUERY_TEMPLATE_LIBRARY:
+        entry = {}
+        params = template_params(name, base_params)
+        try:
+            entry["baseline"] = engine.time_template(name, params, repeat=repeat)
+            if sample_rate < 1.0:
+                entry["sampled"] = engine.time_template(name, params, repeat=repeat, sample_rate=sample_rate)
+            if variants and name in variants:
+                entry["variant"] = engine.time_template(name, params, repeat=repeat, sql_template=variants[name])
+        except Exception as e:
+            entry["error"] = f"{type(e).__name__}: {str(e).splitlines()[0]}"
+        results[name] = entry
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--data", help="Directory of events_YYYYMMDD*.parquet shards.")
+    source.add_argument("--sample", action="store_true", help="Use the small built-in dataset.")
+    parser.add_argument("--template", action="append", help="Run only these templates (repeatable).")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--variants", help="Directory of <template_name>.sql variants to time against the library.")
+    parser.add_argument("--sample-rate", type=float, default=1.0, help="Also time a user-sampled run at this rate.")
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--output", help="Write results JSON here.")
+    args = parser.parse_args(argv)
+
+    engine = LocalGA4Engine(threads=args.threads)
+    if args.data:
+        engine.load_parquet(args.data)
+    else:
+        engine.load_arrow(build_sample_events())
+
+    variants = load_variants(args.variants) if args.variants else None
+    results = run_library(engine, args.template, args.repeat, variants, args.sample_rate)
+
+    failures = 0
+    for name, entry in results.items():
+        if "error" in entry:
+            failures += 1
+            print(f"FAIL {name}: {entry['error']}")
+            continue
+        line = f"ok   {name:<48} {entry['baseline']['median_ms']:>9.1f} ms  rows={entry['baseline']['rows']}"
+        for label in ("sampled", "variant"):
+            if label in entry:
+                ratio = entry[label]["median_ms"] / max(entry["baseline"]["median_ms"], 1e-6)
+                line += f"  {label}={entry[label]['median_ms']:.1f} ms ({ratio:.2f}x)"
+        print(line)
+    print(f"{len(results) - failures}/{len(results)} templates ran")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+# percentiles.py
+"""Nearest-rank percentiles, shared by the perf store, the Gemini latency window and the benchmarks."""
+
+
+def percentile(values, pct: float):
+    """The `pct` percentile of `values` (any order), by rounded nearest rank; None when empty."""
+    values = sorted(values)
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, int(round(pct / 100 * (len(values) - 1)))))]
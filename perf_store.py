@@ -0,0 +1,323 @@
+# perf_store.py
+"""Local store for BigQuery job statistics, per-template performance history and Gemini token usage."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import closing
+from datetime import datetime, timezone
+
+from percentiles import percentile
+
+PERF_DB_PATH = os.getenv("PERF_DB_PATH", "/tmp/ga4_chat_perf.sqlite3")
+# Percentiles are computed over the most recent executions of each template.
+PERF_HISTORY_WINDOW = int(os.getenv("PERF_HISTORY_WINDOW", "500"))
+# Executions older than this are deleted; keep it above PREWARM_LOOKBACK_DAYS.
+PERF_RETENTION_DAYS = float(os.getenv("PERF_RETENTION_DAYS", "30"))
+# Query plans are large and only the latest one per template is shown; older ones are dropped.
+PERF_PLANS_PER_TEMPLATE = int(os.getenv("PERF_PLANS_PER_TEMPLATE", "5"))
+# record_execution() applies retention once every this many writes.
+PERF_PRUNE_EVERY = int(os.getenv("PERF_PRUNE_EVERY", "100"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_executions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    template_name TEXT NOT NULL,
+    question TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    job_id TEXT,
+    duration_ms REAL,
+    total_bytes_processed INTEGER,
+    total_bytes_billed INTEGER,
+    slot_millis INTEGER,
+    cache_hit INTEGER,
+    row_count INTEGER,
+    query_plan TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_query_executions_template
+    ON query_executions (template_name, created_at);
+CREATE TABLE IF NOT EXISTS token_usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    session_id TEXT,
+    user TEXT,
+    template_name TEXT,
+    call TEXT NOT NULL,
+    model TEXT,
+    prompt_tokens INTEGER,
+    candidates_tokens INTEGER,
+    cached_tokens INTEGER,
+    total_tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_token_usage_user ON token_usage (user, created_at);
+CREATE INDEX IF NOT EXISTS idx_token_usage_session ON token_usage (session_id);
+"""
+
+# Columns token_totals() may group by.
+TOKEN_USAGE_GROUPS = ("user", "session_id", "template_name", "model")
+
+
+def extract_job_stats(query_job) -> dict:
+    """Reads the statistics worth keeping off a finished `QueryJob`."""
+    plan = []
+    for stage in query_job.query_plan or []:
+        plan.append({
+            "name": stage.name,
+            "status": stage.status,
+            "records_read": stage.records_read,
+            "records_written": stage.records_written,
+            "slot_ms": stage.slot_ms,
+            "wait_ms_avg": stage.wait_ms_avg,
+            "read_ms_avg": stage.read_ms_avg,
+            "compute_ms_avg": stage.compute_ms_avg,
+            "write_ms_avg": stage.write_ms_avg,
+            "shuffle_output_bytes": stage.shuffle_output_bytes,
+            "shuffle_output_bytes_spilled": stage.shuffle_output_bytes_spilled,
+        })
+    return {
+        "job_id": query_job.job_id,
+        "location": query_job.location,
+        "total_bytes_processed": query_job.total_bytes_processed,
+        "total_bytes_billed": query_job.total_bytes_billed,
+        "slot_millis": query_job.slot_millis,
+        "cache_hit": bool(query_job.cache_hit),
+        "query_plan": plan,
+    }
+
+
+def _summarize(values):
+    values = [v for v in values if v is not None]
+    return {
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+    }
+
+
+class PerfStore:
+    """SQLite-backed execution history. Safe to share across Streamlit sessions;
+    each call opens its own connection."""
+
+    def __init__(self, path: str = PERF_DB_PATH):
+        self.path = path
+        self._prune_lock = threading.Lock()
+        self._writes_since_prune = 0
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def record_execution(self, template_name, job_stats, duration_ms, row_count,
+                         question=None, start_date=None, end_date=None):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT INTO query_executions (
+                    created_at, template_name, question, start_date, end_date, job_id,
+                    duration_ms, total_bytes_processed, total_bytes_billed, slot_millis,
+                    cache_hit, row_count, query_plan
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    time.time(), template_name, question, start_date, end_date,
+                    job_stats.get("job_id"), duration_ms,
+                    job_stats.get("total_bytes_processed"), job_stats.get("total_bytes_billed"),
+                    job_stats.get("slot_millis"), int(bool(job_stats.get("cache_hit"))),
+                    row_count, json.dumps(job_stats.get("query_plan") or []),
+                ),
+            )
+        with self._prune_lock:
+            self._writes_since_prune += 1
+            due = self._writes_since_prune >= PERF_PRUNE_EVERY
+            if due:
+                self._writes_since_prune = 0
+        if due:
+            self.prune()
+
+    def prune(self) -> dict:
+        """Deletes executions older than PERF_RETENTION_DAYS and all but the latest query plans per template."""
+        with closing(self._connect()) as conn, conn:
+            deleted = conn.execute(
+                "DELETE FROM query_executions WHERE created_at < ?", (time.time() - PERF_RETENTION_DAYS * 86_400,)
+            ).rowcount
+            plans_dropped = conn.execute(
+                """
+                UPDATE query_executions SET query_plan = NULL
+                WHERE query_plan IS NOT NULL AND id NOT IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY template_name ORDER BY cache_hit, created_at DESC
+                        ) AS n
+                        FROM query_executions WHERE query_plan IS NOT NULL
+                    ) WHERE n <= ?
+                )
+                """,
+                (PERF_PLANS_PER_TEMPLATE,),
+            ).rowcount
+        return {"deleted": deleted, "plans_dropped": plans_dropped}
+
+    def template_percentiles(self, template_name: str) -> dict:
+        """Latency, bytes and slot percentiles over the template's recent executions."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT duration_ms, total_bytes_processed, total_bytes_billed, slot_millis, cache_hit
+                FROM query_executions
+                WHERE template_name = ?
+                ORDER BY created_at DESC
+                LIMIT ?
+                """,
+                (template_name, PERF_HISTORY_WINDOW),
+            ).fetchall()
+        if not rows:
+            return {"executions": 0}
+        return {
+            "executions": len(rows),
+            "duration_ms": _summarize(r[0] for r in rows),
+            "total_bytes_processed": _summarize(r[1] for r in rows),
+            "total_bytes_billed": _summarize(r[2] for r in rows),
+            "slot_millis": _summarize(r[3] for r in rows),
+            "cache_hit_rate": round(sum(r[4] for r in rows) / len(rows), 3),
+        }
+
+    def template_summaries(self) -> list:
+        """One row per template, most expensive (by total slot time) first."""
+        with closing(self._connect()) as conn:
+            names = [r[0] for r in conn.execute(
+                """
+                SELECT template_name
+                FROM query_executions
+                GROUP BY template_name
+                ORDER BY SUM(COALESCE(slot_millis, 0)) DESC
+                """
+            ).fetchall()]
+        summaries = []
+        for name in names:
+            stats = self.template_percentiles(name)
+            summaries.append({
+                "template": name,
+                "executions": stats["executions"],
+                "p50_ms": stats["duration_ms"]["p50"],
+                "p90_ms": stats["duration_ms"]["p90"],
+                "p50_gb_processed": _to_gb(stats["total_bytes_processed"]["p50"]),
+                "p90_gb_billed": _to_gb(stats["total_bytes_billed"]["p90"]),
+                "p50_slot_ms": stats["slot_millis"]["p50"],
+                "cache_hit_rate": stats["cache_hit_rate"],
+            })
+        return summaries
+
+    def recent_query_plan(self, template_name: str) -> list:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                """
+                SELECT query_plan FROM query_executions
+                WHERE template_name = ? AND cache_hit = 0 AND query_plan IS NOT NULL
+                ORDER BY created_at DESC LIMIT 1
+                """,
+                (template_name,),
+            ).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def range_frequencies(self, since: float, user_only: bool = True) -> list:
+        """How often each (template, date-range shape) ran since a unix time, most frequent first.
+
+        A shape is the range length and how many days before the execution date
+        it ended, so "last 7 days ending yesterday" counts as one shape whatever
+        day it was asked. `user_only` skips executions without a question
+        (pre-warm and batch template runs).
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"""
+                SELECT template_name, start_date, end_date, created_at FROM query_executions
+                WHERE created_at >= ? {"AND question IS NOT NULL" if user_only else ""}
+                """,
+                (since,),
+            ).fetchall()
+        counts = Counter()
+        for template_name, start_date, end_date, created_at in rows:
+            try:
+                start = datetime.strptime(start_date, "%Y%m%d").date()
+                end = datetime.strptime(end_date, "%Y%m%d").date()
+            except (TypeError, ValueError):
+                continue
+            asked_on = datetime.fromtimestamp(created_at, timezone.utc).date()
+            counts[(template_name, (asked_on - end).days, (end - start).days + 1)] += 1
+        return [
+            {"template": t, "end_offset_days": offset, "length_days": length, "count": n}
+            for (t, offset, length), n in counts.most_common()
+        ]
+
+    def user_executions_since(self, since: float) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM query_executions WHERE created_at >= ? AND question IS NOT NULL", (since,)
+            ).fetchone()[0]
+
+    def record_token_usage(self, calls, session_id=None, user=None, template_name=None):
+        """Stores one row per Gemini call (as produced by token_usage.UsageMeter)."""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                """
+                INSERT INTO token_usage (
+                    created_at, session_id, user, template_name, call, model,
+                    prompt_tokens, candidates_tokens, cached_tokens, total_tokens
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (now, session_id, user, template_name, c["call"], c.get("model"),
+                     c.get("prompt_tokens"), c.get("candidates_tokens"), c.get("cached_tokens"),
+                     c.get("total_tokens"))
+                    for c in calls
+                ],
+            )
+
+    def tokens_used(self, session_id=None, user=None, since=None) -> int:
+        """Total tokens for a session and/or user, optionally since a unix timestamp."""
+        clauses, args = [], []
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            args.append(session_id)
+        if user is not None:
+            clauses.append("user = ?")
+            args.append(user)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            args.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with closing(self._connect()) as conn:
+            row = conn.execute(f"SELECT COALESCE(SUM(total_tokens), 0) FROM token_usage {where}", args).fetchone()
+        return int(row[0])
+
+    def token_totals(self, group_by: str = "user", since=None) -> list:
+        """Token totals per user, session, template or model, largest first."""
+        if group_by not in TOKEN_USAGE_GROUPS:
+            raise ValueError(f"group_by must be one of {TOKEN_USAGE_GROUPS}")
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {group_by}, COUNT(*), SUM(prompt_tokens), SUM(candidates_tokens),
+                       SUM(cached_tokens), SUM(total_tokens)
+                FROM token_usage
+                WHERE created_at >= ?
+                GROUP BY {group_by}
+                ORDER BY SUM(total_tokens) DESC
+                """,
+                (since or 0,),
+            ).fetchall()
+        return [
+            {group_by: r[0], "calls": r[1], "prompt_tokens": r[2], "candidates_tokens": r[3],
+             "cached_tokens": r[4], "total_tokens": r[5]}
+            for r in rows
+        ]
+
+
+def _to_gb(value):
+    return None if value is None else round(value / 1_000_000_000, 3)
@@ -0,0 +1,219 @@
+# prewarm.py
+# pylint: disable=broad-exception-caught
+"""Pre-warms the answer cache with the most frequently asked templates.
+
+Reads which (template, date-range shape) pairs users ran over the last
+--lookback-days from the perf store. It then runs the most frequent ones,
+plus the default 8-day range for the top templates, for today's equivalent
+dates. Queries run at BigQuery BATCH priority, and the summarized answers are
+stored in the answer cache. Morning questions then only pay for routing.
+
+Schedule it after the GA4 daily export lands (e.g. cron) with PERF_DB_PATH
+and ANSWER_CACHE_PATH pointing at storage shared with the app:
+
+    python prewarm.py --top 20
+    python prewarm.py --dry-run          # show the plan only
+    python prewarm.py --report           # how many requests since the last warm-up were served warm
+
+Where the SQLite files are per instance, as in Cloud Run's /tmp, a separate
+job cannot reach them. Set PREWARM_INTERVAL_SECONDS instead, and the app and
+the API warm their own cache in a background thread, PREWARM_STARTUP_DELAY_SECONDS
+after they start and then on that interval. A new instance has no history of
+its own yet, so PREWARM_TEMPLATES names templates to warm on the default range
+until it does.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from admission import exempt_from_per_user_limit
+from answer_cache import AnswerCache
+from engine import answer_template, default_dates
+from perf_store import PerfStore
+from query_template_library import TEMPLATE_INDEX
+from tracing import Tracer
+
+PREWARM_TOP_N = int(os.getenv("PREWARM_TOP_N", "20"))
+PREWARM_LOOKBACK_DAYS = int(os.getenv("PREWARM_LOOKBACK_DAYS", "14"))
+# In-process warming; 0 turns it off.
+PREWARM_INTERVAL_SECONDS = float(os.getenv("PREWARM_INTERVAL_SECONDS", "0"))
+PREWARM_STARTUP_DELAY_SECONDS = float(os.getenv("PREWARM_STARTUP_DELAY_SECONDS", "30"))
+# Comma-separated templates warmed on the default range when the history does not fill the plan.
+PREWARM_TEMPLATES = [t.strip() for t in os.getenv("PREWARM_TEMPLATES", "").split(",") if t.strip()]
+PREWARM_USER = "prewarm"
+# Longest range worth warming; longer ones are rare and expensive.
+MAX_RANGE_DAYS = 92
+
+logger = logging.getLogger(__name__)
+
+# Warm-ups run under one user name; their own concurrency bounds them instead.
+exempt_from_per_user_limit(PREWARM_USER)
+
+
+def _needs_only_dates(template_name: str) -> bool:
+    meta = TEMPLATE_INDEX.get(template_name)
+    # top_n (the only int parameter) falls back to the template's default, which is what questions mostly get too.
+    return meta is not None and all(spec["type"] in ("date", "int") for spec in meta["parameters"].values())
+
+
+def plan_warmup(perf_store: PerfStore, top_n: int = PREWARM_TOP_N, lookback_days: int = PREWARM_LOOKBACK_DAYS,
+                today=None, templates=PREWARM_TEMPLATES) -> list:
+    """Returns [{template, start_date, end_date, count}] to warm, most frequent first."""
+    today = today or datetime.now(timezone.utc).date()
+    since = time.time() - lookback_days * 86_400
+    shapes = [
+        f for f in perf_store.range_frequencies(since)
+        if f["end_offset_days"] >= 1 and 1 <= f["length_days"] <= MAX_RANGE_DAYS and _needs_only_dates(f["template"])
+    ]
+    template_counts = Counter()
+    for shape in shapes:
+        template_counts[shape["template"]] += shape["count"]
+
+    candidates = Counter()
+    for shape in shapes:
+        end = today - timedelta(days=shape["end_offset_days"])
+        start = end - timedelta(days=shape["length_days"] - 1)
+        candidates[(shape["template"], start.strftime("%Y%m%d"), end.strftime("%Y%m%d"))] += shape["count"]
+    # The default range is what undated questions resolve to, so the top templates always get it.
+    default_start, default_end = default_dates()
+    for template_name, count in template_counts.most_common(top_n):
+        key = (template_name, default_start, default_end)
+        candidates[key] = max(candidates[key], count)
+    # Configured templates fill whatever places the history leaves.
+    for template_name in templates:
+        if _needs_only_dates(template_name):
+            candidates.setdefault((template_name, default_start, default_end), 0)
+
+    return [
+        {"template": t, "start_date": start, "end_date": end, "count": n}
+        for (t, start, end), n in candidates.most_common(top_n)
+    ]
+
+
+def run_warmup(plan: list, bq_client, genai_client, project_id: str, dataset_id: str, answer_cache: AnswerCache,
+               perf_store: PerfStore = None, concurrency: int = 4, priority: str = "BATCH",
+               sampling_mode: str = "off", log=print) -> list:
+    def warm(item):
+        tracer = Tracer("prewarm", template=item["template"])
+        started = time.perf_counter()
+        try:
+            result = answer_template(
+                item["template"], {"start_date": item["start_date"], "end_date": item["end_date"]},
+                bq_client, genai_client, project_id, dataset_id,
+                sampling_mode=sampling_mode, perf_store=perf_store, tracer=tracer, user=PREWARM_USER,
+                answer_cache=answer_cache, priority=priority, cache_source="prewarm",
+            )
+            status = "already_warm" if result["details"].get("cache", {}).get("hit") else "warmed"
+            error = None
+        except Exception as e:
+            status, error = "error", f"{type(e).__name__}: {e}"
+        outcome = {**item, "status": status, "seconds": round(time.perf_counter() - started, 2)}
+        if error:
+            outcome["error"] = error
+        log(f"{outcome['status']:<13}{outcome['seconds']:>8.1f}s  {item['template']} "
+            f"{item['start_date']}..{item['end_date']}" + (f"  {error}" if error else ""))
+        return outcome
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        return list(pool.map(warm, plan))
+
+
+def start_background_warmup(bq_client, genai_client, project_id: str, dataset_id: str, answer_cache: AnswerCache,
+                            perf_store: PerfStore, interval_s: float = PREWARM_INTERVAL_SECONDS,
+                            delay_s: float = PREWARM_STARTUP_DELAY_SECONDS):
+    """Warms this instance's cache after `delay_s`, then every `interval_s`, in a daemon thread.
+
+    Returns the thread, or None when `interval_s` is 0.
+    """
+    if interval_s <= 0:
+        return None
+
+    def loop():
+        time.sleep(delay_s)
+        while True:
+            try:
+                plan = plan_warmup(perf_store)
+                results = run_warmup(plan, bq_client, genai_client, project_id, dataset_id, answer_cache, perf_store,
+                                     concurrency=2, log=logger.info)
+                logger.info("Pre-warm finished: %s", dict(Counter(r["status"] for r in results)))
+            except Exception as e:
+                logger.warning("Pre-warm failed: %s", e)
+            time.sleep(interval_s)
+
+    thread = threading.Thread(target=loop, name="prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def warm_report(answer_cache: AnswerCache, perf_store: PerfStore, since: float) -> dict:
+    """Requests since `since` served from pre-warmed answers vs. run cold against BigQuery.
+
+    Cold requests are user executions recorded in the perf store; requests
+    answered from other (non-pre-warmed) cache entries are not counted.
+    """
+    warm = answer_cache.source_stats("prewarm", since)
+    cold = perf_store.user_executions_since(warm["stored_at"] or since)
+    total = warm["hits"] + cold
+    return {
+        "prewarmed_entries": warm["entries"],
+        "prewarmed_entries_used": warm["entries_hit"],
+        "served_warm": warm["hits"],
+        "ran_cold": cold,
+        "warm_rate": round(warm["hits"] / total, 3) if total else None,
+        "hits_by_template": warm["hits_by_template"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=PREWARM_TOP_N, help="Template/range pairs to warm.")
+    parser.add_argument("--lookback-days", type=int, default=PREWARM_LOOKBACK_DAYS)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--interactive", action="store_true", help="Use INTERACTIVE instead of BATCH priority.")
+    parser.add_argument("--sampling", choices=("off", "auto"), default="off")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without running it.")
+    parser.add_argument("--report", action="store_true", help="Report warm hits instead of warming.")
+    parser.add_argument("--since-hours", type=float, default=24, help="Window for --report.")
+    args = parser.parse_args(argv)
+
+    perf_store = PerfStore()
+    answer_cache = AnswerCache()
+    if args.report:
+        print(json.dumps(warm_report(answer_cache, perf_store, time.time() - args.since_hours * 3600), indent=2))
+        return 0
+
+    plan = plan_warmup(perf_store, args.top, args.lookback_days)
+    if args.dry_run or not plan:
+        for item in plan:
+            print(f"{item['count']:>5}x  {item['template']} {item['start_date']}..{item['end_date']}")
+        if not plan:
+            print("No query history to warm from yet.")
+        return 0
+
+    from google import genai  # pylint: disable=import-outside-toplevel
+    from google.cloud import bigquery  # pylint: disable=import-outside-toplevel
+
+    dataset_id = os.getenv("GA4_BIGQUERY_DATASET", "")
+    if not dataset_id:
+        parser.error("GA4_BIGQUERY_DATASET is not set")
+    bq_client = bigquery.Client()
+    genai_client = genai.Client(vertexai=True, location=os.getenv("VERTEX_LOCATION", "us-central1"),
+                                project=bq_client.project)
+    results = run_warmup(plan, bq_client, genai_client, bq_client.project, dataset_id, answer_cache, perf_store,
+                         concurrency=args.concurrency, priority="INTERACTIVE" if args.interactive else "BATCH",
+                         sampling_mode=args.sampling)
+    statuses = Counter(r["status"] for r in results)
+    print(f"warmed={statuses['warmed']} already_warm={statuses['already_warm']} errors={statuses['error']}")
+    return 1 if statuses["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
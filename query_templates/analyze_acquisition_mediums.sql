@@ -0,0 +1,33 @@
+
+-- Analyzes user acquisition performance across different traffic mediums
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(traffic_source.medium, '(medium_not_set)') AS traffic_medium,
+    COUNT(DISTINCT user_pseudo_id) AS acquired_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    ROUND(
+        COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        )) * 1.0 / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS avg_sessions_per_user,
+    COUNTIF(event_name = 'page_view') AS page_views,
+    ROUND(
+        COUNTIF(event_name = 'page_view') * 1.0 / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS avg_page_views_per_user,
+    ROUND(
+        COUNT(DISTINCT user_pseudo_id) * 100.0 / SUM(COUNT(DISTINCT user_pseudo_id)) OVER (), 2
+    ) AS user_share_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Include user-specified WHERE conditions
+GROUP BY
+    traffic_medium
+ORDER BY
+    acquired_users DESC
+LIMIT {top_n}
@@ -0,0 +1,43 @@
+
+-- Analyzes user acquisition performance by traffic source
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(traffic_source.source, '(source_not_set)') AS traffic_source_name,
+    COUNT(DISTINCT user_pseudo_id) AS acquired_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+             THEN user_pseudo_id 
+        END
+    ) AS first_time_users,
+    ROUND(
+        SAFE_DIVIDE(
+            COUNT(DISTINCT 
+                CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+                     THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                END
+            ),
+            COUNT(DISTINCT CONCAT(
+                user_pseudo_id, 
+                CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+            ))
+        ) * 100, 2
+    ) AS engagement_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Apply additional filters as needed
+GROUP BY
+    traffic_source_name
+ORDER BY
+    acquired_users DESC
+LIMIT {top_n}
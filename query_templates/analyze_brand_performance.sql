@@ -0,0 +1,49 @@
+
+-- Analyzes product performance across different brands
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(items.item_brand, '(brand_not_set)') AS brand_name,
+    COUNT(DISTINCT items.item_id) AS unique_products_per_brand,
+    COUNT(DISTINCT items.item_category) AS categories_per_brand,
+    SUM(items.quantity) AS total_units_sold,
+    SUM(items.item_revenue_in_usd) AS total_brand_revenue_usd,
+    COUNT(DISTINCT user_pseudo_id) AS unique_brand_buyers,
+    COUNT(DISTINCT ecommerce.transaction_id) AS transactions_with_brand,
+    ROUND(AVG(items.price_in_usd), 2) AS avg_brand_price_usd,
+    ROUND(
+        SUM(items.item_revenue_in_usd) / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS revenue_per_brand_buyer,
+    ROUND(
+        SUM(items.item_revenue_in_usd) / SUM(items.quantity), 2
+    ) AS avg_revenue_per_unit,
+    ROUND(
+        COUNT(DISTINCT user_pseudo_id) * 100.0 / 
+        SUM(COUNT(DISTINCT user_pseudo_id)) OVER (), 2
+    ) AS brand_buyer_share_percentage,
+    ROUND(
+        SUM(items.item_revenue_in_usd) * 100.0 / 
+        SUM(SUM(items.item_revenue_in_usd)) OVER (), 2
+    ) AS brand_revenue_share_percentage,
+    MIN(items.price_in_usd) AS lowest_brand_price,
+    MAX(items.price_in_usd) AS highest_brand_price,
+    COUNT(DISTINCT 
+        CASE WHEN items.coupon IS NOT NULL THEN ecommerce.transaction_id END
+    ) AS transactions_with_brand_coupons,
+    ROUND(
+        COUNT(DISTINCT 
+            CASE WHEN items.coupon IS NOT NULL THEN ecommerce.transaction_id END
+        ) * 100.0 / COUNT(DISTINCT ecommerce.transaction_id), 2
+    ) AS brand_coupon_usage_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`,
+    UNNEST(items) AS items
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND event_name = 'purchase'
+    AND items.item_id IS NOT NULL
+    -- LLM: Apply additional filters as needed
+GROUP BY
+    brand_name
+ORDER BY
+    total_brand_revenue_usd DESC
+LIMIT {top_n}
@@ -0,0 +1,24 @@
+
+-- Analyzes web browser usage including versions for web traffic
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(device.browser, device.web_info.browser, 'Unknown_Browser') AS browser_name,
+    COALESCE(device.browser_version, device.web_info.browser_version, 'Unknown_Version') AS browser_version,
+    COALESCE(device.web_info.hostname, 'Unknown_Hostname') AS website_hostname,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNTIF(event_name = 'page_view') AS page_views
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND platform = 'WEB'
+    -- LLM: Add additional WHERE clauses as needed
+GROUP BY
+    browser_name, browser_version, website_hostname
+ORDER BY
+    unique_users DESC
+LIMIT {top_n}
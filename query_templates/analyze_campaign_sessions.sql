@@ -0,0 +1,30 @@
+
+-- Analyzes session distribution across marketing campaigns
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH campaign_data AS (
+    SELECT
+        user_pseudo_id,
+        (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS session_identifier,
+        ARRAY_AGG(
+            (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'campaign') 
+            IGNORE NULLS ORDER BY event_timestamp
+        )[SAFE_OFFSET(0)] AS marketing_campaign
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        -- LLM: Add additional filters if user specifies criteria
+    GROUP BY
+        user_pseudo_id,
+        session_identifier
+)
+SELECT
+    COALESCE(marketing_campaign, '(unassigned)') AS campaign_name,
+    COUNT(DISTINCT CONCAT(user_pseudo_id, CAST(session_identifier AS STRING))) AS session_count
+FROM
+    campaign_data
+GROUP BY
+    campaign_name
+ORDER BY
+    session_count DESC
+LIMIT {top_n}
@@ -0,0 +1,34 @@
+
+-- Analyzes how specific campaigns perform across different traffic sources
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(traffic_source.name, '(campaign_not_set)') AS campaign_name,
+    COALESCE(traffic_source.source, '(source_not_set)') AS traffic_source_name,
+    COALESCE(traffic_source.medium, '(medium_not_set)') AS traffic_medium,
+    COUNT(DISTINCT user_pseudo_id) AS acquired_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+             THEN user_pseudo_id 
+        END
+    ) AS new_users_acquired,
+    ROUND(
+        COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        )) * 1.0 / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS avg_sessions_per_user
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND traffic_source.name IS NOT NULL
+    -- LLM: Add user-specified WHERE clauses
+GROUP BY
+    campaign_name, traffic_source_name, traffic_medium
+ORDER BY
+    acquired_users DESC
+LIMIT {top_n}
@@ -0,0 +1,28 @@
+
+-- Analyzes user distribution and engagement at the city level
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(geo.country, 'Unknown_Country') AS country_name,
+    COALESCE(geo.region, 'Unknown_Region') AS region_state,
+    COALESCE(geo.city, 'Unknown_City') AS city_name,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNTIF(event_name = 'page_view') AS page_views,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+             THEN user_pseudo_id 
+        END
+    ) AS new_users
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Include additional filtering conditions
+GROUP BY
+    country_name, region_state, city_name
+ORDER BY
+    unique_users DESC
+LIMIT {top_n}
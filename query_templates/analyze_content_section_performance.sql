@@ -0,0 +1,54 @@
+
+-- Analyzes performance across different website sections or content categories
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    CASE 
+        WHEN REGEXP_CONTAINS((SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'page_location'), r'/blog/|/articles/|/news/') THEN 'Blog_Content'
+        WHEN REGEXP_CONTAINS((SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'page_location'), r'/product/|/products/|/shop/|/store/') THEN 'Product_Pages'
+        WHEN REGEXP_CONTAINS((SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'page_location'), r'/about/|/contact/|/team/') THEN 'Company_Info'
+        WHEN REGEXP_CONTAINS((SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'page_location'), r'/support/|/help/|/faq/|/docs/') THEN 'Support_Help'
+        WHEN REGEXP_CONTAINS((SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'page_location'), r'^[^/]*//[^/]+/?$') THEN 'Homepage'
+        ELSE 'Other_Pages'
+    END AS content_section,
+    COUNTIF(event_name = 'page_view') AS page_views,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS unique_sessions,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'entrances') = 1 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS entrances_to_section,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions_in_section,
+    ROUND(
+        COUNTIF(event_name = 'page_view') * 1.0 / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS avg_page_views_per_user,
+    ROUND(
+        SAFE_DIVIDE(
+            COUNT(DISTINCT 
+                CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+                     THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                END
+            ),
+            COUNT(DISTINCT CONCAT(
+                user_pseudo_id, 
+                CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+            ))
+        ) * 100, 2
+    ) AS section_engagement_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND event_name = 'page_view'
+    -- LLM: Include user-specified WHERE conditions
+GROUP BY
+    content_section
+ORDER BY
+    page_views DESC
@@ -0,0 +1,39 @@
+
+-- Analyzes user distribution and engagement metrics by country
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(geo.country, 'Unknown_Country') AS country_name,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNTIF(event_name = 'page_view') AS page_views,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions,
+    ROUND(
+        SAFE_DIVIDE(
+            COUNT(DISTINCT 
+                CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+                     THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                END
+            ),
+            COUNT(DISTINCT CONCAT(
+                user_pseudo_id, 
+                CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+            ))
+        ) * 100, 2
+    ) AS engagement_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Include user-specified WHERE conditions
+GROUP BY
+    country_name
+ORDER BY
+    unique_users DESC
+LIMIT {top_n}
@@ -0,0 +1,48 @@
+
+-- Analyzes custom events to assess tracking implementation and performance
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH event_classification AS (
+    SELECT
+        event_name,
+        CASE 
+            WHEN event_name IN ('page_view', 'session_start', 'first_visit', 'user_engagement') THEN 'Auto_Tracked'
+            WHEN event_name IN ('purchase', 'add_to_cart', 'view_item', 'begin_checkout', 'add_payment_info', 'add_shipping_info') THEN 'Enhanced_Ecommerce'
+            WHEN event_name IN ('login', 'sign_up', 'generate_lead', 'view_search_results', 'select_content') THEN 'Recommended_Events'
+            ELSE 'Custom_Events'
+        END AS event_category,
+        user_pseudo_id,
+        (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS session_id,
+        event_timestamp,
+        event_value_in_usd,
+        ARRAY_LENGTH(event_params) AS parameter_count
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        -- LLM: Apply additional filters as needed
+)
+SELECT
+    event_category,
+    event_name,
+    COUNT(*) AS total_events,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(user_pseudo_id, CAST(session_id AS STRING))) AS unique_sessions,
+    ROUND(AVG(parameter_count), 1) AS avg_parameters_per_event,
+    COUNT(DISTINCT 
+        CASE WHEN event_value_in_usd IS NOT NULL AND event_value_in_usd > 0 
+             THEN CONCAT(user_pseudo_id, CAST(session_id AS STRING), event_name) 
+        END
+    ) AS events_with_value,
+    ROUND(SUM(event_value_in_usd), 2) AS total_event_value_usd,
+    ROUND(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER (), 2) AS event_frequency_percentage,
+    DATE_DIFF(
+        DATE(MAX(TIMESTAMP_MICROS(event_timestamp))), 
+        DATE(MIN(TIMESTAMP_MICROS(event_timestamp))), 
+        DAY
+    ) AS days_active
+FROM
+    event_classification
+GROUP BY
+    event_category, event_name
+ORDER BY
+    event_category, total_events DESC
@@ -0,0 +1,49 @@
+
+-- Analyzes user behavior and engagement patterns across days of the week
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    FORMAT_DATE('%A', PARSE_DATE('%Y%m%d', event_date)) AS day_of_week_name,
+    FORMAT_DATE('%w', PARSE_DATE('%Y%m%d', event_date)) AS day_of_week_number,
+    CASE 
+        WHEN FORMAT_DATE('%w', PARSE_DATE('%Y%m%d', event_date)) IN ('0', '6') THEN 'Weekend'
+        ELSE 'Weekday'
+    END AS weekday_weekend,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNTIF(event_name = 'page_view') AS page_views,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions,
+    ROUND(
+        COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        )) * 1.0 / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS avg_sessions_per_user,
+    ROUND(
+        SAFE_DIVIDE(
+            COUNT(DISTINCT 
+                CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+                     THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                END
+            ),
+            COUNT(DISTINCT CONCAT(
+                user_pseudo_id, 
+                CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+            ))
+        ) * 100, 2
+    ) AS engagement_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Include user-specified WHERE conditions
+GROUP BY
+    day_of_week_name, day_of_week_number, weekday_weekend
+ORDER BY
+    day_of_week_number
@@ -0,0 +1,20 @@
+
+-- Analyzes user and session distribution across device categories
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(device.category, 'Unknown_Device') AS device_type,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNTIF(event_name = 'page_view') AS page_views
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Add additional filters as specified by user
+GROUP BY
+    device_type
+ORDER BY
+    unique_users DESC
@@ -0,0 +1,22 @@
+
+-- Analyzes device language settings and timezone distribution
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(device.language, 'Unknown_Language') AS device_language,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNT(DISTINCT device.category) AS device_categories_used,
+    ROUND(device.time_zone_offset_seconds / 3600, 1) AS timezone_offset_hours
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Apply additional filters as specified
+GROUP BY
+    device_language, timezone_offset_hours
+ORDER BY
+    unique_users DESC
+LIMIT {top_n}
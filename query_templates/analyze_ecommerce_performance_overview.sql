@@ -0,0 +1,27 @@
+
+-- Provides comprehensive ecommerce performance overview with key business metrics
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COUNT(DISTINCT ecommerce.transaction_id) AS total_transactions,
+    COUNT(DISTINCT user_pseudo_id) AS unique_purchasing_users,
+    SUM(ecommerce.purchase_revenue_in_usd) AS total_revenue_usd,
+    SUM(ecommerce.total_item_quantity) AS total_items_sold,
+    SUM(ecommerce.unique_items) AS total_unique_items_sold,
+    SUM(ecommerce.shipping_value_in_usd) AS total_shipping_revenue_usd,
+    SUM(ecommerce.tax_value_in_usd) AS total_tax_collected_usd,
+    ROUND(AVG(ecommerce.purchase_revenue_in_usd), 2) AS avg_order_value_usd,
+    ROUND(AVG(ecommerce.total_item_quantity), 2) AS avg_items_per_transaction,
+    ROUND(AVG(ecommerce.unique_items), 2) AS avg_unique_items_per_transaction,
+    ROUND(SUM(ecommerce.purchase_revenue_in_usd) / COUNT(DISTINCT user_pseudo_id), 2) AS revenue_per_user,
+    ROUND(COUNT(DISTINCT ecommerce.transaction_id) * 1.0 / COUNT(DISTINCT user_pseudo_id), 2) AS transactions_per_user,
+    ROUND(
+        (SUM(ecommerce.purchase_revenue_in_usd) - SUM(ecommerce.shipping_value_in_usd) - SUM(ecommerce.tax_value_in_usd)) * 100.0 / 
+        SUM(ecommerce.purchase_revenue_in_usd), 2
+    ) AS product_revenue_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND event_name = 'purchase'
+    AND ecommerce.transaction_id IS NOT NULL
+    -- LLM: Add additional filters as specified by user
@@ -0,0 +1,80 @@
+
+-- Analyzes event sequences to understand user conversion patterns
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+-- LLM: Modify the funnel_events list based on user's conversion funnel
+WITH user_events AS (
+    SELECT
+        user_pseudo_id,
+        (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS session_id,
+        event_name,
+        event_timestamp,
+        event_value_in_usd
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        AND event_name IN ('page_view', 'view_item', 'add_to_cart', 'begin_checkout', 'purchase')  -- LLM: Adjust these events based on user's funnel
+        -- LLM: Include additional filtering conditions
+),
+funnel_analysis AS (
+    SELECT
+        user_pseudo_id,
+        session_id,
+        MAX(CASE WHEN event_name = 'page_view' THEN 1 ELSE 0 END) AS step_1_page_view,
+        MAX(CASE WHEN event_name = 'view_item' THEN 1 ELSE 0 END) AS step_2_view_item,
+        MAX(CASE WHEN event_name = 'add_to_cart' THEN 1 ELSE 0 END) AS step_3_add_to_cart,
+        MAX(CASE WHEN event_name = 'begin_checkout' THEN 1 ELSE 0 END) AS step_4_begin_checkout,
+        MAX(CASE WHEN event_name = 'purchase' THEN 1 ELSE 0 END) AS step_5_purchase,
+        SUM(event_value_in_usd) AS total_session_value
+    FROM
+        user_events
+    GROUP BY
+        user_pseudo_id, session_id
+),
+funnel_summary AS (
+    SELECT
+        SUM(step_1_page_view) AS total_step_1,
+        SUM(step_2_view_item) AS total_step_2,
+        SUM(step_3_add_to_cart) AS total_step_3,
+        SUM(step_4_begin_checkout) AS total_step_4,
+        SUM(step_5_purchase) AS total_step_5,
+        COUNT(*) AS total_sessions
+    FROM
+        funnel_analysis
+)
+SELECT
+    'Step 1: Page Views' AS funnel_step,
+    total_step_1 AS users_completing_step,
+    ROUND(total_step_1 * 100.0 / NULLIF(total_sessions, 0), 2) AS completion_rate_percentage,
+    NULL AS conversion_rate_from_previous_step
+FROM funnel_summary
+UNION ALL
+SELECT
+    'Step 2: View Item' AS funnel_step,
+    total_step_2 AS users_completing_step,
+    ROUND(total_step_2 * 100.0 / NULLIF(total_sessions, 0), 2) AS completion_rate_percentage,
+    ROUND(total_step_2 * 100.0 / NULLIF(total_step_1, 0), 2) AS conversion_rate_from_previous_step
+FROM funnel_summary
+UNION ALL
+SELECT
+    'Step 3: Add to Cart' AS funnel_step,
+    total_step_3 AS users_completing_step,
+    ROUND(total_step_3 * 100.0 / NULLIF(total_sessions, 0), 2) AS completion_rate_percentage,
+    ROUND(total_step_3 * 100.0 / NULLIF(total_step_2, 0), 2) AS conversion_rate_from_previous_step
+FROM funnel_summary
+UNION ALL
+SELECT
+    'Step 4: Begin Checkout' AS funnel_step,
+    total_step_4 AS users_completing_step,
+    ROUND(total_step_4 * 100.0 / NULLIF(total_sessions, 0), 2) AS completion_rate_percentage,
+    ROUND(total_step_4 * 100.0 / NULLIF(total_step_3, 0), 2) AS conversion_rate_from_previous_step
+FROM funnel_summary
+UNION ALL
+SELECT
+    'Step 5: Purchase' AS funnel_step,
+    total_step_5 AS users_completing_step,
+    ROUND(total_step_5 * 100.0 / NULLIF(total_sessions, 0), 2) AS completion_rate_percentage,
+    ROUND(total_step_5 * 100.0 / NULLIF(total_step_4, 0), 2) AS conversion_rate_from_previous_step
+FROM funnel_summary
+ORDER BY
+    funnel_step
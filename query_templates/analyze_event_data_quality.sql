@@ -0,0 +1,49 @@
+
+-- Analyzes event data quality to identify potential tracking or collection issues
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    event_name,
+    COUNT(*) AS total_events,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    
+    -- Timing quality checks
+    COUNT(CASE WHEN event_server_timestamp_offset IS NULL THEN 1 END) AS events_missing_server_offset,
+    COUNT(CASE WHEN ABS(event_server_timestamp_offset) > 3600000000 THEN 1 END) AS events_with_long_delay,
+    ROUND(AVG(ABS(event_server_timestamp_offset) / 1000000), 2) AS avg_collection_delay_seconds,
+    
+    -- Parameter quality checks
+    COUNT(CASE WHEN ARRAY_LENGTH(event_params) = 0 THEN 1 END) AS events_without_parameters,
+    ROUND(AVG(ARRAY_LENGTH(event_params)), 1) AS avg_parameters_per_event,
+    
+    -- Value quality checks
+    COUNT(CASE WHEN event_value_in_usd IS NOT NULL THEN 1 END) AS events_with_value,
+    COUNT(CASE WHEN event_value_in_usd IS NOT NULL AND event_value_in_usd <= 0 THEN 1 END) AS events_with_zero_or_negative_value,
+    
+    -- Bundle and batch quality
+    COUNT(DISTINCT event_bundle_sequence_id) AS unique_bundles,
+    ROUND(AVG(batch_event_index), 1) AS avg_batch_position,
+    
+    -- Date consistency
+    COUNT(CASE 
+        WHEN DATE(TIMESTAMP_MICROS(event_timestamp)) != PARSE_DATE('%Y%m%d', event_date) 
+        THEN 1 
+    END) AS events_with_date_mismatch,
+    
+    -- Overall data quality score (0-100)
+    ROUND(
+        100 * (1 - (
+            COUNT(CASE WHEN event_server_timestamp_offset IS NULL THEN 1 END) +
+            COUNT(CASE WHEN ARRAY_LENGTH(event_params) = 0 THEN 1 END) +
+            COUNT(CASE WHEN DATE(TIMESTAMP_MICROS(event_timestamp)) != PARSE_DATE('%Y%m%d', event_date) THEN 1 END)
+        ) * 1.0 / COUNT(*)), 2
+    ) AS data_quality_score
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Include additional WHERE conditions as specified
+GROUP BY
+    event_name
+ORDER BY
+    total_events DESC
+LIMIT {top_n}
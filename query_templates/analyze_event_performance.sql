@@ -0,0 +1,30 @@
+
+-- Analyzes performance and frequency of different event types
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    event_name,
+    COUNT(*) AS total_events,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users_triggering_event,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS sessions_with_event,
+    ROUND(COUNT(*) * 1.0 / COUNT(DISTINCT user_pseudo_id), 2) AS avg_events_per_user,
+    ROUND(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER (), 2) AS event_share_percentage,
+    ROUND(AVG(event_value_in_usd), 2) AS avg_event_value_usd,
+    SUM(event_value_in_usd) AS total_event_value_usd,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+             THEN user_pseudo_id 
+        END
+    ) AS new_users_triggering_event
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Add additional filters as specified by user
+GROUP BY
+    event_name
+ORDER BY
+    total_events DESC
+LIMIT {top_n}
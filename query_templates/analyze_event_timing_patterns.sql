@@ -0,0 +1,28 @@
+
+-- Analyzes temporal patterns of event occurrences for optimization insights
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    event_name,
+    EXTRACT(HOUR FROM TIMESTAMP_MICROS(event_timestamp)) AS hour_of_day,
+    FORMAT_DATE('%A', DATE(TIMESTAMP_MICROS(event_timestamp))) AS day_of_week,
+    CASE 
+        WHEN EXTRACT(HOUR FROM TIMESTAMP_MICROS(event_timestamp)) BETWEEN 6 AND 11 THEN 'Morning'
+        WHEN EXTRACT(HOUR FROM TIMESTAMP_MICROS(event_timestamp)) BETWEEN 12 AND 17 THEN 'Afternoon'
+        WHEN EXTRACT(HOUR FROM TIMESTAMP_MICROS(event_timestamp)) BETWEEN 18 AND 22 THEN 'Evening'
+        ELSE 'Night'
+    END AS time_period,
+    COUNT(*) AS event_count,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    ROUND(AVG(event_value_in_usd), 2) AS avg_event_value,
+    SUM(event_value_in_usd) AS total_event_value,
+    ROUND(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER (PARTITION BY event_name), 2) AS time_share_percentage_for_event
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND event_name IN ('page_view', 'purchase', 'add_to_cart', 'view_item')  -- LLM: Adjust events based on user interest
+    -- LLM: Apply additional filters as needed
+GROUP BY
+    event_name, hour_of_day, day_of_week, time_period
+ORDER BY
+    event_name, event_count DESC
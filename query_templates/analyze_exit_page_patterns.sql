@@ -0,0 +1,40 @@
+
+-- Analyzes exit patterns to identify potential user experience issues
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH session_pages AS (
+    SELECT
+        user_pseudo_id,
+        (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS session_id,
+        (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'page_location') AS page_url,
+        (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'page_title') AS page_title,
+        event_timestamp,
+        ROW_NUMBER() OVER (
+            PARTITION BY user_pseudo_id, (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') 
+            ORDER BY event_timestamp DESC
+        ) AS page_rank_desc
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        AND event_name = 'page_view'
+        -- LLM: Apply additional filters as needed
+)
+SELECT
+    page_url AS exit_page_url,
+    page_title AS exit_page_title,
+    COUNT(DISTINCT CONCAT(user_pseudo_id, CAST(session_id AS STRING))) AS sessions_exiting_from_page,
+    COUNT(DISTINCT user_pseudo_id) AS users_exiting_from_page,
+    ROUND(
+        COUNT(DISTINCT CONCAT(user_pseudo_id, CAST(session_id AS STRING))) * 100.0 / 
+        SUM(COUNT(DISTINCT CONCAT(user_pseudo_id, CAST(session_id AS STRING)))) OVER (), 2
+    ) AS exit_share_percentage
+FROM
+    session_pages
+WHERE
+    page_rank_desc = 1  -- Last page in session (exit page)
+    AND page_url IS NOT NULL
+GROUP BY
+    exit_page_url, exit_page_title
+ORDER BY
+    sessions_exiting_from_page DESC
+LIMIT {top_n}
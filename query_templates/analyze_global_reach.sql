@@ -0,0 +1,22 @@
+
+-- Analyzes user and session distribution across global regions (continents and subcontinents)
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(geo.continent, 'Unknown_Continent') AS continent_name,
+    COALESCE(geo.sub_continent, 'Unknown_Subcontinent') AS subcontinent_name,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNT(*) AS total_events,
+    ROUND(COUNT(DISTINCT user_pseudo_id) * 100.0 / SUM(COUNT(DISTINCT user_pseudo_id)) OVER (), 2) AS user_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Add additional filters as specified by user
+GROUP BY
+    continent_name, subcontinent_name
+ORDER BY
+    unique_users DESC
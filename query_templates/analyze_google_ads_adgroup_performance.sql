@@ -0,0 +1,60 @@
+
+-- Analyzes Google Ads ad group performance using last-click attribution
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(session_traffic_source_last_click.google_ads_campaign.account_name, '(account_not_set)') AS google_ads_account,
+    COALESCE(session_traffic_source_last_click.google_ads_campaign.campaign_name, '(campaign_not_set)') AS google_ads_campaign,
+    COALESCE(session_traffic_source_last_click.google_ads_campaign.ad_group_id, '(adgroup_id_not_set)') AS ad_group_id,
+    COALESCE(session_traffic_source_last_click.google_ads_campaign.ad_group_name, '(adgroup_name_not_set)') AS ad_group_name,
+    COUNT(DISTINCT user_pseudo_id) AS attributed_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS attributed_sessions,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions,
+    COUNTIF(event_name = 'page_view') AS page_views,
+    COUNT(*) AS total_events,
+    ROUND(
+        COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        )) * 1.0 / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS avg_sessions_per_attributed_user,
+    ROUND(
+        SAFE_DIVIDE(
+            COUNT(DISTINCT 
+                CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+                     THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                END
+            ),
+            COUNT(DISTINCT CONCAT(
+                user_pseudo_id, 
+                CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+            ))
+        ) * 100, 2
+    ) AS engagement_rate_percentage,
+    ROUND(
+        COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        )) * 100.0 / SUM(COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        ))) OVER (), 2
+    ) AS session_share_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND (session_traffic_source_last_click.google_ads_campaign.ad_group_id IS NOT NULL 
+         OR session_traffic_source_last_click.google_ads_campaign.ad_group_name IS NOT NULL)
+    -- LLM: Include additional filtering conditions
+GROUP BY
+    google_ads_account, google_ads_campaign, ad_group_id, ad_group_name
+ORDER BY
+    attributed_sessions DESC
+LIMIT {top_n}
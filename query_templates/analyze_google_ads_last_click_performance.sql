@@ -0,0 +1,56 @@
+
+-- Analyzes Google Ads campaign performance using last-click attribution
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(session_traffic_source_last_click.google_ads_campaign.customer_id, '(customer_id_not_set)') AS google_ads_customer_id,
+    COALESCE(session_traffic_source_last_click.google_ads_campaign.account_name, '(account_name_not_set)') AS google_ads_account,
+    COALESCE(session_traffic_source_last_click.google_ads_campaign.campaign_id, '(campaign_id_not_set)') AS google_ads_campaign_id,
+    COALESCE(session_traffic_source_last_click.google_ads_campaign.campaign_name, '(campaign_name_not_set)') AS google_ads_campaign_name,
+    COUNT(DISTINCT user_pseudo_id) AS attributed_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS attributed_sessions,
+    COUNT(*) AS total_events,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+             THEN user_pseudo_id 
+        END
+    ) AS attributed_new_users,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions,
+    COUNTIF(event_name = 'page_view') AS page_views,
+    ROUND(
+        COUNTIF(event_name = 'page_view') * 1.0 / COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        )), 2
+    ) AS avg_page_views_per_session,
+    ROUND(
+        SAFE_DIVIDE(
+            COUNT(DISTINCT 
+                CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+                     THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                END
+            ),
+            COUNT(DISTINCT CONCAT(
+                user_pseudo_id, 
+                CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+            ))
+        ) * 100, 2
+    ) AS engagement_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND (session_traffic_source_last_click.google_ads_campaign.campaign_id IS NOT NULL 
+         OR session_traffic_source_last_click.google_ads_campaign.campaign_name IS NOT NULL)
+    -- LLM: Apply additional filters as needed
+GROUP BY
+    google_ads_customer_id, google_ads_account, google_ads_campaign_id, google_ads_campaign_name
+ORDER BY
+    attributed_sessions DESC
+LIMIT {top_n}
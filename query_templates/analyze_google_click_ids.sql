@@ -0,0 +1,57 @@
+
+-- Analyzes Google click identifiers for detailed Google Ads attribution
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    CASE 
+        WHEN collected_traffic_source.gclid IS NOT NULL THEN 'Google_Ads_Search_Shopping'
+        WHEN collected_traffic_source.dclid IS NOT NULL THEN 'Display_Video_360_CM360'
+        WHEN collected_traffic_source.srsltid IS NOT NULL THEN 'Google_Merchant_Center'
+        ELSE 'Other_Google_Traffic'
+    END AS google_click_type,
+    CASE 
+        WHEN collected_traffic_source.gclid IS NOT NULL THEN 'Has_GCLID'
+        WHEN collected_traffic_source.dclid IS NOT NULL THEN 'Has_DCLID'  
+        WHEN collected_traffic_source.srsltid IS NOT NULL THEN 'Has_SRSLTID'
+        ELSE 'No_Click_ID'
+    END AS click_id_status,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+             THEN user_pseudo_id 
+        END
+    ) AS new_users,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions,
+    COUNTIF(event_name = 'page_view') AS page_views,
+    ROUND(
+        SAFE_DIVIDE(
+            COUNT(DISTINCT 
+                CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+                     THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                END
+            ),
+            COUNT(DISTINCT CONCAT(
+                user_pseudo_id, 
+                CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+            ))
+        ) * 100, 2
+    ) AS engagement_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND (collected_traffic_source.gclid IS NOT NULL 
+         OR collected_traffic_source.dclid IS NOT NULL 
+         OR collected_traffic_source.srsltid IS NOT NULL)
+    -- LLM: Add user-specified WHERE clauses
+GROUP BY
+    google_click_type, click_id_status
+ORDER BY
+    unique_users DESC
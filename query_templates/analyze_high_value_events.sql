@@ -0,0 +1,34 @@
+
+-- Analyzes events that generate monetary value for business insights
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    event_name,
+    COUNT(*) AS total_events,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users_generating_value,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS sessions_generating_value,
+    ROUND(SUM(event_value_in_usd), 2) AS total_event_value_usd,
+    ROUND(AVG(event_value_in_usd), 2) AS avg_event_value_usd,
+    ROUND(MIN(event_value_in_usd), 2) AS min_event_value_usd,
+    ROUND(MAX(event_value_in_usd), 2) AS max_event_value_usd,
+    ROUND(SUM(event_value_in_usd) * 100.0 / SUM(SUM(event_value_in_usd)) OVER (), 2) AS value_share_percentage,
+    ROUND(SUM(event_value_in_usd) / COUNT(DISTINCT user_pseudo_id), 2) AS avg_value_per_user,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+             THEN user_pseudo_id 
+        END
+    ) AS new_users_generating_value
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND event_value_in_usd IS NOT NULL
+    AND event_value_in_usd > 0
+    -- LLM: Include additional filtering conditions as specified
+GROUP BY
+    event_name
+ORDER BY
+    total_event_value_usd DESC
+LIMIT {top_n}
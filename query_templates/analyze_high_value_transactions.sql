@@ -0,0 +1,57 @@
+
+-- Analyzes high-value transactions to understand premium customer behavior
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+-- LLM: Adjust the high_value_threshold based on business context (default $500)
+WITH transaction_analysis AS (
+    SELECT
+        ecommerce.transaction_id,
+        user_pseudo_id,
+        ecommerce.purchase_revenue_in_usd,
+        ecommerce.total_item_quantity,
+        ecommerce.unique_items,
+        ecommerce.shipping_value_in_usd,
+        ecommerce.tax_value_in_usd,
+        CASE 
+            WHEN ecommerce.purchase_revenue_in_usd >= 500 THEN 'High_Value ($500+)'
+            WHEN ecommerce.purchase_revenue_in_usd >= 200 THEN 'Medium_High_Value ($200-499)'
+            WHEN ecommerce.purchase_revenue_in_usd >= 100 THEN 'Medium_Value ($100-199)'
+            ELSE 'Standard_Value (Under $100)'
+        END AS value_tier
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        AND event_name = 'purchase'
+        AND ecommerce.transaction_id IS NOT NULL
+        -- LLM: Apply additional filters as specified
+)
+SELECT
+    value_tier,
+    COUNT(DISTINCT transaction_id) AS transaction_count,
+    COUNT(DISTINCT user_pseudo_id) AS unique_customers,
+    SUM(purchase_revenue_in_usd) AS total_revenue_usd,
+    ROUND(AVG(purchase_revenue_in_usd), 2) AS avg_order_value_usd,
+    ROUND(AVG(total_item_quantity), 2) AS avg_items_per_transaction,
+    ROUND(AVG(unique_items), 2) AS avg_unique_items_per_transaction,
+    ROUND(AVG(shipping_value_in_usd), 2) AS avg_shipping_per_transaction,
+    ROUND(
+        COUNT(DISTINCT transaction_id) * 100.0 / 
+        SUM(COUNT(DISTINCT transaction_id)) OVER (), 2
+    ) AS transaction_share_percentage,
+    ROUND(
+        SUM(purchase_revenue_in_usd) * 100.0 / 
+        SUM(SUM(purchase_revenue_in_usd)) OVER (), 2
+    ) AS revenue_contribution_percentage,
+    ROUND(
+        COUNT(DISTINCT user_pseudo_id) * 100.0 / 
+        SUM(COUNT(DISTINCT user_pseudo_id)) OVER (), 2
+    ) AS customer_share_percentage,
+    ROUND(
+        SUM(purchase_revenue_in_usd) / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS revenue_per_customer_in_tier
+FROM
+    transaction_analysis
+GROUP BY
+    value_tier
+ORDER BY
+    AVG(purchase_revenue_in_usd) DESC
@@ -0,0 +1,54 @@
+
+-- Analyzes session performance using last-click manual campaign attribution
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(session_traffic_source_last_click.manual_campaign.campaign_id, '(campaign_id_not_set)') AS last_click_campaign_id,
+    COALESCE(session_traffic_source_last_click.manual_campaign.campaign_name, '(campaign_name_not_set)') AS last_click_campaign_name,
+    COALESCE(session_traffic_source_last_click.manual_campaign.source, '(source_not_set)') AS last_click_source,
+    COALESCE(session_traffic_source_last_click.manual_campaign.medium, '(medium_not_set)') AS last_click_medium,
+    COUNT(DISTINCT user_pseudo_id) AS attributed_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS attributed_sessions,
+    COUNT(*) AS total_events,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions,
+    COUNTIF(event_name = 'page_view') AS page_views,
+    ROUND(
+        SAFE_DIVIDE(
+            COUNT(DISTINCT 
+                CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+                     THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                END
+            ),
+            COUNT(DISTINCT CONCAT(
+                user_pseudo_id, 
+                CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+            ))
+        ) * 100, 2
+    ) AS engagement_rate_percentage,
+    ROUND(
+        COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        )) * 100.0 / SUM(COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        ))) OVER (), 2
+    ) AS session_attribution_share_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND (session_traffic_source_last_click.manual_campaign.campaign_id IS NOT NULL 
+         OR session_traffic_source_last_click.manual_campaign.campaign_name IS NOT NULL)
+    -- LLM: Add additional filters as specified by user
+GROUP BY
+    last_click_campaign_id, last_click_campaign_name, last_click_source, last_click_medium
+ORDER BY
+    attributed_sessions DESC
+LIMIT {top_n}
@@ -0,0 +1,50 @@
+
+-- Analyzes creative performance using last-click attribution for optimization
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(session_traffic_source_last_click.manual_campaign.campaign_name, '(campaign_not_set)') AS last_click_campaign,
+    COALESCE(session_traffic_source_last_click.manual_campaign.term, '(term_not_set)') AS last_click_keyword_term,
+    COALESCE(session_traffic_source_last_click.manual_campaign.content, '(content_not_set)') AS last_click_content,
+    COALESCE(session_traffic_source_last_click.manual_campaign.creative_format, '(creative_format_not_set)') AS creative_format,
+    COALESCE(session_traffic_source_last_click.manual_campaign.marketing_tactic, '(marketing_tactic_not_set)') AS marketing_tactic,
+    COUNT(DISTINCT user_pseudo_id) AS attributed_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS attributed_sessions,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions,
+    COUNT(*) AS total_events,
+    ROUND(
+        COUNT(*) * 1.0 / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS avg_events_per_attributed_user,
+    ROUND(
+        SAFE_DIVIDE(
+            COUNT(DISTINCT 
+                CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+                     THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                END
+            ),
+            COUNT(DISTINCT CONCAT(
+                user_pseudo_id, 
+                CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+            ))
+        ) * 100, 2
+    ) AS engagement_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND (session_traffic_source_last_click.manual_campaign.term IS NOT NULL 
+         OR session_traffic_source_last_click.manual_campaign.content IS NOT NULL
+         OR session_traffic_source_last_click.manual_campaign.creative_format IS NOT NULL)
+    -- LLM: Include user-specified WHERE conditions
+GROUP BY
+    last_click_campaign, last_click_keyword_term, last_click_content, 
+    creative_format, marketing_tactic
+ORDER BY
+    attributed_sessions DESC
+LIMIT {top_n}
@@ -0,0 +1,30 @@
+
+-- Analyzes session distribution across traffic mediums
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH medium_data AS (
+    SELECT
+        user_pseudo_id,
+        (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS session_identifier,
+        ARRAY_AGG(
+            (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'medium') 
+            IGNORE NULLS ORDER BY event_timestamp
+        )[SAFE_OFFSET(0)] AS traffic_medium
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        -- LLM: Include user-specified filtering conditions
+    GROUP BY
+        user_pseudo_id,
+        session_identifier
+)
+SELECT
+    COALESCE(traffic_medium, '(undefined)') AS medium_type,
+    COUNT(DISTINCT CONCAT(user_pseudo_id, CAST(session_identifier AS STRING))) AS session_count
+FROM
+    medium_data
+GROUP BY
+    medium_type
+ORDER BY
+    session_count DESC
+LIMIT {top_n}
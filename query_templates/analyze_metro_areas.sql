@@ -0,0 +1,25 @@
+
+-- Analyzes user distribution across metropolitan/DMA areas
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(geo.country, 'Unknown_Country') AS country_name,
+    COALESCE(geo.metro, 'Unknown_Metro') AS metro_area,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNT(*) AS total_events,
+    COUNT(DISTINCT event_name) AS unique_event_types,
+    ROUND(COUNT(*) * 1.0 / NULLIF(COUNT(DISTINCT user_pseudo_id), 0), 2) AS avg_events_per_user
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND geo.metro IS NOT NULL
+    -- LLM: Add user-specified WHERE clauses
+GROUP BY
+    country_name, metro_area
+ORDER BY
+    unique_users DESC
+LIMIT {top_n}
@@ -0,0 +1,23 @@
+
+-- Analyzes mobile device characteristics including brand, model, and marketing name
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(device.mobile_brand_name, 'Unknown_Brand') AS mobile_brand,
+    COALESCE(device.mobile_model_name, 'Unknown_Model') AS mobile_model,
+    COALESCE(device.mobile_marketing_name, 'Unknown_Marketing_Name') AS marketing_name,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND device.category = 'mobile'
+    -- LLM: Include additional WHERE conditions based on user requirements
+GROUP BY
+    mobile_brand, mobile_model, marketing_name
+ORDER BY
+    unique_users DESC
+LIMIT {top_n}
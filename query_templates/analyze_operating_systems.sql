@@ -0,0 +1,22 @@
+
+-- Analyzes operating system distribution and version usage
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(device.operating_system, 'Unknown_OS') AS operating_system,
+    COALESCE(device.operating_system_version, 'Unknown_Version') AS os_version,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    ROUND(AVG(device.time_zone_offset_seconds / 3600), 1) AS avg_timezone_offset_hours
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Apply user-specified filtering conditions
+GROUP BY
+    operating_system, os_version
+ORDER BY
+    unique_users DESC
+LIMIT {top_n}
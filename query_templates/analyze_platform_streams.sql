@@ -0,0 +1,22 @@
+
+-- Analyzes platform distribution (web vs app) and associated data streams
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(platform, 'Unknown_Platform') AS platform_type,
+    COALESCE(CAST(stream_id AS STRING), 'Unknown_Stream') AS data_stream_id,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNT(*) AS total_events,
+    COUNT(DISTINCT event_name) AS unique_event_types
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Add user-specified WHERE conditions
+GROUP BY
+    platform_type, data_stream_id
+ORDER BY
+    unique_users DESC
@@ -0,0 +1,45 @@
+
+-- Analyzes product performance across categories and subcategories
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(items.item_category, '(category_not_set)') AS primary_category,
+    COALESCE(items.item_category2, '(subcategory_not_set)') AS secondary_category,
+    COALESCE(items.item_category3, '(subcategory3_not_set)') AS tertiary_category,
+    COUNT(DISTINCT items.item_id) AS unique_products_in_category,
+    SUM(items.quantity) AS total_units_sold,
+    SUM(items.item_revenue_in_usd) AS total_category_revenue_usd,
+    COUNT(DISTINCT user_pseudo_id) AS unique_buyers,
+    COUNT(DISTINCT ecommerce.transaction_id) AS transactions_with_category,
+    ROUND(AVG(items.price_in_usd), 2) AS avg_item_price_in_category,
+    ROUND(AVG(items.quantity), 2) AS avg_quantity_per_transaction,
+    ROUND(
+        SUM(items.item_revenue_in_usd) / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS revenue_per_buyer,
+    ROUND(
+        SUM(items.item_revenue_in_usd) / SUM(items.quantity), 2
+    ) AS revenue_per_unit,
+    ROUND(
+        COUNT(DISTINCT user_pseudo_id) * 100.0 / 
+        SUM(COUNT(DISTINCT user_pseudo_id)) OVER (), 2
+    ) AS buyer_share_percentage,
+    ROUND(
+        SUM(items.item_revenue_in_usd) * 100.0 / 
+        SUM(SUM(items.item_revenue_in_usd)) OVER (), 2
+    ) AS revenue_share_percentage,
+    ROUND(
+        SUM(items.quantity) * 100.0 / 
+        SUM(SUM(items.quantity)) OVER (), 2
+    ) AS unit_share_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`,
+    UNNEST(items) AS items
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND event_name = 'purchase'
+    AND items.item_id IS NOT NULL
+    -- LLM: Include user-specified WHERE conditions
+GROUP BY
+    primary_category, secondary_category, tertiary_category
+ORDER BY
+    total_category_revenue_usd DESC
+LIMIT {top_n}
@@ -0,0 +1,49 @@
+
+-- Analyzes product performance across different lists and positions for merchandising insights
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(items.item_list_name, '(no_list)') AS product_list_name,
+    COALESCE(items.item_list_id, '(no_list_id)') AS product_list_id,
+    CASE 
+        WHEN SAFE_CAST(items.item_list_index AS INT64) <= 3 THEN 'Top 3 Positions'
+        WHEN SAFE_CAST(items.item_list_index AS INT64) <= 10 THEN 'Positions 4-10'
+        WHEN SAFE_CAST(items.item_list_index AS INT64) <= 20 THEN 'Positions 11-20'
+        ELSE 'Position 20+'
+    END AS list_position_group,
+    COUNT(DISTINCT items.item_id) AS unique_products_in_list,
+    SUM(items.quantity) AS total_units_from_list,
+    SUM(items.item_revenue_in_usd) AS total_revenue_from_list_usd,
+    COUNT(DISTINCT user_pseudo_id) AS unique_buyers_from_list,
+    COUNT(DISTINCT ecommerce.transaction_id) AS transactions_from_list,
+    ROUND(AVG(SAFE_CAST(items.item_list_index AS INT64)), 1) AS avg_list_position,
+    ROUND(AVG(items.price_in_usd), 2) AS avg_item_price_in_list,
+    ROUND(
+        SUM(items.item_revenue_in_usd) / NULLIF(COUNT(DISTINCT user_pseudo_id), 0), 2
+    ) AS revenue_per_list_buyer,
+    ROUND(
+        SUM(items.item_revenue_in_usd) / NULLIF(SUM(items.quantity), 0), 2
+    ) AS revenue_per_unit_from_list,
+    ROUND(
+        COUNT(DISTINCT user_pseudo_id) * 100.0 / 
+        NULLIF(SUM(COUNT(DISTINCT user_pseudo_id)) OVER (), 0), 2
+    ) AS buyer_share_percentage,
+    ROUND(
+        SUM(items.item_revenue_in_usd) * 100.0 / 
+        NULLIF(SUM(SUM(items.item_revenue_in_usd)) OVER (), 0), 2
+    ) AS revenue_share_percentage,
+    COUNT(DISTINCT items.item_brand) AS brands_in_list,
+    COUNT(DISTINCT items.item_category) AS categories_in_list
+FROM
+    `{project_id}.{dataset_id}.events_*`,
+    UNNEST(items) AS items
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND event_name = 'purchase'
+    AND items.item_id IS NOT NULL
+    AND (items.item_list_name IS NOT NULL OR items.item_list_id IS NOT NULL)
+    -- LLM: Apply additional filters as needed
+GROUP BY
+    product_list_name, product_list_id, list_position_group
+ORDER BY
+    total_revenue_from_list_usd DESC
+LIMIT {top_n}
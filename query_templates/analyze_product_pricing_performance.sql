@@ -0,0 +1,54 @@
+
+-- Analyzes product performance across different price points
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    CASE 
+        WHEN items.price_in_usd < 10 THEN 'Under $10'
+        WHEN items.price_in_usd < 25 THEN '$10 - $24'
+        WHEN items.price_in_usd < 50 THEN '$25 - $49'
+        WHEN items.price_in_usd < 100 THEN '$50 - $99'
+        WHEN items.price_in_usd < 200 THEN '$100 - $199'
+        ELSE '$200+'
+    END AS price_range,
+    COUNT(DISTINCT items.item_id) AS unique_products_in_range,
+    SUM(items.quantity) AS total_units_sold,
+    SUM(items.item_revenue_in_usd) AS total_revenue_usd,
+    COUNT(DISTINCT user_pseudo_id) AS unique_buyers,
+    COUNT(DISTINCT ecommerce.transaction_id) AS transactions_in_range,
+    ROUND(AVG(items.price_in_usd), 2) AS avg_price_in_range,
+    ROUND(AVG(items.quantity), 2) AS avg_quantity_per_transaction,
+    ROUND(
+        SUM(items.item_revenue_in_usd) / SUM(items.quantity), 2
+    ) AS revenue_per_unit,
+    ROUND(
+        SUM(items.item_revenue_in_usd) / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS revenue_per_buyer,
+    ROUND(
+        SUM(items.quantity) * 100.0 / 
+        SUM(SUM(items.quantity)) OVER (), 2
+    ) AS unit_volume_share_percentage,
+    ROUND(
+        SUM(items.item_revenue_in_usd) * 100.0 / 
+        SUM(SUM(items.item_revenue_in_usd)) OVER (), 2
+    ) AS revenue_share_percentage,
+    COUNT(DISTINCT 
+        CASE WHEN items.coupon IS NOT NULL THEN ecommerce.transaction_id END
+    ) AS transactions_with_coupons,
+    ROUND(
+        COUNT(DISTINCT 
+            CASE WHEN items.coupon IS NOT NULL THEN ecommerce.transaction_id END
+        ) * 100.0 / COUNT(DISTINCT ecommerce.transaction_id), 2
+    ) AS coupon_usage_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`,
+    UNNEST(items) AS items
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND event_name = 'purchase'
+    AND items.item_id IS NOT NULL
+    AND items.price_in_usd IS NOT NULL
+    -- LLM: Include additional filtering conditions
+GROUP BY
+    price_range
+ORDER BY
+    AVG(items.price_in_usd)
@@ -0,0 +1,43 @@
+
+-- Analyzes the effectiveness of promotions and coupons on product sales
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(items.coupon, '(no_coupon)') AS coupon_code,
+    COALESCE(items.promotion_name, '(no_promotion)') AS promotion_name,
+    COALESCE(items.promotion_id, '(no_promotion_id)') AS promotion_id,
+    COUNT(DISTINCT items.item_id) AS unique_products_promoted,
+    COUNT(DISTINCT user_pseudo_id) AS unique_buyers_using_promotion,
+    COUNT(DISTINCT ecommerce.transaction_id) AS transactions_with_promotion,
+    SUM(items.quantity) AS total_promoted_units_sold,
+    SUM(items.item_revenue_in_usd) AS total_promoted_revenue_usd,
+    ROUND(AVG(items.price_in_usd), 2) AS avg_promoted_item_price,
+    ROUND(AVG(items.quantity), 2) AS avg_promoted_quantity_per_transaction,
+    ROUND(
+        SUM(items.item_revenue_in_usd) / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS revenue_per_promotion_user,
+    ROUND(
+        SUM(items.item_revenue_in_usd) / SUM(items.quantity), 2
+    ) AS revenue_per_promoted_unit,
+    ROUND(
+        COUNT(DISTINCT user_pseudo_id) * 100.0 / 
+        SUM(COUNT(DISTINCT user_pseudo_id)) OVER (), 2
+    ) AS user_share_percentage,
+    ROUND(
+        SUM(items.item_revenue_in_usd) * 100.0 / 
+        SUM(SUM(items.item_revenue_in_usd)) OVER (), 2
+    ) AS revenue_share_percentage,
+    COUNT(DISTINCT items.item_brand) AS brands_in_promotion,
+    COUNT(DISTINCT items.item_category) AS categories_in_promotion
+FROM
+    `{project_id}.{dataset_id}.events_*`,
+    UNNEST(items) AS items
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND event_name = 'purchase'
+    AND items.item_id IS NOT NULL
+    -- LLM: Apply additional filters as specified
+GROUP BY
+    coupon_code, promotion_name, promotion_id
+ORDER BY
+    total_promoted_revenue_usd DESC
+LIMIT {top_n}
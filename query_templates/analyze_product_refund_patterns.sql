@@ -0,0 +1,73 @@
+
+-- Analyzes product return patterns to identify potential quality or satisfaction issues
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH purchases AS (
+    SELECT
+        items.item_id,
+        items.item_name,
+        items.item_brand,
+        items.item_category,
+        SUM(items.quantity) AS total_purchased_quantity,
+        SUM(items.item_revenue_in_usd) AS total_purchase_revenue_usd,
+        COUNT(DISTINCT user_pseudo_id) AS buyers_of_item
+    FROM
+        `{project_id}.{dataset_id}.events_*`,
+        UNNEST(items) AS items
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        AND event_name = 'purchase'
+        AND items.item_id IS NOT NULL
+    GROUP BY
+        items.item_id, items.item_name, items.item_brand, items.item_category
+),
+refunds AS (
+    SELECT
+        items.item_id,
+        SUM(items.quantity) AS total_refunded_quantity,
+        SUM(items.item_refund_in_usd) AS total_refund_amount_usd,
+        COUNT(DISTINCT user_pseudo_id) AS users_returning_item
+    FROM
+        `{project_id}.{dataset_id}.events_*`,
+        UNNEST(items) AS items
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        AND event_name = 'refund'
+        AND items.item_id IS NOT NULL
+        AND items.item_refund_in_usd > 0
+    GROUP BY
+        items.item_id
+)
+SELECT
+    p.item_id,
+    p.item_name,
+    p.item_brand,
+    p.item_category,
+    p.total_purchased_quantity,
+    p.total_purchase_revenue_usd,
+    p.buyers_of_item,
+    COALESCE(r.total_refunded_quantity, 0) AS total_refunded_quantity,
+    COALESCE(r.total_refund_amount_usd, 0) AS total_refund_amount_usd,
+    COALESCE(r.users_returning_item, 0) AS users_returning_item,
+    ROUND(
+        COALESCE(r.total_refunded_quantity, 0) * 100.0 / NULLIF(p.total_purchased_quantity, 0), 2
+    ) AS unit_return_rate_percentage,
+    ROUND(
+        COALESCE(r.total_refund_amount_usd, 0) * 100.0 / NULLIF(p.total_purchase_revenue_usd, 0), 2
+    ) AS revenue_return_rate_percentage,
+    ROUND(
+        COALESCE(r.users_returning_item, 0) * 100.0 / NULLIF(p.buyers_of_item, 0), 2
+    ) AS buyer_return_rate_percentage,
+    CASE 
+        WHEN COALESCE(r.total_refunded_quantity, 0) * 100.0 / NULLIF(p.total_purchased_quantity, 0) > 10 THEN 'High_Return_Risk'
+        WHEN COALESCE(r.total_refunded_quantity, 0) * 100.0 / NULLIF(p.total_purchased_quantity, 0) > 5 THEN 'Medium_Return_Risk'
+        ELSE 'Low_Return_Risk'
+    END AS return_risk_category
+FROM
+    purchases p
+    LEFT JOIN refunds r ON p.item_id = r.item_id
+WHERE
+    p.total_purchased_quantity > 5  -- Filter for products with meaningful volume
+    -- LLM: Include additional WHERE conditions as needed
+ORDER BY
+    unit_return_rate_percentage DESC
+LIMIT {top_n}
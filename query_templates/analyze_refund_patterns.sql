@@ -0,0 +1,66 @@
+
+-- Analyzes refund patterns to understand return behavior and rates
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH purchases AS (
+    SELECT
+        ecommerce.transaction_id,
+        user_pseudo_id,
+        ecommerce.purchase_revenue_in_usd,
+        ecommerce.total_item_quantity,
+        PARSE_DATE('%Y%m%d', event_date) AS purchase_date
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        AND event_name = 'purchase'
+        AND ecommerce.transaction_id IS NOT NULL
+),
+refunds AS (
+    SELECT
+        ecommerce.transaction_id,
+        user_pseudo_id,
+        ecommerce.refund_value_in_usd,
+        PARSE_DATE('%Y%m%d', event_date) AS refund_date
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        AND event_name = 'refund'
+        AND ecommerce.transaction_id IS NOT NULL
+        AND ecommerce.refund_value_in_usd > 0
+)
+SELECT
+    -- Purchase metrics
+    COUNT(DISTINCT p.transaction_id) AS total_transactions,
+    SUM(p.purchase_revenue_in_usd) AS total_purchase_revenue_usd,
+    COUNT(DISTINCT p.user_pseudo_id) AS unique_buyers,
+    
+    -- Refund metrics  
+    COUNT(DISTINCT r.transaction_id) AS transactions_with_refunds,
+    COUNT(DISTINCT r.user_pseudo_id) AS users_requesting_refunds,
+    SUM(r.refund_value_in_usd) AS total_refund_amount_usd,
+    
+    -- Refund rates
+    ROUND(
+        COUNT(DISTINCT r.transaction_id) * 100.0 / 
+        COUNT(DISTINCT p.transaction_id), 2
+    ) AS transaction_refund_rate_percentage,
+    ROUND(
+        COUNT(DISTINCT r.user_pseudo_id) * 100.0 / 
+        COUNT(DISTINCT p.user_pseudo_id), 2
+    ) AS user_refund_rate_percentage,
+    ROUND(
+        SUM(r.refund_value_in_usd) * 100.0 / 
+        SUM(p.purchase_revenue_in_usd), 2
+    ) AS revenue_refund_rate_percentage,
+    
+    -- Average values
+    ROUND(AVG(r.refund_value_in_usd), 2) AS avg_refund_amount_usd,
+    ROUND(AVG(p.purchase_revenue_in_usd), 2) AS avg_purchase_amount_usd,
+    
+    -- Timing analysis
+    ROUND(AVG(DATE_DIFF(r.refund_date, p.purchase_date, DAY)), 1) AS avg_days_to_refund
+FROM
+    purchases p
+    LEFT JOIN refunds r ON p.transaction_id = r.transaction_id
+-- LLM: Add additional WHERE conditions as needed
@@ -0,0 +1,27 @@
+
+-- Analyzes user distribution across regions/states within countries
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(geo.country, 'Unknown_Country') AS country_name,
+    COALESCE(geo.region, 'Unknown_Region') AS region_state,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    ROUND(
+        COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        )) * 1.0 / NULLIF(COUNT(DISTINCT user_pseudo_id), 0), 2
+    ) AS avg_sessions_per_user
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Apply additional filters as needed
+GROUP BY
+    country_name, region_state
+ORDER BY
+    unique_users DESC
+LIMIT {top_n}
@@ -0,0 +1,50 @@
+
+-- Analyzes purchasing patterns between new and returning customers
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH user_purchase_history AS (
+    SELECT
+        user_pseudo_id,
+        COUNT(DISTINCT ecommerce.transaction_id) AS total_transactions,
+        MIN(PARSE_DATE('%Y%m%d', event_date)) AS first_purchase_date,
+        MAX(PARSE_DATE('%Y%m%d', event_date)) AS last_purchase_date,
+        SUM(ecommerce.purchase_revenue_in_usd) AS total_user_revenue,
+        AVG(ecommerce.purchase_revenue_in_usd) AS avg_order_value,
+        SUM(ecommerce.total_item_quantity) AS total_items_purchased
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        AND event_name = 'purchase'
+        AND ecommerce.transaction_id IS NOT NULL
+        -- LLM: Apply additional filters as needed
+    GROUP BY
+        user_pseudo_id
+)
+SELECT
+    CASE 
+        WHEN total_transactions = 1 THEN 'New_Buyer (1 transaction)'
+        WHEN total_transactions BETWEEN 2 AND 3 THEN 'Occasional_Buyer (2-3 transactions)'
+        WHEN total_transactions BETWEEN 4 AND 10 THEN 'Regular_Buyer (4-10 transactions)'
+        ELSE 'Loyal_Buyer (10+ transactions)'
+    END AS buyer_segment,
+    COUNT(DISTINCT user_pseudo_id) AS unique_buyers,
+    SUM(total_transactions) AS total_transactions_from_segment,
+    SUM(total_user_revenue) AS total_revenue_from_segment,
+    ROUND(AVG(avg_order_value), 2) AS avg_order_value_usd,
+    ROUND(AVG(total_user_revenue), 2) AS avg_customer_lifetime_value,
+    ROUND(AVG(total_items_purchased), 2) AS avg_items_per_customer,
+    ROUND(AVG(total_transactions), 2) AS avg_transactions_per_customer,
+    ROUND(
+        COUNT(DISTINCT user_pseudo_id) * 100.0 / 
+        SUM(COUNT(DISTINCT user_pseudo_id)) OVER (), 2
+    ) AS buyer_share_percentage,
+    ROUND(
+        SUM(total_user_revenue) * 100.0 / 
+        SUM(SUM(total_user_revenue)) OVER (), 2
+    ) AS revenue_contribution_percentage
+FROM
+    user_purchase_history
+GROUP BY
+    buyer_segment
+ORDER BY
+    total_revenue_from_segment DESC
@@ -0,0 +1,38 @@
+
+-- Analyzes the composition of total revenue including product, shipping, and tax
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COUNT(DISTINCT ecommerce.transaction_id) AS total_transactions,
+    SUM(ecommerce.purchase_revenue_in_usd) AS total_revenue_usd,
+    SUM(ecommerce.purchase_revenue_in_usd - COALESCE(ecommerce.shipping_value_in_usd, 0) - COALESCE(ecommerce.tax_value_in_usd, 0)) AS product_revenue_usd,
+    SUM(ecommerce.shipping_value_in_usd) AS shipping_revenue_usd,
+    SUM(ecommerce.tax_value_in_usd) AS tax_collected_usd,
+    ROUND(AVG(ecommerce.purchase_revenue_in_usd), 2) AS avg_total_order_value,
+    ROUND(AVG(ecommerce.purchase_revenue_in_usd - COALESCE(ecommerce.shipping_value_in_usd, 0) - COALESCE(ecommerce.tax_value_in_usd, 0)), 2) AS avg_product_value,
+    ROUND(AVG(ecommerce.shipping_value_in_usd), 2) AS avg_shipping_per_order,
+    ROUND(AVG(ecommerce.tax_value_in_usd), 2) AS avg_tax_per_order,
+    ROUND(
+        SUM(ecommerce.purchase_revenue_in_usd - COALESCE(ecommerce.shipping_value_in_usd, 0) - COALESCE(ecommerce.tax_value_in_usd, 0)) * 100.0 / 
+        SUM(ecommerce.purchase_revenue_in_usd), 2
+    ) AS product_revenue_percentage,
+    ROUND(
+        SUM(ecommerce.shipping_value_in_usd) * 100.0 / 
+        SUM(ecommerce.purchase_revenue_in_usd), 2
+    ) AS shipping_revenue_percentage,
+    ROUND(
+        SUM(ecommerce.tax_value_in_usd) * 100.0 / 
+        SUM(ecommerce.purchase_revenue_in_usd), 2
+    ) AS tax_percentage,
+    COUNT(CASE WHEN ecommerce.shipping_value_in_usd > 0 THEN 1 END) AS transactions_with_shipping,
+    COUNT(CASE WHEN ecommerce.tax_value_in_usd > 0 THEN 1 END) AS transactions_with_tax,
+    ROUND(
+        COUNT(CASE WHEN ecommerce.shipping_value_in_usd > 0 THEN 1 END) * 100.0 / 
+        COUNT(DISTINCT ecommerce.transaction_id), 2
+    ) AS shipping_charge_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND event_name = 'purchase'
+    AND ecommerce.transaction_id IS NOT NULL
+    -- LLM: Include additional filtering conditions
@@ -0,0 +1,54 @@
+
+-- Analyzes seasonal trends and monthly patterns in user behavior
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    FORMAT_DATE('%B', PARSE_DATE('%Y%m%d', event_date)) AS month_name,
+    FORMAT_DATE('%m', PARSE_DATE('%Y%m%d', event_date)) AS month_number,
+    FORMAT_DATE('%Y', PARSE_DATE('%Y%m%d', event_date)) AS year,
+    CASE 
+        WHEN FORMAT_DATE('%m', PARSE_DATE('%Y%m%d', event_date)) IN ('12', '01', '02') THEN 'Winter'
+        WHEN FORMAT_DATE('%m', PARSE_DATE('%Y%m%d', event_date)) IN ('03', '04', '05') THEN 'Spring'
+        WHEN FORMAT_DATE('%m', PARSE_DATE('%Y%m%d', event_date)) IN ('06', '07', '08') THEN 'Summer'
+        ELSE 'Fall'
+    END AS season,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNTIF(event_name = 'page_view') AS page_views,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+             THEN user_pseudo_id 
+        END
+    ) AS new_users,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions,
+    ROUND(
+        COUNT(DISTINCT user_pseudo_id) * 100.0 / SUM(COUNT(DISTINCT user_pseudo_id)) OVER (), 2
+    ) AS user_share_percentage,
+    ROUND(
+        SAFE_DIVIDE(
+            COUNT(DISTINCT 
+                CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+                     THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                END
+            ),
+            COUNT(DISTINCT CONCAT(
+                user_pseudo_id, 
+                CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+            ))
+        ) * 100, 2
+    ) AS engagement_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Apply additional filters as specified
+GROUP BY
+    month_name, month_number, year, season
+ORDER BY
+    year, month_number
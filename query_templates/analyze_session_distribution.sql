@@ -0,0 +1,23 @@
+
+-- Analyzes the distribution of session counts across users
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH user_session_data AS (
+    SELECT
+        user_pseudo_id,
+        MAX((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number')) 
+            OVER (PARTITION BY user_pseudo_id ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING) AS total_user_sessions
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        -- LLM: Add more WHERE conditions if user specifies filters
+)
+SELECT
+    total_user_sessions AS session_depth,
+    COUNT(DISTINCT user_pseudo_id) AS user_count
+FROM
+    user_session_data
+GROUP BY
+    total_user_sessions
+ORDER BY
+    total_user_sessions ASC
@@ -0,0 +1,27 @@
+
+-- Analyzes sessions based on their referring page or website
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH session_referrer_data AS (
+    SELECT
+        user_pseudo_id,
+        (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS session_identifier,
+        MAX((SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'page_referrer')) AS referring_page
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        -- LLM: Include user-specified WHERE conditions
+    GROUP BY
+        user_pseudo_id,
+        session_identifier
+)
+SELECT
+    COALESCE(referring_page, '(direct_entry)') AS session_referrer_source,
+    COUNT(DISTINCT CONCAT(user_pseudo_id, CAST(session_identifier AS STRING))) AS session_count
+FROM
+    session_referrer_data
+GROUP BY
+    session_referrer_source
+ORDER BY
+    session_count DESC
+LIMIT {top_n}
@@ -0,0 +1,31 @@
+
+-- Analyzes user acquisition across source/medium combinations for detailed attribution
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(traffic_source.source, '(source_not_set)') AS traffic_source_name,
+    COALESCE(traffic_source.medium, '(medium_not_set)') AS traffic_medium,
+    CONCAT(
+        COALESCE(traffic_source.source, '(source_not_set)'), 
+        ' / ', 
+        COALESCE(traffic_source.medium, '(medium_not_set)')
+    ) AS source_medium_combination,
+    COUNT(DISTINCT user_pseudo_id) AS acquired_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNT(*) AS total_events,
+    ROUND(
+        COUNT(*) * 1.0 / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS avg_events_per_user,
+    COUNT(DISTINCT event_name) AS unique_event_types
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Include additional filtering conditions
+GROUP BY
+    traffic_source_name, traffic_medium, source_medium_combination
+ORDER BY
+    acquired_users DESC
+LIMIT {top_n}
@@ -0,0 +1,20 @@
+
+-- Analyzes user distribution across source/medium combinations using traffic_source data
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    CONCAT(
+        COALESCE(traffic_source.source, '(direct_access)'), 
+        ' / ', 
+        COALESCE(traffic_source.medium, '(undefined)')
+    ) AS acquisition_channel,
+    COUNT(DISTINCT user_pseudo_id) AS user_count
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Add user-specified filters here
+GROUP BY
+    acquisition_channel
+ORDER BY
+    user_count DESC
+LIMIT {top_n}
@@ -0,0 +1,53 @@
+
+-- Provides detailed analysis of a specific marketing campaign's performance
+-- LLM: Replace {campaign_name}, {start_date} and {end_date} with user-specified values
+SELECT
+    traffic_source.name AS campaign_name,
+    COALESCE(traffic_source.source, '(source_not_set)') AS traffic_source_name,
+    COALESCE(traffic_source.medium, '(medium_not_set)') AS traffic_medium,
+    COUNT(DISTINCT user_pseudo_id) AS total_users,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+             THEN user_pseudo_id 
+        END
+    ) AS new_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNTIF(event_name = 'page_view') AS page_views,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions,
+    ROUND(
+        COUNTIF(event_name = 'page_view') * 1.0 / COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        )), 2
+    ) AS avg_page_views_per_session,
+    ROUND(
+        SAFE_DIVIDE(
+            COUNT(DISTINCT 
+                CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+                     THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                END
+            ),
+            COUNT(DISTINCT CONCAT(
+                user_pseudo_id, 
+                CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+            ))
+        ) * 100, 2
+    ) AS engagement_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND traffic_source.name = '{campaign_name}'
+    -- LLM: Include additional filters as specified
+GROUP BY
+    campaign_name, traffic_source_name, traffic_medium
+ORDER BY
+    total_users DESC
+LIMIT {top_n}
@@ -0,0 +1,35 @@
+
+-- Provides detailed geographic breakdown for a specific country
+-- LLM: Replace {country_name}, {start_date} and {end_date} with user-specified values
+SELECT
+    geo.country AS country_name,
+    COALESCE(geo.region, 'Unknown_Region') AS region_state,
+    COALESCE(geo.city, 'Unknown_City') AS city_name,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+             THEN user_pseudo_id 
+        END
+    ) AS new_users,
+    ROUND(
+        COUNT(DISTINCT 
+            CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+                 THEN user_pseudo_id 
+            END
+        ) * 100.0 / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS new_user_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND geo.country = '{country_name}'
+    -- LLM: Apply additional filters as specified
+GROUP BY
+    country_name, region_state, city_name
+ORDER BY
+    unique_users DESC
+LIMIT {top_n}
@@ -0,0 +1,45 @@
+
+-- Provides detailed analysis of a specific event including parameter breakdown
+-- LLM: Replace {event_name}, {start_date} and {end_date} with user-specified values
+WITH event_params_expanded AS (
+    SELECT
+        event_name,
+        user_pseudo_id,
+        (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS session_id,
+        event_timestamp,
+        event_value_in_usd,
+        param.key AS parameter_key,
+        param.value.string_value AS param_string_value,
+        param.value.int_value AS param_int_value,
+        param.value.float_value AS param_float_value,
+        param.value.double_value AS param_double_value
+    FROM
+        `{project_id}.{dataset_id}.events_*`,
+        UNNEST(event_params) AS param
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        AND event_name = '{event_name}'
+        -- LLM: Add additional WHERE conditions as needed
+)
+SELECT
+    event_name,
+    parameter_key,
+    COUNT(*) AS event_occurrences,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(user_pseudo_id, CAST(session_id AS STRING))) AS unique_sessions,
+    COUNT(DISTINCT param_string_value) AS unique_string_values,
+    COUNT(DISTINCT param_int_value) AS unique_int_values,
+    ROUND(AVG(param_int_value), 2) AS avg_int_value,
+    ROUND(AVG(param_float_value), 2) AS avg_float_value,
+    ROUND(AVG(param_double_value), 2) AS avg_double_value,
+    COUNT(DISTINCT 
+        CASE WHEN param_string_value IS NOT NULL THEN param_string_value END
+    ) AS non_null_string_values,
+    ROUND(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER (), 2) AS parameter_usage_percentage
+FROM
+    event_params_expanded
+GROUP BY
+    event_name, parameter_key
+ORDER BY
+    event_occurrences DESC
+LIMIT {top_n}
@@ -0,0 +1,36 @@
+
+-- Analyzes top-performing pages with comprehensive engagement metrics
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'page_location' AND event_name = 'page_view') AS page_url,
+    (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'page_title' AND event_name = 'page_view') AS page_title,
+    COUNTIF(event_name = 'page_view') AS page_views,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS unique_sessions,
+    ROUND(
+        COUNTIF(event_name = 'page_view') * 1.0 / NULLIF(COUNT(DISTINCT user_pseudo_id), 0), 2
+    ) AS avg_page_views_per_user,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions_with_page,
+    ROUND(
+        COUNTIF(event_name = 'page_view') * 100.0 / NULLIF(SUM(COUNTIF(event_name = 'page_view')) OVER (), 0), 2
+    ) AS page_view_share_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND event_name = 'page_view'
+    -- LLM: Add additional filters as specified by user
+GROUP BY
+    page_url, page_title
+HAVING
+    page_url IS NOT NULL
+ORDER BY
+    page_views DESC
+LIMIT {top_n}
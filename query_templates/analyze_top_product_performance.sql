@@ -0,0 +1,49 @@
+
+-- Analyzes top-performing products across key business metrics
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    items.item_id,
+    items.item_name,
+    items.item_brand,
+    items.item_category,
+    SUM(items.quantity) AS total_quantity_sold,
+    SUM(items.item_revenue_in_usd) AS total_item_revenue_usd,
+    COUNT(DISTINCT user_pseudo_id) AS unique_buyers,
+    COUNT(DISTINCT ecommerce.transaction_id) AS transactions_containing_item,
+    ROUND(AVG(items.price_in_usd), 2) AS avg_item_price_usd,
+    ROUND(AVG(items.quantity), 2) AS avg_quantity_per_transaction,
+    ROUND(
+        SUM(items.item_revenue_in_usd) / SUM(items.quantity), 2
+    ) AS revenue_per_unit_sold,
+    ROUND(
+        SUM(items.item_revenue_in_usd) / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS revenue_per_buyer,
+    ROUND(
+        SUM(items.quantity) * 100.0 / 
+        SUM(SUM(items.quantity)) OVER (), 2
+    ) AS quantity_share_percentage,
+    ROUND(
+        SUM(items.item_revenue_in_usd) * 100.0 / 
+        SUM(SUM(items.item_revenue_in_usd)) OVER (), 2
+    ) AS revenue_share_percentage,
+    COUNT(DISTINCT 
+        CASE WHEN items.coupon IS NOT NULL THEN ecommerce.transaction_id END
+    ) AS transactions_with_coupon,
+    ROUND(
+        COUNT(DISTINCT 
+            CASE WHEN items.coupon IS NOT NULL THEN ecommerce.transaction_id END
+        ) * 100.0 / COUNT(DISTINCT ecommerce.transaction_id), 2
+    ) AS coupon_usage_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`,
+    UNNEST(items) AS items
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND event_name = 'purchase'
+    AND items.item_id IS NOT NULL
+    -- LLM: Add additional filters as specified by user
+GROUP BY
+    items.item_id, items.item_name, items.item_brand, items.item_category
+ORDER BY
+    total_item_revenue_usd DESC
+LIMIT {top_n}
@@ -0,0 +1,48 @@
+
+-- Analyzes the completeness and quality of ecommerce transaction data
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COUNT(DISTINCT ecommerce.transaction_id) AS total_transactions,
+    
+    -- Data completeness checks
+    COUNT(CASE WHEN ecommerce.purchase_revenue_in_usd IS NOT NULL THEN 1 END) AS transactions_with_revenue_usd,
+    COUNT(CASE WHEN ecommerce.purchase_revenue IS NOT NULL THEN 1 END) AS transactions_with_revenue_local,
+    COUNT(CASE WHEN ecommerce.total_item_quantity IS NOT NULL THEN 1 END) AS transactions_with_item_quantity,
+    COUNT(CASE WHEN ecommerce.unique_items IS NOT NULL THEN 1 END) AS transactions_with_unique_items,
+    COUNT(CASE WHEN ecommerce.shipping_value_in_usd IS NOT NULL AND ecommerce.shipping_value_in_usd > 0 THEN 1 END) AS transactions_with_shipping,
+    COUNT(CASE WHEN ecommerce.tax_value_in_usd IS NOT NULL AND ecommerce.tax_value_in_usd > 0 THEN 1 END) AS transactions_with_tax,
+    
+    -- Data quality percentages
+    ROUND(
+        COUNT(CASE WHEN ecommerce.purchase_revenue_in_usd IS NOT NULL THEN 1 END) * 100.0 / 
+        COUNT(DISTINCT ecommerce.transaction_id), 2
+    ) AS revenue_completeness_percentage,
+    ROUND(
+        COUNT(CASE WHEN ecommerce.total_item_quantity IS NOT NULL THEN 1 END) * 100.0 / 
+        COUNT(DISTINCT ecommerce.transaction_id), 2
+    ) AS quantity_completeness_percentage,
+    
+    -- Value ranges for validation
+    MIN(ecommerce.purchase_revenue_in_usd) AS min_transaction_value,
+    MAX(ecommerce.purchase_revenue_in_usd) AS max_transaction_value,
+    ROUND(AVG(ecommerce.purchase_revenue_in_usd), 2) AS avg_transaction_value,
+    
+    -- Suspicious data detection
+    COUNT(CASE WHEN ecommerce.purchase_revenue_in_usd <= 0 THEN 1 END) AS transactions_with_zero_or_negative_revenue,
+    COUNT(CASE WHEN ecommerce.total_item_quantity <= 0 THEN 1 END) AS transactions_with_zero_or_negative_quantity,
+    COUNT(CASE WHEN ecommerce.purchase_revenue_in_usd > 10000 THEN 1 END) AS transactions_over_10k_usd,
+    
+    -- Overall data quality score
+    ROUND(
+        (COUNT(CASE WHEN ecommerce.purchase_revenue_in_usd IS NOT NULL 
+                    AND ecommerce.total_item_quantity IS NOT NULL 
+                    AND ecommerce.purchase_revenue_in_usd > 0 
+                    AND ecommerce.total_item_quantity > 0 
+               THEN 1 END) * 100.0) / COUNT(DISTINCT ecommerce.transaction_id), 2
+    ) AS overall_data_quality_score
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND event_name = 'purchase'
+    -- LLM: Apply additional filters as specified
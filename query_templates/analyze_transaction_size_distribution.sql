@@ -0,0 +1,44 @@
+
+-- Analyzes distribution of transaction sizes and order values for business insights
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    CASE 
+        WHEN ecommerce.purchase_revenue_in_usd < 25 THEN 'Under $25'
+        WHEN ecommerce.purchase_revenue_in_usd < 50 THEN '$25 - $49'
+        WHEN ecommerce.purchase_revenue_in_usd < 100 THEN '$50 - $99'
+        WHEN ecommerce.purchase_revenue_in_usd < 200 THEN '$100 - $199'
+        WHEN ecommerce.purchase_revenue_in_usd < 500 THEN '$200 - $499'
+        ELSE '$500+'
+    END AS order_value_range,
+    CASE 
+        WHEN ecommerce.total_item_quantity = 1 THEN '1 Item'
+        WHEN ecommerce.total_item_quantity BETWEEN 2 AND 3 THEN '2-3 Items'
+        WHEN ecommerce.total_item_quantity BETWEEN 4 AND 5 THEN '4-5 Items'
+        WHEN ecommerce.total_item_quantity BETWEEN 6 AND 10 THEN '6-10 Items'
+        ELSE '10+ Items'
+    END AS quantity_range,
+    COUNT(DISTINCT ecommerce.transaction_id) AS transaction_count,
+    COUNT(DISTINCT user_pseudo_id) AS unique_buyers,
+    SUM(ecommerce.purchase_revenue_in_usd) AS total_revenue_usd,
+    SUM(ecommerce.total_item_quantity) AS total_items,
+    ROUND(AVG(ecommerce.purchase_revenue_in_usd), 2) AS avg_order_value_usd,
+    ROUND(AVG(ecommerce.total_item_quantity), 2) AS avg_items_per_order,
+    ROUND(
+        COUNT(DISTINCT ecommerce.transaction_id) * 100.0 / 
+        SUM(COUNT(DISTINCT ecommerce.transaction_id)) OVER (), 2
+    ) AS transaction_share_percentage,
+    ROUND(
+        SUM(ecommerce.purchase_revenue_in_usd) * 100.0 / 
+        SUM(SUM(ecommerce.purchase_revenue_in_usd)) OVER (), 2
+    ) AS revenue_share_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND event_name = 'purchase'
+    AND ecommerce.transaction_id IS NOT NULL
+    -- LLM: Include user-specified WHERE conditions
+GROUP BY
+    order_value_range, quantity_range
+ORDER BY
+    AVG(ecommerce.purchase_revenue_in_usd) DESC
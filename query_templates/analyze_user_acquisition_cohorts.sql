@@ -0,0 +1,17 @@
+
+-- Analyzes users by their acquisition date (first touch)
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    DATE(TIMESTAMP_MICROS(user_first_touch_timestamp)) AS acquisition_date,
+    COUNT(DISTINCT user_pseudo_id) AS new_users_acquired,
+    COUNT(DISTINCT CASE WHEN is_active_user IS TRUE THEN user_pseudo_id END) AS active_users_acquired
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND user_first_touch_timestamp IS NOT NULL
+    -- LLM: Apply user-specified filters
+GROUP BY
+    acquisition_date
+ORDER BY
+    acquisition_date DESC
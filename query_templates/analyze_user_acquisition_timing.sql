@@ -0,0 +1,35 @@
+
+-- Analyzes user acquisition timing based on first touch timestamps
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    DATE(TIMESTAMP_MICROS(user_first_touch_timestamp)) AS first_touch_date,
+    FORMAT_DATE('%A', DATE(TIMESTAMP_MICROS(user_first_touch_timestamp))) AS first_touch_day_of_week,
+    DATE_TRUNC(DATE(TIMESTAMP_MICROS(user_first_touch_timestamp)), WEEK(SUNDAY)) AS first_touch_week,
+    DATE_TRUNC(DATE(TIMESTAMP_MICROS(user_first_touch_timestamp)), MONTH) AS first_touch_month,
+    COUNT(DISTINCT user_pseudo_id) AS users_acquired,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions_from_cohort,
+    COUNTIF(event_name = 'page_view') AS page_views_from_cohort,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions_from_cohort,
+    ROUND(
+        COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        )) * 1.0 / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS avg_sessions_per_acquired_user
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND user_first_touch_timestamp IS NOT NULL
+    -- LLM: Include additional filtering conditions
+GROUP BY
+    first_touch_date, first_touch_day_of_week, first_touch_week, first_touch_month
+ORDER BY
+    first_touch_date DESC
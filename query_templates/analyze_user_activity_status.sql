@@ -0,0 +1,19 @@
+
+-- Analyzes users by their activity status (active/inactive)
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    CASE 
+        WHEN is_active_user IS TRUE THEN 'Active_Users'
+        WHEN is_active_user IS FALSE THEN 'Inactive_Users'
+        ELSE 'Unknown_Status'
+    END AS activity_status,
+    COUNT(DISTINCT user_pseudo_id) AS user_count
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Add additional filters as specified by user
+GROUP BY
+    activity_status
+ORDER BY
+    user_count DESC
@@ -0,0 +1,21 @@
+
+-- Analyzes user lifetime value including revenue and currency breakdown
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    user_ltv.currency AS revenue_currency,
+    COUNT(DISTINCT user_pseudo_id) AS users_with_ltv,
+    ROUND(AVG(user_ltv.revenue), 2) AS avg_ltv_revenue,
+    ROUND(SUM(user_ltv.revenue), 2) AS total_ltv_revenue,
+    MIN(user_ltv.revenue) AS min_ltv_revenue,
+    MAX(user_ltv.revenue) AS max_ltv_revenue
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND user_ltv.revenue IS NOT NULL
+    -- LLM: Include additional WHERE conditions based on user requirements
+GROUP BY
+    revenue_currency
+ORDER BY
+    total_ltv_revenue DESC
+LIMIT {top_n}
@@ -0,0 +1,40 @@
+
+-- Analyzes common page-to-page navigation patterns in user journeys
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH page_sequences AS (
+    SELECT
+        user_pseudo_id,
+        (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS session_id,
+        (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'page_location') AS current_page,
+        LAG((SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'page_location')) OVER (
+            PARTITION BY user_pseudo_id, (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') 
+            ORDER BY event_timestamp
+        ) AS previous_page,
+        event_timestamp
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        AND event_name = 'page_view'
+        -- LLM: Apply additional filters as specified
+)
+SELECT
+    COALESCE(previous_page, '(session_start)') AS from_page,
+    current_page AS to_page,
+    COUNT(DISTINCT CONCAT(user_pseudo_id, CAST(session_id AS STRING))) AS sessions_with_transition,
+    COUNT(*) AS total_transitions,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users_making_transition,
+    ROUND(
+        COUNT(*) * 100.0 / SUM(COUNT(*)) OVER (), 2
+    ) AS transition_share_percentage
+FROM
+    page_sequences
+WHERE
+    current_page IS NOT NULL
+GROUP BY
+    from_page, to_page
+HAVING
+    total_transitions >= 10  -- Filter for meaningful patterns
+ORDER BY
+    total_transitions DESC
+LIMIT {top_n}
@@ -0,0 +1,24 @@
+
+-- Analyzes when specific user properties were last set/updated
+-- LLM: Replace {property_key}, {start_date} and {end_date} with user-specified values
+SELECT
+    DATE(TIMESTAMP_MICROS((SELECT value.set_timestamp_micros FROM UNNEST(user_properties) WHERE key = '{property_key}'))) AS property_set_date,
+    COUNT(DISTINCT user_pseudo_id) AS users_with_property,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(user_properties) WHERE key = '{property_key}') IS NOT NULL
+             OR (SELECT value.int_value FROM UNNEST(user_properties) WHERE key = '{property_key}') IS NOT NULL
+             OR (SELECT value.float_value FROM UNNEST(user_properties) WHERE key = '{property_key}') IS NOT NULL
+             OR (SELECT value.double_value FROM UNNEST(user_properties) WHERE key = '{property_key}') IS NOT NULL
+             THEN user_pseudo_id
+        END
+    ) AS users_with_property_value
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND EXISTS (SELECT 1 FROM UNNEST(user_properties) WHERE key = '{property_key}')
+    -- LLM: Include user-specified WHERE conditions
+GROUP BY
+    property_set_date
+ORDER BY
+    property_set_date DESC
@@ -0,0 +1,37 @@
+
+-- Analyzes user acquisition based on the referring page from their first session
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH referrer_prep AS (
+    SELECT
+        user_pseudo_id,
+        (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS session_identifier,
+        MAX((SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'page_referrer')) AS referring_page
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        -- LLM: Add additional filters as specified by user
+    GROUP BY
+        user_pseudo_id,
+        session_identifier
+),
+first_session_referrer AS (
+    SELECT
+        user_pseudo_id,
+        session_identifier,
+        referring_page,
+        RANK() OVER (PARTITION BY user_pseudo_id ORDER BY session_identifier) AS session_rank
+    FROM
+        referrer_prep
+    QUALIFY session_rank = 1
+)
+SELECT
+    COALESCE(referring_page, '(direct_entry)') AS user_referrer_source,
+    COUNT(DISTINCT user_pseudo_id) AS user_count
+FROM
+    first_session_referrer
+GROUP BY
+    user_referrer_source
+ORDER BY
+    user_count DESC
+LIMIT {top_n}
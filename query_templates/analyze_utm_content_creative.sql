@@ -0,0 +1,47 @@
+
+-- Analyzes UTM content performance for creative testing and optimization
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(collected_traffic_source.manual_content, '(utm_content_not_set)') AS utm_content,
+    COALESCE(collected_traffic_source.manual_campaign_name, '(campaign_not_set)') AS utm_campaign_name,
+    COALESCE(collected_traffic_source.manual_creative_format, '(creative_format_not_set)') AS creative_format,
+    COALESCE(collected_traffic_source.manual_marketing_tactic, '(marketing_tactic_not_set)') AS marketing_tactic,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNT(*) AS total_events,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions,
+    ROUND(
+        COUNT(*) * 1.0 / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS avg_events_per_user,
+    ROUND(
+        SAFE_DIVIDE(
+            COUNT(DISTINCT 
+                CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+                     THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                END
+            ),
+            COUNT(DISTINCT CONCAT(
+                user_pseudo_id, 
+                CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+            ))
+        ) * 100, 2
+    ) AS engagement_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND (collected_traffic_source.manual_content IS NOT NULL 
+         OR collected_traffic_source.manual_creative_format IS NOT NULL)
+    -- LLM: Include additional filtering conditions
+GROUP BY
+    utm_content, utm_campaign_name, creative_format, marketing_tactic
+ORDER BY
+    unique_users DESC
+LIMIT {top_n}
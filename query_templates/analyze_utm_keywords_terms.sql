@@ -0,0 +1,46 @@
+
+-- Analyzes UTM term/keyword performance for search and keyword-based campaigns
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(collected_traffic_source.manual_term, '(utm_term_not_set)') AS utm_keyword_term,
+    COALESCE(collected_traffic_source.manual_source, '(utm_source_not_set)') AS utm_source,
+    COALESCE(collected_traffic_source.manual_medium, '(utm_medium_not_set)') AS utm_medium,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+             THEN user_pseudo_id 
+        END
+    ) AS new_users,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions,
+    ROUND(
+        SAFE_DIVIDE(
+            COUNT(DISTINCT 
+                CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+                     THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                END
+            ),
+            COUNT(DISTINCT CONCAT(
+                user_pseudo_id, 
+                CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+            ))
+        ) * 100, 2
+    ) AS engagement_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND collected_traffic_source.manual_term IS NOT NULL
+    -- LLM: Apply additional filters as needed
+GROUP BY
+    utm_keyword_term, utm_source, utm_medium
+ORDER BY
+    unique_users DESC
+LIMIT {top_n}
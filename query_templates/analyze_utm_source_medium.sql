@@ -0,0 +1,43 @@
+
+-- Analyzes performance across UTM source and medium combinations
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COALESCE(collected_traffic_source.manual_source, '(utm_source_not_set)') AS utm_source,
+    COALESCE(collected_traffic_source.manual_medium, '(utm_medium_not_set)') AS utm_medium,
+    CONCAT(
+        COALESCE(collected_traffic_source.manual_source, '(utm_source_not_set)'), 
+        ' / ', 
+        COALESCE(collected_traffic_source.manual_medium, '(utm_medium_not_set)')
+    ) AS utm_source_medium,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNTIF(event_name = 'page_view') AS page_views,
+    COUNT(DISTINCT collected_traffic_source.manual_campaign_name) AS campaign_count,
+    ROUND(
+        COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        )) * 1.0 / NULLIF(COUNT(DISTINCT user_pseudo_id), 0), 2
+    ) AS avg_sessions_per_user,
+    ROUND(
+        COUNTIF(event_name = 'page_view') * 1.0 / NULLIF(COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        )), 0), 2
+    ) AS avg_page_views_per_session
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    AND
+   (collected_traffic_source.manual_source IS NOT NULL 
+         OR collected_traffic_source.manual_medium IS NOT NULL)
+    -- LLM: Include user-specified WHERE conditions
+GROUP BY
+    utm_source, utm_medium, utm_source_medium
+ORDER BY
+    unique_users DESC
+LIMIT {top_n}
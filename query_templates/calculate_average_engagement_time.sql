@@ -0,0 +1,32 @@
+
+-- Calculates the average engagement time for sessions that showed engagement
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH session_engagement_data AS (
+    SELECT
+        user_pseudo_id,
+        (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS session_identifier,
+        MAX((SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged')) AS is_engaged,
+        SUM((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'engagement_time_msec')) / 1000 AS engagement_seconds
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        -- LLM: Add user-specified filters here
+    GROUP BY
+        user_pseudo_id,
+        session_identifier
+)
+SELECT
+    ROUND(
+        SAFE_DIVIDE(
+            SUM(engagement_seconds),
+            COUNT(DISTINCT 
+                CASE WHEN is_engaged = '1' 
+                     THEN CONCAT(user_pseudo_id, CAST(session_identifier AS STRING))
+                     ELSE NULL 
+                END
+            )
+        ), 2
+    ) AS avg_engagement_time_seconds
+FROM
+    session_engagement_data
@@ -0,0 +1,24 @@
+
+-- Calculates the average duration of sessions based on first and last event timestamps
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH session_duration_data AS (
+    SELECT
+        CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        ) AS session_identifier,
+        (MAX(event_timestamp) - MIN(event_timestamp)) / 1000000 AS duration_seconds
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        -- LLM: Include user-specified filters
+    GROUP BY
+        session_identifier
+)
+SELECT
+    ROUND(
+        SUM(duration_seconds) / COUNT(DISTINCT session_identifier), 2
+    ) AS avg_session_duration_seconds
+FROM
+    session_duration_data
@@ -0,0 +1,17 @@
+
+-- Calculates the average number of engaged sessions per individual user
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    ROUND(
+        COUNT(DISTINCT 
+            CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+                 THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                 ELSE NULL 
+            END
+        ) / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS avg_engaged_sessions_per_user
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Apply user-specified filters here
@@ -0,0 +1,18 @@
+
+-- Calculates the average count of a specific event type per session
+-- LLM: Replace {event_name}, {start_date} and {end_date} with user-specified values
+SELECT
+    ROUND(
+        SAFE_DIVIDE(
+            COUNTIF(event_name = '{event_name}'),
+            COUNT(DISTINCT CONCAT(
+                user_pseudo_id, 
+                CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+            ))
+        ), 2
+    ) AS avg_events_per_session
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Add additional WHERE conditions as specified
@@ -0,0 +1,12 @@
+
+-- Calculates the average count of a specific event type per user
+-- LLM: Replace {event_name}, {start_date} and {end_date} with user-specified values
+SELECT
+    ROUND(
+        COUNTIF(event_name = '{event_name}') / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS avg_events_per_user
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Add additional WHERE conditions as needed
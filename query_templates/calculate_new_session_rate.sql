@@ -0,0 +1,17 @@
+
+-- Calculates the percentage of sessions that are from first-time users
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    ROUND(
+        COUNT(DISTINCT 
+            CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+                 THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                 ELSE NULL 
+            END
+        ) / COUNT(DISTINCT CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))) * 100, 2
+    ) AS new_session_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Apply additional filters based on user requirements
@@ -0,0 +1,17 @@
+
+-- Calculates the percentage of first-time users relative to total users
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    ROUND(
+        COUNT(DISTINCT 
+            CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+                 THEN user_pseudo_id 
+                 ELSE NULL 
+            END
+        ) / COUNT(DISTINCT user_pseudo_id) * 100, 2
+    ) AS new_user_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Include additional filters as specified by user
@@ -0,0 +1,24 @@
+
+-- Calculates the average number of page views per session
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH session_pageview_data AS (
+    SELECT
+        CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        ) AS session_identifier,
+        COUNTIF(event_name = 'page_view') AS page_views
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        -- LLM: Add additional WHERE clauses based on user requirements
+    GROUP BY
+        session_identifier
+)
+SELECT
+    ROUND(
+        SUM(page_views) / COUNT(DISTINCT session_identifier), 2
+    ) AS avg_pages_per_session
+FROM
+    session_pageview_data
@@ -0,0 +1,13 @@
+
+-- Calculates the average number of sessions per individual user
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    ROUND(
+        COUNT(DISTINCT CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))) 
+        / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS avg_sessions_per_user
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Include user-specified filtering conditions
@@ -0,0 +1,10 @@
+
+-- Calculates the total count of unique users
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COUNT(DISTINCT user_pseudo_id) AS unique_users
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Add additional WHERE clauses based on user filters (device, location, etc.)
@@ -0,0 +1,88 @@
+
+-- Classifies sessions into default channel groups based on attribution data
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH session_event_attribution AS (
+    SELECT
+        user_pseudo_id,
+        (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS session_identifier,
+        FIRST_VALUE((SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'source') IGNORE NULLS) 
+            OVER (PARTITION BY user_pseudo_id, (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') ORDER BY event_timestamp ASC) AS session_source,
+        FIRST_VALUE((SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'medium') IGNORE NULLS) 
+            OVER (PARTITION BY user_pseudo_id, (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') ORDER BY event_timestamp ASC) AS session_medium,
+        FIRST_VALUE((SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'campaign') IGNORE NULLS) 
+            OVER (PARTITION BY user_pseudo_id, (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') ORDER BY event_timestamp ASC) AS session_campaign
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+        AND (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') IS NOT NULL
+),
+distinct_sessions AS (
+    SELECT DISTINCT
+        user_pseudo_id,
+        session_identifier,
+        session_source,
+        session_medium,
+        session_campaign
+    FROM session_event_attribution
+)
+SELECT
+    CASE
+        WHEN (session_source IS NULL OR session_source = '(direct)') 
+             AND (session_medium IS NULL OR session_medium IN ('(not set)', '(none)')) 
+             THEN 'Direct'
+        WHEN session_campaign LIKE '%cross-network%' 
+             THEN 'Cross-network'
+        WHEN (REGEXP_CONTAINS(session_source, 'alibaba|amazon|google shopping|shopify|etsy|ebay|stripe|walmart|bunnings|jbhifi|harveynorman|kogan|theiconic|catch')
+              OR REGEXP_CONTAINS(session_campaign, r'^(.*(([^a-df-z]|^)shop|shopping).*)$'))
+             AND REGEXP_CONTAINS(session_medium, r'^(.*cp.*|ppc|retargeting|paid.*)$') 
+             THEN 'Paid Shopping'
+        WHEN REGEXP_CONTAINS(session_source, 'bing|duckduckgo|google|yahoo') 
+             AND REGEXP_CONTAINS(session_medium, r'^(.*cp.*|ppc|retargeting|paid.*)$') 
+             THEN 'Paid Search'
+        WHEN REGEXP_CONTAINS(session_source, 'badoo|facebook|fb|instagram|linkedin|pinterest|tiktok|twitter|whatsapp')
+             AND REGEXP_CONTAINS(session_medium, r'^(.*cp.*|ppc|retargeting|paid.*)$') 
+             THEN 'Paid Social'
+        WHEN REGEXP_CONTAINS(session_source, 'dailymotion|disneyplus|netflix|youtube|vimeo|twitch|stan|binge|kayo|9now|7plus|sbsondemand') 
+             AND REGEXP_CONTAINS(session_medium, r'^(.*cp.*|ppc|retargeting|paid.*)$') 
+             THEN 'Paid Video'
+        WHEN session_medium IN ('display', 'banner', 'expandable', 'interstitial', 'cpm') 
+             THEN 'Display'
+        WHEN REGEXP_CONTAINS(session_medium, r'^(.*cp.*|ppc|retargeting|paid.*)$') 
+             THEN 'Paid Other'
+        WHEN REGEXP_CONTAINS(session_source, 'alibaba|amazon|google shopping|shopify|etsy|ebay|stripe|walmart|bunnings|jbhifi|harveynorman|kogan|theiconic|catch') 
+             OR REGEXP_CONTAINS(session_campaign, r'^(.*(([^a-df-z]|^)shop|shopping).*)$') 
+             THEN 'Organic Shopping'
+        WHEN REGEXP_CONTAINS(session_source, 'badoo|facebook|fb|instagram|linkedin|pinterest|tiktok|twitter|whatsapp') 
+             OR session_medium IN ('social', 'social-network', 'social-media', 'sm', 'social network', 'social media') 
+             THEN 'Organic Social'
+        WHEN REGEXP_CONTAINS(session_source, 'dailymotion|disneyplus|netflix|youtube|vimeo|twitch|stan|binge|kayo|9now|7plus|sbsondemand') 
+             OR REGEXP_CONTAINS(session_medium, r'^(.*video.*)$') 
+             THEN 'Organic Video'
+        WHEN REGEXP_CONTAINS(session_source, 'bing|duckduckgo|google|yahoo') 
+             OR session_medium = 'organic' 
+             THEN 'Organic Search'
+        WHEN session_medium IN ('referral', 'app', 'link') 
+             THEN 'Referral'
+        WHEN REGEXP_CONTAINS(session_source, 'email|e-mail|e_mail|e mail') 
+             OR REGEXP_CONTAINS(session_medium, 'email|e-mail|e_mail|e mail') 
+             THEN 'Email'
+        WHEN session_medium = 'affiliate' 
+             THEN 'Affiliates'
+        WHEN session_medium = 'audio' 
+             THEN 'Audio'
+        WHEN session_source = 'sms' OR session_medium = 'sms' 
+             THEN 'SMS'
+        WHEN session_medium LIKE '%push' 
+             OR REGEXP_CONTAINS(session_medium, 'mobile|notification') 
+             OR session_source = 'firebase' 
+             THEN 'Mobile Push Notifications'
+        ELSE 'Unassigned'
+    END AS `Session Channel`,
+    COUNT(DISTINCT CONCAT(user_pseudo_id, CAST(session_identifier AS STRING))) AS `Sessions`
+FROM
+    distinct_sessions
+GROUP BY
+    `Session Channel`
+ORDER BY
+    `Sessions` DESC
@@ -0,0 +1,76 @@
+
+-- Classifies users into default channel groups based on traffic source attribution
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+WITH first_touch_attribution AS (
+    SELECT
+        user_pseudo_id,
+        FIRST_VALUE(traffic_source.source) OVER (PARTITION BY user_pseudo_id ORDER BY event_timestamp ASC) AS first_user_source,
+        FIRST_VALUE(traffic_source.medium) OVER (PARTITION BY user_pseudo_id ORDER BY event_timestamp ASC) AS first_user_medium,
+        FIRST_VALUE(traffic_source.name) OVER (PARTITION BY user_pseudo_id ORDER BY event_timestamp ASC) AS first_user_campaign,
+        ROW_NUMBER() OVER (PARTITION BY user_pseudo_id ORDER BY event_timestamp ASC) as user_event_rank
+    FROM
+        `{project_id}.{dataset_id}.events_*`
+    WHERE
+        _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+)
+SELECT
+    CASE
+        WHEN (first_user_source IS NULL OR first_user_source = '(direct)') 
+             AND (first_user_medium IS NULL OR first_user_medium IN ('(not set)', '(none)')) 
+             THEN 'Direct'
+        WHEN first_user_campaign LIKE '%cross-network%' 
+             THEN 'Cross-network'
+        WHEN (REGEXP_CONTAINS(first_user_source, 'alibaba|amazon|google shopping|shopify|etsy|ebay|stripe|walmart|bunnings|jbhifi|harveynorman|kogan|theiconic|catch')
+              OR REGEXP_CONTAINS(first_user_campaign, r'^(.*(([^a-df-z]|^)shop|shopping).*)$'))
+             AND REGEXP_CONTAINS(first_user_medium, r'^(.*cp.*|ppc|retargeting|paid.*)$') 
+             THEN 'Paid Shopping'
+        WHEN REGEXP_CONTAINS(first_user_source, 'bing|duckduckgo|google|yahoo') 
+             AND REGEXP_CONTAINS(first_user_medium, r'^(.*cp.*|ppc|retargeting|paid.*)$') 
+             THEN 'Paid Search'
+        WHEN REGEXP_CONTAINS(first_user_source, 'badoo|facebook|fb|instagram|linkedin|pinterest|tiktok|twitter|whatsapp')
+             AND REGEXP_CONTAINS(first_user_medium, r'^(.*cp.*|ppc|retargeting|paid.*)$') 
+             THEN 'Paid Social'
+        WHEN REGEXP_CONTAINS(first_user_source, 'dailymotion|disneyplus|netflix|youtube|vimeo|twitch|stan|binge|kayo|9now|7plus|sbsondemand') 
+             AND REGEXP_CONTAINS(first_user_medium, r'^(.*cp.*|ppc|retargeting|paid.*)$') 
+             THEN 'Paid Video'
+        WHEN first_user_medium IN ('display', 'banner', 'expandable', 'interstitial', 'cpm') 
+             THEN 'Display'
+        WHEN REGEXP_CONTAINS(first_user_medium, r'^(.*cp.*|ppc|retargeting|paid.*)$') 
+             THEN 'Paid Other'
+        WHEN REGEXP_CONTAINS(first_user_source, 'alibaba|amazon|google shopping|shopify|etsy|ebay|stripe|walmart|bunnings|jbhifi|harveynorman|kogan|theiconic|catch') 
+             OR REGEXP_CONTAINS(first_user_campaign, r'^(.*(([^a-df-z]|^)shop|shopping).*)$') 
+             THEN 'Organic Shopping'
+        WHEN REGEXP_CONTAINS(first_user_source, 'badoo|facebook|fb|instagram|linkedin|pinterest|tiktok|twitter|whatsapp') 
+             OR first_user_medium IN ('social', 'social-network', 'social-media', 'sm', 'social network', 'social media') 
+             THEN 'Organic Social'
+        WHEN REGEXP_CONTAINS(first_user_source, 'dailymotion|disneyplus|netflix|youtube|vimeo|twitch|stan|binge|kayo|9now|7plus|sbsondemand') 
+             OR REGEXP_CONTAINS(first_user_medium, r'^(.*video.*)$') 
+             THEN 'Organic Video'
+        WHEN REGEXP_CONTAINS(first_user_source, 'bing|duckduckgo|google|yahoo') 
+             OR first_user_medium = 'organic' 
+             THEN 'Organic Search'
+        WHEN first_user_medium IN ('referral', 'app', 'link') 
+             THEN 'Referral'
+        WHEN REGEXP_CONTAINS(first_user_source, 'email|e-mail|e_mail|e mail') 
+             OR REGEXP_CONTAINS(first_user_medium, 'email|e-mail|e_mail|e mail') 
+             THEN 'Email'
+        WHEN first_user_medium = 'affiliate' 
+             THEN 'Affiliates'
+        WHEN first_user_medium = 'audio' 
+             THEN 'Audio'
+        WHEN first_user_source = 'sms' OR first_user_medium = 'sms' 
+             THEN 'SMS'
+        WHEN first_user_medium LIKE '%push' 
+             OR REGEXP_CONTAINS(first_user_medium, 'mobile|notification') 
+             OR first_user_source = 'firebase' 
+             THEN 'Mobile Push Notifications'
+        ELSE 'Unassigned'
+    END AS `First User Channel`,
+    COUNT(DISTINCT user_pseudo_id) AS `Users`
+FROM 
+    first_touch_attribution
+WHERE user_event_rank = 1
+GROUP BY
+    `First User Channel`
+ORDER BY
+    `Users` DESC
@@ -0,0 +1,23 @@
+
+-- Categorizes users based on whether they are first-time or repeat visitors
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    CASE
+        WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE event_name = 'session_start' AND key = 'ga_session_number') = 1 
+            THEN 'first_time_visitor'
+        WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE event_name = 'session_start' AND key = 'ga_session_number') > 1 
+            THEN 'repeat_visitor'
+        ELSE NULL 
+    END AS visitor_category,
+    COUNT(DISTINCT user_pseudo_id) AS total_users
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Add additional filters here if user specifies (e.g., country, device, traffic source)
+GROUP BY
+    visitor_category
+HAVING
+    visitor_category IS NOT NULL
+ORDER BY
+    total_users DESC
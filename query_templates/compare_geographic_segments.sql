@@ -0,0 +1,44 @@
+
+-- Compares user metrics across different geographic segments
+-- LLM: Replace {start_date} and {end_date} with user-specified date range, modify WHERE clause for specific regions
+SELECT
+    CASE 
+        WHEN geo.continent IN ('North America', 'South America') THEN 'Americas'
+        WHEN geo.continent = 'Europe' THEN 'Europe'
+        WHEN geo.continent = 'Asia' THEN 'Asia'
+        WHEN geo.continent IN ('Africa', 'Oceania') THEN 'Other_Regions'
+        ELSE 'Unknown_Region'
+    END AS geographic_segment,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    ROUND(
+        COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        )) * 1.0 / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS avg_sessions_per_user,
+    ROUND(
+        SAFE_DIVIDE(
+            COUNT(DISTINCT 
+                CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+                     THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+                END
+            ),
+            COUNT(DISTINCT CONCAT(
+                user_pseudo_id, 
+                CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+            ))
+        ) * 100, 2
+    ) AS engagement_rate_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Modify grouping logic or WHERE clause based on user's comparison needs
+GROUP BY
+    geographic_segment
+ORDER BY
+    unique_users DESC
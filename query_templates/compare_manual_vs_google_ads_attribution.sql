@@ -0,0 +1,51 @@
+
+-- Compares manual UTM attribution vs Google Ads attribution using last-click data
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    CASE 
+        WHEN session_traffic_source_last_click.manual_campaign.campaign_name IS NOT NULL 
+             AND session_traffic_source_last_click.google_ads_campaign.campaign_name IS NOT NULL 
+             THEN 'Both_Manual_and_Google_Ads'
+        WHEN session_traffic_source_last_click.manual_campaign.campaign_name IS NOT NULL 
+             AND session_traffic_source_last_click.google_ads_campaign.campaign_name IS NULL 
+             THEN 'Manual_Attribution_Only'
+        WHEN session_traffic_source_last_click.manual_campaign.campaign_name IS NULL 
+             AND session_traffic_source_last_click.google_ads_campaign.campaign_name IS NOT NULL 
+             THEN 'Google_Ads_Attribution_Only'
+        ELSE 'No_Last_Click_Attribution'
+    END AS attribution_data_coverage,
+    COALESCE(session_traffic_source_last_click.manual_campaign.campaign_name, 
+             session_traffic_source_last_click.google_ads_campaign.campaign_name, 
+             '(no_campaign_attribution)') AS primary_campaign_name,
+    COALESCE(session_traffic_source_last_click.manual_campaign.source, '(no_manual_source)') AS manual_source,
+    COALESCE(session_traffic_source_last_click.google_ads_campaign.account_name, '(no_google_ads_account)') AS google_ads_account,
+    COUNT(DISTINCT user_pseudo_id) AS attributed_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS attributed_sessions,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions,
+    COUNT(*) AS total_events,
+    ROUND(
+        COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        )) * 100.0 / SUM(COUNT(DISTINCT CONCAT(
+            user_pseudo_id, 
+            CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+        ))) OVER (), 2
+    ) AS session_share_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Add user-specified WHERE clauses
+GROUP BY
+    attribution_data_coverage, primary_campaign_name, manual_source, google_ads_account
+ORDER BY
+    attributed_sessions DESC
+LIMIT {top_n}
@@ -0,0 +1,20 @@
+
+-- Compares users with custom user_id vs anonymous users (pseudo_id only)
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    CASE 
+        WHEN user_id IS NOT NULL THEN 'Identified_Users'
+        ELSE 'Anonymous_Users'
+    END AS user_identification_status,
+    COUNT(DISTINCT user_pseudo_id) AS user_count,
+    COUNT(DISTINCT CASE WHEN is_active_user IS TRUE THEN user_pseudo_id END) AS active_user_count,
+    ROUND(AVG(user_ltv.revenue), 2) AS avg_ltv_revenue
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Apply additional filters as needed
+GROUP BY
+    user_identification_status
+ORDER BY
+    user_count DESC
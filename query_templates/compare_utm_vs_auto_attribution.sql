@@ -0,0 +1,36 @@
+
+-- Compares manual UTM attribution with automatic traffic source attribution
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    CASE 
+        WHEN collected_traffic_source.manual_source IS NOT NULL AND traffic_source.source IS NOT NULL THEN 'Both_Manual_and_Auto'
+        WHEN collected_traffic_source.manual_source IS NOT NULL AND traffic_source.source IS NULL THEN 'Manual_UTM_Only'
+        WHEN collected_traffic_source.manual_source IS NULL AND traffic_source.source IS NOT NULL THEN 'Auto_Attribution_Only'
+        ELSE 'No_Attribution_Data'
+    END AS attribution_data_status,
+    COALESCE(collected_traffic_source.manual_source, traffic_source.source, '(no_source)') AS primary_source,
+    COALESCE(collected_traffic_source.manual_medium, traffic_source.medium, '(no_medium)') AS primary_medium,
+    COUNT(DISTINCT user_pseudo_id) AS unique_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    COUNT(*) AS total_events,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN CONCAT(user_pseudo_id, CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING))
+        END
+    ) AS engaged_sessions,
+    ROUND(
+        COUNT(DISTINCT user_pseudo_id) * 100.0 / SUM(COUNT(DISTINCT user_pseudo_id)) OVER (), 2
+    ) AS user_share_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Include user-specified filtering conditions
+GROUP BY
+    attribution_data_status, primary_source, primary_medium
+ORDER BY
+    unique_users DESC
+LIMIT {top_n}
@@ -0,0 +1,23 @@
+
+-- Extracts and analyzes a specific user property
+-- LLM: Replace {property_key}, {start_date} and {end_date} with user-specified values
+SELECT
+    COALESCE(
+        (SELECT value.string_value FROM UNNEST(user_properties) WHERE key = '{property_key}'),
+        CAST((SELECT value.int_value FROM UNNEST(user_properties) WHERE key = '{property_key}') AS STRING),
+        CAST((SELECT value.float_value FROM UNNEST(user_properties) WHERE key = '{property_key}') AS STRING),
+        CAST((SELECT value.double_value FROM UNNEST(user_properties) WHERE key = '{property_key}') AS STRING),
+        '(not_set)'
+    ) AS property_value,
+    COUNT(DISTINCT user_pseudo_id) AS user_count,
+    COUNT(DISTINCT CASE WHEN is_active_user IS TRUE THEN user_pseudo_id END) AS active_user_count
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Add additional filtering conditions
+GROUP BY
+    property_value
+ORDER BY
+    user_count DESC
+LIMIT {top_n}
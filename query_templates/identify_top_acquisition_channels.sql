@@ -0,0 +1,45 @@
+
+-- Identifies top-performing acquisition channels with comprehensive metrics
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    CASE 
+        WHEN traffic_source.name IS NOT NULL THEN CONCAT('Campaign: ', traffic_source.name)
+        ELSE CONCAT(
+            COALESCE(traffic_source.source, '(direct)'), 
+            ' / ', 
+            COALESCE(traffic_source.medium, '(none)')
+        )
+    END AS acquisition_channel,
+    COALESCE(traffic_source.source, '(direct)') AS source_detail,
+    COALESCE(traffic_source.medium, '(none)') AS medium_detail,
+    COALESCE(traffic_source.name, '(no_campaign)') AS campaign_detail,
+    COUNT(DISTINCT user_pseudo_id) AS total_users,
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+             THEN user_pseudo_id 
+        END
+    ) AS new_users,
+    COUNT(DISTINCT CONCAT(
+        user_pseudo_id, 
+        CAST((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS STRING)
+    )) AS total_sessions,
+    ROUND(
+        COUNT(DISTINCT 
+            CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_number') = 1 
+                 THEN user_pseudo_id 
+            END
+        ) * 100.0 / COUNT(DISTINCT user_pseudo_id), 2
+    ) AS new_user_rate_percentage,
+    ROUND(
+        COUNT(DISTINCT user_pseudo_id) * 100.0 / SUM(COUNT(DISTINCT user_pseudo_id)) OVER (), 2
+    ) AS channel_share_percentage
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Add additional WHERE conditions based on user requirements
+GROUP BY
+    acquisition_channel, source_detail, medium_detail, campaign_detail
+ORDER BY
+    total_users DESC
+LIMIT {top_n}
@@ -0,0 +1,32 @@
+
+-- Lists all available user property keys with usage statistics
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    user_prop.key AS property_key,
+    COUNT(DISTINCT user_pseudo_id) AS users_with_property,
+    COUNT(DISTINCT 
+        CASE WHEN user_prop.value.string_value IS NOT NULL 
+             OR user_prop.value.int_value IS NOT NULL 
+             OR user_prop.value.float_value IS NOT NULL 
+             OR user_prop.value.double_value IS NOT NULL 
+             THEN user_pseudo_id 
+        END
+    ) AS users_with_values,
+    CASE 
+        WHEN COUNTIF(user_prop.value.string_value IS NOT NULL) > 0 THEN 'string'
+        WHEN COUNTIF(user_prop.value.int_value IS NOT NULL) > 0 THEN 'integer'
+        WHEN COUNTIF(user_prop.value.float_value IS NOT NULL) > 0 THEN 'float'
+        WHEN COUNTIF(user_prop.value.double_value IS NOT NULL) > 0 THEN 'double'
+        ELSE 'unknown'
+    END AS primary_data_type
+FROM
+    `{project_id}.{dataset_id}.events_*`,
+    UNNEST(user_properties) AS user_prop
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Add filtering conditions if user specifies
+GROUP BY
+    property_key
+ORDER BY
+    users_with_property DESC
+LIMIT {top_n}
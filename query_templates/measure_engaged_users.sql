@@ -0,0 +1,16 @@
+
+-- Measures users who demonstrated engagement through time spent or interaction
+-- LLM: Replace {start_date} and {end_date} with user-specified date range
+SELECT
+    COUNT(DISTINCT 
+        CASE WHEN (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'engagement_time_msec') > 0  
+                  OR (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'session_engaged') = '1' 
+             THEN user_pseudo_id 
+             ELSE NULL 
+        END
+    ) AS engaged_user_count
+FROM
+    `{project_id}.{dataset_id}.events_*`
+WHERE
+    _table_suffix BETWEEN '{start_date}' AND '{end_date}'
+    -- LLM: Add filters if user specifies additional criteria
@@ -0,0 +1,91 @@
+# result_pages.py
+"""Paging through query results that stay in BigQuery.
+
+A paged run (engine.run_paged) returns only the first page of a result and
+leaves the rest in the job's destination table. BigQuery writes every query
+result to an anonymous table and keeps it for about a day. ResultPages
+records which destination belongs to which owner (a chat session or an API
+user) under an opaque id. Pages are then fetched one at a time with
+`list_rows`, so only the page on screen is held in memory. Callers never
+see or choose table names.
+"""
+
+import math
+import os
+import threading
+import time
+import uuid
+
+from google.api_core.exceptions import NotFound
+
+from tracing import Tracer
+
+RESULT_PAGE_SIZE = int(os.getenv("RESULT_PAGE_SIZE", "50"))
+# Anonymous result tables expire after about 24 hours; forget them a little earlier.
+RESULT_PAGES_TTL_SECONDS = int(os.getenv("RESULT_PAGES_TTL_SECONDS", str(23 * 3600)))
+
+
+class ResultExpired(LookupError):
+    """The result id is unknown, belongs to someone else, or its table has expired."""
+
+
+class ResultPages:
+    """Process-wide registry of paged results; safe to share across sessions and threads."""
+
+    def __init__(self, ttl_s: int = RESULT_PAGES_TTL_SECONDS):
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._results = {}  # result_id -> {"owner", "destination", "total_rows", "page_size", "created"}
+
+    def register(self, owner: str, destination: str, total_rows: int, page_size: int = RESULT_PAGE_SIZE) -> str:
+        result_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            for stale in [r for r, v in self._results.items() if now - v["created"] > self.ttl_s]:
+                del self._results[stale]
+            self._results[result_id] = {"owner": owner, "destination": destination, "total_rows": total_rows,
+                                        "page_size": page_size, "created": now}
+        return result_id
+
+    def info(self, result_id: str, owner: str) -> dict:
+        """{"result_id", "total_rows", "page_size", "pages"} without fetching anything."""
+        entry = self._lookup(result_id, owner)
+        return {
+            "result_id": result_id,
+            "total_rows": entry["total_rows"],
+            "page_size": entry["page_size"],
+            "pages": max(1, math.ceil(entry["total_rows"] / entry["page_size"])),
+        }
+
+    def page(self, bq_client, result_id: str, page: int, owner: str, tracer: Tracer = None) -> dict:
+        """Fetches one 0-based page; returns info() plus "page" and "rows"."""
+        tracer = tracer or Tracer("result_pages.page")
+        info = self.info(result_id, owner)
+        if not 0 <= page < info["pages"]:
+            raise ValueError(f"page must be between 0 and {info['pages'] - 1}")
+        destination = self.destination(result_id, owner)
+        page_size = info["page_size"]
+        with tracer.span("bigquery.list_rows", page=page) as span:
+            try:
+                rows = [dict(row.items()) for row in bq_client.list_rows(
+                    destination, start_index=page * page_size, max_results=page_size)]
+            except NotFound as e:
+                self.forget(result_id)
+                raise ResultExpired("These results have expired; run the query again.") from e
+            span.attributes["rows"] = len(rows)
+        return {**info, "page": page, "rows": rows}
+
+    def destination(self, result_id: str, owner: str) -> str:
+        """The table holding the full result, e.g. for exports.py."""
+        return self._lookup(result_id, owner)["destination"]
+
+    def forget(self, result_id: str):
+        with self._lock:
+            self._results.pop(result_id, None)
+
+    def _lookup(self, result_id: str, owner: str) -> dict:
+        with self._lock:
+            entry = self._results.get(result_id)
+        if entry is None or entry["owner"] != owner or time.time() - entry["created"] > self.ttl_s:
+            raise ResultExpired("These results are no longer available; run the query again.")
+        return entry
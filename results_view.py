@@ -0,0 +1,91 @@
+# results_view.py
+"""Arrow tables and chart data for the results panel, free of Streamlit.
+
+Result rows are converted to a pyarrow Table once, and st.dataframe /
+st.line_chart render it directly. Templates that report a time series
+declare a `time_axis` in query_templates/index.json: the dimension
+columns that order the rows in time, most significant first (e.g.
+["year", "month_number"]). Their results also get a line chart. Series
+longer than CHART_MAX_POINTS are downsampled with largest-triangle-three-
+buckets (LTTB) before plotting. LTTB keeps peaks and dips, so the shape
+survives while the browser draws at most that many points.
+"""
+
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from query_template_library import TEMPLATE_INDEX
+
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "500"))
+# Name of the x column built when the time axis spans several columns.
+PERIOD_COLUMN = "period"
+
+
+def to_arrow(rows: list) -> pa.Table:
+    return pa.Table.from_pylist(rows) if rows else pa.table({})
+
+
+def time_axis(template_name: str) -> list:
+    """The template's time-axis columns, or [] if it does not report a time series."""
+    return list(TEMPLATE_INDEX.get(template_name, {}).get("time_axis") or [])
+
+
+def plottable_metrics(template_name: str, table: pa.Table) -> list:
+    """The template's metric columns that hold numbers in this result."""
+    metrics = TEMPLATE_INDEX.get(template_name, {}).get("metrics", [])
+    return [name for name in metrics if name in table.column_names and _is_number(table.schema.field(name).type)]
+
+
+def _is_number(arrow_type) -> bool:
+    return pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type)
+
+
+def time_series(table: pa.Table, axis: list, metrics: list, max_points: int = CHART_MAX_POINTS):
+    """Returns (chart table, x column): rows in time order, at most `max_points` of them.
+
+    A multi-column axis is joined into one PERIOD_COLUMN ("2024-03").
+    """
+    table = table.filter(pc.is_valid(table.column(axis[0]))).sort_by([(column, "ascending") for column in axis])
+    if len(axis) == 1:
+        x = axis[0]
+    else:
+        parts = [_padded(table.column(column)) for column in axis]
+        table = table.append_column(PERIOD_COLUMN, pc.binary_join_element_wise(*parts, "-"))
+        x = PERIOD_COLUMN
+    table = table.select([x] + metrics)
+    if metrics and table.num_rows > max_points:
+        values = table.column(metrics[0]).to_numpy(zero_copy_only=False).astype(float)
+        table = table.take(pa.array(lttb_indices(np.nan_to_num(values), max_points)))
+    return table, x
+
+
+def _padded(column):
+    if pa.types.is_integer(column.type):
+        return pc.utf8_lpad(pc.cast(column, pa.string()), 2, "0")
+    return pc.cast(column, pa.string())
+
+
+def lttb_indices(values, threshold: int):
+    """Indices of the points largest-triangle-three-buckets keeps from an evenly spaced series."""
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float)
+    y = np.asarray(values, dtype=float)
+    # First and last points are always kept; the rest are split into threshold - 2 buckets.
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = [0]
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean() if next_end > next_start else x[-1]
+        avg_y = y[next_start:next_end].mean() if next_end > next_start else y[-1]
+        a = selected[-1]
+        # Twice the area of the triangle (previous point, candidate, next bucket's average).
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        selected.append(start + int(areas.argmax()))
+    selected.append(n - 1)
+    return np.array(selected)
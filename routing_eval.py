@@ -0,0 +1,293 @@
+# routing_eval.py
+# pylint: disable=broad-exception-caught
+"""Routing accuracy and latency evaluation over a labeled question corpus.
+
+Runs only the routing turn (engine.route_question) for each labeled question
+and scores the chosen template and extracted parameters against the labels,
+recording tokens and latency per question. Results are saved as JSON under
+benchmarks/results/ so runs can be diffed with --compare.
+
+--escalate-to MODEL evaluates tiered routing as the app runs it
+(engine.route_tiered): --model routes first, and questions whose choice
+fails validation are routed again with MODEL. Latency is then also
+reported per tier, with the escalation rate.
+
+Responses come from one of three sources:
+  --live               call Gemini on Vertex AI (optionally --record them)
+  --replay FILE        recorded responses from an earlier --live --record run
+  (default)            stubbed responses from fakes.FakeGenaiClient routed
+                       with the corpus labels, which checks the harness only
+
+    python routing_eval.py --live --record benchmarks/routing_recordings.jsonl
+    python routing_eval.py --replay benchmarks/routing_recordings.jsonl --compare <previous>.json
+
+The system prompt is built with a fixed --today so recordings stay valid
+across days; a recording whose prompt hash differs from the current prompt
+(descriptions or prompt edited since) is flagged as stale.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from benchmark import DEFAULT_CORPUS, DEFAULT_RESULTS_DIR, git_commit, load_corpus
+from engine import ROUTE_MODEL_ID, build_system_prompt, parse_route, route_tiered
+from fakes import FakeGenaiClient, RecordedGenaiClient
+from percentiles import percentile
+from query_template_library import PARAMETER_NAMES
+from token_usage import UsageMeter
+
+EVAL_PROJECT_ID = "eval-project"
+EVAL_DATASET_ID = "analytics_eval"
+DEFAULT_TODAY = "2024-06-01"
+SCORED_PARAMS = PARAMETER_NAMES
+
+
+def prompt_sha(today) -> str:
+    prompt = build_system_prompt(EVAL_PROJECT_ID, EVAL_DATASET_ID, today=today)
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+
+
+def load_recordings(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return {record["question"]: record for record in map(json.loads, f) if record}
+
+
+def _normalize(value):
+    return str(value).strip().lower() if value is not None else None
+
+
+def score_route(item: dict, template_name, parameters) -> dict:
+    """Compares a routed (template, parameters) with the item's labels.
+
+    `template` may be a single name or a list of acceptable names. Parameter
+    accuracy is the share of labeled parameters matched; a parameter the
+    model supplied without a label counts as extra.
+    """
+    expected_templates = item["template"] if isinstance(item["template"], list) else [item["template"]]
+    expected_params = {k: v for k, v in (item.get("parameters") or {}).items() if k in SCORED_PARAMS}
+    parameters = parameters or {}
+    mismatched = {
+        key: {"expected": value, "got": parameters.get(key)}
+        for key, value in expected_params.items()
+        if _normalize(parameters.get(key)) != _normalize(value)
+    }
+    extra = sorted(k for k in parameters if k in SCORED_PARAMS and k not in expected_params)
+    matched = len(expected_params) - len(mismatched)
+    return {
+        "template_correct": template_name in expected_templates,
+        "param_accuracy": matched / len(expected_params) if expected_params else 1.0,
+        "params_exact": not mismatched and not extra,
+        "param_mismatches": mismatched,
+        "extra_params": extra,
+    }
+
+
+def evaluate(corpus, genai_client, model_id=ROUTE_MODEL_ID, today=None, recordings=None, record_to=None,
+             escalate_to="") -> list:
+    """Routes every corpus item; returns one result dict per item."""
+    current_sha = prompt_sha(today)
+    results = []
+    for item in corpus:
+        question = item["question"]
+        result = {"question": question, "expected_template": item["template"],
+                  "expected_parameters": item.get("parameters") or {}}
+        started = time.perf_counter()
+        meter = UsageMeter()
+        try:
+            # No hedging: every response must come from the models under evaluation.
+            _, response, routing = route_tiered(question, genai_client, EVAL_PROJECT_ID, EVAL_DATASET_ID,
+                                                route_model=model_id, escalation_model=escalate_to, today=today,
+                                                meter=meter, hedge_model="")
+        except Exception as e:
+            result.update(error=f"{type(e).__name__}: {e}", template_correct=False, param_accuracy=0.0,
+                          params_exact=False)
+            results.append(result)
+            continue
+        latency_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        recorded = (recordings or {}).get(question)
+        if recorded is not None:
+            # Replayed: report the latency measured when the response was recorded.
+            latency_ms = recorded.get("latency_ms")
+            result["stale"] = recorded.get("prompt_sha") != current_sha
+        if record_to is not None:
+            record_to.write(json.dumps({
+                "question": question, "prompt_sha": current_sha, "model": routing["model"],
+                "latency_ms": latency_ms, "response": response.model_dump(mode="json", exclude_none=True),
+            }) + "\n")
+
+        template_name, parameters = parse_route(response)
+        result.update(
+            template=template_name,
+            parameters=parameters,
+            latency_ms=latency_ms,
+            tier=routing["tier"],
+            tier_latency_ms=routing["latency_ms"],
+            escalation_reasons=routing.get("escalation_reasons"),
+            tokens=meter.totals(),
+            **score_route(item, template_name, parameters),
+        )
+        results.append(result)
+    return results
+
+
+def summarize(results: list) -> dict:
+    n = len(results) or 1
+    latencies = [r["latency_ms"] for r in results if r.get("latency_ms") is not None]
+    tokens = [r.get("tokens") or {} for r in results]
+    confusions = Counter(
+        f"{r['expected_template']} -> {r.get('template')}" for r in results
+        if not r.get("template_correct") and "error" not in r
+    )
+    return {
+        "questions": len(results),
+        "errors": sum(1 for r in results if "error" in r),
+        "stale_recordings": sum(1 for r in results if r.get("stale")),
+        "template_accuracy": round(sum(r["template_correct"] for r in results) / n, 4),
+        "param_accuracy": round(sum(r["param_accuracy"] for r in results) / n, 4),
+        "exact_match": round(sum(r["template_correct"] and r["params_exact"] for r in results) / n, 4),
+        "latency_p50_ms": percentile(latencies, 50),
+        "latency_p95_ms": percentile(latencies, 95),
+        "escalation_rate": round(sum(r.get("tier") == "escalated" for r in results) / n, 4),
+        "latency_by_tier": {
+            tier: {"calls": len(values), "p50_ms": percentile(values, 50), "p95_ms": percentile(values, 95)}
+            for tier, values in _tier_latencies(results).items()
+        },
+        "prompt_tokens_mean": round(sum(t.get("prompt_tokens", 0) for t in tokens) / n, 1),
+        "candidates_tokens_mean": round(sum(t.get("candidates_tokens", 0) for t in tokens) / n, 1),
+        "total_tokens": sum(t.get("total_tokens", 0) for t in tokens),
+        "top_confusions": confusions.most_common(10),
+    }
+
+
+def _tier_latencies(results: list) -> dict:
+    by_tier = {}
+    for r in results:
+        for tier, ms in (r.get("tier_latency_ms") or {}).items():
+            by_tier.setdefault(tier, []).append(ms)
+    return by_tier
+
+
+def print_report(result: dict, baseline: dict = None):
+    summary = result["summary"]
+    base = (baseline or {}).get("summary", {})
+
+    def line(label, key, fmt="{:.3f}"):
+        value = summary.get(key)
+        text = fmt.format(value) if value is not None else "-"
+        if key in base and base[key] is not None and value is not None:
+            text += f"  ({value - base[key]:+.3f})" if isinstance(value, float) else f"  ({value - base[key]:+})"
+        print(f"{label:<22}{text}")
+
+    escalate_to = result["config"].get("escalate_to")
+    print(f"commit {result['git_commit']}  source={result['config']['source']}  "
+          f"model={result['config']['model']}" + (f" -> {escalate_to}" if escalate_to else "")
+          + f"  prompt={result['config']['prompt_sha']}")
+    line("questions", "questions", "{}")
+    line("errors", "errors", "{}")
+    line("stale recordings", "stale_recordings", "{}")
+    line("template accuracy", "template_accuracy")
+    line("param accuracy", "param_accuracy")
+    line("exact match", "exact_match")
+    line("latency p50 ms", "latency_p50_ms", "{}")
+    line("latency p95 ms", "latency_p95_ms", "{}")
+    if escalate_to:
+        line("escalation rate", "escalation_rate")
+        for tier, stats in summary["latency_by_tier"].items():
+            print(f"{'  ' + tier + ' p50/p95 ms':<22}{stats['p50_ms']} / {stats['p95_ms']}  ({stats['calls']} calls)")
+    line("prompt tokens/q", "prompt_tokens_mean", "{}")
+    line("total tokens", "total_tokens", "{}")
+    for confusion, count in summary["top_confusions"]:
+        print(f"  misrouted x{count}: {confusion}")
+    if baseline:
+        before = {r["question"]: r for r in baseline.get("items", [])}
+        for item in result["items"]:
+            previous = before.get(item["question"])
+            if previous and previous.get("template_correct") and not item.get("template_correct"):
+                print(f"  REGRESSED: {item['question']!r} -> {item.get('template')} "
+                      f"(was {previous.get('template')})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL of {question, template, parameters}.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--live", action="store_true", help="Call Gemini on Vertex AI.")
+    source.add_argument("--replay", help="JSONL of responses recorded with --live --record.")
+    parser.add_argument("--record", help="With --live, append raw responses to this JSONL file.")
+    parser.add_argument("--model", default=ROUTE_MODEL_ID)
+    parser.add_argument("--escalate-to", default="", metavar="MODEL",
+                        help="Re-route questions whose routing fails validation with MODEL (tiered routing).")
+    parser.add_argument("--today", default=DEFAULT_TODAY, help="Date the prompt treats as today (YYYY-MM-DD).")
+    parser.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR)
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--compare", help="Previous routing result JSON to diff against.")
+    args = parser.parse_args(argv)
+    if args.record and not args.live:
+        parser.error("--record requires --live")
+    if args.escalate_to and args.replay:
+        parser.error("--escalate-to cannot replay: recordings hold one response per question")
+
+    corpus = load_corpus(args.corpus)
+    today = datetime.strptime(args.today, "%Y-%m-%d").date()
+    recordings = None
+    if args.live:
+        from google import genai  # pylint: disable=import-outside-toplevel
+        from google.cloud import bigquery  # pylint: disable=import-outside-toplevel
+
+        project_id = bigquery.Client().project
+        genai_client = genai.Client(vertexai=True, location=os.getenv("VERTEX_LOCATION", "us-central1"),
+                                    project=project_id)
+        source_name = "live"
+    elif args.replay:
+        recordings = load_recordings(args.replay)
+        genai_client = RecordedGenaiClient(recordings)
+        source_name = f"replay:{os.path.basename(args.replay)}"
+    else:
+        routes = {item["question"]: (item["template"] if isinstance(item["template"], str) else item["template"][0],
+                                     item.get("parameters")) for item in corpus}
+        genai_client = FakeGenaiClient(routes=routes, route_latency_ms=0, summary_latency_ms=0)
+        source_name = "stub"
+
+    record_to = open(args.record, "a", encoding="utf-8") if args.record else None
+    try:
+        items = evaluate(corpus, genai_client, model_id=args.model, today=today,
+                         recordings=recordings, record_to=record_to, escalate_to=args.escalate_to)
+    finally:
+        if record_to is not None:
+            record_to.close()
+
+    result = {
+        "kind": "routing_eval",
+        "git_commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {"source": source_name, "model": args.model, "escalate_to": args.escalate_to, "today": args.today,
+                   "prompt_sha": prompt_sha(today), "corpus": os.path.relpath(args.corpus)},
+        "summary": summarize(items),
+        "items": items,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    if not args.no_save:
+        os.makedirs(args.results_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = os.path.join(args.results_dir, f"routing-{stamp}-{result['git_commit']}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, default=str)
+        print(f"saved {path}")
+    return 1 if result["summary"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
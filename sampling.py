@@ -0,0 +1,128 @@
+# sampling.py
+"""User-consistent sampling for long date ranges.
+
+Templates are sampled by keeping a deterministic fraction of users, chosen by
+hashing `user_pseudo_id`. Every event of a kept user is retained, so per-user
+metrics (sessions per user, funnels, journeys) stay coherent, and CTEs that
+read the events table more than once keep the same users in each read.
+"""
+
+import math
+import os
+import re
+
+# Sampling mode: "off" never samples, "auto" samples only when the dry-run
+# estimate exceeds SAMPLING_BYTES_THRESHOLD.
+SAMPLING_MODE = os.getenv("SAMPLING_MODE", "off")
+SAMPLING_BYTES_THRESHOLD = int(os.getenv("SAMPLING_BYTES_THRESHOLD", str(50_000_000_000)))  # 50 GB
+SAMPLING_TARGET_BYTES = int(os.getenv("SAMPLING_TARGET_BYTES", str(10_000_000_000)))  # 10 GB
+SAMPLING_MODES = ("off", "auto")
+
+# Allowed sample rates, largest first. Rates snap down to one of these so the
+# same question over similar ranges reuses the same sample (and cache entries).
+SAMPLE_RATE_LADDER = (0.5, 0.25, 0.1, 0.05, 0.02, 0.01)
+HASH_BUCKETS = 10_000
+
+# Every template filters the wildcard table with this exact predicate; the
+# sampling filter is appended right after each occurrence.
+_SUFFIX_FILTER_RE = re.compile(
+    r"(_table_suffix\s+BETWEEN\s+'\{start_date\}'\s+AND\s+'\{end_date\}')",
+    re.IGNORECASE,
+)
+
+# Column-name heuristics for which result columns are totals that must be
+# scaled by 1/rate. Ratios, averages and shares are already unbiased.
+_SCALED_MARKERS = (
+    "count", "users", "sessions", "events", "views", "buyers", "purchasers",
+    "transactions", "purchases", "clicks", "conversions", "revenue", "quantity",
+    "total", "refunds",
+)
+_UNSCALED_MARKERS = (
+    "avg", "average", "rate", "ratio", "pct", "percent", "percentage", "share",
+    "per_", "_per", "median", "min_", "max_", "days", "seconds", "minutes",
+    "position", "rank", "price",
+)
+# Sums of per-user values: scaled, but the count-based interval does not apply.
+_VALUE_MARKERS = ("revenue", "value", "quantity", "amount")
+
+
+def choose_sample_rate(estimated_bytes, mode=SAMPLING_MODE,
+                       threshold_bytes=SAMPLING_BYTES_THRESHOLD,
+                       target_bytes=SAMPLING_TARGET_BYTES):
+    """Returns the sample rate for a query, or 1.0 when it should run unsampled."""
+    if mode != "auto" or not estimated_bytes or estimated_bytes <= threshold_bytes:
+        return 1.0
+    wanted = target_bytes / estimated_bytes
+    for rate in SAMPLE_RATE_LADDER:
+        if rate <= wanted:
+            return rate
+    return SAMPLE_RATE_LADDER[-1]
+
+
+def sampling_predicate(rate: float) -> str:
+    buckets = max(1, int(round(rate * HASH_BUCKETS)))
+    return f"MOD(ABS(FARM_FINGERPRINT(user_pseudo_id)), {HASH_BUCKETS}) < {buckets}"
+
+
+def apply_user_sampling(sql_template: str, rate: float) -> str:
+    """Adds the user-hash filter next to every `_table_suffix` range filter.
+
+    Operates on the unformatted template, before its placeholders are bound
+    as query parameters.
+    """
+    if rate >= 1.0:
+        return sql_template
+    predicate = sampling_predicate(rate)
+    sampled, count = _SUFFIX_FILTER_RE.subn(rf"\1 AND {predicate}", sql_template)
+    if count == 0:
+        raise ValueError("Template has no _table_suffix range filter; cannot sample it.")
+    return sampled
+
+
+def is_scaled_column(name: str) -> bool:
+    lowered = name.lower()
+    if any(marker in lowered for marker in _UNSCALED_MARKERS):
+        return False
+    return any(marker in lowered for marker in _SCALED_MARKERS)
+
+
+def scale_sampled_rows(rows, rate: float):
+    """Scales total-like columns back up and attaches 95% confidence intervals.
+
+    Returns (rows, info) where info lists the scaled columns for display.
+    Intervals use the binomial approximation for a count of sampled units:
+    Var(N_hat) ~= n * (1 - rate) / rate**2.
+    """
+    if rate >= 1.0 or not rows:
+        return rows, {}
+
+    scaled_columns = [
+        key for key, value in rows[0].items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and is_scaled_column(key)
+    ]
+    scaled_rows = []
+    for row in rows:
+        new_row = dict(row)
+        for key in scaled_columns:
+            value = row.get(key)
+            if value is None:
+                continue
+            estimate = value / rate
+            new_row[key] = round(estimate) if isinstance(value, int) else round(estimate, 2)
+            if not any(marker in key.lower() for marker in _VALUE_MARKERS):
+                half_width = 1.96 * math.sqrt(max(value, 0) * (1 - rate)) / rate
+                new_row[f"{key}_ci95"] = [
+                    max(0, round(estimate - half_width)),
+                    round(estimate + half_width),
+                ]
+        scaled_rows.append(new_row)
+
+    info = {
+        "sample_rate": rate,
+        "scaled_columns": scaled_columns,
+        "note": (
+            f"Results are estimated from a {rate:.0%} user sample and scaled up; "
+            "`*_ci95` columns give approximate 95% confidence intervals."
+        ),
+    }
+    return scaled_rows, info
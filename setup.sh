@@ -233,6 +233,10 @@ if [[ "$ENABLE_IAP" =~ ^[yY](es)?$ ]]; then
     PROJECT_NUMBER=$(gcloud projects describe "$PROJECT_ID" --format='value(projectNumber)')
     IAP_SA_EMAIL="service-${PROJECT_NUMBER}@gcp-sa-iap.iam.gserviceaccount.com"
 
+    # The app verifies IAP's signed assertion against this audience before trusting the user's email.
+    IAP_AUDIENCE="/projects/${PROJECT_NUMBER}/locations/${REGION}/services/${SERVICE_NAME}"
+    gcloud run services update "$SERVICE_NAME" --region="$REGION" --update-env-vars="IAP_AUDIENCE=${IAP_AUDIENCE}"
+
     print_info "Granting IAP invoker role..."
     gcloud run services add-iam-policy-binding "$SERVICE_NAME" --region="$REGION" --member="serviceAccount:$IAP_SA_EMAIL" --role="roles/run.invoker"
 
@@ -256,6 +260,9 @@ gcloud projects add-iam-policy-binding "$PROJECT_ID" --member="serviceAccount:$G
 
 # --- 9. CREATE CLOUD BUILD TRIGGER ---
 SUBSTITUTIONS="_REGION=${REGION},_REPO_NAME=${ARTIFACT_REPO_NAME},_SERVICE_NAME=${SERVICE_NAME},_SERVICE_ACCOUNT=${APP_SERVICE_ACCOUNT_EMAIL},_GA4_BIGQUERY_DATASET=${GA4_DATASET_ID},_AUTH_FLAG=${AUTH_FLAG}"
+if [[ -n "$IAP_AUDIENCE" ]]; then
+    SUBSTITUTIONS+=",_IAP_AUDIENCE=${IAP_AUDIENCE}"
+fi
 if [[ -n "$SIMPLE_AUTH_USERNAME" ]]; then
     SUBSTITUTIONS+=",_SIMPLE_AUTH_USERNAME=${SIMPLE_AUTH_USERNAME},_SIMPLE_AUTH_PASSWORD_HASH=${SIMPLE_AUTH_PASSWORD_HASH}"
 fi
@@ -0,0 +1,72 @@
+# singleflight.py
+"""In-process coalescing of identical concurrent calls.
+
+The first caller for a key runs the function; callers that arrive with the
+same key while it is running wait for it and share its result (or its
+exception) instead of starting a duplicate.
+"""
+
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._executions = 0
+        self._coalesced = 0
+        self._shared_errors = 0
+        self._max_waiters = 0
+
+    def do(self, key, fn):
+        """Returns (result, shared); `shared` is True when another caller's run was reused."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._executions += 1
+            else:
+                call.waiters += 1
+                self._coalesced += 1
+                self._max_waiters = max(self._max_waiters, call.waiters)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                with self._lock:
+                    self._shared_errors += 1
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self._executions + self._coalesced
+            return {
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "coalesce_rate": round(self._coalesced / requests, 3) if requests else None,
+                "shared_errors": self._shared_errors,
+                "max_waiters": self._max_waiters,
+                "in_flight": len(self._calls),
+            }
@@ -0,0 +1,144 @@
+# tests/test_admission.py
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionTimeout, FairLimiter
+
+
+class Interrupted(Exception):
+    """Stands in for Streamlit's StopException / RerunException."""
+
+
+def hold(limiter, user, release: threading.Event, entered: threading.Event = None, order: list = None):
+    """Holds a slot of `limiter` until `release` is set, in a thread."""
+    def run():
+        with limiter.slot(user):
+            if order is not None:
+                order.append(user)
+            if entered is not None:
+                entered.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.005)
+
+
+def test_interrupted_waiter_leaves_the_queue():
+    limiter = FairLimiter("test", limit=1, timeout_s=5)
+    release, entered = threading.Event(), threading.Event()
+    holder = hold(limiter, "a", release, entered)
+    entered.wait(5)
+
+    def on_queue(position):
+        raise Interrupted()
+
+    with pytest.raises(Interrupted):
+        with limiter.slot("b", on_queue=on_queue):
+            pass
+    assert limiter.stats()["waiting"] == 0
+
+    release.set()
+    holder.join(5)
+    assert limiter.stats()["active"] == 0
+    with limiter.slot("c"):
+        assert limiter.stats()["active"] == 1
+
+
+def test_interrupted_waiter_gives_back_a_granted_slot():
+    limiter = FairLimiter("test", limit=1, timeout_s=5)
+    release, entered = threading.Event(), threading.Event()
+    holder = hold(limiter, "a", release, entered)
+    entered.wait(5)
+    calls = []
+
+    def on_queue(position):
+        calls.append(position)
+        if len(calls) == 1:
+            # Free the slot while this caller is outside the lock, so it is granted before it raises.
+            release.set()
+            holder.join(5)
+            raise Interrupted()
+
+    with pytest.raises(Interrupted):
+        with limiter.slot("b", on_queue=on_queue):
+            pass
+    stats = limiter.stats()
+    assert stats["active"] == 0 and stats["waiting"] == 0
+    with limiter.slot("c"):
+        pass
+
+
+def test_timeout_removes_the_ticket():
+    limiter = FairLimiter("test", limit=1, timeout_s=0.05)
+    release, entered = threading.Event(), threading.Event()
+    holder = hold(limiter, "a", release, entered)
+    entered.wait(5)
+
+    with pytest.raises(AdmissionTimeout):
+        with limiter.slot("b"):
+            pass
+    stats = limiter.stats()
+    assert stats["timed_out"] == 1 and stats["waiting"] == 0 and stats["active"] == 1
+
+    release.set()
+    holder.join(5)
+    assert limiter.stats()["active"] == 0
+
+
+def test_per_user_limit():
+    limiter = FairLimiter("test", limit=10, per_user_limit=1, timeout_s=0.05)
+    release, entered = threading.Event(), threading.Event()
+    holder = hold(limiter, "a", release, entered)
+    entered.wait(5)
+
+    with limiter.slot("b"):
+        pass
+    with pytest.raises(AdmissionTimeout):
+        with limiter.slot("a"):
+            pass
+    release.set()
+    holder.join(5)
+
+
+def test_free_slots_go_round_robin():
+    limiter = FairLimiter("test", limit=1, timeout_s=5)
+    release, entered = threading.Event(), threading.Event()
+    holder = hold(limiter, "first", release, entered)
+    entered.wait(5)
+
+    # "a" queues three calls before "b" queues one; "b" must not wait behind all of them.
+    order, releases, threads = [], [], []
+    for user in ["a", "a", "a", "b"]:
+        releases.append(threading.Event())
+        releases[-1].set()
+        threads.append(hold(limiter, user, releases[-1], order=order))
+        wait_until(lambda n=len(threads): limiter.stats()["waiting"] == n)
+
+    release.set()
+    for thread in [holder] + threads:
+        thread.join(5)
+    assert order == ["a", "b", "a", "a"]
+    assert limiter.stats()["active"] == 0
+
+
+def test_exempt_user_is_not_held_to_the_per_user_limit():
+    limiter = FairLimiter("test", limit=10, per_user_limit=1, timeout_s=0.05)
+    limiter.exempt_users.add("batch")
+    release, entered = threading.Event(), threading.Event()
+    holder = hold(limiter, "batch", release, entered)
+    entered.wait(5)
+
+    with limiter.slot("batch"):
+        assert limiter.stats()["active"] == 2
+    release.set()
+    holder.join(5)
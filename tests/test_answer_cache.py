@@ -0,0 +1,34 @@
+# tests/test_answer_cache.py
+from datetime import datetime, timedelta, timezone
+
+import answer_cache
+from answer_cache import AnswerCache
+
+
+def yesterday_params():
+    yesterday = (datetime.now(timezone.utc).date() - timedelta(days=1)).strftime("%Y%m%d")
+    return {"project_id": "p", "dataset_id": "d", "start_date": yesterday, "end_date": yesterday}
+
+
+def put(cache, sql, freshness, params=None):
+    return cache.put("t", sql, params or yesterday_params(), "off", "answer", {}, [], freshness=freshness)
+
+
+def test_new_or_rewritten_shard_evicts_older_answers(tmp_path):
+    cache = AnswerCache(str(tmp_path / "answers.sqlite3"))
+    put(cache, "a", "ttl:1")
+    put(cache, "b", "modified:1")  # the daily shard landed: the time-bucketed answer goes
+    assert cache.stats()["entries"] == 1
+    put(cache, "c", "modified:1")
+    assert cache.stats()["entries"] == 2
+    put(cache, "d", "modified:2")  # the shard was rewritten
+    assert cache.stats()["entries"] == 1
+
+
+def test_put_prunes_to_the_size_cap(tmp_path, monkeypatch):
+    monkeypatch.setattr(answer_cache, "ANSWER_CACHE_PRUNE_EVERY", 2)
+    cache = AnswerCache(str(tmp_path / "answers.sqlite3"), max_mb=0.000_001)
+    put(cache, "a", "settled")
+    assert cache.stats()["entries"] == 1
+    put(cache, "b", "settled")
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,21 @@
+# tests/test_exports.py
+import os
+
+import pytest
+from google.api_core.exceptions import NotFound
+
+from exports import export_to_file
+from result_pages import ResultExpired
+
+
+class ExpiredTableClient:
+    """A BigQuery client whose result tables have all expired."""
+
+    def list_rows(self, table, page_size=None):
+        raise NotFound(f"Not found: Table {table}")
+
+
+def test_expired_table_raises_result_expired_and_removes_the_temp_file(tmp_path):
+    with pytest.raises(ResultExpired):
+        export_to_file(ExpiredTableClient(), "project.dataset.anon123", "csv", directory=str(tmp_path))
+    assert os.listdir(tmp_path) == []
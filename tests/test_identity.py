@@ -0,0 +1,57 @@
+# tests/test_identity.py
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from google.auth import crypt, jwt
+
+import identity
+
+AUDIENCE = "/projects/123/locations/us-central1/services/app"
+
+
+@pytest.fixture(name="iap_key")
+def fixture_iap_key():
+    """A signer and the matching {kid: public PEM} certs, standing in for IAP's keys."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    private_pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                    serialization.NoEncryption())
+    public_pem = key.public_key().public_bytes(serialization.Encoding.PEM,
+                                               serialization.PublicFormat.SubjectPublicKeyInfo)
+    return crypt.ES256Signer.from_string(private_pem, key_id="k1"), {"k1": public_pem.decode()}
+
+
+def assertion(signer, **claims):
+    now = int(time.time())
+    payload = {"iss": identity.IAP_ISSUER, "aud": AUDIENCE, "email": "ann@example.com",
+               "iat": now, "exp": now + 600, **claims}
+    return jwt.encode(signer, payload).decode()
+
+
+def test_verified_assertion_gives_the_email(iap_key):
+    signer, certs = iap_key
+    assert identity.verify_iap_assertion(assertion(signer), AUDIENCE, certs) == "ann@example.com"
+
+
+def test_assertion_for_another_audience_or_issuer_is_rejected(iap_key):
+    signer, certs = iap_key
+    with pytest.raises(ValueError):
+        identity.verify_iap_assertion(assertion(signer, aud="/projects/1/other"), AUDIENCE, certs)
+    with pytest.raises(ValueError):
+        identity.verify_iap_assertion(assertion(signer, iss="https://evil.example"), AUDIENCE, certs)
+
+
+def test_plain_header_is_ignored_unless_trusted(monkeypatch):
+    headers = {"X-Goog-Authenticated-User-Email": "accounts.google.com:ann@example.com"}
+    monkeypatch.setattr(identity, "IAP_AUDIENCE", "")
+    monkeypatch.setattr(identity, "TRUST_IAP_HEADER", False)
+    assert identity.iap_email(headers) is None
+    monkeypatch.setattr(identity, "TRUST_IAP_HEADER", True)
+    assert identity.iap_email(headers) == "ann@example.com"
+
+
+def test_client_address_counts_appended_hops_from_the_right():
+    assert identity.client_address("6.6.6.6, 1.2.3.4", "10.0.0.1", hops=1) == "1.2.3.4"
+    assert identity.client_address("6.6.6.6, 1.2.3.4, 35.1.1.1", "10.0.0.1", hops=2) == "1.2.3.4"
+    assert identity.client_address(None, "10.0.0.1", hops=1) == "10.0.0.1"
@@ -0,0 +1,117 @@
+# token_usage.py
+"""Gemini token accounting and budget-driven degradation of the summary turn.
+
+Every Gemini call's `usage_metadata` is metered; the per-call records are
+stored in the perf store so totals can be aggregated per session, user and
+template. When a budget is configured and nearly spent, the summary turn is
+degraded rather than refused: first the results sent to Gemini are compacted
+to the top rows, then the summary is skipped and the rows are shown as a table.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+
+# ------------------------------------------------------------------------------
+# Config (env-driven; 0 disables a budget)
+# ------------------------------------------------------------------------------
+TOKEN_BUDGET_PER_SESSION = int(os.getenv("TOKEN_BUDGET_PER_SESSION", "0"))
+TOKEN_BUDGET_PER_USER_DAY = int(os.getenv("TOKEN_BUDGET_PER_USER_DAY", "0"))
+# Rows sent to the summarizer in compact mode.
+COMPACT_RESULT_ROWS = int(os.getenv("COMPACT_RESULT_ROWS", "25"))
+
+SUMMARY_MODES = ("full", "compact", "skip")
+# Rough size of a token in JSON result text, and headroom for the summary text itself.
+CHARS_PER_TOKEN = 4
+SUMMARY_OUTPUT_TOKENS = 400
+
+
+def usage_from_response(response) -> dict:
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return {"prompt_tokens": 0, "candidates_tokens": 0, "cached_tokens": 0, "total_tokens": 0}
+    prompt = usage.prompt_token_count or 0
+    candidates = usage.candidates_token_count or 0
+    return {
+        "prompt_tokens": prompt,
+        "candidates_tokens": candidates,
+        "cached_tokens": usage.cached_content_token_count or 0,
+        "total_tokens": usage.total_token_count or (prompt + candidates),
+    }
+
+
+class UsageMeter:
+    """Token usage of the Gemini calls made while answering one question."""
+
+    def __init__(self):
+        self.calls = []
+
+    def add(self, call: str, model: str, response) -> dict:
+        record = {"call": call, "model": model, **usage_from_response(response)}
+        self.calls.append(record)
+        return record
+
+    def totals(self) -> dict:
+        keys = ("prompt_tokens", "candidates_tokens", "cached_tokens", "total_tokens")
+        return {key: sum(c[key] for c in self.calls) for key in keys}
+
+
+def start_of_day_utc() -> float:
+    now = datetime.now(timezone.utc)
+    return now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+
+def remaining_budget(perf_store, session_id=None, user=None,
+                     session_budget=None, user_day_budget=None):
+    """Tokens left under the tighter of the session and per-user daily budgets, or None if unlimited."""
+    session_budget = TOKEN_BUDGET_PER_SESSION if session_budget is None else session_budget
+    user_day_budget = TOKEN_BUDGET_PER_USER_DAY if user_day_budget is None else user_day_budget
+    remaining = []
+    if session_budget and session_id is not None:
+        remaining.append(session_budget - perf_store.tokens_used(session_id=session_id))
+    if user_day_budget and user is not None:
+        remaining.append(user_day_budget - perf_store.tokens_used(user=user, since=start_of_day_utc()))
+    return min(remaining) if remaining else None
+
+
+def estimate_summary_tokens(history_prompt_tokens: int, content_chars: int) -> int:
+    """The summary turn re-sends the routing prompt as chat history, plus the results."""
+    return history_prompt_tokens + content_chars // CHARS_PER_TOKEN + SUMMARY_OUTPUT_TOKENS
+
+
+def choose_summary_mode(remaining, history_prompt_tokens: int, full_chars: int, compact_chars: int) -> str:
+    if remaining is None:
+        return "full"
+    if remaining >= estimate_summary_tokens(history_prompt_tokens, full_chars):
+        return "full"
+    if remaining >= estimate_summary_tokens(history_prompt_tokens, compact_chars):
+        return "compact"
+    return "skip"
+
+
+def compact_rows(rows: list, limit: int = COMPACT_RESULT_ROWS):
+    """First `limit` rows, plus a note for the summarizer when rows were dropped."""
+    if len(rows) <= limit:
+        return rows, None
+    return rows[:limit], f"Only the first {limit} of {len(rows)} result rows are included."
+
+
+def rows_to_markdown(rows: list, limit: int = 20) -> str:
+    if not rows:
+        return "_The query returned no rows._"
+    columns = list(rows[0].keys())
+    lines = [
+        "| " + " | ".join(columns) + " |",
+        "| " + " | ".join("---" for _ in columns) + " |",
+    ]
+    for row in rows[:limit]:
+        lines.append("| " + " | ".join(_cell(row.get(c)) for c in columns) + " |")
+    if len(rows) > limit:
+        lines.append(f"\n_{len(rows) - limit} more rows not shown._")
+    return "\n".join(lines)
+
+
+def _cell(value) -> str:
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value, default=str)
+    return str(value).replace("|", "\\|").replace("\n", " ")
@@ -0,0 +1,232 @@
+# tracing.py
+# pylint: disable=broad-exception-caught
+"""Lightweight nested timing spans for the chat pipeline.
+
+Spans are exported as OTLP/JSON (the OpenTelemetry wire format), either
+appended to a local file or POSTed to a collector, so any OpenTelemetry
+backend (Cloud Trace, Jaeger, Tempo) can ingest them without an SDK dependency.
+"""
+
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+import tracemalloc
+import urllib.request
+from contextlib import contextmanager
+
+TRACE_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "ga4-bigquery-chat")
+# Append one OTLP/JSON export request per line; empty disables file export.
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+# e.g. http://localhost:4318 — spans are POSTed to {endpoint}/v1/traces.
+OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
+
+logger = logging.getLogger(__name__)
+_file_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "_mem_start", "_mem_peak")
+
+    def __init__(self, name, span_id, parent_id, start_ns, attributes=None):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start_ns = start_ns
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self._mem_start = None
+        self._mem_peak = 0
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1_000_000
+
+
+class Tracer:
+    """Collects the spans of one trace (one answered question).
+
+    `span()` nests under whichever span is currently open on the calling
+    thread; `record_span()` adds a span with explicit timestamps, e.g. for
+    work timed elsewhere such as BigQuery's server-side job timeline.
+
+    When `tracemalloc` is tracing (the benchmark harness turns it on), each
+    span also records its peak traced memory as `mem.peak_kb`.
+    """
+
+    def __init__(self, root_name: str = "chat.answer", **attributes):
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.root = self._start(root_name, None, attributes)
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _start(self, name, parent_id, attributes):
+        span = Span(name, secrets.token_hex(8), parent_id, time.time_ns(), attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def current_span_id(self):
+        stack = self._stack()
+        if stack:
+            return stack[-1].span_id
+        return self.root.span_id if self.root else None
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        span = self._start(name, self.current_span_id(), attributes)
+        stack = self._stack()
+        tracing_memory = tracemalloc.is_tracing()
+        if tracing_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # Fold the peak seen so far into the parent before resetting it.
+            if stack:
+                stack[-1]._mem_peak = max(stack[-1]._mem_peak, peak)
+            tracemalloc.reset_peak()
+            span._mem_start = current
+        stack.append(span)
+        try:
+            yield span
+        except Exception as e:
+            span.attributes["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            stack.pop()
+            if tracing_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                span._mem_peak = max(span._mem_peak, peak)
+                span.attributes["mem.peak_kb"] = round((span._mem_peak - span._mem_start) / 1024, 1)
+                if stack:
+                    stack[-1]._mem_peak = max(stack[-1]._mem_peak, span._mem_peak)
+
+    def record_span(self, name, start_ns, end_ns, parent_id=None, **attributes):
+        span = self._start(name, parent_id or self.current_span_id(), attributes)
+        span.start_ns = start_ns
+        span.end_ns = end_ns
+        return span
+
+    def finish(self):
+        if self.root.end_ns is None:
+            self.root.end_ns = time.time_ns()
+
+    def summary(self) -> list:
+        """Span names and durations in start order, for backend_details."""
+        return [
+            {"span": span.name, "ms": round(span.duration_ms, 1)}
+            for span in sorted(self.spans, key=lambda s: s.start_ns)
+        ]
+
+    def waterfall(self, width: int = 40) -> str:
+        """Renders the trace as a compact text waterfall.
+
+        Each span sits under its parent (by `parent_id`), siblings in start
+        order, so spans recorded after the fact with an earlier start (e.g.
+        `bigquery.queue`) still land at the right depth.
+        """
+        known = {span.span_id for span in self.spans}
+        children = {}
+        for span in sorted(self.spans, key=lambda s: s.start_ns):
+            parent = span.parent_id if span.parent_id in known else None
+            children.setdefault(parent, []).append(span)
+        spans, depths = [], {}
+        stack = [(span, 0) for span in reversed(children.get(None, []))]
+        while stack:
+            span, depth = stack.pop()
+            spans.append(span)
+            depths[span.span_id] = depth
+            stack.extend((child, depth + 1) for child in reversed(children.get(span.span_id, [])))
+        t0 = self.root.start_ns
+        total_ns = max(1, (self.root.end_ns or time.time_ns()) - t0)
+        label_width = max(len("  " * depths[s.span_id] + s.name) for s in spans)
+        lines = []
+        for span in spans:
+            end_ns = span.end_ns or time.time_ns()
+            offset = int((span.start_ns - t0) / total_ns * width)
+            length = max(1, int((end_ns - span.start_ns) / total_ns * width))
+            offset = min(max(offset, 0), width - 1)
+            length = min(length, width - offset)
+            bar = " " * offset + "█" * length + " " * (width - offset - length)
+            label = ("  " * depths[span.span_id] + span.name).ljust(label_width)
+            lines.append(f"{label} |{bar}| {span.duration_ms:8.1f} ms")
+        return "\n".join(lines)
+
+    def to_otlp(self) -> dict:
+        """Builds an OTLP/JSON ExportTraceServiceRequest for this trace."""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", TRACE_SERVICE_NAME)]},
+                "scopeSpans": [{
+                    "scope": {"name": "ga4-bigquery-chat.tracing"},
+                    "spans": [
+                        {
+                            "traceId": self.trace_id,
+                            "spanId": span.span_id,
+                            "parentSpanId": span.parent_id or "",
+                            "name": span.name,
+                            "kind": 1,  # SPAN_KIND_INTERNAL
+                            "startTimeUnixNano": str(span.start_ns),
+                            "endTimeUnixNano": str(span.end_ns or span.start_ns),
+                            "attributes": [_otlp_attribute(k, v) for k, v in span.attributes.items()],
+                            "status": {"code": 2 if "error" in span.attributes else 1},
+                        }
+                        for span in self.spans
+                    ],
+                }],
+            }]
+        }
+
+
+def _otlp_attribute(key, value):
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def _post_otlp(payload: bytes):
+    request = urllib.request.Request(
+        OTLP_ENDPOINT.rstrip("/") + "/v1/traces",
+        data=payload,
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5):
+            pass
+    except Exception as e:
+        logger.warning("OTLP trace export failed: %s", e)
+
+
+def export_trace(tracer: Tracer):
+    """Exports a finished trace to the configured file and/or collector.
+
+    The collector POST runs on a daemon thread so exporting never adds
+    latency to the answer.
+    """
+    if not TRACE_EXPORT_PATH and not OTLP_ENDPOINT:
+        return
+    tracer.finish()
+    payload = json.dumps(tracer.to_otlp(), separators=(",", ":"))
+    if TRACE_EXPORT_PATH:
+        try:
+            with _file_lock, open(TRACE_EXPORT_PATH, "a", encoding="utf-8") as f:
+                f.write(payload + "\n")
+        except OSError as e:
+            logger.warning("Trace file export failed: %s", e)
+    if OTLP_ENDPOINT:
+        threading.Thread(target=_post_otlp, args=(payload.encode("utf-8"),), daemon=True).start()
@@ -0,0 +1,329 @@
+# validate_templates.py
+"""Checks query_templates/index.json against the SQL it describes.
+
+Each template's metadata declares:
+  parameters            {name: {"type": "date" | "int" | "string", "description"?, "default"?}} for
+                        the placeholders it uses besides {project_id}/{dataset_id}; only top_n
+                        takes a "default"
+  dimensions, metrics   its output columns, split into group-by labels and measures
+  nested_arrays         which of event_params / items / user_properties it UNNESTs
+  additive_across_days  whether per-day results can be summed into a range result
+  cost_tier             "low" | "medium" | "high", the expected relative scan/compute cost
+  tags                  free-form topic labels
+  time_axis             optional; for time-series templates, the dimensions that order rows in
+                        time, most significant first (drives the results chart)
+  bounded_rows          optional; true when the dimensions only take a few fixed values (CASE
+                        buckets, device categories), so a ranking needs no LIMIT {top_n}
+
+The SQL is parsed with sqlglot (BigQuery dialect). The check fails if
+declared parameters, output columns or nested arrays differ from the SQL. It
+also fails if a template is declared additive but uses a non-additive
+aggregate, or is declared cheaper than its UNNESTs and joins imply. A ranking
+template (outer ORDER BY a metric DESC) must end in LIMIT {top_n} unless its
+rows are bounded. Run in CI
+(cloudbuild.yaml) and after editing templates:
+
+    python validate_templates.py
+    python validate_templates.py --suggest my_new_template   # print inferred metadata
+"""
+
+import argparse
+import json
+import os
+import string
+import sys
+
+import sqlglot
+from sqlglot import expressions as exp
+
+from query_template_library import IDENTIFIER_PARAMS, TEMPLATE_DIR, TEMPLATE_INDEX, bind_parameters, template_sql
+
+BUILTIN_PARAMS = set(IDENTIFIER_PARAMS)
+DATE_PARAMS = {"start_date", "end_date"}
+INT_PARAMS = {"top_n"}
+PARAM_TYPES = {"date", "int", "string"}
+NESTED_ARRAYS = ("event_params", "items", "user_properties")
+COST_TIERS = ("low", "medium", "high")
+REQUIRED_FIELDS = {
+    "description": str, "parameters": dict, "dimensions": list, "metrics": list,
+    "nested_arrays": list, "additive_across_days": bool, "cost_tier": str, "tags": list,
+}
+# Aggregates whose per-day values cannot be summed into a multi-day value.
+NON_ADDITIVE_AGGS = (exp.Avg, exp.Min, exp.Max, exp.ApproxDistinct, exp.Quantile, exp.ApproxQuantile,
+                     exp.PercentileCont, exp.PercentileDisc, exp.Stddev, exp.Variance, exp.ArrayAgg)
+
+
+# ------------------------------------------------------------------------------
+# SQL analysis
+# ------------------------------------------------------------------------------
+def placeholders(sql_template: str) -> set:
+    return {field for _, field, _, _ in string.Formatter().parse(sql_template) if field}
+
+
+def param_type(name: str) -> str:
+    return "date" if name in DATE_PARAMS else "int" if name in INT_PARAMS else "string"
+
+
+def parse(sql_template: str):
+    """Parses the SQL as it is sent to BigQuery, with values bound as @name parameters."""
+    values = {p: None for p in placeholders(sql_template)}
+    values.update({name: name for name in IDENTIFIER_PARAMS})
+    sql, _ = bind_parameters(sql_template, values)
+    return sqlglot.parse_one(sql, read="bigquery")
+
+
+def _outer_select(tree):
+    while isinstance(tree, exp.Union):
+        tree = tree.left
+    return tree
+
+
+def output_columns(tree) -> list:
+    return [projection.alias_or_name for projection in _outer_select(tree).selects]
+
+
+def _ctes(tree) -> dict:
+    return {cte.alias: cte.this for cte in tree.find_all(exp.CTE)}
+
+
+def _has_aggregate(expression) -> bool:
+    """An aggregate or window function in the expression itself, not inside a scalar subquery."""
+    for node in expression.find_all(exp.AggFunc, exp.Window):
+        parent = node.parent
+        while parent is not None and parent is not expression and not isinstance(parent, exp.Subquery):
+            parent = parent.parent
+        if not isinstance(parent, exp.Subquery):
+            return True
+    return False
+
+
+def _is_metric(projection, select, ctes, seen=()) -> bool:
+    """GROUP BY columns are dimensions. Aggregates, window functions, and columns computed from a CTE's
+    metrics are metrics."""
+    group = select.args.get("group")
+    if group is not None:
+        keys = {e.name if isinstance(e, exp.Column) else e.sql() for e in group.expressions}
+        name = projection.alias_or_name
+        inner = projection.this if isinstance(projection, exp.Alias) else projection
+        if name in keys or inner.sql() in keys:
+            return False
+        ordinal = str(select.selects.index(projection) + 1)
+        if ordinal in keys:
+            return False
+    if _has_aggregate(projection):
+        return True
+    for column in projection.find_all(exp.Column):
+        for cte_name, cte in ctes.items():
+            if cte_name in seen:
+                continue
+            cte_select = _outer_select(cte)
+            for cte_projection in cte_select.selects:
+                if (cte_projection.alias_or_name == column.name
+                        and _is_metric(cte_projection, cte_select, ctes, seen + (cte_name,))):
+                    return True
+    return False
+
+
+def _branches(tree) -> list:
+    if isinstance(tree, exp.Union):
+        return _branches(tree.left) + _branches(tree.right)
+    return [tree]
+
+
+def split_outputs(tree):
+    """Returns (dimensions, metrics) for the outer SELECT's columns (a metric in any UNION branch)."""
+    ctes = _ctes(tree)
+    branches = _branches(tree)
+    dimensions, metrics = [], []
+    for i, name in enumerate(output_columns(tree)):
+        is_metric = any(_is_metric(branch.selects[i], branch, ctes) for branch in branches)
+        (metrics if is_metric else dimensions).append(name)
+    return dimensions, metrics
+
+
+def _outer_clause(tree, clause):
+    """ORDER BY / LIMIT of the whole query; a UNION carries them on the union itself."""
+    return tree.args.get(clause) or _outer_select(tree).args.get(clause)
+
+
+def ranked_by(tree, metrics) -> str:
+    """The metric the outer ORDER BY ranks on (first key, descending), or None."""
+    order = _outer_clause(tree, "order")
+    if order is None or not order.expressions:
+        return None
+    first = order.expressions[0]
+    name = first.this.name if isinstance(first.this, exp.Column) else first.this.sql()
+    return name if first.args.get("desc") and name in metrics else None
+
+
+def limit_parameter(tree) -> str:
+    """Name of the query parameter in the outer LIMIT, or None."""
+    limit = _outer_clause(tree, "limit")
+    value = limit.expression if limit is not None else None
+    return value.name if isinstance(value, exp.Parameter) else None
+
+
+def unnested_arrays(tree) -> list:
+    found = set()
+    for unnest in tree.find_all(exp.Unnest):
+        for column in unnest.find_all(exp.Column):
+            if column.name in NESTED_ARRAYS:
+                found.add(column.name)
+    return [name for name in NESTED_ARRAYS if name in found]
+
+
+def non_additive_reasons(tree) -> list:
+    reasons = []
+    for agg in tree.find_all(exp.AggFunc):
+        if isinstance(agg, NON_ADDITIVE_AGGS):
+            reasons.append(agg.key.upper())
+        elif isinstance(agg, exp.Count) and agg.find(exp.Distinct) is not None:
+            reasons.append("COUNT(DISTINCT)")
+    if tree.find(exp.Window) is not None:
+        reasons.append("window function")
+    for div in tree.find_all(exp.Div, exp.SafeDivide):
+        if div.find(exp.AggFunc) is not None:
+            reasons.append("ratio of aggregates")
+            break
+    # Totals over per-user or per-session rows built in a CTE do not add up across days.
+    for cte in _ctes(tree).values():
+        group = _outer_select(cte).args.get("group")
+        if group is not None and any(c.name in ("user_pseudo_id", "user_id", "ga_session_id")
+                                     for c in group.find_all(exp.Column)):
+            reasons.append("per-user/session intermediate")
+            break
+    return sorted(set(reasons))
+
+
+def minimum_cost_tier(tree) -> str:
+    unnests = sum(1 for unnest in tree.find_all(exp.Unnest)
+                  if any(c.name in NESTED_ARRAYS for c in unnest.find_all(exp.Column)))
+    joins = sum(1 for _ in tree.find_all(exp.Join)) - unnests
+    windows = 1 if tree.find(exp.Window) is not None else 0
+    score = unnests + max(joins, 0) + windows
+    return "low" if score == 0 else "medium" if score <= 2 else "high"
+
+
+def infer_metadata(name: str) -> dict:
+    """Metadata inferred from the SQL; a starting point for a new template's index entry."""
+    if name in TEMPLATE_INDEX:
+        sql_template = template_sql(name)
+    else:  # a new template, not in the index yet
+        with open(os.path.join(TEMPLATE_DIR, f"{name}.sql"), encoding="utf-8") as f:
+            sql_template = f.read()
+    tree = parse(sql_template)
+    dimensions, metrics = split_outputs(tree)
+    params = [p for p in placeholders(sql_template) if p not in BUILTIN_PARAMS]
+    return {
+        "description": TEMPLATE_INDEX.get(name, {}).get("description", ""),
+        "parameters": {p: {"type": param_type(p)}
+                       for p in sorted(params, key=lambda p: (p not in DATE_PARAMS, p != "start_date", p))},
+        "dimensions": dimensions,
+        "metrics": metrics,
+        "nested_arrays": unnested_arrays(tree),
+        "additive_across_days": not non_additive_reasons(tree),
+        "cost_tier": minimum_cost_tier(tree),
+        "tags": TEMPLATE_INDEX.get(name, {}).get("tags", []),
+        **({"time_axis": TEMPLATE_INDEX[name]["time_axis"]} if "time_axis" in TEMPLATE_INDEX.get(name, {}) else {}),
+        **({"bounded_rows": True} if TEMPLATE_INDEX.get(name, {}).get("bounded_rows") else {}),
+    }
+
+
+# ------------------------------------------------------------------------------
+# Validation
+# ------------------------------------------------------------------------------
+def validate_template(name: str, meta: dict) -> list:
+    problems = []
+    for field, kind in REQUIRED_FIELDS.items():
+        if not isinstance(meta.get(field), kind):
+            problems.append(f"'{field}' must be a {kind.__name__}")
+    if problems:
+        return problems
+    try:
+        sql_template = template_sql(name)
+    except OSError as e:
+        return [f"cannot read SQL: {e}"]
+    try:
+        tree = parse(sql_template)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return [f"SQL does not parse: {e}"]
+
+    used = placeholders(sql_template) - BUILTIN_PARAMS
+    declared = set(meta["parameters"])
+    if used != declared:
+        problems.append(f"parameters {sorted(declared)} != placeholders in SQL {sorted(used)}")
+    for param, spec in meta["parameters"].items():
+        kind = spec.get("type") if isinstance(spec, dict) else None
+        if kind not in PARAM_TYPES:
+            problems.append(f"parameter '{param}' type must be one of {sorted(PARAM_TYPES)}")
+        elif kind != param_type(param):
+            problems.append(f"parameter '{param}' has type '{kind}', expected '{param_type(param)}'")
+        elif "default" in spec and (param != "top_n" or not isinstance(spec["default"], int) or spec["default"] < 1):
+            problems.append(f"parameter '{param}' default must be a positive int, and only top_n takes one")
+
+    outputs = output_columns(tree)
+    declared_outputs = meta["dimensions"] + meta["metrics"]
+    if set(meta["dimensions"]) & set(meta["metrics"]):
+        problems.append(f"columns in both dimensions and metrics: {sorted(set(meta['dimensions']) & set(meta['metrics']))}")
+    if sorted(declared_outputs) != sorted(outputs):
+        problems.append(f"dimensions+metrics {sorted(declared_outputs)} != SELECT columns {sorted(outputs)}")
+
+    ranking = ranked_by(tree, meta["metrics"])
+    bounded = meta.get("bounded_rows", False)
+    if not isinstance(bounded, bool):
+        problems.append("bounded_rows must be a bool")
+    elif "top_n" in declared and limit_parameter(tree) != "top_n":
+        problems.append("declares top_n but the outer query does not end in LIMIT {top_n}")
+    elif "top_n" in declared and bounded:
+        problems.append("declares bounded_rows, so it returns every row; drop top_n")
+    elif ranking and "top_n" not in declared and not bounded:
+        problems.append(f"ranks rows by {ranking} DESC but has no LIMIT {{top_n}}")
+
+    arrays = unnested_arrays(tree)
+    if sorted(meta["nested_arrays"]) != sorted(arrays):
+        problems.append(f"nested_arrays {meta['nested_arrays']} != UNNESTed in SQL {arrays}")
+
+    if meta["additive_across_days"]:
+        reasons = non_additive_reasons(tree)
+        if reasons:
+            problems.append(f"declared additive_across_days but uses {', '.join(reasons)}")
+
+    if "time_axis" in meta:
+        axis = meta["time_axis"]
+        if not isinstance(axis, list) or not axis or not set(axis) <= set(meta["dimensions"]):
+            problems.append(f"time_axis {axis} must be a non-empty list of dimensions")
+
+    if meta["cost_tier"] not in COST_TIERS:
+        problems.append(f"cost_tier must be one of {COST_TIERS}")
+    elif COST_TIERS.index(meta["cost_tier"]) < COST_TIERS.index(minimum_cost_tier(tree)):
+        problems.append(f"cost_tier '{meta['cost_tier']}' is below '{minimum_cost_tier(tree)}' implied by the SQL")
+    return problems
+
+
+def validate_all() -> dict:
+    """{template name: [problems]} for every template with at least one problem."""
+    results = {name: validate_template(name, meta) for name, meta in TEMPLATE_INDEX.items()}
+    for filename in os.listdir(TEMPLATE_DIR):
+        if filename.endswith(".sql") and filename[:-4] not in TEMPLATE_INDEX:
+            results[filename[:-4]] = ["SQL file has no entry in index.json"]
+    return {name: problems for name, problems in results.items() if problems}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suggest", metavar="TEMPLATE", help="Print metadata inferred from TEMPLATE's SQL.")
+    args = parser.parse_args(argv)
+
+    if args.suggest:
+        print(json.dumps({args.suggest: infer_metadata(args.suggest)}, indent=2))
+        return 0
+    failures = validate_all()
+    for name, problems in sorted(failures.items()):
+        for problem in problems:
+            print(f"{name}: {problem}")
+    print(f"{len(TEMPLATE_INDEX)} templates, {len(failures)} with problems")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())